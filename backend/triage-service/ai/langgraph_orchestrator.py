@@ -24,6 +24,8 @@ from langgraph.graph.message import add_messages
 from langgraph.checkpoint.memory import MemorySaver
 from pydantic import BaseModel, Field
 
+from metrics import instrument_node
+
 
 # ==================== STATE DEFINITIONS ====================
 
@@ -646,12 +648,12 @@ class TriageGraph:
         graph = StateGraph(TriageState)
         
         # Add nodes
-        graph.add_node("symptom_intake", SymptomIntakeNode())
-        graph.add_node("risk_assessment", RiskAssessmentNode())
-        graph.add_node("local_inference", LocalInferenceNode())
-        graph.add_node("cloud_inference", CloudInferenceNode())
-        graph.add_node("result_aggregation", ResultAggregationNode())
-        graph.add_node("response_formatting", ResponseFormattingNode())
+        graph.add_node("symptom_intake", instrument_node("symptom_intake", SymptomIntakeNode()))
+        graph.add_node("risk_assessment", instrument_node("risk_assessment", RiskAssessmentNode()))
+        graph.add_node("local_inference", instrument_node("local_inference", LocalInferenceNode()))
+        graph.add_node("cloud_inference", instrument_node("cloud_inference", CloudInferenceNode()))
+        graph.add_node("result_aggregation", instrument_node("result_aggregation", ResultAggregationNode()))
+        graph.add_node("response_formatting", instrument_node("response_formatting", ResponseFormattingNode()))
         
         # Set entry point
         graph.set_entry_point("symptom_intake")
@@ -0,0 +1,435 @@
+"""
+Online Model Selector for ClinixAI
+==================================
+Learns which OpenRouter model to use for each case complexity band from
+observed outcomes instead of fixed thresholds:
+
+- Parse success rate (Beta posterior, Thompson sampling for exploration)
+- Latency (exponentially weighted moving average)
+- Cost (EWMA of per-call USD, from OpenRouter usage accounting or a price table)
+
+Scores trade quality against latency and cost with per-band weights. The
+critical band is quality-first: it only routes to an allowlist of
+high-capability models, ignores cost and drops any model whose observed
+success rate falls below a floor.
+
+Only a model's own failures (5xx, timeouts, unparseable output) count
+against its success rate. Availability errors (rate limits, exhausted
+credits, unreachable host) are recorded separately and only take the model
+out of rotation for a cooldown; rejected requests (bad key, bad request,
+client-side errors) say nothing about the model and are not recorded.
+
+State is written atomically to a JSON file and reloaded on start, so the
+learned statistics survive restarts.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import atexit
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from pydantic import BaseModel, Field
+
+
+BAND_CRITICAL = "critical"
+BAND_STANDARD = "standard"
+BAND_SIMPLE = "simple"
+BANDS = (BAND_CRITICAL, BAND_STANDARD, BAND_SIMPLE)
+
+
+def _env_list(name: str, default: List[str]) -> List[str]:
+    raw = os.getenv(name, "")
+    if not raw:
+        return default
+    return [m.strip() for m in raw.split(",") if m.strip()]
+
+
+def _dedupe(models: List[str]) -> List[str]:
+    seen = set()
+    return [m for m in models if m and not (m in seen or seen.add(m))]
+
+
+# How a failed provider call is fed back to the selector
+FEEDBACK_FAILURE = "failure"  # the model's own failure: record()
+FEEDBACK_UNAVAILABLE = "unavailable"  # could not be served: record_unavailable()
+FEEDBACK_SKIP = "skip"  # the request was at fault: no update
+
+
+def feedback_for_status(status_code: int) -> str:
+    """Selector feedback for a non-200 HTTP status"""
+    if status_code in (402, 429):
+        return FEEDBACK_UNAVAILABLE
+    if status_code == 408 or status_code >= 500:
+        return FEEDBACK_FAILURE
+    return FEEDBACK_SKIP
+
+
+class ModelUnavailable(Exception):
+    """A provider call failed for availability reasons (rate limit, credits, unreachable)"""
+
+
+class RequestRejected(Exception):
+    """A provider call failed through no fault of the model (auth, bad request, client-side error)"""
+
+
+class BandPolicy(BaseModel):
+    """Candidate models and score weights for one complexity band"""
+    candidates: List[str]
+    latency_weight: float = 0.15  # penalty per target_latency_s of EWMA latency
+    cost_weight: float = 0.1  # penalty per target_cost_usd of EWMA cost
+    min_success_rate: float = 0.0  # safety floor once min_samples observed
+
+
+class ModelSelectorConfig(BaseModel):
+    """Configuration for the online model selector"""
+    state_path: str = "data/model_selector_state.json"
+    enabled: bool = True
+
+    policies: Dict[str, BandPolicy] = Field(default_factory=lambda: {
+        BAND_CRITICAL: BandPolicy(
+            candidates=["anthropic/claude-3.5-sonnet", "openai/gpt-4o"],
+            latency_weight=0.05,
+            cost_weight=0.0,
+            min_success_rate=0.9,
+        ),
+        BAND_STANDARD: BandPolicy(
+            candidates=["openai/gpt-4o-mini", "anthropic/claude-3.5-sonnet", "meta-llama/llama-3.1-70b-instruct"],
+            latency_weight=0.15,
+            cost_weight=0.1,
+        ),
+        BAND_SIMPLE: BandPolicy(
+            candidates=["meta-llama/llama-3.1-70b-instruct", "openai/gpt-4o-mini", "meta-llama/llama-3.1-8b-instruct:free"],
+            latency_weight=0.2,
+            cost_weight=0.3,
+        ),
+    })
+
+    # Normalisers for the latency and cost penalties
+    target_latency_s: float = 5.0
+    target_cost_usd: float = 0.01
+
+    # Learning parameters
+    latency_alpha: float = 0.2  # EWMA smoothing
+    decay: float = 0.995  # discount on success/failure counts so old evidence fades
+    min_samples: int = 20  # before min_success_rate is enforced
+    unavailable_cooldown_s: float = 30.0  # skip a model this long after an availability error
+    save_every: int = 10  # persist after this many updates
+
+    # Optional USD per 1M tokens (prompt, completion) when usage.cost is absent
+    prices_per_mtok: Dict[str, List[float]] = Field(default_factory=dict)
+
+    class Config:
+        env_prefix = "MODEL_SELECTOR_"
+
+
+class ModelSelector:
+    """
+    Scored bandit over models per complexity band.
+
+    select() samples from each arm's success posterior (exploration);
+    rank() orders candidates by posterior mean (fallback order).
+    """
+
+    def __init__(self, config: Optional[ModelSelectorConfig] = None):
+        self.config = config or ModelSelectorConfig()
+        self._arms: Dict[str, Dict[str, Dict[str, float]]] = {band: {} for band in BANDS}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one writer of the state file at a time
+        self._updates_since_save = 0
+        self._rng = random.Random()
+        self._load()
+
+    # ==================== BANDS ====================
+
+    @staticmethod
+    def band_for(
+        complexity_score: float = 0.5,
+        risk_score: Optional[float] = None,
+        critical: bool = False
+    ) -> str:
+        """
+        Map case scores to a complexity band. Uses the risk/complexity
+        thresholds of OpenRouterNode when a risk score is available and the
+        complexity-only thresholds of main.py otherwise.
+        """
+        if critical or complexity_score >= 0.9 or (risk_score is not None and risk_score >= 0.8):
+            return BAND_CRITICAL
+        if risk_score is None:
+            return BAND_STANDARD if complexity_score >= 0.7 else BAND_SIMPLE
+        if risk_score < 0.4 and complexity_score < 0.4:
+            return BAND_SIMPLE
+        return BAND_STANDARD
+
+    def candidates(self, band: str, extra: Optional[List[str]] = None) -> List[str]:
+        """Configured candidates for a band; critical never widens past its allowlist"""
+        policy = self.config.policies[band]
+        models = list(policy.candidates)
+        if extra and band != BAND_CRITICAL:
+            models.extend(extra)
+        return _dedupe(models)
+
+    # ==================== SCORING ====================
+
+    def _arm(self, band: str, model: str) -> Dict[str, float]:
+        return self._arms.setdefault(band, {}).setdefault(model, {
+            "successes": 0.0,
+            "failures": 0.0,
+            "calls": 0,
+            "latency_ms": 0.0,
+            "cost_usd": 0.0,
+            "updated_at": 0.0,
+            "unavailable": 0.0,
+            "unavailable_at": 0.0,
+        })
+
+    def _score(self, band: str, model: str, sample: bool) -> float:
+        policy = self.config.policies[band]
+        arm = self._arm(band, model)
+        a = 1.0 + arm["successes"]
+        b = 1.0 + arm["failures"]
+        quality = self._rng.betavariate(a, b) if sample else a / (a + b)
+
+        # Unobserved arms get neutral latency/cost so exploration isn't biased
+        latency_s = arm["latency_ms"] / 1000.0 if arm["calls"] else self.config.target_latency_s
+        cost = arm["cost_usd"] if arm["calls"] else 0.0
+
+        return (
+            quality
+            - policy.latency_weight * latency_s / self.config.target_latency_s
+            - policy.cost_weight * cost / self.config.target_cost_usd
+        )
+
+    def _available(self, band: str, models: List[str]) -> List[str]:
+        """Drop models still cooling down after an availability error"""
+        cutoff = time.time() - self.config.unavailable_cooldown_s
+        available = [m for m in models if self._arm(band, m)["unavailable_at"] < cutoff]
+        return available or models
+
+    def _eligible(self, band: str, models: List[str]) -> List[str]:
+        """Apply the availability cooldown and the band's success-rate floor"""
+        models = self._available(band, models)
+        policy = self.config.policies[band]
+        if policy.min_success_rate <= 0:
+            return models
+
+        eligible = []
+        for model in models:
+            arm = self._arm(band, model)
+            observed = arm["successes"] + arm["failures"]
+            if observed < self.config.min_samples:
+                eligible.append(model)
+                continue
+            if (1.0 + arm["successes"]) / (2.0 + observed) >= policy.min_success_rate:
+                eligible.append(model)
+
+        # Never leave a band without a model; fall back to the configured order
+        return eligible or models
+
+    def select(self, band: str, default: Optional[str] = None) -> str:
+        """
+        Pick the model to try first for a band. The operator-configured
+        default for the band is always a candidate, including for critical.
+        """
+        models = _dedupe([default] + self.candidates(band)) if default else self.candidates(band)
+        if not self.config.enabled or not models:
+            return default or models[0]
+
+        with self._lock:
+            eligible = self._eligible(band, models)
+            return max(eligible, key=lambda m: self._score(band, m, sample=True))
+
+    def rank(self, band: str, extra: Optional[List[str]] = None, exclude: Optional[List[str]] = None) -> List[str]:
+        """
+        Candidates ordered best-first by expected score (fallback order);
+        models cooling down or below the floor go last.
+        """
+        exclude = set(exclude or [])
+        models = [m for m in self.candidates(band, extra) if m not in exclude]
+        if not self.config.enabled:
+            return models
+
+        with self._lock:
+            eligible = self._eligible(band, models)
+            ranked = sorted(eligible, key=lambda m: self._score(band, m, sample=False), reverse=True)
+        return ranked + [m for m in models if m not in ranked]
+
+    # ==================== LEARNING ====================
+
+    def estimate_cost(self, model: str, usage: Optional[Dict[str, Any]]) -> float:
+        """USD for one call from usage.cost, else the configured price table"""
+        if not usage:
+            return 0.0
+        if usage.get("cost") is not None:
+            return float(usage["cost"])
+        prices = self.config.prices_per_mtok.get(model)
+        if not prices:
+            return 0.0
+        prompt_price, completion_price = prices[0], prices[-1]
+        return (
+            usage.get("prompt_tokens", usage.get("prompt", 0)) * prompt_price
+            + usage.get("completion_tokens", usage.get("completion", 0)) * completion_price
+        ) / 1_000_000
+
+    def record(
+        self,
+        band: str,
+        model: str,
+        success: bool,
+        latency_ms: float,
+        cost_usd: float = 0.0
+    ):
+        """Feed back the outcome of one call"""
+        if self._update(band, model, success, latency_ms, cost_usd):
+            self.save()
+
+    async def arecord(
+        self,
+        band: str,
+        model: str,
+        success: bool,
+        latency_ms: float,
+        cost_usd: float = 0.0
+    ):
+        """record() for async callers; the state file is written on a worker thread"""
+        if self._update(band, model, success, latency_ms, cost_usd):
+            await asyncio.to_thread(self.save)
+
+    def record_unavailable(self, band: str, model: str):
+        """
+        Feed back an availability error (429, 402, unreachable). Leaves the
+        quality, latency and cost statistics alone.
+        """
+        if self._update_unavailable(band, model):
+            self.save()
+
+    async def arecord_unavailable(self, band: str, model: str):
+        """record_unavailable() for async callers"""
+        if self._update_unavailable(band, model):
+            await asyncio.to_thread(self.save)
+
+    def _save_due(self) -> bool:
+        """Count an update (lock held); the caller that makes a save due claims it"""
+        self._updates_since_save += 1
+        if self._updates_since_save < self.config.save_every:
+            return False
+        self._updates_since_save = 0
+        return True
+
+    def _update(self, band: str, model: str, success: bool, latency_ms: float, cost_usd: float) -> bool:
+        """Apply one outcome; True when the state is due to be saved"""
+        with self._lock:
+            arm = self._arm(band, model)
+            decay = self.config.decay
+            arm["successes"] = arm["successes"] * decay + (1.0 if success else 0.0)
+            arm["failures"] = arm["failures"] * decay + (0.0 if success else 1.0)
+
+            alpha = self.config.latency_alpha
+            if arm["calls"] == 0:
+                arm["latency_ms"] = latency_ms
+                arm["cost_usd"] = cost_usd
+            else:
+                arm["latency_ms"] = (1 - alpha) * arm["latency_ms"] + alpha * latency_ms
+                arm["cost_usd"] = (1 - alpha) * arm["cost_usd"] + alpha * cost_usd
+            arm["calls"] += 1
+            arm["updated_at"] = time.time()
+
+            return self._save_due()
+
+    def _update_unavailable(self, band: str, model: str) -> bool:
+        with self._lock:
+            arm = self._arm(band, model)
+            arm["unavailable"] = arm["unavailable"] * self.config.decay + 1.0
+            arm["unavailable_at"] = time.time()
+            return self._save_due()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-band arm statistics with current expected scores"""
+        with self._lock:
+            out = {}
+            for band, arms in self._arms.items():
+                out[band] = {}
+                for model, arm in arms.items():
+                    observed = arm["successes"] + arm["failures"]
+                    out[band][model] = {
+                        "calls": arm["calls"],
+                        "success_rate": round((1.0 + arm["successes"]) / (2.0 + observed), 4),
+                        "latency_ms": round(arm["latency_ms"], 1),
+                        "cost_usd": round(arm["cost_usd"], 6),
+                        "unavailable": round(arm["unavailable"], 2),
+                        "score": round(self._score(band, model, sample=False), 4),
+                    }
+            return out
+
+    # ==================== PERSISTENCE ====================
+
+    def _load(self):
+        path = Path(self.config.state_path)
+        if not path.exists():
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for band, arms in data.get("arms", {}).items():
+                if band in self._arms:
+                    for model, arm in arms.items():
+                        self._arm(band, model).update(arm)
+        except (OSError, ValueError) as e:
+            print(f"Model selector state not loaded from {path}: {e}")
+
+    def save(self):
+        """Atomically write state to disk"""
+        path = Path(self.config.state_path)
+        # Snapshot and write under one lock so an older snapshot never lands last
+        with self._save_lock:
+            with self._lock:
+                payload = {"version": 1, "saved_at": time.time(), "arms": self._arms}
+                data = json.dumps(payload, indent=2)
+                self._updates_since_save = 0
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(path.suffix + ".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"Model selector state not saved to {path}: {e}")
+
+
+# Singleton instance
+_model_selector: Optional[ModelSelector] = None
+
+
+def get_model_selector() -> ModelSelector:
+    """Get or create the process-wide model selector"""
+    global _model_selector
+    if _model_selector is None:
+        defaults = ModelSelectorConfig()
+        policies = defaults.policies
+        for band in BANDS:
+            policies[band].candidates = _env_list(
+                f"MODEL_SELECTOR_{band.upper()}_MODELS", policies[band].candidates
+            )
+
+        prices = {}
+        if os.getenv("MODEL_SELECTOR_PRICES"):
+            try:
+                prices = json.loads(os.getenv("MODEL_SELECTOR_PRICES"))
+            except ValueError:
+                print("MODEL_SELECTOR_PRICES is not valid JSON, ignoring")
+
+        _model_selector = ModelSelector(ModelSelectorConfig(
+            state_path=os.getenv("MODEL_SELECTOR_STATE_PATH", defaults.state_path),
+            enabled=os.getenv("MODEL_SELECTOR_ENABLED", "true").lower() == "true",
+            unavailable_cooldown_s=float(
+                os.getenv("MODEL_SELECTOR_UNAVAILABLE_COOLDOWN_S", defaults.unavailable_cooldown_s)
+            ),
+            policies=policies,
+            prices_per_mtok=prices,
+        ))
+        atexit.register(_model_selector.save)
+    return _model_selector
@@ -15,13 +15,17 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 
 import httpx
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from metrics import instrument_provider_call, set_provider_outcome
 
 
 class AnthropicConfig(BaseModel):
     """Configuration for Anthropic API"""
     api_key: str = ""
-    api_base: str = "https://api.anthropic.com/v1"
+    api_base: str = Field(
+        default_factory=lambda: os.getenv("ANTHROPIC_API_BASE", "https://api.anthropic.com/v1")
+    )
     api_version: str = "2023-06-01"
     
     # Model selection
@@ -126,6 +130,7 @@ Respond ONLY with valid JSON:
         # Fallback to secondary model
         return await self._call_anthropic(prompt, self.config.fallback_model)
     
+    @instrument_provider_call("anthropic")
     async def _call_anthropic(self, prompt: str, model: str) -> Optional[Dict[str, Any]]:
         """Make API call to Anthropic"""
         try:
@@ -155,14 +160,17 @@ Respond ONLY with valid JSON:
             if response.status_code == 200:
                 data = response.json()
                 content = data["content"][0]["text"]
+                set_provider_outcome("parse_error")
                 return self._parse_response(content)
             
             elif response.status_code == 529:
                 # Overloaded
+                set_provider_outcome("http_error")
                 print(f"Anthropic overloaded for model {model}")
                 return None
             
             else:
+                set_provider_outcome("http_error")
                 print(f"Anthropic API error: {response.status_code} - {response.text}")
                 return None
                 
@@ -11,19 +11,29 @@ Models Used:
 """
 
 import os
+import re
 import json
 import asyncio
-from typing import Optional, Dict, Any, List
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
 import httpx
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from metrics import instrument_provider_call, set_provider_outcome
 
 
 class HuggingFaceConfig(BaseModel):
     """Configuration for Hugging Face Inference API"""
     api_key: str = ""
-    inference_endpoint: str = "https://api-inference.huggingface.co/models"
+    inference_endpoint: str = Field(
+        default_factory=lambda: os.getenv(
+            "HUGGINGFACE_INFERENCE_ENDPOINT", "https://api-inference.huggingface.co/models"
+        )
+    )
     
     # Model selection for different tasks
     text_generation_model: str = "mistralai/Mistral-7B-Instruct-v0.2"
@@ -116,6 +126,7 @@ OUTPUT FORMAT (JSON only):
         # Fallback to classification-based approach
         return await self._classify_symptoms(state)
     
+    @instrument_provider_call("huggingface", model=lambda self, *_: self.config.text_generation_model)
     async def _generate_with_instruct_model(self, prompt: str) -> Optional[Dict[str, Any]]:
         """Generate response using instruction-tuned model"""
         try:
@@ -159,15 +170,18 @@ OUTPUT FORMAT (JSON only):
                     generated_text = data.get("generated_text", "")
                 
                 # Parse JSON from response
+                set_provider_outcome("parse_error")
                 return self._parse_json_response(generated_text)
             
             elif response.status_code == 503:
                 # Model is loading
+                set_provider_outcome("http_error")
                 print("HuggingFace model is loading, waiting...")
                 await asyncio.sleep(20)
                 return await self._generate_with_instruct_model(prompt)
             
             else:
+                set_provider_outcome("http_error")
                 print(f"HuggingFace API error: {response.status_code} - {response.text}")
                 return None
                 
@@ -175,6 +189,7 @@ OUTPUT FORMAT (JSON only):
             print(f"HuggingFace inference error: {e}")
             return None
     
+    @instrument_provider_call("huggingface", model=lambda self, *_: "facebook/bart-large-mnli")
     async def _classify_symptoms(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Fallback classification-based analysis using PubMedBERT.
@@ -221,6 +236,7 @@ OUTPUT FORMAT (JSON only):
                 data = response.json()
                 return self._convert_classification_to_triage(data, state)
             
+            set_provider_outcome("http_error")
             return None
             
         except Exception as e:
@@ -338,35 +354,140 @@ OUTPUT FORMAT (JSON only):
 
 # ==================== SPECIALIZED MEDICAL MODELS ====================
 
+# Shared pool for CPU-bound local NER / similarity so the event loop stays free
+_local_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_local_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool used by the local helper nodes"""
+    global _local_executor
+    if _local_executor is None:
+        _local_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("HF_LOCAL_WORKERS", "4")),
+            thread_name_prefix="hf-local",
+        )
+    return _local_executor
+
+
+# Gazetteer for local NER, labelled like d4data/biomedical-ner-all
+MEDICAL_GAZETTEER: Dict[str, List[str]] = {
+    "Sign_symptom": [
+        "fever", "high fever", "chills", "night sweats", "sweating", "headache",
+        "chest pain", "chest tightness", "palpitations", "shortness of breath",
+        "difficulty breathing", "cough", "dry cough", "blood sputum", "wheezing",
+        "nausea", "vomiting", "vomiting blood", "diarrhea", "watery diarrhea",
+        "abdominal pain", "stomach pain", "constipation", "bloating", "jaundice",
+        "dizziness", "confusion", "seizure", "convulsions", "numbness", "tingling",
+        "weakness", "fatigue", "weight loss", "loss of appetite", "rash", "itching",
+        "swelling", "joint pain", "back pain", "neck stiffness", "muscle pain",
+        "body ache", "sore throat", "runny nose", "dehydration", "bleeding",
+        "severe bleeding", "unconscious", "loss of consciousness", "blurred vision",
+        "burning urination", "blood in urine", "swollen lymph nodes",
+    ],
+    "Disease_disorder": [
+        "malaria", "typhoid", "cholera", "tuberculosis", "tb", "hiv", "aids",
+        "lassa fever", "yellow fever", "dengue", "ebola", "meningitis", "pneumonia",
+        "asthma", "diabetes", "hypertension", "stroke", "heart attack",
+        "myocardial infarction", "sepsis", "anemia", "sickle cell disease",
+        "schistosomiasis", "trypanosomiasis", "measles", "gastroenteritis",
+        "urinary tract infection", "influenza", "covid-19", "hepatitis",
+    ],
+    "Medication": [
+        "paracetamol", "acetaminophen", "ibuprofen", "aspirin", "amoxicillin",
+        "artemether", "lumefantrine", "artesunate", "quinine", "chloroquine",
+        "metformin", "insulin", "ciprofloxacin", "metronidazole", "ors",
+        "oral rehydration salts", "salbutamol", "prednisolone", "antiretroviral",
+    ],
+    # No bare "back" or "head": everyday phrases ("came back", "head to the
+    # clinic") would tag them; "back pain" and "headache" are symptoms above
+    "Biological_structure": [
+        "chest", "abdomen", "stomach", "heart", "lung", "lungs", "liver",
+        "kidney", "bladder", "skin", "eye", "eyes", "throat", "neck",
+        "joint", "joints", "leg", "legs", "arm", "arms",
+    ],
+    "Diagnostic_procedure": [
+        "blood test", "malaria test", "rapid diagnostic test", "rdt", "x-ray",
+        "ultrasound", "ecg", "urinalysis", "blood smear", "ct scan",
+    ],
+}
+
+
 class MedicalNERNode:
     """
     Named Entity Recognition for medical terms.
-    Uses BioBERT or PubMedBERT for extracting medical entities.
+
+    Runs locally: a compiled gazetteer matcher by default, or a local
+    transformers token-classification model (d4data/biomedical-ner-all)
+    when MEDICAL_NER_BACKEND=transformers. Output matches the HF Inference
+    API shape: entity_group, word, score, start, end.
     """
     
-    def __init__(self):
-        self.config = HuggingFaceConfig(
-            api_key=os.getenv("HUGGINGFACE_API_KEY", "")
-        )
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        gazetteer: Optional[Dict[str, List[str]]] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
         self.model = "d4data/biomedical-ner-all"
+        self.backend = backend or os.getenv("MEDICAL_NER_BACKEND", "gazetteer")
+        self._executor = executor
+        self._pipeline = None
+        
+        # One alternation over every term, longest first, so each position
+        # takes the longest match in a single regex pass
+        gazetteer = gazetteer or MEDICAL_GAZETTEER
+        self._labels: Dict[str, str] = {}
+        for label, terms in gazetteer.items():
+            for term in terms:
+                self._labels.setdefault(term.lower(), label)
+        alternation = "|".join(
+            re.escape(term) for term in sorted(self._labels, key=len, reverse=True)
+        )
+        self._pattern = re.compile(rf"(?<![\w-])(?:{alternation})(?![\w-])", re.IGNORECASE)
+    
+    def _load_pipeline(self):
+        """Load the local transformers NER model (once)"""
+        if self._pipeline is None:
+            from transformers import pipeline
+            self._pipeline = pipeline(
+                "token-classification",
+                model=self.model,
+                aggregation_strategy="simple",
+            )
+        return self._pipeline
+    
+    def extract_entities_sync(self, text: str) -> List[Dict[str, Any]]:
+        """Extract medical entities from text (blocking)"""
+        if self.backend == "transformers":
+            try:
+                return [
+                    {**e, "score": float(e["score"])}
+                    for e in self._load_pipeline()(text)
+                ]
+            except ImportError:
+                print("transformers not installed, falling back to gazetteer NER")
+                self.backend = "gazetteer"
+        
+        return [
+            {
+                "entity_group": self._labels[match.group(0).lower()],
+                "word": match.group(0),
+                "score": 1.0,
+                "start": match.start(),
+                "end": match.end(),
+            }
+            for match in self._pattern.finditer(text)
+        ]
     
     async def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """Extract medical entities from text"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"https://api-inference.huggingface.co/models/{self.model}",
-                    headers={
-                        "Authorization": f"Bearer {self.config.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={"inputs": text},
-                    timeout=30.0,
-                )
-                
-                if response.status_code == 200:
-                    return response.json()
-                return []
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor or get_local_executor(),
+                self.extract_entities_sync,
+                text,
+            )
         except Exception as e:
             print(f"NER extraction error: {e}")
             return []
@@ -376,44 +497,89 @@ class SymptomSimilarityNode:
     """
     Semantic similarity for symptom matching.
     Matches patient symptoms to known conditions.
+
+    Reuses the process-wide EmbeddingService model. Condition embeddings are
+    computed once into a normalized float32 matrix, so each query costs one
+    encode plus one matrix-vector product.
     """
     
-    def __init__(self):
-        self.config = HuggingFaceConfig(
-            api_key=os.getenv("HUGGINGFACE_API_KEY", "")
-        )
-        self.model = "sentence-transformers/all-MiniLM-L6-v2"
+    # Condition lists whose embedding matrices are kept
+    MAX_CACHED_CONDITION_SETS = 16
+    
+    def __init__(
+        self,
+        embedder: Optional[Any] = None,
+        conditions: Optional[List[str]] = None,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        # None shares the RAG embedding model instance
+        self.model = os.getenv("SYMPTOM_SIMILARITY_MODEL")
+        self._embedder = embedder
+        self._executor = executor
+        self._matrices: "OrderedDict[Tuple[str, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._default_conditions: Optional[Tuple[str, ...]] = None
+        if conditions:
+            self.set_conditions(conditions)
+    
+    def _get_embedder(self):
+        if self._embedder is None:
+            from graphrag.advanced_rag_service import get_embedding_service
+            self._embedder = get_embedding_service(self.model)
+        return self._embedder
+    
+    def set_conditions(self, conditions: List[str]):
+        """Precompute the embedding matrix for the default condition list"""
+        self._default_conditions = tuple(conditions)
+        self._condition_matrix(self._default_conditions)
+    
+    def _condition_matrix(self, conditions: Tuple[str, ...]):
+        """Normalized (n_conditions, dim) matrix for a condition list (cached)"""
+        with self._lock:
+            matrix = self._matrices.get(conditions)
+            if matrix is not None:
+                self._matrices.move_to_end(conditions)
+                return matrix
+        
+        matrix = self._get_embedder().embed_matrix(list(conditions), normalize=True)
+        with self._lock:
+            self._matrices[conditions] = matrix
+            while len(self._matrices) > self.MAX_CACHED_CONDITION_SETS:
+                self._matrices.popitem(last=False)
+        return matrix
+    
+    def find_similar_conditions_sync(
+        self,
+        symptoms: str,
+        conditions: Optional[List[str]] = None
+    ) -> List[Dict[str, float]]:
+        """Cosine similarity of symptoms against each condition (blocking)"""
+        key = tuple(conditions) if conditions else self._default_conditions
+        if not key:
+            return []
+        
+        matrix = self._condition_matrix(key)
+        query = self._get_embedder().embed_matrix([symptoms], normalize=True)[0]
+        scores = matrix @ query
+        return [
+            {"condition": c, "similarity": float(s)}
+            for c, s in zip(key, scores)
+        ]
     
     async def find_similar_conditions(
         self, 
         symptoms: str, 
-        conditions: List[str]
+        conditions: Optional[List[str]] = None
     ) -> List[Dict[str, float]]:
         """Find conditions most similar to given symptoms"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"https://api-inference.huggingface.co/models/{self.model}",
-                    headers={
-                        "Authorization": f"Bearer {self.config.api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "inputs": {
-                            "source_sentence": symptoms,
-                            "sentences": conditions,
-                        }
-                    },
-                    timeout=30.0,
-                )
-                
-                if response.status_code == 200:
-                    scores = response.json()
-                    return [
-                        {"condition": c, "similarity": s}
-                        for c, s in zip(conditions, scores)
-                    ]
-                return []
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor or get_local_executor(),
+                self.find_similar_conditions_sync,
+                symptoms,
+                conditions,
+            )
         except Exception as e:
             print(f"Similarity search error: {e}")
             return []
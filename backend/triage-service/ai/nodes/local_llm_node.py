@@ -11,6 +11,12 @@ Optimized for:
 - Offline operation
 - Low memory footprint (2GB target)
 - Fast inference (<5s target)
+
+Speculative decoding (llama.cpp backend only):
+- draft: a much smaller GGUF with the same tokenizer (e.g. Qwen2.5-0.5B for
+  Qwen2.5-1.5B) proposes tokens that the main model verifies in one batch
+- prompt_lookup: n-gram matches against the prompt are proposed instead,
+  no second model needed
 """
 
 import os
@@ -32,6 +38,13 @@ class LocalModelBackend(str, Enum):
     RULE_BASED = "rule_based"
 
 
+class SpeculativeMode(str, Enum):
+    """Speculative decoding strategies for the llama.cpp backend"""
+    OFF = "off"
+    DRAFT_MODEL = "draft"
+    PROMPT_LOOKUP = "prompt_lookup"
+
+
 class LocalLLMConfig(BaseModel):
     """Configuration for local LLM inference"""
     # Model settings
@@ -50,6 +63,12 @@ class LocalLLMConfig(BaseModel):
     n_threads: int = 4
     n_gpu_layers: int = 0  # CPU only for compatibility
     
+    # Speculative decoding (llama.cpp only)
+    speculative_mode: SpeculativeMode = SpeculativeMode.OFF
+    draft_model_path: Optional[str] = None  # e.g. models/qwen2.5-0.5b-instruct-q4_k_m.gguf
+    num_draft_tokens: int = 8
+    draft_n_threads: Optional[int] = None  # defaults to n_threads
+    
     # Performance targets
     target_inference_time_ms: int = 5000
     
@@ -57,6 +76,73 @@ class LocalLLMConfig(BaseModel):
         env_prefix = "LOCAL_LLM_"
 
 
+class GGUFDraftModel:
+    """
+    Draft model for llama-cpp-python speculative decoding.
+    
+    Greedily proposes `num_pred_tokens` tokens from a small GGUF model that
+    shares the main model's vocabulary. llama.cpp keeps the KV cache for the
+    longest common prefix, so each call only evaluates the new tokens.
+    """
+    
+    def __init__(
+        self,
+        model_path: str,
+        num_pred_tokens: int = 8,
+        n_ctx: int = 2048,
+        n_threads: int = 4,
+    ):
+        from llama_cpp import Llama
+        
+        self.num_pred_tokens = num_pred_tokens
+        self._llama = Llama(
+            model_path=model_path,
+            n_ctx=n_ctx,
+            n_threads=n_threads,
+            n_gpu_layers=0,
+            verbose=False,
+        )
+        self.calls = 0
+        self.proposed_tokens = 0
+    
+    def n_vocab(self) -> int:
+        return self._llama.n_vocab()
+    
+    def __call__(self, input_ids, /, **kwargs):
+        import numpy as np
+        
+        draft = []
+        for token in self._llama.generate(
+            [int(t) for t in input_ids],
+            top_k=1,
+            temp=0.0,
+        ):
+            if token == self._llama.token_eos():
+                break
+            draft.append(token)
+            if len(draft) >= self.num_pred_tokens:
+                break
+        
+        self.calls += 1
+        self.proposed_tokens += len(draft)
+        return np.array(draft, dtype=np.intc)
+
+
+class CountingDraftModel:
+    """Wraps a llama.cpp draft model to count proposals for acceptance stats"""
+    
+    def __init__(self, inner):
+        self._inner = inner
+        self.calls = 0
+        self.proposed_tokens = 0
+    
+    def __call__(self, input_ids, /, **kwargs):
+        draft = self._inner(input_ids, **kwargs)
+        self.calls += 1
+        self.proposed_tokens += len(draft)
+        return draft
+
+
 class LocalLLMNode:
     """
     LangGraph node for local/on-device LLM inference.
@@ -70,6 +156,7 @@ class LocalLLMNode:
     def __init__(self, config: Optional[LocalLLMConfig] = None):
         self.config = config or LocalLLMConfig()
         self._model = None
+        self._draft_model = None
         self._initialized = False
         
         # Rule-based fallback data
@@ -148,16 +235,68 @@ class LocalLLMNode:
             if not model_path.exists():
                 raise FileNotFoundError(f"Model not found: {model_path}")
             
+            self._draft_model = self._init_draft_model()
+            
             self._model = Llama(
                 model_path=str(model_path),
                 n_ctx=self.config.context_size,
                 n_threads=self.config.n_threads,
                 n_gpu_layers=self.config.n_gpu_layers,
+                draft_model=self._draft_model,
                 verbose=False,
             )
+            
+            if (
+                isinstance(self._draft_model, GGUFDraftModel)
+                and self._draft_model.n_vocab() != self._model.n_vocab()
+            ):
+                print(
+                    f"Draft model vocabulary ({self._draft_model.n_vocab()}) differs from the main "
+                    f"model's ({self._model.n_vocab()}); speculative decoding disabled"
+                )
+                self._draft_model = None
+                self._model.draft_model = None
         except ImportError:
             raise ImportError("llama-cpp-python not installed")
     
+    def _init_draft_model(self):
+        """
+        Draft model for the configured speculative mode, or None. Speculation
+        is only a speed-up: a bad draft setting disables it, not the local LLM.
+        """
+        try:
+            return self._build_draft_model()
+        except Exception as e:
+            print(f"Speculative decoding disabled, draft model failed: {e}")
+            return None
+    
+    def _build_draft_model(self):
+        mode = self.config.speculative_mode
+        
+        if mode == SpeculativeMode.PROMPT_LOOKUP:
+            from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+            
+            return CountingDraftModel(
+                LlamaPromptLookupDecoding(num_pred_tokens=self.config.num_draft_tokens)
+            )
+        
+        if mode == SpeculativeMode.DRAFT_MODEL:
+            if not self.config.draft_model_path:
+                raise ValueError("draft_model_path is required for draft-model speculative decoding")
+            
+            draft_path = Path(self.config.draft_model_path)
+            if not draft_path.exists():
+                raise FileNotFoundError(f"Draft model not found: {draft_path}")
+            
+            return GGUFDraftModel(
+                model_path=str(draft_path),
+                num_pred_tokens=self.config.num_draft_tokens,
+                n_ctx=self.config.context_size,
+                n_threads=self.config.draft_n_threads or self.config.n_threads,
+            )
+        
+        return None
+    
     async def _init_ctransformers(self):
         """Initialize ctransformers backend"""
         try:
@@ -219,6 +358,9 @@ class LocalLLMNode:
         """Run inference with loaded model"""
         try:
             if self.config.backend == LocalModelBackend.LLAMA_CPP:
+                draft_calls_before = getattr(self._draft_model, "calls", 0)
+                proposed_before = getattr(self._draft_model, "proposed_tokens", 0)
+                
                 # Run in thread pool to avoid blocking
                 loop = asyncio.get_event_loop()
                 response = await loop.run_in_executor(
@@ -234,7 +376,18 @@ class LocalLLMNode:
                 )
                 
                 text = response["choices"][0]["text"]
-                return self._parse_model_response(text)
+                result = self._parse_model_response(text)
+                if result is not None:
+                    completion_tokens = response.get("usage", {}).get("completion_tokens", 0)
+                    result["_tokens"] = {
+                        "prompt": response.get("usage", {}).get("prompt_tokens", 0),
+                        "completion": completion_tokens,
+                    }
+                    if self._draft_model is not None:
+                        result["_speculative"] = self._speculative_stats(
+                            completion_tokens, draft_calls_before, proposed_before
+                        )
+                return result
             
             elif self.config.backend == LocalModelBackend.CTRANSFORMERS:
                 loop = asyncio.get_event_loop()
@@ -257,6 +410,31 @@ class LocalLLMNode:
         
         return None
     
+    def _speculative_stats(
+        self,
+        completion_tokens: int,
+        draft_calls_before: int,
+        proposed_before: int
+    ) -> Dict[str, Any]:
+        """
+        Estimate draft acceptance for the last generation.
+        
+        llama.cpp does not report accepted tokens, but every verification
+        step emits the accepted draft tokens plus one token from the main
+        model, so accepted ~= completion_tokens - verification_steps.
+        """
+        steps = self._draft_model.calls - draft_calls_before
+        proposed = self._draft_model.proposed_tokens - proposed_before
+        accepted = max(completion_tokens - steps, 0)
+        
+        return {
+            "mode": self.config.speculative_mode.value,
+            "draft_steps": steps,
+            "proposed_tokens": proposed,
+            "accepted_tokens": accepted,
+            "acceptance_rate": round(accepted / proposed, 3) if proposed else 0.0,
+        }
+    
     def _parse_model_response(self, text: str) -> Optional[Dict[str, Any]]:
         """Parse JSON from model response"""
         try:
@@ -443,5 +621,6 @@ class LocalLLMNode:
             "provider": "local",
             "backend": self.config.backend.value,
             "model_loaded": self._model is not None,
+            "speculative_mode": self.config.speculative_mode.value,
             "initialized": self._initialized,
         }
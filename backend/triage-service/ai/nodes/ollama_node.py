@@ -20,6 +20,8 @@ from datetime import datetime
 import httpx
 from pydantic import BaseModel, Field
 
+from metrics import instrument_provider_call, set_provider_outcome
+
 
 class OllamaConfig(BaseModel):
     """Configuration for Ollama server connection"""
@@ -158,6 +160,7 @@ Respond ONLY in valid JSON format:
         
         return result
 
+    @instrument_provider_call("ollama")
     async def _chat_completion(
         self, 
         user_prompt: str,
@@ -187,6 +190,7 @@ Respond ONLY in valid JSON format:
             if response.status_code == 200:
                 data = response.json()
                 content = data.get("message", {}).get("content", "")
+                set_provider_outcome("parse_error")
                 result = self._extract_json(content)
                 
                 if result:
@@ -197,6 +201,7 @@ Respond ONLY in valid JSON format:
                 
                 return result
             else:
+                set_provider_outcome("http_error")
                 print(f"Ollama chat error ({response.status_code}): {response.text}")
                 return None
                 
@@ -207,6 +212,7 @@ Respond ONLY in valid JSON format:
             print(f"Ollama chat error: {e}")
             return None
 
+    @instrument_provider_call("ollama")
     async def _generate(
         self, 
         user_prompt: str,
@@ -235,6 +241,7 @@ Respond ONLY in valid JSON format:
             if response.status_code == 200:
                 data = response.json()
                 content = data.get("response", "")
+                set_provider_outcome("parse_error")
                 result = self._extract_json(content)
                 
                 if result:
@@ -243,6 +250,7 @@ Respond ONLY in valid JSON format:
                 
                 return result
             else:
+                set_provider_outcome("http_error")
                 print(f"Ollama generate error ({response.status_code}): {response.text}")
                 return None
                 
@@ -15,13 +15,17 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 
 import httpx
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from metrics import instrument_provider_call, set_provider_outcome
 
 
 class OpenAIConfig(BaseModel):
     """Configuration for OpenAI API"""
     api_key: str = ""
-    api_base: str = "https://api.openai.com/v1"
+    api_base: str = Field(
+        default_factory=lambda: os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+    )
     
     # Model selection
     primary_model: str = "gpt-4o"
@@ -129,6 +133,7 @@ IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend prof
         # Fallback to secondary model
         return await self._call_openai(prompt, self.config.fallback_model)
     
+    @instrument_provider_call("openai")
     async def _call_openai(self, prompt: str, model: str) -> Optional[Dict[str, Any]]:
         """Make API call to OpenAI"""
         try:
@@ -162,14 +167,17 @@ IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend prof
             if response.status_code == 200:
                 data = response.json()
                 content = data["choices"][0]["message"]["content"]
+                set_provider_outcome("parse_error")
                 return self._parse_response(content)
             
             elif response.status_code == 429:
                 # Rate limited
+                set_provider_outcome("http_error")
                 print(f"OpenAI rate limited for model {model}")
                 return None
             
             else:
+                set_provider_outcome("http_error")
                 print(f"OpenAI API error: {response.status_code} - {response.text}")
                 return None
                 
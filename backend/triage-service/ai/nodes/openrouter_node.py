@@ -20,17 +20,33 @@ Get your API key at: https://openrouter.ai/keys
 
 import os
 import json
+import time
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 import httpx
 from pydantic import BaseModel, Field
 
+from metrics import instrument_provider_call, set_provider_outcome
+from ..model_selector import (
+    ModelSelector,
+    ModelUnavailable,
+    RequestRejected,
+    BAND_CRITICAL,
+    BAND_SIMPLE,
+    FEEDBACK_SKIP,
+    FEEDBACK_UNAVAILABLE,
+    feedback_for_status,
+    get_model_selector,
+)
+
 
 class OpenRouterConfig(BaseModel):
     """Configuration for OpenRouter API"""
     api_key: str = ""
-    api_base: str = "https://openrouter.ai/api/v1"
+    api_base: str = Field(
+        default_factory=lambda: os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1")
+    )
     
     # Model selection by use case
     default_model: str = "anthropic/claude-3.5-sonnet"
@@ -102,7 +118,9 @@ Always respond with valid JSON in this exact format:
 
 IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend professional medical evaluation for any concerning symptoms."""
 
-    # Fallback chain for resilience
+    # Fallback pool for resilience; the order is learned by ModelSelector.
+    # Critical cases try the critical allowlist first and this full pool
+    # only as a last resort.
     FALLBACK_MODELS = [
         "anthropic/claude-3.5-sonnet",
         "openai/gpt-4o",
@@ -112,7 +130,12 @@ IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend prof
         "google/gemini-pro-1.5",
     ]
 
-    def __init__(self, config: Optional[OpenRouterConfig] = None):
+    def __init__(
+        self,
+        config: Optional[OpenRouterConfig] = None,
+        selector: Optional[ModelSelector] = None
+    ):
+        self.selector = selector or get_model_selector()
         self.config = config or OpenRouterConfig(
             api_key=os.getenv("OPENROUTER_API_KEY", ""),
             default_model=os.getenv("OPENROUTER_DEFAULT_MODEL", "anthropic/claude-3.5-sonnet"),
@@ -136,22 +159,45 @@ IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend prof
         if self._client and not self._client.is_closed:
             await self._client.aclose()
 
-    def _select_model(self, state: Dict[str, Any]) -> str:
-        """Select appropriate model based on case complexity"""
-        risk_score = state.get("risk_score", 0.5)
-        complexity_score = state.get("complexity_score", 0.5)
-        
-        # Critical cases get the best model
-        if risk_score >= 0.8:
+    def _band(self, state: Dict[str, Any]) -> str:
+        """Complexity band for the case"""
+        return ModelSelector.band_for(
+            complexity_score=state.get("complexity_score", 0.5),
+            risk_score=state.get("risk_score", 0.5),
+        )
+
+    def _band_default(self, band: str) -> str:
+        """Configured model for a band (always a selector candidate)"""
+        if band == BAND_CRITICAL:
             return self.config.critical_model
-        
-        # Simple cases use cost-effective model
-        if risk_score < 0.4 and complexity_score < 0.4:
+        if band == BAND_SIMPLE:
             return self.config.simple_model
-        
-        # Default for standard cases
         return self.config.default_model
 
+    def _select_model(self, state: Dict[str, Any]) -> str:
+        """Select model for the case's complexity band from learned latency/success/cost"""
+        band = self._band(state)
+        return self.selector.select(band, default=self._band_default(band))
+
+    async def _call_and_record(self, prompt: str, model: str, band: str) -> Optional[Dict[str, Any]]:
+        """Call a model and feed the outcome back to the selector"""
+        start = time.perf_counter()
+        try:
+            result = await self._call_openrouter(prompt, model)
+        except ModelUnavailable as e:
+            print(f"OpenRouter model {model} unavailable: {e}")
+            await self.selector.arecord_unavailable(band, model)
+            return None
+        except RequestRejected as e:
+            # Bad key, bad request or a local error: nothing learned about the model
+            print(f"OpenRouter request to {model} rejected: {e}")
+            return None
+        latency_ms = (time.perf_counter() - start) * 1000
+        
+        cost = self.selector.estimate_cost(model, result.get("_tokens") if result else None)
+        await self.selector.arecord(band, model, success=result is not None, latency_ms=latency_ms, cost_usd=cost)
+        return result
+
     def _build_prompt(self, state: Dict[str, Any]) -> str:
         """Build the medical triage prompt from state"""
         parts = []
@@ -226,32 +272,43 @@ IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend prof
         # Build prompt from state if not provided
         user_prompt = prompt if prompt else self._build_prompt(state)
         
-        # Select model based on case complexity
+        # Select model based on case complexity band
+        band = self._band(state)
         selected_model = model or self._select_model(state)
         
         # Try selected model first
-        result = await self._call_openrouter(user_prompt, selected_model)
+        result = await self._call_and_record(user_prompt, selected_model, band)
         
         if result:
             result["_model_used"] = selected_model
             result["_provider"] = "openrouter"
+            result["_band"] = band
             return result
         
-        # Try fallback models
-        for fallback_model in self.FALLBACK_MODELS:
-            if fallback_model != selected_model:
-                print(f"Trying fallback model: {fallback_model}")
-                result = await self._call_openrouter(user_prompt, fallback_model)
-                if result:
-                    result["_model_used"] = fallback_model
-                    result["_provider"] = "openrouter"
-                    result["_fallback"] = True
-                    return result
+        # Try fallback models, best expected score first, then the rest of
+        # the pool (for critical, rank() stays within the allowlist)
+        fallbacks = self.selector.rank(band, extra=self.FALLBACK_MODELS, exclude=[selected_model])
+        fallbacks += [m for m in self.FALLBACK_MODELS if m != selected_model and m not in fallbacks]
+        for fallback_model in fallbacks:
+            print(f"Trying fallback model: {fallback_model}")
+            result = await self._call_and_record(user_prompt, fallback_model, band)
+            if result:
+                result["_model_used"] = fallback_model
+                result["_provider"] = "openrouter"
+                result["_band"] = band
+                result["_fallback"] = True
+                return result
         
         return None
 
+    @instrument_provider_call("openrouter")
     async def _call_openrouter(self, prompt: str, model: str) -> Optional[Dict[str, Any]]:
-        """Make API call to OpenRouter"""
+        """
+        Make API call to OpenRouter. Returns None when the model failed
+        (5xx, timeout, unparseable output); raises ModelUnavailable when it
+        could not be served and RequestRejected when the request was at fault.
+        """
+        response = None
         try:
             client = await self._get_client()
             
@@ -277,6 +334,8 @@ IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend prof
                 "temperature": self.config.temperature,
                 "max_tokens": self.config.max_tokens,
                 "top_p": self.config.top_p,
+                # Ask OpenRouter to report the call's cost for model selection
+                "usage": {"include": True},
             }
             
             # Add JSON mode for supported models
@@ -292,6 +351,7 @@ IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend prof
             if response.status_code == 200:
                 data = response.json()
                 content = data["choices"][0]["message"]["content"]
+                set_provider_outcome("parse_error")
                 result = self._parse_response(content)
                 
                 # Add usage info if available
@@ -300,23 +360,40 @@ IMPORTANT: You are a triage tool, NOT a diagnostic system. Always recommend prof
                         "prompt": data["usage"].get("prompt_tokens", 0),
                         "completion": data["usage"].get("completion_tokens", 0),
                         "total": data["usage"].get("total_tokens", 0),
+                        "cost": data["usage"].get("cost"),
                     }
                 
                 return result
             
             elif response.status_code == 429:
-                print(f"OpenRouter rate limited for model {model}")
-                return None
+                set_provider_outcome("http_error")
+                raise ModelUnavailable("rate limited")
             
             elif response.status_code == 402:
-                print(f"OpenRouter insufficient credits for model {model}")
-                return None
+                set_provider_outcome("http_error")
+                raise ModelUnavailable("insufficient credits")
             
             else:
+                set_provider_outcome("http_error")
+                feedback = feedback_for_status(response.status_code)
+                if feedback == FEEDBACK_UNAVAILABLE:
+                    raise ModelUnavailable(f"API error {response.status_code}")
+                if feedback == FEEDBACK_SKIP:
+                    raise RequestRejected(f"API error {response.status_code} - {response.text}")
                 print(f"OpenRouter API error: {response.status_code} - {response.text}")
                 return None
-                
+        
+        except (ModelUnavailable, RequestRejected):
+            raise
+        except httpx.TimeoutException as e:
+            print(f"OpenRouter request timed out: {e}")
+            return None
+        except httpx.TransportError as e:
+            raise ModelUnavailable(f"transport error: {e}") from e
         except Exception as e:
+            if response is None:
+                raise RequestRejected(f"client error: {e}") from e
+            # The model's response did not have the expected shape
             print(f"OpenRouter inference error: {e}")
             return None
 
@@ -24,6 +24,8 @@ from enum import Enum
 import httpx
 from pydantic import BaseModel, Field
 
+from metrics import instrument_provider_call, set_provider_outcome
+
 
 class ModelProvider(str, Enum):
     """Available model providers"""
@@ -32,6 +34,18 @@ class ModelProvider(str, Enum):
     CUSTOM = "custom"
 
 
+# Base URLs for the legacy Inference API and the new router; overridable so
+# the node can be pointed at a local stub server for load testing
+def _hf_inference_url(model_id: str) -> str:
+    base = os.getenv("HUGGINGFACE_INFERENCE_ENDPOINT", "https://api-inference.huggingface.co/models")
+    return f"{base}/{model_id}"
+
+
+def _hf_router_chat_url(model_id: str) -> str:
+    base = os.getenv("HUGGINGFACE_ROUTER_BASE", "https://router.huggingface.co/hf-inference")
+    return f"{base}/models/{model_id}/v1/chat/completions"
+
+
 class HuggingFaceEndpointConfig(BaseModel):
     """Configuration for a HuggingFace Inference Endpoint"""
     name: str
@@ -53,22 +67,22 @@ class QwenLiquidConfig(BaseModel):
     # NEW: HuggingFace Endpoints Router (endpoints.huggingface.co)
     # Qwen Model Configuration
     qwen_endpoint: str = Field(
-        default="https://api-inference.huggingface.co/models/Qwen/Qwen2.5-3B-Instruct",
+        default_factory=lambda: _hf_inference_url("Qwen/Qwen2.5-3B-Instruct"),
         description="Qwen model endpoint URL (legacy API)"
     )
     qwen_chat_endpoint: str = Field(
-        default="https://router.huggingface.co/hf-inference/models/Qwen/Qwen2.5-3B-Instruct/v1/chat/completions",
+        default_factory=lambda: _hf_router_chat_url("Qwen/Qwen2.5-3B-Instruct"),
         description="Qwen chat completions endpoint (new router)"
     )
     qwen_model_id: str = "Qwen/Qwen2.5-3B-Instruct"
     
     # LiquidAI Model Configuration  
     liquid_endpoint: str = Field(
-        default="https://api-inference.huggingface.co/models/LiquidAI/LFM2-1.2B-Instruct",
+        default_factory=lambda: _hf_inference_url("LiquidAI/LFM2-1.2B-Instruct"),
         description="LiquidAI model endpoint URL (legacy API)"
     )
     liquid_chat_endpoint: str = Field(
-        default="https://router.huggingface.co/hf-inference/models/microsoft/Phi-3-mini-4k-instruct/v1/chat/completions",
+        default_factory=lambda: _hf_router_chat_url("microsoft/Phi-3-mini-4k-instruct"),
         description="Alternative chat endpoint (Phi-3 as LiquidAI alternative)"
     )
     liquid_model_id: str = "microsoft/Phi-3-mini-4k-instruct"
@@ -267,6 +281,7 @@ You MUST respond in valid JSON format:
             print(f"Model {model_name} failed: {e}")
         return None
 
+    @instrument_provider_call("huggingface", model=lambda self, *_: self.config.qwen_model_id)
     async def _infer_qwen(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Inference using Qwen model via HuggingFace chat completions API"""
         if not self.config.hf_api_token:
@@ -322,6 +337,7 @@ You MUST respond in valid JSON format:
                 )
             
             if response.status_code == 200:
+                set_provider_outcome("parse_error")
                 data = response.json()
                 # Parse chat completions format
                 if "choices" in data:
@@ -330,10 +346,12 @@ You MUST respond in valid JSON format:
                 else:
                     return self._parse_response(data)
             elif response.status_code == 503:
+                set_provider_outcome("http_error")
                 print("Qwen model is loading...")
                 await asyncio.sleep(20)
                 return await self._infer_qwen(state)
             else:
+                set_provider_outcome("http_error")
                 print(f"Qwen API error ({response.status_code}): {response.text[:200]}")
                 return None
                 
@@ -378,6 +396,7 @@ You MUST respond in valid JSON format:
         parts.append("\nProvide your triage assessment in JSON format.")
         return "\n".join(parts)
 
+    @instrument_provider_call("huggingface", model=lambda self, *_: self.config.liquid_model_id)
     async def _infer_liquid(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Inference using LiquidAI/alternative model via chat completions API"""
         if not self.config.hf_api_token:
@@ -431,6 +450,7 @@ You MUST respond in valid JSON format:
                 )
             
             if response.status_code == 200:
+                set_provider_outcome("parse_error")
                 data = response.json()
                 if "choices" in data:
                     content = data["choices"][0]["message"]["content"]
@@ -438,10 +458,12 @@ You MUST respond in valid JSON format:
                 else:
                     return self._parse_response(data)
             elif response.status_code == 503:
+                set_provider_outcome("http_error")
                 print("Model is loading...")
                 await asyncio.sleep(20)
                 return await self._infer_liquid(state)
             else:
+                set_provider_outcome("http_error")
                 print(f"LiquidAI API error ({response.status_code}): {response.text[:200]}")
                 return None
                 return None
@@ -450,6 +472,7 @@ You MUST respond in valid JSON format:
             print(f"LiquidAI inference error: {e}")
             return None
 
+    @instrument_provider_call("huggingface", model=lambda self, state, endpoint: endpoint.name)
     async def _infer_custom(
         self, 
         state: Dict[str, Any], 
@@ -486,8 +509,10 @@ You MUST respond in valid JSON format:
             )
             
             if response.status_code == 200:
+                set_provider_outcome("parse_error")
                 return self._parse_response(response.json())
             else:
+                set_provider_outcome("http_error")
                 print(f"Custom endpoint error: {response.status_code}")
                 return None
                 
@@ -596,11 +621,11 @@ def get_qwen_liquid_node() -> QwenLiquidNode:
             hf_api_token=os.getenv("HUGGINGFACE_API_KEY", ""),
             qwen_endpoint=os.getenv(
                 "QWEN_ENDPOINT",
-                "https://api-inference.huggingface.co/models/Qwen/Qwen2.5-7B-Instruct"
+                _hf_inference_url("Qwen/Qwen2.5-7B-Instruct")
             ),
             liquid_endpoint=os.getenv(
                 "LIQUID_ENDPOINT",
-                "https://api-inference.huggingface.co/models/LiquidAI/LFM2-1.2B-Instruct"
+                _hf_inference_url("LiquidAI/LFM2-1.2B-Instruct")
             ),
         )
         _qwen_liquid_node = QwenLiquidNode(config)
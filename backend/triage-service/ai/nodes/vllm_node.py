@@ -20,6 +20,8 @@ from datetime import datetime
 import httpx
 from pydantic import BaseModel, Field
 
+from metrics import instrument_provider_call, set_provider_outcome
+
 
 class VLLMConfig(BaseModel):
     """Configuration for vLLM server connection"""
@@ -180,6 +182,12 @@ Respond ONLY in valid JSON format:
         
         return result
 
+    @instrument_provider_call(
+        "vllm",
+        model=lambda self, state, use_lite=False: (
+            self.config.lite_model_name if use_lite else self.config.model_name
+        ),
+    )
     async def _try_inference(
         self, 
         state: Dict[str, Any],
@@ -212,6 +220,7 @@ Respond ONLY in valid JSON format:
             if response.status_code == 200:
                 data = response.json()
                 content = data["choices"][0]["message"]["content"]
+                set_provider_outcome("parse_error")
                 result = self._extract_json(content)
                 
                 if result:
@@ -221,6 +230,7 @@ Respond ONLY in valid JSON format:
                 
                 return result
             else:
+                set_provider_outcome("http_error")
                 print(f"vLLM error ({response.status_code}): {response.text}")
                 return None
                 
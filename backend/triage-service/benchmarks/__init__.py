@@ -0,0 +1,3 @@
+# ClinixAI Triage Service - Benchmarks
+# Standalone performance harnesses, run from backend/triage-service:
+#   python -m benchmarks.<name> --help
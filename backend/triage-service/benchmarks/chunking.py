@@ -0,0 +1,75 @@
+"""
+Chunking Benchmark
+==================
+Chunks/sec and chunk counts for the bundled handbooks (docs/*.pdf) with:
+
+- joined      : chunk_text() over the whole document joined into one string
+- streamed    : chunk_pages() over the page stream, as ingestion does
+
+Both produce the same chunks; the streamed path also reports how many
+chunks span a page boundary. Pages are extracted once up front so only
+chunking is timed.
+
+Usage (from backend/triage-service):
+    python -m benchmarks.chunking
+    python -m benchmarks.chunking --chunk-size 1000 --chunk-overlap 200
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import print_table
+from graphrag.chunking import PAGE_SEPARATOR, chunk_pages, chunk_text
+from graphrag.pdf_pages import PdfPage, iter_pdf_pages
+
+
+DEFAULT_DOCS_DIR = Path(__file__).resolve().parents[3] / "docs"
+
+
+def measure(label: str, documents: List[List[PdfPage]], size: int, overlap: int, streamed: bool) -> Dict[str, Any]:
+    chars = sum(len(page.text) for pages in documents for page in pages)
+    chunks = 0
+    spanning = 0
+    start = time.perf_counter()
+    for pages in documents:
+        if streamed:
+            for chunk in chunk_pages(pages, size, overlap):
+                chunks += 1
+                spanning += chunk.page_start != chunk.page_end
+        else:
+            chunks += len(chunk_text(PAGE_SEPARATOR.join(page.text for page in pages), size, overlap))
+    elapsed = time.perf_counter() - start
+    return {
+        "path": label,
+        "chunks": chunks,
+        "cross_page": spanning if streamed else "-",
+        "seconds": round(elapsed, 3),
+        "mchars_per_sec": round(chars / elapsed / 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs-dir", type=Path, default=DEFAULT_DOCS_DIR)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    args = parser.parse_args()
+
+    pdfs = sorted(args.docs_dir.glob("*.pdf"))
+    if not pdfs:
+        raise SystemExit(f"No PDFs in {args.docs_dir}")
+    documents = [list(iter_pdf_pages(str(pdf))) for pdf in pdfs]
+
+    rows = [
+        measure("joined", documents, args.chunk_size, args.chunk_overlap, streamed=False),
+        measure("streamed", documents, args.chunk_size, args.chunk_overlap, streamed=True),
+    ]
+    print_table(
+        f"Chunking ({len(pdfs)} files, size {args.chunk_size}, overlap {args.chunk_overlap})", rows
+    )
+
+
+if __name__ == "__main__":
+    main()
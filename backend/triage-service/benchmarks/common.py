@@ -0,0 +1,140 @@
+"""
+Shared helpers for ClinixAI benchmarks
+======================================
+Sample triage cases and timing/percentile utilities used by the
+benchmark scripts in this package.
+"""
+
+import time
+import statistics
+from typing import List, Dict, Any, Callable
+
+
+# Representative triage cases (same shapes as TriageRequest.symptoms)
+TRIAGE_CASES: List[Dict[str, Any]] = [
+    {
+        "symptoms": [
+            {"description": "Severe chest pain radiating to left arm", "severity": 9, "duration_hours": 1},
+            {"description": "Shortness of breath", "severity": 8},
+        ],
+        "vital_signs": {"heart_rate": 118, "blood_pressure": "160/100"},
+        "patient_age": 58,
+    },
+    {
+        "symptoms": [
+            {"description": "High fever with chills", "severity": 7, "duration_hours": 48},
+            {"description": "Headache and muscle pain", "severity": 6},
+        ],
+        "vital_signs": {"temperature": 39.6},
+        "patient_age": 24,
+    },
+    {
+        "symptoms": [
+            {"description": "Watery diarrhea and vomiting", "severity": 7, "duration_hours": 12},
+            {"description": "Leg cramps", "severity": 5},
+        ],
+        "patient_age": 6,
+    },
+    {
+        "symptoms": [
+            {"description": "Persistent cough with night sweats", "severity": 5, "duration_hours": 500},
+            {"description": "Weight loss", "severity": 4},
+        ],
+        "patient_age": 41,
+    },
+    {
+        "symptoms": [
+            {"description": "Runny nose and sore throat", "severity": 3, "duration_hours": 36},
+        ],
+        "patient_age": 30,
+    },
+]
+
+# Short free-text queries as sent to /rag/query and /analyze-with-rag
+TRIAGE_QUERIES: List[str] = [
+    "fever headache",
+    "chest pain",
+    "shortness of breath",
+    "chest pain shortness of breath",
+    "fever chills muscle pain",
+    "watery diarrhea vomiting dehydration",
+    "persistent cough night sweats",
+    "seizure in child",
+    "severe bleeding after injury",
+    "cardiac arrest no pulse",
+]
+
+
+def build_triage_prompt(case: Dict[str, Any]) -> str:
+    """Build a triage prompt in the same format as the cloud nodes"""
+    parts = []
+    if case.get("patient_age"):
+        parts.append(f"Patient Age: {case['patient_age']} years")
+    
+    parts.append("\nSymptoms:")
+    for i, s in enumerate(case.get("symptoms", []), 1):
+        line = f"  {i}. {s.get('description', 'Unknown')}"
+        if s.get("severity"):
+            line += f" (Severity: {s['severity']}/10)"
+        if s.get("duration_hours"):
+            line += f" (Duration: {s['duration_hours']} hours)"
+        parts.append(line)
+    
+    vitals = case.get("vital_signs")
+    if vitals:
+        parts.append("\nVital Signs:")
+        for key, value in vitals.items():
+            parts.append(f"  - {key.replace('_', ' ').title()}: {value}")
+    
+    parts.append("\nProvide your triage assessment in JSON format.")
+    return "\n".join(parts)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize_latencies(samples_ms: List[float]) -> Dict[str, float]:
+    """Summarize latency samples in milliseconds"""
+    if not samples_ms:
+        return {"count": 0}
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(statistics.mean(samples_ms), 3),
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "max_ms": round(max(samples_ms), 3),
+    }
+
+
+def time_calls(fn: Callable[[], Any], iterations: int, warmup: int = 1) -> List[float]:
+    """Call fn repeatedly and return per-call latency in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def print_table(title: str, rows: List[Dict[str, Any]]):
+    """Print rows of dicts as a simple aligned table"""
+    print(f"\n{title}")
+    print("=" * len(title))
+    if not rows:
+        print("(no results)")
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(str(c)), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(str(c).ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
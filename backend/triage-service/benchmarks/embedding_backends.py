@@ -0,0 +1,175 @@
+"""
+Embedding Backend Benchmark
+===========================
+Compares the torch (sentence-transformers) EmbeddingService backend with
+the ONNX Runtime backend, fp32 and int8:
+
+- load: seconds to import and load the model, RSS growth
+- query: single-query latency (p50/p99) over triage queries
+- throughput: chunks/sec over handbook chunks
+- agreement: mean cosine to the torch vectors and top-k overlap of
+  query -> chunk retrieval against the torch ranking
+
+Each backend runs in its own subprocess so load time and memory are
+measured from a cold interpreter. Export the ONNX models first:
+    python -m graphrag.onnx_embedding --int8
+
+Usage (from backend/triage-service):
+    python -m benchmarks.embedding_backends
+    python -m benchmarks.embedding_backends --backends torch onnx-int8 --chunks 500
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import TRIAGE_QUERIES, print_table, summarize_latencies, time_calls
+
+
+DEFAULT_DOCS_DIR = Path(__file__).resolve().parents[3] / "docs"
+BACKENDS = {
+    "torch": {"backend": "torch", "onnx_int8": False},
+    "onnx": {"backend": "onnx", "onnx_int8": False},
+    "onnx-int8": {"backend": "onnx", "onnx_int8": True},
+}
+
+
+def rss_mb() -> float:
+    """Resident set size of this process in MB (Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_corpus(docs_dir: Path, limit: int) -> List[str]:
+    from pypdf import PdfReader
+
+    chunks: List[str] = []
+    for pdf in sorted(docs_dir.glob("*.pdf")):
+        text = "\n\n".join(p.extract_text() or "" for p in PdfReader(str(pdf)).pages)
+        chunks.extend(text[i:i + 500].strip() for i in range(0, len(text), 400))
+        if len(chunks) >= limit:
+            break
+    return [c for c in chunks if c][:limit]
+
+
+def run_backend(name: str, corpus: List[str], model: str, iterations: int, out_path: str):
+    """Child process: measure one backend and dump vectors for agreement"""
+    import numpy as np
+
+    before = rss_mb()
+    start = time.perf_counter()
+    from graphrag.advanced_rag_service import EmbeddingService
+
+    embedder = EmbeddingService(model_name=model, cache=None, **BACKENDS[name])
+    embedder.load()
+    load_s = time.perf_counter() - start
+    load_rss = rss_mb() - before
+
+    cycle = iter(range(10**9))
+    samples = time_calls(
+        lambda: embedder.embed_single(TRIAGE_QUERIES[next(cycle) % len(TRIAGE_QUERIES)]),
+        iterations,
+        warmup=5,
+    )
+
+    start = time.perf_counter()
+    corpus_vectors = embedder.embed_matrix(corpus, batch_size=32)
+    throughput = len(corpus) / (time.perf_counter() - start)
+
+    np.save(out_path + ".corpus.npy", corpus_vectors)
+    np.save(out_path + ".queries.npy", embedder.embed_matrix(list(TRIAGE_QUERIES)))
+    with open(out_path, "w") as f:
+        json.dump({
+            "load_s": round(load_s, 2),
+            "rss_mb": round(load_rss, 1),
+            "peak_rss_mb": round(rss_mb(), 1),
+            "query": summarize_latencies(samples),
+            "chunks_per_sec": round(throughput, 1),
+        }, f)
+
+
+def agreement(ref_dir: str, other_dir: str, k: int) -> Dict[str, Any]:
+    import numpy as np
+
+    ref_c, ref_q = np.load(ref_dir + ".corpus.npy"), np.load(ref_dir + ".queries.npy")
+    oth_c, oth_q = np.load(other_dir + ".corpus.npy"), np.load(other_dir + ".queries.npy")
+
+    cosine = float(np.mean(np.sum(ref_c * oth_c, axis=1)))
+    ref_top = np.argsort(-(ref_q @ ref_c.T), axis=1)[:, :k]
+    oth_top = np.argsort(-(oth_q @ oth_c.T), axis=1)[:, :k]
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, oth_top)])
+    return {"mean_cosine": round(cosine, 4), f"top{k}_overlap": round(float(overlap), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--docs-dir", type=Path, default=DEFAULT_DOCS_DIR)
+    parser.add_argument("--chunks", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus-file", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.corpus_file) as f:
+            corpus = json.load(f)
+        run_backend(args.child, corpus, args.model, args.iterations, args.out)
+        return
+
+    corpus = load_corpus(args.docs_dir, args.chunks)
+    workdir = tempfile.mkdtemp(prefix="clinixai-embed-bench-")
+    corpus_file = os.path.join(workdir, "corpus.json")
+    with open(corpus_file, "w") as f:
+        json.dump(corpus, f)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in args.backends:
+        out = os.path.join(workdir, name)
+        proc = subprocess.run([
+            sys.executable, "-m", "benchmarks.embedding_backends",
+            "--child", name, "--corpus-file", corpus_file, "--out", out,
+            "--model", args.model, "--iterations", str(args.iterations),
+        ])
+        if proc.returncode != 0:
+            print(f"{name}: failed (exit {proc.returncode})")
+            continue
+        with open(out) as f:
+            results[name] = json.load(f)
+
+    reference = "torch" if "torch" in results else next(iter(results), None)
+    rows = []
+    for name, r in results.items():
+        row = {
+            "backend": name,
+            "load_s": r["load_s"],
+            "rss_mb": r["rss_mb"],
+            "query_p50_ms": r["query"]["p50_ms"],
+            "query_p99_ms": r["query"]["p99_ms"],
+            "chunks_per_sec": r["chunks_per_sec"],
+        }
+        if reference and name != reference:
+            row.update(agreement(os.path.join(workdir, reference), os.path.join(workdir, name), args.k))
+        else:
+            row.update({"mean_cosine": 1.0, f"top{args.k}_overlap": 1.0})
+        rows.append(row)
+
+    if rows:
+        print_table(f"Embedding backends ({args.model}, {len(corpus)} chunks, reference={reference})", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Local NER / Symptom Similarity Benchmark
+========================================
+Measures p50/p99 latency of the in-process MedicalNERNode and
+SymptomSimilarityNode, both called directly and through the shared thread
+pool under concurrent load. Optionally compares against the HF Inference
+API (or the local stub server) for the same requests.
+
+Usage (from backend/triage-service):
+    python -m benchmarks.hf_local_nodes --iterations 500 --concurrency 16
+    python -m benchmarks.hf_local_nodes --remote   # also time the HF API
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import httpx
+
+from ai.nodes.huggingface_node import MedicalNERNode, SymptomSimilarityNode
+from benchmarks.common import (
+    TRIAGE_CASES,
+    TRIAGE_QUERIES,
+    print_table,
+    summarize_latencies,
+    time_calls,
+)
+
+
+CONDITIONS = [
+    "malaria", "typhoid fever", "cholera", "tuberculosis", "pneumonia",
+    "acute coronary syndrome", "asthma exacerbation", "meningitis",
+    "gastroenteritis", "dengue fever", "sepsis", "common cold",
+    "urinary tract infection", "migraine", "stroke", "diabetic ketoacidosis",
+]
+
+
+def symptom_texts() -> List[str]:
+    texts = list(TRIAGE_QUERIES)
+    for case in TRIAGE_CASES:
+        texts.append(". ".join(s["description"] for s in case["symptoms"]))
+    return texts
+
+
+async def time_concurrent(
+    fn: Callable[[str], Awaitable[Any]],
+    texts: List[str],
+    iterations: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """Latency percentiles and throughput with `concurrency` in-flight calls"""
+    samples: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await fn(texts[i % len(texts)])
+            samples.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    elapsed = time.perf_counter() - start
+    return {**summarize_latencies(samples), "req_per_sec": round(iterations / elapsed, 1)}
+
+
+async def remote_similarity(client: httpx.AsyncClient, text: str):
+    endpoint = os.getenv("HUGGINGFACE_INFERENCE_ENDPOINT", "https://api-inference.huggingface.co/models")
+    await client.post(
+        f"{endpoint}/sentence-transformers/all-MiniLM-L6-v2",
+        headers={"Authorization": f"Bearer {os.getenv('HUGGINGFACE_API_KEY', '')}"},
+        json={"inputs": {"source_sentence": text, "sentences": CONDITIONS}},
+    )
+
+
+async def remote_ner(client: httpx.AsyncClient, text: str):
+    endpoint = os.getenv("HUGGINGFACE_INFERENCE_ENDPOINT", "https://api-inference.huggingface.co/models")
+    await client.post(
+        f"{endpoint}/d4data/biomedical-ner-all",
+        headers={"Authorization": f"Bearer {os.getenv('HUGGINGFACE_API_KEY', '')}"},
+        json={"inputs": text},
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--ner-backend", choices=["gazetteer", "transformers"], default="gazetteer")
+    parser.add_argument("--remote", action="store_true", help="Also time the HF Inference API")
+    parser.add_argument("--remote-iterations", type=int, default=30)
+    args = parser.parse_args()
+
+    texts = symptom_texts()
+    ner = MedicalNERNode(backend=args.ner_backend)
+    similarity = SymptomSimilarityNode(conditions=CONDITIONS)
+
+    rows = []
+    cycle = iter(range(10**9))
+
+    # Direct (single-threaded) calls: pure compute cost per request
+    samples = time_calls(
+        lambda: ner.extract_entities_sync(texts[next(cycle) % len(texts)]),
+        args.iterations,
+        warmup=3,
+    )
+    rows.append({"path": f"ner/{args.ner_backend} direct", **summarize_latencies(samples), "req_per_sec": "-"})
+
+    samples = time_calls(
+        lambda: similarity.find_similar_conditions_sync(texts[next(cycle) % len(texts)]),
+        args.iterations,
+        warmup=3,
+    )
+    rows.append({"path": "similarity direct", **summarize_latencies(samples), "req_per_sec": "-"})
+
+    # Through the thread pool with concurrent callers, as the API sees it
+    rows.append({
+        "path": f"ner/{args.ner_backend} pool x{args.concurrency}",
+        **await time_concurrent(ner.extract_entities, texts, args.iterations, args.concurrency),
+    })
+    rows.append({
+        "path": f"similarity pool x{args.concurrency}",
+        **await time_concurrent(similarity.find_similar_conditions, texts, args.iterations, args.concurrency),
+    })
+
+    if args.remote:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            rows.append({
+                "path": "ner remote",
+                **await time_concurrent(
+                    lambda t: remote_ner(client, t), texts, args.remote_iterations, args.concurrency
+                ),
+            })
+            rows.append({
+                "path": "similarity remote",
+                **await time_concurrent(
+                    lambda t: remote_similarity(client, t), texts, args.remote_iterations, args.concurrency
+                ),
+            })
+
+    print_table(f"Local HF helper nodes ({len(CONDITIONS)} conditions)", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""
+Neo4j Chunk Write Benchmark
+===========================
+Wall time for writing chunk nodes (text + embedding + FROM_DOCUMENT edge)
+to Neo4j with:
+
+- add_chunk   : one auto-commit session.run per chunk (previous ingest path)
+- add_chunks  : one UNWIND statement per batch in explicit write transactions
+
+Chunks come from the bundled handbooks (docs/*.pdf) with random unit
+vectors, so the timing isolates Neo4j. Each variant writes under its own
+benchmark Document, which is deleted afterwards.
+
+Requires a reachable Neo4j (NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD).
+
+Usage (from backend/triage-service):
+    python -m benchmarks.neo4j_chunk_writes --chunks 2000
+    python -m benchmarks.neo4j_chunk_writes --batch-sizes 50 200 1000
+"""
+
+import argparse
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.common import print_table
+from graphrag.advanced_rag_service import AdvancedRAGService, DocumentChunk, Neo4jVectorStore
+
+
+DEFAULT_DOCS_DIR = Path(__file__).resolve().parents[3] / "docs"
+
+
+def make_chunks(texts: List[str], doc_id: str, dim: int, seed: int = 0) -> List[DocumentChunk]:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((len(texts), dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [
+        DocumentChunk(
+            id=f"{doc_id}_chunk_{i}",
+            text=text,
+            document_id=doc_id,
+            document_name=doc_id,
+            chunk_index=i,
+            embedding=vectors[i],
+        )
+        for i, text in enumerate(texts)
+    ]
+
+
+def run_variant(store: Neo4jVectorStore, label: str, texts: List[str], dim: int, batch_size: int) -> Dict[str, Any]:
+    doc_id = f"bench_{uuid.uuid4().hex[:10]}"
+    chunks = make_chunks(texts, doc_id, dim)
+    store.add_document(doc_id=doc_id, name=doc_id, metadata={"benchmark": True})
+
+    start = time.perf_counter()
+    if batch_size == 0:
+        for chunk in chunks:
+            store.add_chunk(chunk)
+    else:
+        store.add_chunks(chunks, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    store._driver.execute_query(
+        "MATCH (d:Document {id: $id}) OPTIONAL MATCH (c:Chunk {document_id: $id}) DETACH DELETE c, d",
+        id=doc_id,
+        database_=store.database,
+    )
+    return {
+        "path": label,
+        "chunks": len(chunks),
+        "transactions": len(chunks) if batch_size == 0 else -(-len(chunks) // batch_size),
+        "seconds": round(elapsed, 2),
+        "chunks_per_sec": round(len(chunks) / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs-dir", type=Path, default=DEFAULT_DOCS_DIR)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 200, 1000])
+    args = parser.parse_args()
+
+    service = AdvancedRAGService()
+    texts: List[str] = []
+    for pdf in sorted(args.docs_dir.glob("*.pdf")):
+        texts.extend(service._chunk_text(service._load_pdf(str(pdf))))
+        if len(texts) >= args.chunks:
+            break
+    texts = texts[:args.chunks]
+
+    store = service.vector_store
+    if not store.connect():
+        raise SystemExit("Neo4j not reachable")
+    store.setup_vector_index(args.dim)
+
+    rows = [run_variant(store, "add_chunk (per chunk)", texts, args.dim, 0)]
+    for batch_size in args.batch_sizes:
+        rows.append(run_variant(store, f"add_chunks x{batch_size}", texts, args.dim, batch_size))
+    store.close()
+
+    print_table(f"Neo4j chunk writes ({store.uri})", rows)
+
+
+if __name__ == "__main__":
+    main()
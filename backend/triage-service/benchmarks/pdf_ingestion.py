@@ -0,0 +1,169 @@
+"""
+PDF Ingestion Embedding Benchmark
+=================================
+Chunks/sec for embedding the bundled handbooks (docs/*.pdf) with:
+
+- per-chunk   : one embed_single() call per chunk (the previous ingest path)
+- batched     : fixed-size batches in document order
+- sorted      : token-length-sorted batches (EmbeddingService.plan_batches)
+- pipelined   : IngestPipeline embed and write stages (sorted batches per
+                embed window) with a simulated Neo4j write of --write-ms
+                per chunk; per-stage throughput is printed after the table
+- pool xN     : sorted batches on an N-process EmbeddingPool (--processes)
+
+The on-disk embedding cache is bypassed so every run encodes.
+
+With --neo4j the full AdvancedRAGService.ingest_pdf() path is also timed
+against the configured database (writes real nodes), once forced and once
+unchanged, where the content-hash manifest skips every file.
+
+Usage (from backend/triage-service):
+    python -m benchmarks.pdf_ingestion --max-chunks 400
+    python -m benchmarks.pdf_ingestion --batch-size 64 --max-batch-tokens 16384
+    python -m benchmarks.pdf_ingestion --processes 2 4 8
+    python -m benchmarks.pdf_ingestion --neo4j
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import print_table
+from graphrag.advanced_rag_service import AdvancedRAGService
+from graphrag.embedding_pool import EmbeddingPool
+from graphrag.ingest_pipeline import IngestPipeline, Stage, format_report
+
+
+DEFAULT_DOCS_DIR = Path(__file__).resolve().parents[3] / "docs"
+
+
+def load_chunks(service: AdvancedRAGService, docs_dir: Path, max_chunks: int) -> List[str]:
+    chunks: List[str] = []
+    for pdf in sorted(docs_dir.glob("*.pdf")):
+        chunks.extend(service._chunk_text(service._load_pdf(str(pdf))))
+    return chunks[:max_chunks] if max_chunks else chunks
+
+
+def timed(label: str, n: int, fn: Callable[[], Any]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return {
+        "path": label,
+        "chunks": n,
+        "seconds": round(elapsed, 2),
+        "chunks_per_sec": round(n / elapsed, 1),
+    }
+
+
+async def run_pipelined(service: AdvancedRAGService, chunks: List[str], write_ms: float) -> Dict[str, Any]:
+    embedder = service.embedder
+
+    def embed(window: List[str]):
+        for indices, matrix in embedder.embed_batches(window, service.embed_batch_size, service.embed_max_batch_tokens):
+            yield from (matrix[row] for row in range(len(indices)))
+
+    def write(rows: List[Any]):
+        time.sleep(write_ms * len(rows) / 1000)
+
+    pipeline = IngestPipeline("chunks", chunks, [
+        Stage("embed", embed, batch_size=service.embed_window),
+        Stage("write", write, batch_size=service.chunk_write_batch_size),
+    ], queue_size=service.ingest_queue_size)
+    return await pipeline.run()
+
+
+async def run_pooled(service: AdvancedRAGService, chunks: List[str], pool: EmbeddingPool) -> int:
+    embedded = 0
+    async for indices, _ in service._embed_chunks_pooled(chunks, pool):
+        embedded += len(indices)
+    return embedded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs-dir", type=Path, default=DEFAULT_DOCS_DIR)
+    parser.add_argument("--max-chunks", type=int, default=0, help="0 = all chunks")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-batch-tokens", type=int, default=8192)
+    parser.add_argument("--write-ms", type=float, default=1.0, help="Simulated Neo4j write cost per chunk")
+    parser.add_argument("--processes", type=int, nargs="*", default=[], help="EmbeddingPool sizes to time")
+    parser.add_argument("--neo4j", action="store_true", help="Also time ingest_pdf() against Neo4j")
+    args = parser.parse_args()
+
+    service = AdvancedRAGService(
+        embed_batch_size=args.batch_size,
+        embed_max_batch_tokens=args.max_batch_tokens,
+    )
+    embedder = service.embedder
+    embedder.cache = None
+    chunks = load_chunks(service, args.docs_dir, args.max_chunks)
+    n = len(chunks)
+    print(f"{n} chunks from {args.docs_dir}")
+
+    embedder.load()
+    embedder.embed_matrix(chunks[:args.batch_size])  # warm-up
+
+    def fixed_batches():
+        for i in range(0, n, args.batch_size):
+            embedder.embed_matrix(chunks[i:i + args.batch_size], normalize=False, batch_size=args.batch_size)
+
+    def sorted_batches():
+        for _ in embedder.embed_batches(chunks, args.batch_size, args.max_batch_tokens):
+            pass
+
+    def per_chunk_with_writes():
+        for chunk in chunks:
+            embedder.embed_single(chunk)
+            time.sleep(args.write_ms / 1000)
+
+    batches = embedder.plan_batches(chunks, args.batch_size, args.max_batch_tokens)
+    rows = [
+        timed("per-chunk", n, lambda: [embedder.embed_single(c) for c in chunks]),
+        timed(f"batched x{args.batch_size}", n, fixed_batches),
+        timed(f"sorted ({len(batches)} batches)", n, sorted_batches),
+        timed(f"per-chunk + {args.write_ms}ms writes", n, per_chunk_with_writes),
+    ]
+    reports = []
+    rows.append(timed(
+        f"pipelined + {args.write_ms}ms writes", n,
+        lambda: reports.append(asyncio.run(run_pipelined(service, chunks, args.write_ms))),
+    ))
+
+    for processes in args.processes:
+        with EmbeddingPool(embedder, processes=processes) as pool:
+            # Spawn workers and load the model in each before timing
+            list(pool.map_ordered([["warm up"]] * processes))
+            rows.append(timed(
+                f"pool x{processes}", n,
+                lambda: asyncio.run(run_pooled(service, chunks, pool)),
+            ))
+
+    if args.neo4j:
+        if not service.initialize():
+            print("Neo4j not reachable; skipping ingest_pdf timing")
+        else:
+            pdfs = sorted(args.docs_dir.glob("*.pdf"))
+            total = 0
+
+            def ingest_all(force: bool):
+                nonlocal total
+                total = 0
+                for pdf in pdfs:
+                    total += asyncio.run(service.ingest_pdf(str(pdf), extract_entities=False, force=force))["chunks"]
+
+            # Forced full ingest, then a re-run that the manifest skips
+            for label, force in (("ingest_pdf (neo4j)", True), ("ingest_pdf unchanged", False)):
+                row = timed(label, 0, lambda: ingest_all(force))
+                row["chunks"] = total
+                row["chunks_per_sec"] = round(total / row["seconds"], 1) if row["seconds"] else "-"
+                rows.append(row)
+
+    print_table(f"PDF ingestion embedding ({embedder.model_name})", rows)
+    print(f"\npipelined stages: {format_report(reports[0])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+PDF Page Extraction Benchmark
+=============================
+Pages/sec and parent-process peak Python memory for extracting the bundled
+handbooks (docs/*.pdf) with:
+
+- joined      : every page extracted in-process, then joined into one string
+                (the previous _load_pdf)
+- streamed    : iter_pdf_pages() in-process, consuming pages as they arrive
+- pool xN     : PdfPagePool with N worker processes (--processes)
+
+Memory is the tracemalloc peak in this process while a document is
+consumed, so it reflects what ingestion holds at once (the pool's workers
+are separate processes and are not counted).
+
+Usage (from backend/triage-service):
+    python -m benchmarks.pdf_pages
+    python -m benchmarks.pdf_pages --processes 2 4 8
+"""
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+from benchmarks.common import print_table
+from graphrag.pdf_pages import PdfPage, PdfPagePool, iter_pdf_pages
+
+
+DEFAULT_DOCS_DIR = Path(__file__).resolve().parents[3] / "docs"
+
+
+def measure(label: str, pdfs: List[Path], pages_of: Callable[[str], Iterable[PdfPage]], hold: bool) -> Dict[str, Any]:
+    pages = 0
+    chars = 0
+    peak = 0
+    start = time.perf_counter()
+    for pdf in pdfs:
+        tracemalloc.start()
+        if hold:
+            held = [page.text for page in pages_of(str(pdf))]
+            chars += len("\n\n".join(held))
+            pages += len(held)
+            del held
+        else:
+            for page in pages_of(str(pdf)):
+                pages += 1
+                chars += len(page.text)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    elapsed = time.perf_counter() - start
+    return {
+        "path": label,
+        "pages": pages,
+        "chars": chars,
+        "seconds": round(elapsed, 2),
+        "pages_per_sec": round(pages / elapsed, 1),
+        "peak_mb": round(peak / 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs-dir", type=Path, default=DEFAULT_DOCS_DIR)
+    parser.add_argument("--processes", type=int, nargs="*", default=[2, 4])
+    args = parser.parse_args()
+
+    pdfs = sorted(args.docs_dir.glob("*.pdf"))
+    if not pdfs:
+        raise SystemExit(f"No PDFs in {args.docs_dir}")
+
+    rows = [
+        measure("joined", pdfs, iter_pdf_pages, hold=True),
+        measure("streamed", pdfs, iter_pdf_pages, hold=False),
+    ]
+    for processes in args.processes:
+        with PdfPagePool(processes) as pool:
+            # Spawn the workers before timing
+            next(iter(pool.iter_pages(str(pdfs[0]))), None)
+            rows.append(measure(f"pool x{processes}", pdfs, pool.iter_pages, hold=False))
+
+    print_table(f"PDF page extraction ({len(pdfs)} files)", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Speculative Decoding Benchmark
+==============================
+Compares plain llama.cpp decoding in LocalLLMNode against draft-model and
+prompt-lookup speculative decoding on the same triage prompts.
+
+Reports decode tokens/sec, wall time per prompt and the estimated draft
+acceptance rate for each mode.
+
+Usage (from backend/triage-service):
+    python -m benchmarks.speculative_decoding \\
+        --model models/qwen2.5-1.5b-instruct-q4_k_m.gguf \\
+        --draft-model models/qwen2.5-0.5b-instruct-q4_k_m.gguf
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Dict, Any
+
+from ai.nodes.local_llm_node import (
+    LocalLLMNode,
+    LocalLLMConfig,
+    LocalModelBackend,
+    SpeculativeMode,
+)
+from benchmarks.common import TRIAGE_CASES, build_triage_prompt, print_table
+
+
+async def run_mode(
+    mode: SpeculativeMode,
+    args: argparse.Namespace,
+    prompts: List[str]
+) -> Dict[str, Any]:
+    """Run every prompt through a LocalLLMNode configured for one mode"""
+    node = LocalLLMNode(LocalLLMConfig(
+        model_path=args.model,
+        backend=LocalModelBackend.LLAMA_CPP,
+        max_tokens=args.max_tokens,
+        temperature=args.temperature,
+        context_size=args.context_size,
+        n_threads=args.threads,
+        speculative_mode=mode,
+        draft_model_path=args.draft_model,
+        num_draft_tokens=args.num_draft_tokens,
+    ))
+    await node.initialize()
+    if node.config.backend != LocalModelBackend.LLAMA_CPP:
+        raise RuntimeError(f"llama.cpp backend failed to load for mode {mode.value}")
+    
+    # Warm-up so model load and first-eval costs are excluded
+    await node.infer(prompts[0], {})
+    
+    total_tokens = 0
+    total_seconds = 0.0
+    proposed = 0
+    accepted = 0
+    parse_failures = 0
+    
+    for _ in range(args.repeat):
+        for prompt in prompts:
+            start = time.perf_counter()
+            result = await node.infer(prompt, {})
+            total_seconds += time.perf_counter() - start
+            
+            if not result:
+                parse_failures += 1
+                continue
+            
+            total_tokens += result.get("_tokens", {}).get("completion", 0)
+            spec = result.get("_speculative")
+            if spec:
+                proposed += spec["proposed_tokens"]
+                accepted += spec["accepted_tokens"]
+    
+    runs = args.repeat * len(prompts)
+    return {
+        "mode": mode.value,
+        "prompts": runs,
+        "completion_tokens": total_tokens,
+        "tokens_per_sec": round(total_tokens / total_seconds, 2) if total_seconds else 0.0,
+        "mean_ms": round(1000 * total_seconds / runs, 1),
+        "acceptance_rate": round(accepted / proposed, 3) if proposed else "-",
+        "parse_failures": parse_failures,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True, help="Main GGUF model (e.g. Qwen2.5-1.5B Q4_K_M)")
+    parser.add_argument("--draft-model", help="Draft GGUF sharing the main model's tokenizer")
+    parser.add_argument("--num-draft-tokens", type=int, default=8)
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--temperature", type=float, default=0.0)
+    parser.add_argument("--context-size", type=int, default=2048)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+    
+    prompts = [build_triage_prompt(case) for case in TRIAGE_CASES]
+    
+    modes = [SpeculativeMode.OFF, SpeculativeMode.PROMPT_LOOKUP]
+    if args.draft_model:
+        modes.append(SpeculativeMode.DRAFT_MODEL)
+    
+    rows = []
+    for mode in modes:
+        print(f"Running {mode.value}...")
+        rows.append(await run_mode(mode, args, prompts))
+    
+    baseline = rows[0]["tokens_per_sec"] or 1.0
+    for row in rows:
+        row["speedup"] = f"{row['tokens_per_sec'] / baseline:.2f}x"
+    
+    print_table("Speculative decoding (llama.cpp, CPU)", rows)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
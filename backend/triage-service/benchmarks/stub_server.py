@@ -0,0 +1,684 @@
+"""
+Inference Stub Server
+=====================
+Local stand-in for the cloud providers the triage service talks to, so the
+provider paths (fallback chains, retries, pooling) can be load-tested on one
+box without spending API credits.
+
+Speaks, each provider under its own path prefix:
+- OpenAI-compatible chat completions: /openrouter/v1, /openai/v1, /vllm/v1
+  and the HF router (/hf-inference/models/<id>/v1/chat/completions)
+- HuggingFace Inference API (text generation, zero-shot, similarity, NER)
+- Anthropic Messages API: /anthropic/v1
+- Ollama chat / generate / tags
+
+Fault profiles, cassette recordings and stats are kept per provider.
+
+Modes:
+- replay (default): serve responses from a recorded cassette, falling back
+  to synthetic triage JSON, with injected latency and faults
+- record: proxy each provider to its own upstream and append every response
+  (and its observed latency) to the cassette under that provider.
+  Credentials (Authorization, x-api-key) are only forwarded to upstreams
+  given explicitly with --upstream-<provider>; the built-in defaults get
+  the request without them.
+
+Usage (from backend/triage-service):
+    python -m benchmarks.stub_server --port 9100 --p50-ms 800 --p99-ms 4000 \\
+        --rate-limit-rate 0.05 --unavailable-rate 0.02
+
+Then point the service at it:
+    OPENROUTER_API_BASE=http://localhost:9100/openrouter/v1
+    OPENAI_API_BASE=http://localhost:9100/openai/v1
+    ANTHROPIC_API_BASE=http://localhost:9100/anthropic/v1
+    HUGGINGFACE_INFERENCE_ENDPOINT=http://localhost:9100/models
+    HUGGINGFACE_ROUTER_BASE=http://localhost:9100/hf-inference
+    OLLAMA_BASE_URL=http://localhost:9100
+    VLLM_BASE_URL=http://localhost:9100/vllm/v1
+
+Recording real OpenRouter traffic:
+    python -m benchmarks.stub_server --mode record --cassette cassette.jsonl \
+        --upstream-openrouter https://openrouter.ai/api/v1
+
+Faults and latency can be changed at runtime with POST /_stub/config and
+counters are available at GET /_stub/stats.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+# Providers served by the stub; each has its own routes, upstream, fault
+# profile and cassette recordings
+API_OPENROUTER = "openrouter"
+API_OPENAI = "openai"
+API_VLLM = "vllm"
+API_HF_ROUTER = "hf_router"
+API_ANTHROPIC = "anthropic"
+API_HUGGINGFACE = "huggingface"
+API_OLLAMA = "ollama"
+API_FAMILIES = (API_OPENROUTER, API_OPENAI, API_VLLM, API_HF_ROUTER, API_ANTHROPIC, API_HUGGINGFACE, API_OLLAMA)
+
+# Response/error body shape of each provider
+SHAPE_CHAT = "chat"  # OpenAI-compatible chat completions
+API_SHAPES = {
+    API_OPENROUTER: SHAPE_CHAT,
+    API_OPENAI: SHAPE_CHAT,
+    API_VLLM: SHAPE_CHAT,
+    API_HF_ROUTER: SHAPE_CHAT,
+    API_ANTHROPIC: API_ANTHROPIC,
+    API_HUGGINGFACE: API_HUGGINGFACE,
+    API_OLLAMA: API_OLLAMA,
+}
+
+DEFAULT_UPSTREAMS = {
+    API_OPENROUTER: "https://openrouter.ai/api/v1",
+    API_OPENAI: "https://api.openai.com/v1",
+    API_VLLM: "http://localhost:8090/v1",
+    API_HF_ROUTER: "https://router.huggingface.co/hf-inference",
+    API_ANTHROPIC: "https://api.anthropic.com/v1",
+    API_HUGGINGFACE: "https://api-inference.huggingface.co/models",
+    API_OLLAMA: "http://localhost:11434",
+}
+
+# Headers forwarded to the upstream in record mode
+FORWARDED_HEADERS = (
+    "anthropic-version",
+    "http-referer",
+    "x-title",
+    "content-type",
+)
+# Credentials, forwarded only to explicitly configured upstreams
+AUTH_HEADERS = ("authorization", "x-api-key")
+
+# z-score of the 99th percentile of a standard normal
+Z_P99 = 2.3263
+
+
+# ==================== CONFIG ====================
+
+@dataclass
+class FaultProfile:
+    """Latency distribution and fault injection rates for one API family"""
+    latency_mode: str = "lognormal"  # lognormal | recorded | none
+    p50_ms: float = 600.0
+    p99_ms: float = 3000.0
+    error_rate: float = 0.0  # HTTP 500
+    rate_limit_rate: float = 0.0  # HTTP 429 with Retry-After
+    unavailable_rate: float = 0.0  # HTTP 503 (HF "model loading")
+    malformed_rate: float = 0.0  # HTTP 200 with non-JSON content
+    retry_after_s: int = 1
+
+    def sample_latency_s(self, rng: random.Random, recorded_ms: Optional[float] = None) -> float:
+        """Draw one response delay in seconds"""
+        if self.latency_mode == "none":
+            return 0.0
+        if self.latency_mode == "recorded" and recorded_ms is not None:
+            return recorded_ms / 1000.0
+        if self.p50_ms <= 0:
+            return 0.0
+        if self.p99_ms <= self.p50_ms:
+            return self.p50_ms / 1000.0
+        # Lognormal fitted so that median == p50 and 99th percentile == p99
+        mu = math.log(self.p50_ms)
+        sigma = (math.log(self.p99_ms) - math.log(self.p50_ms)) / Z_P99
+        return math.exp(rng.gauss(mu, sigma)) / 1000.0
+
+
+@dataclass
+class StubConfig:
+    """Runtime configuration for the stub server"""
+    mode: str = "replay"  # replay | record
+    cassette_path: Optional[str] = None
+    seed: Optional[int] = None
+    default_profile: FaultProfile = field(default_factory=FaultProfile)
+    profiles: Dict[str, FaultProfile] = field(default_factory=dict)
+    upstreams: Dict[str, str] = field(default_factory=dict)  # explicitly configured only
+    upstream_timeout_s: float = 120.0
+
+    def profile_for(self, api: str) -> FaultProfile:
+        return self.profiles.get(api, self.default_profile)
+
+    def upstream_for(self, api: str) -> str:
+        return self.upstreams.get(api) or DEFAULT_UPSTREAMS[api]
+
+    def forwards_credentials(self, api: str) -> bool:
+        """Credentials only go to an upstream the caller configured for this provider"""
+        return bool(self.upstreams.get(api))
+
+
+# ==================== CASSETTE ====================
+
+class Cassette:
+    """
+    Recorded provider responses, stored as JSON lines:
+        {"api", "model", "status", "body", "latency_ms"}
+
+    Replay cycles through the recordings for (api, model), then (api, any
+    model). Only successful recordings are replayed; faults are injected
+    separately so error rates stay controllable.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self._entries: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self._by_api: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if entry.get("status") == 200:
+                    self._index(entry)
+
+    def _index(self, entry: Dict[str, Any]):
+        self._entries[(entry["api"], entry.get("model", ""))].append(entry)
+        self._by_api[entry["api"]].append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._by_api.values())
+
+    def next(self, api: str, model: str) -> Optional[Dict[str, Any]]:
+        """Next recording for api/model (round-robin), or None"""
+        with self._lock:
+            key = (api, model)
+            pool = self._entries.get(key) or self._by_api.get(api)
+            if not pool:
+                return None
+            if key not in self._entries:
+                key = (api, "*")
+            idx = self._cursor[key] % len(pool)
+            self._cursor[key] += 1
+            return pool[idx]
+
+    def record(self, api: str, model: str, status: int, body: Any, latency_ms: float):
+        entry = {
+            "api": api,
+            "model": model,
+            "status": status,
+            "body": body,
+            "latency_ms": round(latency_ms, 1),
+        }
+        with self._lock:
+            if status == 200:
+                self._index(entry)
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+
+
+# ==================== SYNTHETIC RESPONSES ====================
+
+CRITICAL_TERMS = ("chest pain", "unconscious", "seizure", "bleeding", "can't breathe", "stroke")
+URGENT_TERMS = ("high fever", "vomiting", "severe", "fracture", "dehydration")
+NER_TERMS = ("fever", "headache", "cough", "chest pain", "vomiting", "diarrhea", "rash", "fatigue")
+
+
+def synthetic_triage(text: str) -> Dict[str, Any]:
+    """Plausible triage JSON keyed off a few keywords in the prompt"""
+    lowered = text.lower()
+    if any(t in lowered for t in CRITICAL_TERMS):
+        urgency, confidence = "critical", 0.92
+    elif any(t in lowered for t in URGENT_TERMS):
+        urgency, confidence = "urgent", 0.84
+    else:
+        urgency, confidence = "standard", 0.78
+    return {
+        "urgency": urgency,
+        "confidence": confidence,
+        "assessment": "Stub assessment for load testing",
+        "action": "Consult healthcare professional",
+        "conditions": [{"name": "Stub condition", "probability": 0.6}],
+        "red_flags": [],
+        "follow_up_questions": [],
+    }
+
+
+def _content_for(text: str, malformed: bool) -> str:
+    if malformed:
+        return "I'm sorry, I cannot provide a structured assessment for this case."
+    return json.dumps(synthetic_triage(text))
+
+
+def _last_user_message(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages or []):
+        if message.get("role") == "user":
+            content = message.get("content", "")
+            if isinstance(content, list):
+                return " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+            return str(content)
+    return ""
+
+
+def synthesize(api: str, model: str, payload: Dict[str, Any], malformed: bool) -> Any:
+    """Build a provider-shaped response body"""
+    shape = API_SHAPES[api]
+    if shape == SHAPE_CHAT:
+        text = _last_user_message(payload.get("messages", []))
+        content = _content_for(text, malformed)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(text.split()),
+                "completion_tokens": len(content.split()),
+                "total_tokens": len(text.split()) + len(content.split()),
+            },
+        }
+
+    if shape == API_ANTHROPIC:
+        text = _last_user_message(payload.get("messages", []))
+        content = _content_for(text, malformed)
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": content}],
+            "stop_reason": "end_turn",
+            "usage": {"input_tokens": len(text.split()), "output_tokens": len(content.split())},
+        }
+
+    if shape == API_OLLAMA:
+        if "messages" in payload:
+            text = _last_user_message(payload.get("messages", []))
+            content = _content_for(text, malformed)
+            return {
+                "model": model,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "message": {"role": "assistant", "content": content},
+                "done": True,
+                "eval_count": len(content.split()),
+                "eval_duration": 0,
+            }
+        content = _content_for(str(payload.get("prompt", "")), malformed)
+        return {
+            "model": model,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "response": content,
+            "done": True,
+        }
+
+    # HuggingFace Inference API: shape depends on the task implied by inputs
+    inputs = payload.get("inputs")
+    parameters = payload.get("parameters") or {}
+    if isinstance(inputs, dict) and "source_sentence" in inputs:
+        source = set(str(inputs["source_sentence"]).lower().split())
+        scores = []
+        for sentence in inputs.get("sentences", []):
+            words = set(str(sentence).lower().split())
+            scores.append(round(len(source & words) / max(len(source | words), 1), 4))
+        return scores
+    if "candidate_labels" in parameters:
+        labels = list(parameters["candidate_labels"])
+        weights = [1.0 / (i + 1) for i in range(len(labels))]
+        total = sum(weights) or 1.0
+        return {"sequence": inputs, "labels": labels, "scores": [w / total for w in weights]}
+    if "max_new_tokens" in parameters or "return_full_text" in parameters:
+        return [{"generated_text": _content_for(str(inputs), malformed)}]
+    # Token classification (NER)
+    text = str(inputs).lower()
+    entities = []
+    for term in NER_TERMS:
+        start = text.find(term)
+        if start >= 0:
+            entities.append({
+                "entity_group": "Sign_symptom",
+                "word": term,
+                "score": 0.95,
+                "start": start,
+                "end": start + len(term),
+            })
+    return entities
+
+
+def fault_response(api: str, status: int, profile: FaultProfile) -> JSONResponse:
+    """Provider-shaped error body for an injected fault"""
+    shape = API_SHAPES[api]
+    headers = {}
+    if status == 429:
+        headers["Retry-After"] = str(profile.retry_after_s)
+        message = "Rate limit exceeded"
+    elif status == 503:
+        message = "Model is currently loading" if shape == API_HUGGINGFACE else "Service unavailable"
+    else:
+        message = "Internal server error"
+
+    if shape == API_HUGGINGFACE:
+        body: Any = {"error": message}
+        if status == 503:
+            body["estimated_time"] = 20.0
+    elif shape == API_ANTHROPIC:
+        body = {"type": "error", "error": {"type": "api_error", "message": message}}
+    elif shape == API_OLLAMA:
+        body = {"error": message}
+    else:
+        body = {"error": {"message": message, "code": status}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+# ==================== SERVER ====================
+
+class StubServer:
+    """Request handling, fault injection and recording for every provider"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.cassette = Cassette(config.cassette_path)
+        self._rng = random.Random(config.seed)
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(self.config.upstream_timeout_s))
+        return self._client
+
+    async def close(self):
+        if self._client:
+            await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.config.mode,
+            "cassette_entries": len(self.cassette),
+            "requests": {api: dict(counts) for api, counts in self._stats.items()},
+        }
+
+    def reset_stats(self):
+        self._stats.clear()
+
+    def _choose_fault(self, profile: FaultProfile) -> Optional[str]:
+        roll = self._rng.random()
+        for name, rate in (
+            ("rate_limited", profile.rate_limit_rate),
+            ("unavailable", profile.unavailable_rate),
+            ("error", profile.error_rate),
+            ("malformed", profile.malformed_rate),
+        ):
+            if roll < rate:
+                return name
+            roll -= rate
+        return None
+
+    async def handle(
+        self,
+        api: str,
+        model: str,
+        request: Request,
+        upstream_path: str,
+    ) -> JSONResponse:
+        payload = await request.json()
+        counts = self._stats[api]
+        counts["total"] += 1
+
+        if self.config.mode == "record":
+            base = self.config.upstream_for(api)
+            return await self._proxy(api, model, request, payload, f"{base.rstrip('/')}/{upstream_path}")
+
+        profile = self.config.profile_for(api)
+        fault = self._choose_fault(profile)
+        recorded = None if fault == "malformed" else self.cassette.next(api, model)
+        delay = profile.sample_latency_s(
+            self._rng, recorded.get("latency_ms") if recorded else None
+        )
+
+        # Rejections come back fast, like a real gateway shedding load
+        if fault in ("rate_limited", "unavailable"):
+            await asyncio.sleep(min(delay, 0.05))
+            counts[fault] += 1
+            return fault_response(api, 429 if fault == "rate_limited" else 503, profile)
+
+        await asyncio.sleep(delay)
+        if fault == "error":
+            counts["error"] += 1
+            return fault_response(api, 500, profile)
+
+        if recorded is not None:
+            counts["replayed"] += 1
+            return JSONResponse(recorded["body"])
+
+        counts["malformed" if fault == "malformed" else "synthetic"] += 1
+        return JSONResponse(synthesize(api, model, payload, malformed=fault == "malformed"))
+
+    async def _proxy(
+        self,
+        api: str,
+        model: str,
+        request: Request,
+        payload: Dict[str, Any],
+        url: str,
+    ) -> JSONResponse:
+        """Forward to this provider's upstream and record the response under it"""
+        allowed = FORWARDED_HEADERS + (AUTH_HEADERS if self.config.forwards_credentials(api) else ())
+        headers = {k: v for k, v in request.headers.items() if k.lower() in allowed}
+        if any(k.lower() in AUTH_HEADERS for k in request.headers) and not self.config.forwards_credentials(api):
+            self._stats[api]["credentials_withheld"] += 1
+        client = await self._get_client()
+
+        start = time.perf_counter()
+        try:
+            response = await client.post(url, headers=headers, json=payload)
+        except httpx.HTTPError as e:
+            self._stats[api]["upstream_error"] += 1
+            return JSONResponse({"error": f"Upstream request failed: {e}"}, status_code=502)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"raw": response.text}
+        self.cassette.record(api, model, response.status_code, body, latency_ms)
+        self._stats[api]["recorded"] += 1
+        return JSONResponse(body, status_code=response.status_code)
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    """Build the FastAPI app exposing every provider surface"""
+    server = StubServer(config)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await server.close()
+
+    app = FastAPI(title="ClinixAI Inference Stub", version="1.0.0", lifespan=lifespan)
+    app.state.stub = server
+
+    async def _model_from_body(request: Request, default: str = "") -> str:
+        try:
+            return str((await request.json()).get("model", default))
+        except ValueError:
+            return default
+
+    # OpenAI-compatible chat, one prefix per provider so each is proxied to
+    # (and recorded under) its own upstream
+    def add_chat_routes(api: str, prefix: str):
+        @app.post(f"{prefix}/chat/completions", name=f"{api}_chat_completions")
+        async def chat_completions(request: Request):
+            model = await _model_from_body(request)
+            return await server.handle(api, model, request, "chat/completions")
+
+        @app.get(f"{prefix}/models", name=f"{api}_models")
+        async def list_models():
+            return {"object": "list", "data": [{"id": "stub-model", "object": "model"}]}
+
+    add_chat_routes(API_OPENROUTER, "/openrouter/v1")
+    add_chat_routes(API_OPENAI, "/openai/v1")
+    add_chat_routes(API_VLLM, "/vllm/v1")
+
+    # Anthropic Messages API
+    @app.post("/anthropic/v1/messages")
+    async def anthropic_messages(request: Request):
+        model = await _model_from_body(request)
+        return await server.handle(API_ANTHROPIC, model, request, "messages")
+
+    # HuggingFace Inference API and router chat completions
+    @app.post("/models/{model_id:path}")
+    async def huggingface_inference(model_id: str, request: Request):
+        return await server.handle(API_HUGGINGFACE, model_id, request, model_id)
+
+    @app.post("/hf-inference/models/{model_id:path}/v1/chat/completions")
+    async def huggingface_router(model_id: str, request: Request):
+        return await server.handle(
+            API_HF_ROUTER, model_id, request, f"models/{model_id}/v1/chat/completions"
+        )
+
+    # Ollama
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        model = await _model_from_body(request)
+        return await server.handle(API_OLLAMA, model, request, "api/chat")
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        model = await _model_from_body(request)
+        return await server.handle(API_OLLAMA, model, request, "api/generate")
+
+    @app.get("/api/tags")
+    async def ollama_tags():
+        return {"models": [{"name": "qwen2.5:3b", "size": 0}]}
+
+    # Control plane
+    @app.get("/_stub/stats")
+    async def stub_stats():
+        return server.stats()
+
+    @app.post("/_stub/reset")
+    async def stub_reset():
+        server.reset_stats()
+        return {"status": "reset"}
+
+    @app.post("/_stub/config")
+    async def stub_config(update: Dict[str, Any]):
+        """
+        Update fault profiles at runtime, e.g.
+            {"default": {"p50_ms": 200}, "huggingface": {"unavailable_rate": 0.3}}
+        """
+        for key, values in update.items():
+            if key == "default":
+                base = config.default_profile
+                config.default_profile = FaultProfile(**{**asdict(base), **values})
+            elif key in API_FAMILIES:
+                base = config.profile_for(key)
+                config.profiles[key] = FaultProfile(**{**asdict(base), **values})
+        return {
+            "default": asdict(config.default_profile),
+            **{api: asdict(p) for api, p in config.profiles.items()},
+        }
+
+    return app
+
+
+# ==================== CLI ====================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recording/replay stub for inference providers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--mode", choices=["replay", "record"], default="replay")
+    parser.add_argument("--cassette", default=None, help="JSONL file to record to / replay from")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and fault sampling")
+    parser.add_argument("--latency-mode", choices=["lognormal", "recorded", "none"], default="lognormal")
+    parser.add_argument("--p50-ms", type=float, default=600.0)
+    parser.add_argument("--p99-ms", type=float, default=3000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500s")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of HTTP 429s")
+    parser.add_argument("--unavailable-rate", type=float, default=0.0, help="Fraction of HTTP 503s")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of non-JSON completions")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429")
+    parser.add_argument(
+        "--profile",
+        action="append",
+        default=[],
+        metavar="API=JSON",
+        help='Per-provider override, e.g. huggingface=\'{"unavailable_rate": 0.2}\'',
+    )
+    for api in API_FAMILIES:
+        parser.add_argument(
+            f"--upstream-{api.replace('_', '-')}",
+            dest=f"upstream_{api}",
+            default=None,
+            help=(
+                f"{api} upstream base URL in record mode; credentials are only "
+                f"forwarded when set (default {DEFAULT_UPSTREAMS[api]}, without credentials)"
+            ),
+        )
+    return parser.parse_args()
+
+
+def build_config(args: argparse.Namespace) -> StubConfig:
+    default_profile = FaultProfile(
+        latency_mode=args.latency_mode,
+        p50_ms=args.p50_ms,
+        p99_ms=args.p99_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        unavailable_rate=args.unavailable_rate,
+        malformed_rate=args.malformed_rate,
+        retry_after_s=args.retry_after,
+    )
+    profiles = {}
+    for spec in args.profile:
+        api, _, raw = spec.partition("=")
+        if api not in API_FAMILIES:
+            raise SystemExit(f"Unknown provider '{api}', expected one of {API_FAMILIES}")
+        profiles[api] = FaultProfile(**{**asdict(default_profile), **json.loads(raw)})
+
+    return StubConfig(
+        mode=args.mode,
+        cassette_path=args.cassette,
+        seed=args.seed,
+        default_profile=default_profile,
+        profiles=profiles,
+        upstreams={
+            api: getattr(args, f"upstream_{api}") for api in API_FAMILIES if getattr(args, f"upstream_{api}")
+        },
+    )
+
+
+def main():
+    import uvicorn
+
+    args = parse_args()
+    config = build_config(args)
+    if config.mode == "record" and not config.cassette_path:
+        raise SystemExit("--cassette is required in record mode")
+
+    app = create_app(config)
+    print(f"Inference stub ({config.mode}) on http://{args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Vector Compression Benchmark
+============================
+recall@k, memory and search latency of compressed chunk embeddings
+(graphrag.vector_compression) against full float32 vectors, on the
+bundled handbooks (docs/*.pdf).
+
+Queries are the triage queries plus the opening sentence of sampled
+chunks. Ground truth is exact top-k over the full vectors. Search is
+brute force in NumPy, so latency reflects the vector width and dtype;
+int8 variants search the codes and rescore rescore_factor * k candidates
+with the float vectors, as the Neo4j path does.
+
+Usage (from backend/triage-service):
+    python -m benchmarks.vector_compression
+    python -m benchmarks.vector_compression --k 10 --dims 64 128 192
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.common import TRIAGE_QUERIES, print_table, summarize_latencies
+from graphrag.advanced_rag_service import AdvancedRAGService
+from graphrag.vector_compression import CompressionConfig, VectorCompressor
+
+
+DEFAULT_DOCS_DIR = Path(__file__).resolve().parents[3] / "docs"
+
+
+def build_queries(chunks: List[str], n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    queries = list(TRIAGE_QUERIES)
+    for chunk in rng.sample(chunks, min(n, len(chunks))):
+        queries.append(chunk.split(". ")[0][:200])
+    return queries
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    part = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.take_along_axis(scores, part, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(part, order, axis=1)
+
+
+def evaluate(
+    name: str,
+    compressor: VectorCompressor,
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int
+) -> Dict[str, Any]:
+    reduced = compressor.transform(corpus)
+    q_reduced = compressor.transform(queries)
+    codes = compressor.quantize(reduced) if compressor.config.int8 else None
+
+    samples: List[float] = []
+    found = []
+    for q in q_reduced:
+        start = time.perf_counter()
+        if codes is None:
+            ids = top_k((reduced @ q)[None, :], k)[0]
+        else:
+            # int8 dot on the codes (query scaled into the same space), then float rescoring
+            approx = codes.astype(np.int32) @ compressor.quantize(q).astype(np.int32)
+            candidates = top_k(approx[None, :].astype(np.float32), k * compressor.config.rescore_factor)[0]
+            rescored = reduced[candidates] @ q
+            ids = candidates[np.argsort(-rescored)[:k]]
+        samples.append((time.perf_counter() - start) * 1000)
+        found.append(ids)
+
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+    latency = summarize_latencies(samples)
+    return {
+        "variant": name,
+        "dims": compressor.output_dim,
+        "bytes_per_vec": compressor.bytes_per_vector(),
+        "corpus_mb": round(compressor.bytes_per_vector() * len(corpus) / 1e6, 2),
+        f"recall@{k}": round(float(recall), 4),
+        "p50_ms": latency["p50_ms"],
+        "p99_ms": latency["p99_ms"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs-dir", type=Path, default=DEFAULT_DOCS_DIR)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200, help="Chunk-derived queries in addition to triage queries")
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    args = parser.parse_args()
+
+    service = AdvancedRAGService()
+    embedder = service.embedder
+    chunks: List[str] = []
+    for pdf in sorted(args.docs_dir.glob("*.pdf")):
+        chunks.extend(service._chunk_text(service._load_pdf(str(pdf))))
+
+    corpus = embedder.embed_matrix(chunks)
+    queries = embedder.embed_matrix(build_queries(chunks, args.queries))
+    truth = top_k(queries @ corpus.T, args.k)
+    dim = corpus.shape[1]
+    print(f"{len(chunks)} chunks, {len(queries)} queries, dimension {dim}")
+
+    variants = [("float32", CompressionConfig())]
+    variants.append(("int8", CompressionConfig(int8=True, rescore_factor=args.rescore_factor)))
+    for dims in args.dims:
+        if dims >= dim:
+            continue
+        variants.append((f"pca{dims}", CompressionConfig(reduction="pca", dims=dims)))
+        variants.append((f"matryoshka{dims}", CompressionConfig(reduction="matryoshka", dims=dims)))
+        variants.append((
+            f"pca{dims}+int8",
+            CompressionConfig(reduction="pca", dims=dims, int8=True, rescore_factor=args.rescore_factor),
+        ))
+
+    rows = []
+    for name, config in variants:
+        compressor = VectorCompressor(config, dim).fit(corpus)
+        rows.append(evaluate(name, compressor, corpus, queries, truth, args.k))
+
+    print_table(f"Chunk vector compression ({embedder.model_name})", rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -32,7 +32,7 @@ Usage:
     context = service.get_rag_context("patient with chest pain")
 """
 
-from .neo4j_client import Neo4jClient, GraphNode, GraphRelationship, GraphDocument
+from .neo4j_client import Neo4jClient, AsyncNeo4jClient, GraphNode, GraphRelationship, GraphDocument
 from .medical_schema import (
     MedicalSchema, 
     MEDICAL_NODE_TYPES, 
@@ -47,6 +47,7 @@ from .graph_rag_service import GraphRAGService, get_graph_rag_service
 __all__ = [
     # Neo4j Client
     "Neo4jClient",
+    "AsyncNeo4jClient",
     "GraphNode",
     "GraphRelationship", 
     "GraphDocument",
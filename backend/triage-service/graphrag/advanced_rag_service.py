@@ -15,9 +15,13 @@ This is the production-ready RAG system for medical triage.
 import os
 import re
 import json
+import time
 import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import importlib.util
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, field
@@ -25,27 +29,32 @@ import asyncio
 
 import httpx
 
-# Neo4j imports
-try:
-    from neo4j import GraphDatabase
-    NEO4J_AVAILABLE = True
-except ImportError:
-    NEO4J_AVAILABLE = False
+# Neo4j drivers are shared per process (see neo4j_drivers)
+from . import neo4j_drivers
+from .neo4j_drivers import NEO4J_AVAILABLE
+from .ingest_pipeline import IngestPipeline, Stage, format_report
 
-# Embedding imports
+# Embedding imports. sentence-transformers (and torch) is only imported when
+# the torch backend loads, so the ONNX backend starts without it.
 try:
-    from sentence_transformers import SentenceTransformer
     import numpy as np
-    EMBEDDINGS_AVAILABLE = True
+    from .embedding_cache import EmbeddingCache, get_embedding_cache
+    from .onnx_embedding import ONNX_AVAILABLE, OnnxEmbeddingModel, default_model_dir
+    from .embedding_pool import EmbeddingPool
+    from .vector_compression import CompressionConfig, VectorCompressor
+    from .ann_index import IVFIndex
+    SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+    EMBEDDINGS_AVAILABLE = SENTENCE_TRANSFORMERS_AVAILABLE or ONNX_AVAILABLE
 except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+    ONNX_AVAILABLE = False
     EMBEDDINGS_AVAILABLE = False
 
-# PDF imports
-try:
-    from pypdf import PdfReader
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+# PDF pages are streamed (optionally from a process pool, see pdf_pages)
+from .pdf_pages import PdfPage, PdfPagePool, iter_pdf_pages
+from .chunking import PageChunker, TextChunk, chunk_text
+
+from metrics import record_cache_lookup, track_embedding, track_neo4j_query
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +69,7 @@ class DocumentChunk:
     document_id: str
     document_name: str
     chunk_index: int
-    embedding: Optional[List[float]] = None
+    embedding: Optional["np.ndarray"] = None  # float32, unit length
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -101,6 +110,11 @@ class EmbeddingService:
     """
     Manages text embeddings using Sentence Transformers.
     Uses medical-optimized models when available.
+    
+    Backends (EMBEDDING_BACKEND):
+    - torch: sentence-transformers on PyTorch (default)
+    - onnx: exported model on ONNX Runtime; EMBEDDING_ONNX_INT8=true
+      selects the int8-quantized graph
     """
     
     # Medical-optimized embedding models (ranked by quality)
@@ -110,23 +124,65 @@ class EmbeddingService:
         "pritamdeka/S-PubMedBert-MS-MARCO",  # Medical-specific
     ]
     
-    def __init__(self, model_name: str = None):
-        if not EMBEDDINGS_AVAILABLE:
+    # Models whose tokenizer lowercases input, so case never changes the vector
+    UNCASED_MODELS = {
+        "sentence-transformers/all-MiniLM-L6-v2",
+        "sentence-transformers/all-mpnet-base-v2",
+        "pritamdeka/S-PubMedBert-MS-MARCO",
+    }
+    
+    def __init__(
+        self,
+        model_name: str = None,
+        cache: Optional["EmbeddingCache"] = None,
+        backend: str = None,
+        onnx_path: str = None,
+        onnx_int8: bool = None
+    ):
+        self.backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+        if self.backend == "onnx":
+            if not ONNX_AVAILABLE:
+                raise ImportError("onnxruntime/tokenizers not installed. Run: pip install onnxruntime tokenizers")
+        elif not SENTENCE_TRANSFORMERS_AVAILABLE:
             raise ImportError("sentence-transformers not installed. Run: pip install sentence-transformers")
         
         self.model_name = model_name or self.MEDICAL_MODELS[0]
+        self.onnx_path = onnx_path or default_model_dir(self.model_name)
+        self.onnx_int8 = (
+            onnx_int8 if onnx_int8 is not None
+            else os.getenv("EMBEDDING_ONNX_INT8", "false").lower() == "true"
+        )
+        # Quantized vectors differ slightly, so they are cached separately
+        self.cache_key = self.model_name
+        if self.backend == "onnx":
+            self.cache_key = f"{self.model_name}#onnx{'-int8' if self.onnx_int8 else ''}"
+        self.cache = cache
+        self.uncased = self.model_name in self.UNCASED_MODELS
         self._model = None
         self._dimension = None
+        self._load_lock = threading.Lock()
     
     def load(self):
         """Load the embedding model"""
-        if self._model is None:
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self._model = SentenceTransformer(self.model_name)
-            # Get embedding dimension
-            test_embedding = self._model.encode(["test"])
-            self._dimension = len(test_embedding[0])
-            logger.info(f"Embedding dimension: {self._dimension}")
+        if self._model is not None:
+            return
+        with self._load_lock:
+            if self._model is None:
+                logger.info(f"Loading embedding model: {self.model_name} ({self.backend})")
+                if self.backend == "onnx":
+                    model = OnnxEmbeddingModel(
+                        self.onnx_path,
+                        quantized=self.onnx_int8,
+                        intra_op_threads=int(os.getenv("EMBEDDING_ONNX_THREADS", "0")) or None,
+                    )
+                else:
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer(self.model_name)
+                # Get embedding dimension
+                test_embedding = model.encode(["test"])
+                self._dimension = len(test_embedding[0])
+                self._model = model
+                logger.info(f"Embedding dimension: {self._dimension}")
     
     @property
     def dimension(self) -> int:
@@ -135,23 +191,284 @@ class EmbeddingService:
             self.load()
         return self._dimension
     
-    def embed(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for texts"""
+    def _encode(self, texts: List[str], batch_size: int = 32, cached: bool = True) -> "np.ndarray":
+        """
+        Raw float32 embeddings, served from the on-disk cache where possible
+        (unless cached=False). Only cache misses reach the model.
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
+        cache = self.cache if cached else None
+        hits: Dict[int, "np.ndarray"] = {}
+        misses = list(range(len(texts)))
+        if cache is not None:
+            hits, misses = cache.get_many(self.cache_key, texts)
+        
+        if not misses:
+            return np.stack([hits[i] for i in range(len(texts))])
+        
         if self._model is None:
             self.load()
         
-        embeddings = self._model.encode(texts, show_progress_bar=False)
-        return [emb.tolist() for emb in embeddings]
+        miss_texts = [texts[i] for i in misses]
+        with track_embedding(self.model_name, len(miss_texts)):
+            computed = self._model.encode(
+                miss_texts,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                batch_size=batch_size,
+            )
+        computed = np.asarray(computed, dtype=np.float32)
+        
+        if cache is not None:
+            cache.put_many(self.cache_key, miss_texts, computed)
+        if not hits:
+            return computed
+        
+        out = np.empty((len(texts), computed.shape[1]), dtype=np.float32)
+        out[misses] = computed
+        for i, vector in hits.items():
+            out[i] = vector
+        return out
+    
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        """Generate unit-length float32 embeddings, one row per text"""
+        return self.embed_matrix(texts)
+    
+    def embed_single(self, text: str) -> "np.ndarray":
+        """Generate a unit-length float32 embedding for a single text"""
+        return self.embed_matrix([text])[0]
+    
+    def embed_matrix(
+        self,
+        texts: List[str],
+        normalize: bool = True,
+        batch_size: int = 32,
+        cached: bool = True
+    ) -> "np.ndarray":
+        """
+        Generate a float32 (len(texts), dimension) matrix. With normalize=True
+        rows are unit length, so cosine similarity is a plain dot product.
+        cached=False bypasses the on-disk cache for callers with their own.
+        """
+        embeddings = self._encode(texts, batch_size=batch_size, cached=cached)
+        return self.normalize(embeddings) if normalize else embeddings
+    
+    @staticmethod
+    def normalize(embeddings: "np.ndarray") -> "np.ndarray":
+        """Scale float32 rows to unit length in place"""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.maximum(norms, 1e-12)
+        return embeddings
+    
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        """Token count per text (capped at the model's max sequence length)"""
+        if self._model is None:
+            self.load()
+        
+        max_len = getattr(self._model, "max_seq_length", None) or 512
+        tokenizer = getattr(self._model, "tokenizer", None)
+        if tokenizer is None:
+            # Rough fallback: ~4 characters per token
+            return [min(max_len, len(t) // 4 + 2) for t in texts]
+        
+        encoded = tokenizer(texts, add_special_tokens=True, truncation=False)["input_ids"]
+        return [min(max_len, len(ids)) for ids in encoded]
+    
+    def plan_batches(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        max_batch_tokens: Optional[int] = None
+    ) -> List[List[int]]:
+        """
+        Group text indices into batches of similar token length.
+        
+        Texts are sorted by length so each batch pads to a close maximum.
+        A batch closes at batch_size items or when its padded size
+        (items x longest item) would exceed max_batch_tokens.
+        """
+        lengths = self.token_lengths(texts)
+        order = sorted(range(len(texts)), key=lambda i: lengths[i])
+        
+        batches: List[List[int]] = []
+        current: List[int] = []
+        for i in order:
+            # Sorted ascending, so the newest item is the batch's longest
+            padded = (len(current) + 1) * lengths[i]
+            if current and (
+                len(current) >= batch_size
+                or (max_batch_tokens and padded > max_batch_tokens)
+            ):
+                batches.append(current)
+                current = []
+            current.append(i)
+        if current:
+            batches.append(current)
+        return batches
+    
+    def embed_batches(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        max_batch_tokens: Optional[int] = None
+    ) -> Iterator[Tuple[List[int], "np.ndarray"]]:
+        """Yield (indices, float32 embeddings) per length-sorted batch"""
+        for indices in self.plan_batches(texts, batch_size, max_batch_tokens):
+            # One forward pass per planned batch
+            matrix = self.embed_matrix([texts[i] for i in indices], batch_size=len(indices))
+            yield indices, matrix
+    
+    @staticmethod
+    def similarity(embedding1: "np.ndarray", embedding2: "np.ndarray") -> float:
+        """Cosine similarity of two unit-length embeddings (a dot product)"""
+        return float(np.dot(embedding1, embedding2))
+    
+    @staticmethod
+    def similarity_matrix(queries: "np.ndarray", corpus: "np.ndarray") -> "np.ndarray":
+        """Cosine similarities of unit-length rows, shape (len(queries), len(corpus))"""
+        return np.atleast_2d(queries) @ np.atleast_2d(corpus).T
+
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def _safe_identifier(value: Optional[str], default: str) -> str:
+    """Label/relationship type safe to interpolate into Cypher (LLM output is untrusted)"""
+    # fullmatch: "$" alone would also accept a trailing newline
+    return value if value and _IDENTIFIER.fullmatch(value) else default
+
+
+def _index_score(cosine: float) -> float:
+    """Map cosine similarity onto Neo4j's vector index score, (1 + cos) / 2"""
+    return float((1.0 + cosine) / 2.0)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Part of every document manifest: bump when chunk boundaries change so
+# re-ingestion re-chunks documents instead of reporting them unchanged
+CHUNKING_SCHEME = "pages-v2"
+
+
+def _chunk_id(doc_id: str, text: str, seen: Dict[str, int]) -> str:
+    """Content-addressed chunk id; repeated texts get an occurrence suffix"""
+    key = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    count = seen.get(key, 0)
+    seen[key] = count + 1
+    return f"{doc_id}_{key}" if count == 0 else f"{doc_id}_{key}_{count}"
+
+
+def _page_metadata(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Page span of a chunk row, if it was ingested with page numbers"""
+    if row.get("page_start") is None:
+        return {}
+    return {"page_start": row["page_start"], "page_end": row["page_end"]}
+
+
+async def _no_results() -> List[Dict[str, Any]]:
+    return []
+
+
+def _vector_param(vector) -> Optional[List[float]]:
+    """Convert an embedding to the list of floats the Neo4j driver expects"""
+    if vector is None:
+        return None
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU of query embeddings keyed by whitespace-normalized query
+    text, casefolded only for uncased models (for cased ones "MS" and "ms"
+    are different queries). Triage queries repeat heavily, so hits skip the
+    transformer entirely.
+    """
+    
+    _WHITESPACE = re.compile(r"\s+")
+    
+    def __init__(self, embedder: EmbeddingService, max_size: int = 1024):
+        self.embedder = embedder
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def normalize(cls, query: str) -> str:
+        return cls._WHITESPACE.sub(" ", query).strip()
+    
+    def get(self, query: str) -> "np.ndarray":
+        """Embedding for a query, computed on miss"""
+        text = self.normalize(query)
+        key = text.casefold() if self.embedder.uncased else text
+        if self.max_size > 0:
+            with self._lock:
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+            if embedding is not None:
+                record_cache_lookup("query_embedding", True)
+                return embedding
+        
+        # A miss goes straight to the model: the on-disk chunk cache would
+        # count it again and take its write lock on the retrieval path.
+        embedding = self.embedder.embed_matrix([text], cached=False)[0]
+        # Entries are shared between callers
+        embedding.setflags(write=False)
+        record_cache_lookup("query_embedding", False)
+        with self._lock:
+            self.misses += 1
+            if self.max_size > 0:
+                self._entries[key] = embedding
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return embedding
     
-    def embed_single(self, text: str) -> List[float]:
-        """Generate embedding for single text"""
-        return self.embed([text])[0]
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
     
-    def similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
-        """Calculate cosine similarity between embeddings"""
-        a = np.array(embedding1)
-        b = np.array(embedding2)
-        return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+# Shared instances so each model is loaded once per process
+_embedding_services: Dict[str, EmbeddingService] = {}
+_embedding_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str = None) -> EmbeddingService:
+    """
+    Get or create the process-wide EmbeddingService for a model.
+    Defaults to EMBEDDING_MODEL, else the first of MEDICAL_MODELS.
+    """
+    name = model_name or os.getenv("EMBEDDING_MODEL") or EmbeddingService.MEDICAL_MODELS[0]
+    if "/" not in name:
+        # "all-MiniLM-L6-v2" and "sentence-transformers/all-MiniLM-L6-v2" share one instance
+        name = f"sentence-transformers/{name}"
+    with _embedding_services_lock:
+        if name not in _embedding_services:
+            _embedding_services[name] = EmbeddingService(model_name=name, cache=get_embedding_cache())
+        return _embedding_services[name]
 
 
 # ==================== OPENROUTER EXTRACTOR ====================
@@ -289,6 +606,74 @@ Extract all medical knowledge. Return ONLY valid JSON."""
 
 # ==================== NEO4J VECTOR STORE ====================
 
+VECTOR_SEARCH_QUERY = """
+CALL db.index.vector.queryNodes('chunk_embeddings', $limit, $embedding)
+YIELD node, score
+RETURN node.id AS id, node.text AS text, node.document_id AS doc_id, score,
+       node.page_start AS page_start, node.page_end AS page_end,
+       CASE WHEN $return_embeddings THEN node.embedding END AS embedding
+ORDER BY score DESC
+"""
+
+GET_CHUNKS_QUERY = """
+UNWIND $ids AS chunk_id
+MATCH (c:Chunk {id: chunk_id})
+RETURN c.id AS id, c.text AS text, c.document_id AS doc_id,
+       c.page_start AS page_start, c.page_end AS page_end
+"""
+
+KEYWORD_SEARCH_QUERY = """
+CALL db.index.fulltext.queryNodes('chunk_text', $search_text)
+YIELD node, score
+RETURN node.id AS id, node.text AS text, node.document_id AS doc_id, score,
+       node.page_start AS page_start, node.page_end AS page_end
+LIMIT $limit
+"""
+
+ENTITY_SEARCH_QUERY = """
+CALL db.index.fulltext.queryNodes('entity_search', $search_text)
+YIELD node, score
+RETURN labels(node)[0] AS type, node.name AS name, 
+       node.description AS description, score
+LIMIT $limit
+"""
+
+ENTITY_CONTEXT_QUERY = """
+MATCH (e) WHERE e.name = $name
+CALL apoc.path.subgraphAll(e, {maxLevel: $depth})
+YIELD nodes, relationships
+RETURN e AS entity,
+       [n IN nodes | {name: n.name, type: labels(n)[0]}] AS related_entities,
+       [r IN relationships | {type: type(r), source: startNode(r).name, target: endNode(r).name}] AS relations
+"""
+
+SYMPTOM_DISEASE_PATHS_QUERY = """
+UNWIND $symptoms AS symptom_name
+MATCH (s:Symptom)-[r:INDICATES|MANIFESTS_AS|ASSOCIATED_WITH]-(d:Disease)
+WHERE toLower(s.name) CONTAINS toLower(symptom_name)
+RETURN d.name AS disease, 
+       collect(DISTINCT s.name) AS matching_symptoms,
+       count(DISTINCT s) AS symptom_count
+ORDER BY symptom_count DESC
+LIMIT 10
+"""
+
+RED_FLAGS_QUERY = """
+UNWIND $symptoms AS symptom_name
+MATCH (s:Symptom)-[:RED_FLAG_FOR|INDICATES]->(rf:RedFlag)
+WHERE toLower(s.name) CONTAINS toLower(symptom_name)
+RETURN rf.name AS red_flag, rf.description AS description,
+       collect(DISTINCT s.name) AS related_symptoms
+"""
+
+LABEL_COUNTS_QUERY = """
+MATCH (n)
+WITH labels(n)[0] AS label, count(*) AS count
+RETURN label, count
+ORDER BY count DESC
+"""
+
+
 class Neo4jVectorStore:
     """
     Neo4j client with vector search capabilities.
@@ -310,39 +695,69 @@ class Neo4jVectorStore:
         self.password = password or os.getenv("NEO4J_PASSWORD", "clinixai_neo4j_password")
         self.database = database
         self._driver = None
+        self._indexed_labels = {"Disease", "Symptom", "Drug", "Procedure", "BodyPart", "RiskFactor", "RedFlag"}
     
     def connect(self) -> bool:
-        """Connect to Neo4j"""
+        """Connect to Neo4j (shared driver from neo4j_drivers)"""
         try:
-            self._driver = GraphDatabase.driver(
-                self.uri,
-                auth=(self.user, self.password)
-            )
+            if self._driver is None:
+                self._driver = neo4j_drivers.acquire(self.uri, self.user, self.password)
             self._driver.verify_connectivity()
             logger.info(f"Connected to Neo4j at {self.uri}")
             return True
         except Exception as e:
             logger.error(f"Neo4j connection failed: {e}")
+            self.close()
             return False
     
     def close(self):
-        """Close connection"""
+        """Release this store's reference to the shared driver"""
         if self._driver:
-            self._driver.close()
+            self._driver = None
+            neo4j_drivers.release(self.uri, self.user)
     
-    def setup_vector_index(self, embedding_dimension: int = 384):
-        """Create vector index for semantic search"""
+    def _read(self, query: str, **params) -> List[Dict[str, Any]]:
+        """Records of a read-only query, in a managed (routable) read transaction"""
         with self._driver.session(database=self.database) as session:
+            return session.execute_read(neo4j_drivers.read_records, query, params)
+    
+    def _write(self, work, *args):
+        """Run a transaction function in a managed write transaction"""
+        with self._driver.session(database=self.database) as session:
+            return session.execute_write(work, *args)
+    
+    @track_neo4j_query
+    def setup_vector_index(self, embedding_dimension: int = 384, quantization: bool = False):
+        """
+        Create vector index for semantic search.
+        quantization enables Neo4j's int8 index quantization (Neo4j 5.23+).
+        An existing index is kept; if its dimension differs (a new embedding
+        model or compression setting), raise rather than search a mismatched
+        index: drop it and re-ingest.
+        """
+        quantization_option = ",\n                        `vector.quantization.enabled`: true" if quantization else ""
+        with self._driver.session(database=self.database) as session:
+            existing = session.run(
+                "SHOW INDEXES YIELD name, options WHERE name = 'chunk_embeddings' RETURN options"
+            ).single()
+            if existing is not None:
+                dimension = (existing["options"] or {}).get("indexConfig", {}).get("vector.dimensions")
+                if dimension is not None and int(dimension) != embedding_dimension:
+                    raise ValueError(
+                        f"Vector index chunk_embeddings has dimension {dimension}, expected "
+                        f"{embedding_dimension}. Run DROP INDEX chunk_embeddings and re-ingest."
+                    )
+            
             # Create vector index on Chunk nodes
             try:
-                session.run("""
+                session.run(f"""
                     CREATE VECTOR INDEX chunk_embeddings IF NOT EXISTS
                     FOR (c:Chunk)
                     ON c.embedding
-                    OPTIONS {indexConfig: {
+                    OPTIONS {{indexConfig: {{
                         `vector.dimensions`: $dimension,
-                        `vector.similarity_function`: 'cosine'
-                    }}
+                        `vector.similarity_function`: 'cosine'{quantization_option}
+                    }}}}
                 """, dimension=embedding_dimension)
                 logger.info(f"Created vector index with dimension {embedding_dimension}")
             except Exception as e:
@@ -367,6 +782,18 @@ class Neo4jVectorStore:
             except:
                 pass
             
+            for label, name in (("Chunk", "chunk_id"), ("Document", "document_id")):
+                try:
+                    session.run(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.id)")
+                except Exception:
+                    pass
+            
+            # Chunks by document, for re-ingestion diffs
+            try:
+                session.run("CREATE INDEX chunk_doc_id IF NOT EXISTS FOR (c:Chunk) ON (c.document_id)")
+            except Exception:
+                pass
+            
             # Create indexes for entity lookup
             for label in ["Disease", "Symptom", "Drug", "Procedure", "BodyPart", "RiskFactor", "RedFlag", "Document", "Chunk"]:
                 try:
@@ -374,43 +801,150 @@ class Neo4jVectorStore:
                 except:
                     pass
     
+    @track_neo4j_query
     def add_document(self, doc_id: str, name: str, metadata: Dict[str, Any] = None):
         """Add a document node"""
-        with self._driver.session(database=self.database) as session:
-            session.run("""
-                MERGE (d:Document {id: $id})
-                SET d.name = $name,
-                    d.created_at = datetime(),
-                    d += $metadata
-            """, id=doc_id, name=name, metadata=metadata or {})
+        self._write(neo4j_drivers.run_write, """
+            MERGE (d:Document {id: $id})
+            SET d.name = $name,
+                d.created_at = datetime(),
+                d += $metadata
+        """, {"id": doc_id, "name": name, "metadata": metadata or {}})
+    
+    @track_neo4j_query
+    def get_document_manifest(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Ingestion manifest of a document (None if never fully ingested)"""
+        records = self._read("""
+            MATCH (d:Document {id: $id})
+            WHERE d.content_hash IS NOT NULL
+            RETURN d.content_hash AS content_hash, d.ingest_config AS ingest_config,
+                   d.chunk_ids AS chunk_ids
+        """, id=doc_id)
+        return records[0] if records else None
+    
+    @track_neo4j_query
+    def get_partial_chunk_ids(self, doc_id: str, ingest_config: str) -> List[str]:
+        """Chunks stored by an interrupted ingestion of a document under ingest_config"""
+        records = self._read("""
+            MATCH (d:Document {id: $id})
+            WHERE d.content_hash IS NULL AND d.ingest_config = $ingest_config
+            MATCH (c:Chunk {document_id: $id})
+            RETURN c.id AS id
+        """, id=doc_id, ingest_config=ingest_config)
+        return [record["id"] for record in records]
+    
+    @track_neo4j_query
+    def set_document_manifest(self, doc_id: str, content_hash: str, ingest_config: str, chunk_ids: List[str]):
+        """Record the ingested file hash and chunk ids (written last, so a partial ingest is retried)"""
+        self._write(neo4j_drivers.run_write, """
+            MATCH (d:Document {id: $id})
+            SET d.content_hash = $content_hash,
+                d.ingest_config = $ingest_config,
+                d.chunk_ids = $chunk_ids,
+                d.chunks = size($chunk_ids),
+                d.updated_at = datetime()
+        """, {"id": doc_id, "content_hash": content_hash, "ingest_config": ingest_config, "chunk_ids": chunk_ids})
+    
+    @track_neo4j_query
+    def delete_stale_chunks(self, doc_id: str, keep_ids: List[str]) -> List[str]:
+        """Delete a document's chunks not in keep_ids (with their edges); returns deleted ids"""
+        def work(tx):
+            result = tx.run("""
+                MATCH (c:Chunk {document_id: $doc_id})
+                WHERE NOT c.id IN $keep
+                WITH c, c.id AS id
+                DETACH DELETE c
+                RETURN id
+            """, doc_id=doc_id, keep=keep_ids)
+            return [record["id"] for record in result]
+        
+        return self._write(work)
     
+    @track_neo4j_query
+    def set_chunk_positions(self, rows: List[Dict[str, Any]]):
+        """Update chunk_index and pages of unchanged chunks (rows: id, chunk_index, page_start, page_end)"""
+        if not rows:
+            return
+        self._write(neo4j_drivers.run_write, """
+            UNWIND $rows AS row
+            MATCH (c:Chunk {id: row.id})
+            SET c.chunk_index = row.chunk_index,
+                c.page_start = row.page_start,
+                c.page_end = row.page_end
+        """, {"rows": rows})
+    
+    @track_neo4j_query
     def add_chunk(self, chunk: DocumentChunk):
         """Add a chunk with embedding"""
+        self._write(neo4j_drivers.run_write, """
+            MERGE (c:Chunk {id: $id})
+            SET c.text = $text,
+                c.document_id = $doc_id,
+                c.chunk_index = $chunk_index,
+                c.page_start = $page_start,
+                c.page_end = $page_end,
+                c.embedding = $embedding,
+                c.created_at = datetime()
+            
+            WITH c
+            MATCH (d:Document {id: $doc_id})
+            MERGE (c)-[:FROM_DOCUMENT]->(d)
+        """, {
+            "id": chunk.id,
+            "text": chunk.text,
+            "doc_id": chunk.document_id,
+            "chunk_index": chunk.chunk_index,
+            "page_start": chunk.metadata.get("page_start"),
+            "page_end": chunk.metadata.get("page_end"),
+            "embedding": _vector_param(chunk.embedding),
+        })
+    
+    @track_neo4j_query
+    def add_chunks(self, chunks: List[DocumentChunk], batch_size: int = 500):
+        """
+        Add many chunks with embeddings: one UNWIND statement per batch,
+        each in its own write transaction (retried on transient errors).
+        """
+        rows = [
+            {
+                "id": chunk.id,
+                "text": chunk.text,
+                "doc_id": chunk.document_id,
+                "chunk_index": chunk.chunk_index,
+                "page_start": chunk.metadata.get("page_start"),
+                "page_end": chunk.metadata.get("page_end"),
+                "embedding": _vector_param(chunk.embedding),
+            }
+            for chunk in chunks
+        ]
         with self._driver.session(database=self.database) as session:
-            session.run("""
-                MERGE (c:Chunk {id: $id})
-                SET c.text = $text,
-                    c.document_id = $doc_id,
-                    c.chunk_index = $chunk_index,
-                    c.embedding = $embedding,
-                    c.created_at = datetime()
-                
-                WITH c
-                MATCH (d:Document {id: $doc_id})
-                MERGE (c)-[:FROM_DOCUMENT]->(d)
-            """, 
-                id=chunk.id,
-                text=chunk.text,
-                doc_id=chunk.document_id,
-                chunk_index=chunk.chunk_index,
-                embedding=chunk.embedding
-            )
+            for start in range(0, len(rows), batch_size):
+                session.execute_write(self._write_chunk_rows, rows[start:start + batch_size])
     
+    @staticmethod
+    def _write_chunk_rows(tx, rows: List[Dict[str, Any]]):
+        tx.run("""
+            UNWIND $rows AS row
+            MERGE (c:Chunk {id: row.id})
+            SET c.text = row.text,
+                c.document_id = row.doc_id,
+                c.chunk_index = row.chunk_index,
+                c.page_start = row.page_start,
+                c.page_end = row.page_end,
+                c.embedding = row.embedding,
+                c.created_at = datetime()
+            
+            WITH c, row
+            MATCH (d:Document {id: row.doc_id})
+            MERGE (c)-[:FROM_DOCUMENT]->(d)
+        """, rows=rows).consume()
+    
+    @track_neo4j_query
     def add_entity(self, entity: ExtractedEntity, chunk_id: str = None):
         """Add an entity and link to source chunk"""
-        with self._driver.session(database=self.database) as session:
+        def work(tx):
             # Create entity with dynamic label
-            session.run(f"""
+            tx.run(f"""
                 MERGE (e:{entity.type} {{name: $name}})
                 SET e.id = $id,
                     e.description = $description,
@@ -421,16 +955,19 @@ class Neo4jVectorStore:
                 name=entity.name,
                 description=entity.description,
                 properties=entity.properties
-            )
+            ).consume()
             
             # Link to chunk if provided
             if chunk_id:
-                session.run(f"""
+                tx.run(f"""
                     MATCH (e:{entity.type} {{name: $name}})
                     MATCH (c:Chunk {{id: $chunk_id}})
                     MERGE (e)-[:MENTIONED_IN]->(c)
-                """, name=entity.name, chunk_id=chunk_id)
+                """, name=entity.name, chunk_id=chunk_id).consume()
+        
+        self._write(work)
     
+    @track_neo4j_query
     def add_relationship(self, rel: ExtractedRelationship, entity_map: Dict[str, str]):
         """Add a relationship between entities"""
         source_name = entity_map.get(rel.source_id)
@@ -439,120 +976,439 @@ class Neo4jVectorStore:
         if not source_name or not target_name:
             return
         
-        with self._driver.session(database=self.database) as session:
-            # Dynamic relationship type
-            session.run(f"""
-                MATCH (a) WHERE a.name = $source
-                MATCH (b) WHERE b.name = $target
-                MERGE (a)-[r:{rel.type}]->(b)
-                SET r += $properties
-            """,
-                source=source_name,
-                target=target_name,
-                properties=rel.properties
-            )
+        # Dynamic relationship type
+        self._write(neo4j_drivers.run_write, f"""
+            MATCH (a) WHERE a.name = $source
+            MATCH (b) WHERE b.name = $target
+            MERGE (a)-[r:{rel.type}]->(b)
+            SET r += $properties
+        """, {"source": source_name, "target": target_name, "properties": rel.properties})
     
-    def vector_search(self, embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
-        """Search chunks by vector similarity"""
+    @track_neo4j_query
+    def add_graph_batch(
+        self,
+        extractions: List[Tuple[str, List[ExtractedEntity], List[ExtractedRelationship]]],
+        batch_size: int = 500
+    ) -> Tuple[int, int]:
+        """
+        Bulk-write extracted entities and relationships for many chunks.
+        
+        extractions: (chunk_id, entities, relationships) per chunk.
+        Entities are grouped by label and MERGEd on the indexed (label, name)
+        key with their MENTIONED_IN links in the same UNWIND; relationships
+        are grouped by (source label, type, target label) so both endpoints
+        are matched through the name indexes. Everything is written in one
+        managed transaction of O(labels + relationship groups) statements.
+        
+        Returns (entities written, relationships written).
+        """
+        entities: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        relationships: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        
+        for chunk_id, chunk_entities, chunk_relationships in extractions:
+            endpoints: Dict[str, Tuple[str, str]] = {}
+            for entity in chunk_entities:
+                label = _safe_identifier(entity.type, "Entity")
+                endpoints[entity.id] = (label, entity.name)
+                row = entities.setdefault((label, entity.name), {
+                    "name": entity.name,
+                    "id": entity.id,
+                    "description": entity.description,
+                    "properties": entity.properties or {},
+                    "chunk_ids": [],
+                })
+                if chunk_id and chunk_id not in row["chunk_ids"]:
+                    row["chunk_ids"].append(chunk_id)
+            
+            for rel in chunk_relationships:
+                source = endpoints.get(rel.source_id)
+                target = endpoints.get(rel.target_id)
+                if not source or not target:
+                    continue
+                key = (source[0], _safe_identifier(rel.type, "RELATED_TO"), target[0])
+                relationships.setdefault(key, []).append({
+                    "source": source[1],
+                    "target": target[1],
+                    "properties": rel.properties or {},
+                })
+        
+        if not entities:
+            return 0, 0
+        
+        by_label: Dict[str, List[Dict[str, Any]]] = {}
+        for (label, _), row in entities.items():
+            by_label.setdefault(label, []).append(row)
+        
         with self._driver.session(database=self.database) as session:
-            result = session.run("""
-                CALL db.index.vector.queryNodes('chunk_embeddings', $limit, $embedding)
-                YIELD node, score
-                RETURN node.id AS id, node.text AS text, node.document_id AS doc_id, score
-                ORDER BY score DESC
-            """, embedding=embedding, limit=limit)
+            # Schema changes cannot share a transaction with writes
+            for label in set(by_label) - self._indexed_labels:
+                session.run(f"CREATE INDEX {label.lower()}_name IF NOT EXISTS FOR (n:{label}) ON (n.name)").consume()
+                self._indexed_labels.add(label)
+            
+            def write(tx):
+                for label, rows in by_label.items():
+                    for start in range(0, len(rows), batch_size):
+                        tx.run(f"""
+                            UNWIND $rows AS row
+                            MERGE (e:{label} {{name: row.name}})
+                            SET e.id = row.id,
+                                e.description = row.description,
+                                e += row.properties,
+                                e.updated_at = datetime()
+                            WITH e, row
+                            UNWIND row.chunk_ids AS chunk_id
+                            MATCH (c:Chunk {{id: chunk_id}})
+                            MERGE (e)-[:MENTIONED_IN]->(c)
+                        """, rows=rows[start:start + batch_size]).consume()
+                
+                for (source_label, rel_type, target_label), rows in relationships.items():
+                    for start in range(0, len(rows), batch_size):
+                        tx.run(f"""
+                            UNWIND $rows AS row
+                            MATCH (a:{source_label} {{name: row.source}})
+                            MATCH (b:{target_label} {{name: row.target}})
+                            MERGE (a)-[r:{rel_type}]->(b)
+                            SET r += row.properties
+                        """, rows=rows[start:start + batch_size]).consume()
             
-            return [dict(record) for record in result]
+            session.execute_write(write)
+        
+        return len(entities), sum(len(rows) for rows in relationships.values())
+    
+    @track_neo4j_query
+    def vector_search(
+        self,
+        embedding: "np.ndarray",
+        limit: int = 5,
+        return_embeddings: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Search chunks by vector similarity (optionally returning stored vectors for rescoring)"""
+        return self._read(
+            VECTOR_SEARCH_QUERY,
+            embedding=_vector_param(embedding), limit=limit, return_embeddings=return_embeddings
+        )
+    
+    @track_neo4j_query
+    def get_chunks(self, chunk_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch chunk text by id (vectors stay out of the response)"""
+        return self._read(GET_CHUNKS_QUERY, ids=chunk_ids)
     
+    @track_neo4j_query
+    def fetch_chunk_embeddings(self, page_size: int = 5000) -> Tuple[List[str], "np.ndarray"]:
+        """All chunk ids and stored vectors, paged by id (for building the ANN index)"""
+        ids: List[str] = []
+        vectors: List[List[float]] = []
+        last_id = ""
+        while True:
+            page = self._read("""
+                MATCH (c:Chunk)
+                WHERE c.embedding IS NOT NULL AND c.id > $last_id
+                RETURN c.id AS id, c.embedding AS embedding
+                ORDER BY c.id
+                LIMIT $limit
+            """, last_id=last_id, limit=page_size)
+            if not page:
+                break
+            for record in page:
+                ids.append(record["id"])
+                vectors.append(record["embedding"])
+            last_id = page[-1]["id"]
+        return ids, np.asarray(vectors, dtype=np.float32)
+    
+    @track_neo4j_query
     def keyword_search(self, search_text: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Search chunks by keyword (full-text)"""
-        with self._driver.session(database=self.database) as session:
-            result = session.run("""
-                CALL db.index.fulltext.queryNodes('chunk_text', $search_text)
-                YIELD node, score
-                RETURN node.id AS id, node.text AS text, node.document_id AS doc_id, score
-                LIMIT $limit
-            """, search_text=search_text, limit=limit)
-            
-            return [dict(record) for record in result]
+        return self._read(KEYWORD_SEARCH_QUERY, search_text=search_text, limit=limit)
     
+    @track_neo4j_query
     def entity_search(self, search_text: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search entities by name/description"""
-        with self._driver.session(database=self.database) as session:
-            result = session.run("""
-                CALL db.index.fulltext.queryNodes('entity_search', $search_text)
-                YIELD node, score
-                RETURN labels(node)[0] AS type, node.name AS name, 
-                       node.description AS description, score
-                LIMIT $limit
-            """, search_text=search_text, limit=limit)
-            
-            return [dict(record) for record in result]
+        return self._read(ENTITY_SEARCH_QUERY, search_text=search_text, limit=limit)
     
+    @track_neo4j_query
     def get_entity_context(self, entity_name: str, depth: int = 2) -> Dict[str, Any]:
         """Get entity and its graph neighborhood"""
-        with self._driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (e) WHERE e.name = $name
-                CALL apoc.path.subgraphAll(e, {maxLevel: $depth})
-                YIELD nodes, relationships
-                RETURN e AS entity,
-                       [n IN nodes | {name: n.name, type: labels(n)[0]}] AS related_entities,
-                       [r IN relationships | {type: type(r), source: startNode(r).name, target: endNode(r).name}] AS relations
-            """, name=entity_name, depth=depth)
-            
-            record = result.single()
-            if record:
-                return dict(record)
-            return {}
+        records = self._read(ENTITY_CONTEXT_QUERY, name=entity_name, depth=depth)
+        return records[0] if records else {}
     
+    @track_neo4j_query
     def get_symptom_disease_paths(self, symptoms: List[str]) -> List[Dict[str, Any]]:
         """Find diseases related to given symptoms"""
-        with self._driver.session(database=self.database) as session:
-            result = session.run("""
-                UNWIND $symptoms AS symptom_name
-                MATCH (s:Symptom)-[r:INDICATES|MANIFESTS_AS|ASSOCIATED_WITH]-(d:Disease)
-                WHERE toLower(s.name) CONTAINS toLower(symptom_name)
-                RETURN d.name AS disease, 
-                       collect(DISTINCT s.name) AS matching_symptoms,
-                       count(DISTINCT s) AS symptom_count
-                ORDER BY symptom_count DESC
-                LIMIT 10
-            """, symptoms=symptoms)
-            
-            return [dict(record) for record in result]
+        return self._read(SYMPTOM_DISEASE_PATHS_QUERY, symptoms=symptoms)
     
+    @track_neo4j_query
     def get_red_flags(self, symptoms: List[str]) -> List[Dict[str, Any]]:
         """Find red flags related to symptoms"""
-        with self._driver.session(database=self.database) as session:
-            result = session.run("""
-                UNWIND $symptoms AS symptom_name
-                MATCH (s:Symptom)-[:RED_FLAG_FOR|INDICATES]->(rf:RedFlag)
-                WHERE toLower(s.name) CONTAINS toLower(symptom_name)
-                RETURN rf.name AS red_flag, rf.description AS description,
-                       collect(DISTINCT s.name) AS related_symptoms
-            """, symptoms=symptoms)
-            
-            return [dict(record) for record in result]
+        return self._read(RED_FLAGS_QUERY, symptoms=symptoms)
     
+    @track_neo4j_query
     def get_stats(self) -> Dict[str, int]:
         """Get database statistics"""
-        with self._driver.session(database=self.database) as session:
-            result = session.run("""
-                MATCH (n)
-                WITH labels(n)[0] AS label, count(*) AS count
-                RETURN label, count
-                ORDER BY count DESC
-            """)
-            
-            stats = {}
-            for record in result:
-                stats[record["label"]] = record["count"]
-            return stats
+        return {record["label"]: record["count"] for record in self._read(LABEL_COUNTS_QUERY)}
+
+
+class AsyncNeo4jVectorStore:
+    """
+    Read side of Neo4jVectorStore on neo4j.AsyncGraphDatabase, with the
+    same method signatures as coroutines. Used by
+    AdvancedRAGService.retrieve_async; ingestion keeps the sync store.
+    """
+    
+    def __init__(
+        self,
+        uri: str = None,
+        user: str = None,
+        password: str = None,
+        database: str = "neo4j"
+    ):
+        if not NEO4J_AVAILABLE:
+            raise ImportError("neo4j not installed. Run: pip install neo4j")
+        
+        self.uri = uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+        self.user = user or os.getenv("NEO4J_USER", "neo4j")
+        self.password = password or os.getenv("NEO4J_PASSWORD", "clinixai_neo4j_password")
+        self.database = database
+        self._driver = None
+    
+    async def connect(self) -> bool:
+        """Connect to Neo4j (shared driver from neo4j_drivers)"""
+        try:
+            if self._driver is None:
+                self._driver = await neo4j_drivers.acquire_async(self.uri, self.user, self.password)
+            await self._driver.verify_connectivity()
+            logger.info(f"Connected to Neo4j at {self.uri} (async)")
+            return True
+        except Exception as e:
+            logger.error(f"Neo4j async connection failed: {e}")
+            await self.close()
+            return False
+    
+    async def close(self):
+        """Release this store's reference to the shared driver"""
+        if self._driver:
+            self._driver = None
+            await neo4j_drivers.release_async(self.uri, self.user)
+    
+    async def _records(self, query: str, **params) -> List[Dict[str, Any]]:
+        async with self._driver.session(database=self.database) as session:
+            return await session.execute_read(neo4j_drivers.read_records_async, query, params)
+    
+    @track_neo4j_query
+    async def vector_search(
+        self,
+        embedding: "np.ndarray",
+        limit: int = 5,
+        return_embeddings: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Search chunks by vector similarity (optionally returning stored vectors for rescoring)"""
+        return await self._records(
+            VECTOR_SEARCH_QUERY,
+            embedding=_vector_param(embedding), limit=limit, return_embeddings=return_embeddings
+        )
+    
+    @track_neo4j_query
+    async def get_chunks(self, chunk_ids: List[str]) -> List[Dict[str, Any]]:
+        """Fetch chunk text by id (vectors stay out of the response)"""
+        return await self._records(GET_CHUNKS_QUERY, ids=chunk_ids)
+    
+    @track_neo4j_query
+    async def keyword_search(self, search_text: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Search chunks by keyword (full-text)"""
+        return await self._records(KEYWORD_SEARCH_QUERY, search_text=search_text, limit=limit)
+    
+    @track_neo4j_query
+    async def entity_search(self, search_text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search entities by name/description"""
+        return await self._records(ENTITY_SEARCH_QUERY, search_text=search_text, limit=limit)
+    
+    @track_neo4j_query
+    async def get_entity_context(self, entity_name: str, depth: int = 2) -> Dict[str, Any]:
+        """Get entity and its graph neighborhood"""
+        records = await self._records(ENTITY_CONTEXT_QUERY, name=entity_name, depth=depth)
+        return records[0] if records else {}
+    
+    @track_neo4j_query
+    async def get_symptom_disease_paths(self, symptoms: List[str]) -> List[Dict[str, Any]]:
+        """Find diseases related to given symptoms"""
+        return await self._records(SYMPTOM_DISEASE_PATHS_QUERY, symptoms=symptoms)
+    
+    @track_neo4j_query
+    async def get_red_flags(self, symptoms: List[str]) -> List[Dict[str, Any]]:
+        """Find red flags related to symptoms"""
+        return await self._records(RED_FLAGS_QUERY, symptoms=symptoms)
+    
+    @track_neo4j_query
+    async def get_stats(self) -> Dict[str, int]:
+        """Get database statistics"""
+        records = await self._records(LABEL_COUNTS_QUERY)
+        return {record["label"]: record["count"] for record in records}
 
 
 # ==================== ADVANCED RAG SERVICE ====================
 
+@dataclass
+class _PendingChunk:
+    """A new or changed chunk travelling through the ingest pipeline"""
+    position: int
+    id: str
+    text: str
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+
+class _DocumentIngestion:
+    """Per-document state shared by the ingest_pdf pipeline stages"""
+    
+    def __init__(
+        self,
+        service: "AdvancedRAGService",
+        doc_id: str,
+        doc_name: str,
+        existing: set,
+        extract_limit: int = 0,
+        embedding_pool: Optional["EmbeddingPool"] = None,
+        progress_callback: callable = None
+    ):
+        self.service = service
+        self.doc_id = doc_id
+        self.doc_name = doc_name
+        self.existing = existing
+        self.extract_limit = extract_limit
+        self.embedding_pool = embedding_pool
+        self.progress_callback = progress_callback
+        
+        self.chunk_ids: List[str] = []  # every chunk, in document order
+        self.kept: List[Dict[str, Any]] = []  # unchanged chunks' positions and pages
+        self.new_chunks = 0
+        self.written = 0
+        self.forwarded = 0
+        self.entities = 0
+        self.relationships = 0
+        self._seen: Dict[str, int] = {}
+        self._chunker = PageChunker(service.chunk_size, service.chunk_overlap)
+        self._held: List[Tuple[_PendingChunk, "np.ndarray"]] = []
+        # New chunks wait here until an unfitted compressor is sure to get enough to fit on
+        self._waiting: Optional[List[_PendingChunk]] = (
+            [] if service.compressor is not None and service.compressor.needs_fit else None
+        )
+        self._extractions: List[Tuple[str, List[ExtractedEntity], List[ExtractedRelationship]]] = []
+    
+    def chunk(self, page: PdfPage) -> Iterator[_PendingChunk]:
+        """Chunk stage: feed a page to the chunker, pass on chunks the manifest lacks"""
+        for chunk in self._chunker.feed(page):
+            yield from self._gate(self._admit(chunk))
+    
+    def flush_chunks(self) -> Iterator[_PendingChunk]:
+        for chunk in self._chunker.finish():
+            yield from self._gate(self._admit(chunk))
+        if self._waiting:
+            compressor = self.service.compressor
+            raise ValueError(
+                f"{self.doc_name} has {len(self._waiting)} new chunks, but fitting "
+                f"{compressor.config.reduction} compression to {compressor.config.dims} dims needs "
+                f"{compressor.min_fit_samples}; ingest a larger document first or lower RAG_VECTOR_DIMS"
+            )
+    
+    def _gate(self, entries: Iterator[_PendingChunk]) -> Iterator[_PendingChunk]:
+        """Hold chunks back from embedding until the compressor fit has enough samples"""
+        if self._waiting is None:
+            yield from entries
+            return
+        self._waiting.extend(entries)
+        if len(self._waiting) >= self.service.compressor.min_fit_samples:
+            waiting, self._waiting = self._waiting, None
+            yield from waiting
+    
+    def _admit(self, chunk: TextChunk) -> Iterator[_PendingChunk]:
+        position = len(self.chunk_ids)
+        chunk_id = _chunk_id(self.doc_id, chunk.text, self._seen)
+        self.chunk_ids.append(chunk_id)
+        if chunk_id in self.existing:
+            self.kept.append({
+                "id": chunk_id,
+                "chunk_index": position,
+                "page_start": chunk.page_start,
+                "page_end": chunk.page_end,
+            })
+            return
+        self.new_chunks += 1
+        yield _PendingChunk(position, chunk_id, chunk.text, chunk.page_start, chunk.page_end)
+    
+    def embed(self, window: List[_PendingChunk]) -> Iterator[Tuple[_PendingChunk, "np.ndarray"]]:
+        """Embed stage: length-sorted batches within the window"""
+        embedder = self.service.embedder
+        for indices, matrix in embedder.embed_batches(
+            [entry.text for entry in window],
+            self.service.embed_batch_size,
+            self.service.embed_max_batch_tokens
+        ):
+            for row, i in enumerate(indices):
+                yield window[i], matrix[row]
+    
+    async def embed_pooled(self, window: List[_PendingChunk]) -> List[Tuple[_PendingChunk, "np.ndarray"]]:
+        """Embed stage on the process pool"""
+        rows = []
+        async for indices, matrix in self.service._embed_chunks_pooled(
+            [entry.text for entry in window], self.embedding_pool
+        ):
+            rows.extend((window[i], matrix[row]) for row, i in enumerate(indices))
+        return rows
+    
+    def write(self, rows: List[Tuple[_PendingChunk, "np.ndarray"]]) -> List[_PendingChunk]:
+        """
+        Write stage: one batched Neo4j write; returns the chunks to extract
+        from. An unfitted compressor holds rows back until it has a sample.
+        """
+        service = self.service
+        if service.compressor is not None and service.compressor.needs_fit:
+            self._held.extend(rows)
+            if len(self._held) < service.compression_fit_samples:
+                return []
+            return self.flush_writes()
+        return self._write(rows)
+    
+    def flush_writes(self) -> List[_PendingChunk]:
+        if not self._held:
+            return []
+        rows, self._held = self._held, []
+        self.service._fit_compressor([np.stack([vector for _, vector in rows])])
+        return self._write(rows)
+    
+    def _write(self, rows: List[Tuple[_PendingChunk, "np.ndarray"]]) -> List[_PendingChunk]:
+        entries = [entry for entry, _ in rows]
+        self.service._write_chunk_batch(
+            self.doc_id, self.doc_name, entries, np.stack([vector for _, vector in rows])
+        )
+        self.written += len(entries)
+        if self.progress_callback:
+            progress = 15 + int(75 * self.written / max(self.new_chunks, 1))
+            self.progress_callback(progress, 100, f"Embedded {self.written}/{self.new_chunks} chunks...")
+        
+        budget = max(0, self.extract_limit - self.forwarded)
+        self.forwarded += min(budget, len(entries))
+        return entries[:budget]
+    
+    async def extract(self, entry: _PendingChunk) -> None:
+        """Extract stage: LLM entity extraction on a written chunk"""
+        try:
+            entities, relationships = await self.service.extractor.extract(entry.text)
+        except Exception as e:
+            logger.warning(f"Entity extraction failed for chunk {entry.position}: {e}")
+            return
+        for entity in entities:
+            entity.source_chunk_id = entry.id
+        self._extractions.append((entry.id, entities, relationships))
+    
+    async def flush_extractions(self) -> None:
+        # One bulk write for every extracted chunk
+        if self._extractions:
+            self.entities, self.relationships = await asyncio.to_thread(
+                self.service.vector_store.add_graph_batch,
+                self._extractions,
+                self.service.chunk_write_batch_size
+            )
+
+
 class AdvancedRAGService:
     """
     Production-ready GraphRAG service combining:
@@ -571,7 +1427,12 @@ class AdvancedRAGService:
         openrouter_api_key: str = None,
         embedding_model: str = None,
         chunk_size: int = 500,
-        chunk_overlap: int = 100
+        chunk_overlap: int = 100,
+        embed_batch_size: int = None,
+        embed_max_batch_tokens: int = None,
+        embed_window: int = None,
+        ingest_queue_size: int = None,
+        query_cache_size: int = None
     ):
         # Components
         self.vector_store = Neo4jVectorStore(
@@ -579,96 +1440,272 @@ class AdvancedRAGService:
             user=neo4j_user,
             password=neo4j_password
         )
-        self.embedder = EmbeddingService(model_name=embedding_model)
+        self.async_store = AsyncNeo4jVectorStore(
+            uri=neo4j_uri,
+            user=neo4j_user,
+            password=neo4j_password
+        )
+        self.embedder = get_embedding_service(embedding_model)
         self.extractor = OpenRouterExtractor(api_key=openrouter_api_key)
         
         # Config
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         
+        # Ingestion embedding batches (sorted by token length to limit padding)
+        self.embed_batch_size = embed_batch_size or int(os.getenv("RAG_EMBED_BATCH_SIZE", "32"))
+        self.embed_max_batch_tokens = embed_max_batch_tokens or int(os.getenv("RAG_EMBED_MAX_BATCH_TOKENS", "8192"))
+        self.chunk_write_batch_size = int(os.getenv("RAG_CHUNK_WRITE_BATCH_SIZE", "500"))
+        
+        # Ingestion pipeline: chunks are length-sorted within an embed window,
+        # and each queue holds up to ingest_queue_size batches of its consumer
+        self.embed_window = embed_window or int(os.getenv("RAG_INGEST_EMBED_WINDOW", "256"))
+        self.ingest_queue_size = ingest_queue_size or int(os.getenv("RAG_INGEST_QUEUE_SIZE", "4"))
+        
+        # Page extraction processes (0/1 = in-process); the pool is created on first use
+        self.pdf_processes = int(os.getenv("RAG_PDF_PROCESSES", "0"))
+        self._pdf_pool: Optional[PdfPagePool] = None
+        self._pdf_pool_lock = threading.Lock()
+        
+        # Repeat retrieval queries reuse their embedding
+        if query_cache_size is None:
+            query_cache_size = int(os.getenv("RAG_QUERY_CACHE_SIZE", "1024"))
+        self.query_embeddings = QueryEmbeddingCache(self.embedder, max_size=query_cache_size)
+        
+        # Optional chunk vector compression (see graphrag.vector_compression)
+        self.compression = CompressionConfig.from_env("chunk_embeddings")
+        self.compression_path = os.path.join(
+            os.getenv("RAG_VECTOR_COMPRESSION_DIR", "data/vector_compression"), "chunk_embeddings.npz"
+        )
+        self.compression_fit_samples = int(os.getenv("RAG_VECTOR_FIT_SAMPLES", "2000"))
+        self.compressor: Optional["VectorCompressor"] = None
+        
+        # Optional in-process ANN index serving semantic search
+        self.ann_enabled = os.getenv("RAG_ANN_INDEX", "false").lower() == "true"
+        self.ann_path = os.getenv("RAG_ANN_INDEX_DIR", "data/ann_index")
+        self.ann_nprobe = int(os.getenv("RAG_ANN_NPROBE", "8"))
+        self.ann_refresh_seconds = float(os.getenv("RAG_ANN_REFRESH_SECONDS", "5"))
+        self.ann_index: Optional["IVFIndex"] = None
+        self._ann_checked_at = 0.0
+        
         # State
         self._initialized = False
+        self._init_lock = threading.Lock()
+        self._async_connected = False
     
     def initialize(self) -> bool:
-        """Initialize all components"""
+        """Initialize all components (concurrent callers share one attempt)"""
         if self._initialized:
             return True
         
-        # Connect to Neo4j
-        if not self.vector_store.connect():
+        with self._init_lock:
+            if self._initialized:
+                return True
+            
+            # Load embeddings model (independent of Neo4j, so warm it first)
+            self.embedder.load()
+            
+            # Connect to Neo4j
+            if not self.vector_store.connect():
+                return False
+            
+            # Setup vector index (at the compressed dimension when enabled)
+            index_dimension = self.embedder.dimension
+            if self.compression.enabled:
+                self.compressor = VectorCompressor.load(
+                    self.compression_path, self.compression, self.embedder.dimension
+                )
+                index_dimension = self.compressor.output_dim
+            self.vector_store.setup_vector_index(index_dimension, quantization=self.compression.int8)
+            
+            if self.ann_enabled:
+                self._load_ann_index(index_dimension)
+            
+            self._initialized = True
+            logger.info("AdvancedRAGService initialized")
+            return True
+    
+    async def initialize_async(self) -> bool:
+        """initialize() off the event loop, then connect the async store used by retrieve_async"""
+        if not self._initialized and not await asyncio.to_thread(self.initialize):
             return False
-        
-        # Load embeddings model
-        self.embedder.load()
-        
-        # Setup vector index
-        self.vector_store.setup_vector_index(self.embedder.dimension)
-        
-        self._initialized = True
-        logger.info("AdvancedRAGService initialized")
-        return True
+        if not self._async_connected:
+            self._async_connected = await self.async_store.connect()
+        return self._async_connected
     
     def close(self):
         """Clean up resources"""
         self.vector_store.close()
+        if self._pdf_pool is not None:
+            self._pdf_pool.close()
+            self._pdf_pool = None
         self._initialized = False
     
+    async def close_async(self):
+        """Close the async store's driver"""
+        await self.async_store.close()
+        self._async_connected = False
+    
     # ==================== PDF INGESTION ====================
     
+    def _iter_pdf_pages(self, pdf_path: str) -> Iterator[PdfPage]:
+        """Stream non-empty pages in order (on the page pool when RAG_PDF_PROCESSES > 1)"""
+        pool = None
+        if self.pdf_processes > 1:
+            with self._pdf_pool_lock:
+                if self._pdf_pool is None:
+                    self._pdf_pool = PdfPagePool(self.pdf_processes)
+                pool = self._pdf_pool
+        return iter_pdf_pages(pdf_path, pool)
+    
     def _load_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF"""
-        if not PDF_AVAILABLE:
-            raise ImportError("pypdf not installed. Run: pip install pypdf")
-        
-        reader = PdfReader(pdf_path)
-        text_parts = []
-        
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                text_parts.append(text)
-        
-        return "\n\n".join(text_parts)
+        return "\n\n".join(page.text for page in self._iter_pdf_pages(pdf_path))
     
     def _chunk_text(self, text: str) -> List[str]:
         """Split text into overlapping chunks"""
-        chunks = []
-        start = 0
+        return chunk_text(text, self.chunk_size, self.chunk_overlap)
+    
+    async def _embed_chunks_pooled(self, chunks: List[str], pool: "EmbeddingPool"):
+        """
+        Async iterator of (indices, embeddings) batches computed on a process
+        pool, in submission order. Cache hits are served in the parent from
+        one lookup; only the misses are sent to the workers (which have no
+        cache), so nothing is looked up twice. Workers return raw vectors,
+        cached as-is like _encode does, and normalized here.
+        """
+        cache = self.embedder.cache
+        misses = list(range(len(chunks)))
+        if cache is not None:
+            hits, misses = cache.get_many(self.embedder.cache_key, chunks)
+            if hits:
+                hit_indices = sorted(hits)
+                yield hit_indices, self.embedder.normalize(np.stack([hits[i] for i in hit_indices]))
+        if not misses:
+            return
         
-        while start < len(text):
-            end = start + self.chunk_size
-            
-            # Try to end at sentence boundary
-            if end < len(text):
-                for sep in [". ", "\n\n", "\n", " "]:
-                    last_sep = text.rfind(sep, start + self.chunk_size // 2, end)
-                    if last_sep > start:
-                        end = last_sep + len(sep)
-                        break
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            start = end - self.chunk_overlap
+        miss_texts = [chunks[i] for i in misses]
+        plan = self.embedder.plan_batches(miss_texts, self.embed_batch_size, self.embed_max_batch_tokens)
+        batches = ([miss_texts[j] for j in batch] for batch in plan)
         
-        return chunks
+        position = 0
+        async for matrix in pool.amap_ordered(batches):
+            batch = plan[position]
+            position += 1
+            if cache is not None:
+                await asyncio.to_thread(
+                    cache.put_many, self.embedder.cache_key, [miss_texts[j] for j in batch], matrix
+                )
+            yield [misses[j] for j in batch], self.embedder.normalize(matrix)
+    
+    def _load_ann_index(self, dimension: int):
+        """mmap-load the ANN index, building it from Neo4j when missing or empty"""
+        index = IVFIndex.load(self.ann_path, dimension, nprobe=self.ann_nprobe)
+        if len(index) == 0:
+            ids, vectors = self.vector_store.fetch_chunk_embeddings()
+            if ids and vectors.shape[1] == dimension:
+                index.build(ids, vectors)
+                index.save()
+        self.ann_index = index
+    
+    def _ann_refresh_due(self) -> bool:
+        return (
+            self.ann_index is not None
+            and time.monotonic() - self._ann_checked_at >= self.ann_refresh_seconds
+        )
+    
+    def _refresh_ann_index(self):
+        """
+        Reload the ANN index if another process (the ingestion worker) saved it since.
+        A save can delete the generation being read; the current index then stays
+        in use and the reload is retried on the next check.
+        """
+        self._ann_checked_at = time.monotonic()
+        if not self.ann_index.changed_on_disk():
+            return
+        try:
+            self.ann_index = IVFIndex.load(self.ann_path, self.ann_index.dim, nprobe=self.ann_nprobe)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"ANN index reload failed, keeping the loaded index: {e}")
+    
+    def _persist_ann_index(self):
+        """Re-cluster if incremental adds have drifted, then save"""
+        if self.ann_index.needs_rebuild():
+            self.ann_index.rebuild()
+        self.ann_index.save()
+    
+    def _fit_compressor(self, samples: List["np.ndarray"]):
+        """Fit chunk vector compression on the first ingested embeddings and persist it"""
+        matrix = np.concatenate(samples)
+        self.compressor.fit(matrix)
+        self.compressor.save(self.compression_path)
+        logger.info(
+            f"Fitted {self.compression.reduction} compression on {len(matrix)} chunks "
+            f"({self.compressor.bytes_per_vector()} bytes/vector)"
+        )
+    
+    def _write_chunk_batch(
+        self,
+        doc_id: str,
+        doc_name: str,
+        entries: List["_PendingChunk"],
+        embeddings: "np.ndarray"
+    ):
+        """Store one embedded batch of chunks (FREE - local Neo4j)"""
+        if self.compressor is not None:
+            embeddings = self.compressor.transform(embeddings)
+        self.vector_store.add_chunks(
+            [
+                DocumentChunk(
+                    id=entry.id,
+                    text=entry.text,
+                    document_id=doc_id,
+                    document_name=doc_name,
+                    chunk_index=entry.position,
+                    embedding=embeddings[row],
+                    metadata={"page_start": entry.page_start, "page_end": entry.page_end}
+                )
+                for row, entry in enumerate(entries)
+            ],
+            batch_size=self.chunk_write_batch_size
+        )
+        # Only index chunks Neo4j has accepted
+        if self.ann_index is not None:
+            self.ann_index.add([entry.id for entry in entries], embeddings)
     
     async def ingest_pdf(
         self,
         pdf_path: str,
         extract_entities: bool = False,  # DEFAULT OFF to save OpenRouter credits
         batch_size: int = 10,  # Process N chunks at a time for entity extraction
-        progress_callback: callable = None
+        progress_callback: callable = None,
+        embedding_pool: Optional["EmbeddingPool"] = None,
+        document_name: str = None,
+        force: bool = False
     ) -> Dict[str, Any]:
         """
         Ingest a PDF into the knowledge graph.
         
+        Re-ingestion is incremental: the Document node keeps a manifest (file
+        SHA-256, chunking/model config, content-addressed chunk ids). An
+        unchanged file is skipped; a changed one only embeds and writes new
+        chunks, re-numbers moved ones and deletes chunks that disappeared.
+        Chunks are committed batch by batch, so re-running an interrupted
+        ingestion only embeds the chunks it had not written yet.
+        
+        New chunks flow through an IngestPipeline (parse -> chunk -> embed ->
+        write -> extract) whose stages overlap; the returned stats include
+        its per-stage throughput report.
+        
         Args:
             pdf_path: Path to PDF file
             extract_entities: Use LLM to extract medical entities (costs OpenRouter credits!)
             batch_size: How many chunks to process for entity extraction (lower = less cost)
             progress_callback: Optional callback(progress, total, message)
+            embedding_pool: Optional EmbeddingPool to embed on worker processes
+            document_name: Document identity (defaults to the file name; uploads
+                pass the original name since they are read from a temp file)
+            force: Re-embed every chunk even if the manifest matches
         
         Returns:
             Ingestion statistics
@@ -688,130 +1725,257 @@ class AdvancedRAGService:
             raise FileNotFoundError(f"PDF not found: {pdf_path}")
         
         # Generate document ID
-        doc_id = hashlib.md5(pdf_path.name.encode()).hexdigest()[:12]
+        doc_name = document_name or pdf_path.name
+        doc_id = hashlib.md5(doc_name.encode()).hexdigest()[:12]
         
-        logger.info(f"Ingesting PDF: {pdf_path.name}")
+        logger.info(f"Ingesting PDF: {doc_name}")
         
-        # Step 1: Load PDF
-        if progress_callback:
-            progress_callback(5, 100, f"Loading {pdf_path.name}...")
+        # Step 1: Fingerprint the file; an unchanged document is skipped
+        content_hash = await asyncio.to_thread(_file_sha256, pdf_path)
+        ingest_config = f"{CHUNKING_SCHEME}/{self.chunk_size}/{self.chunk_overlap}/{self.embedder.cache_key}"
+        manifest = await asyncio.to_thread(self.vector_store.get_document_manifest, doc_id)
+        if (
+            manifest is not None and not force
+            and manifest["content_hash"] == content_hash
+            and manifest["ingest_config"] == ingest_config
+        ):
+            logger.info(f"{doc_name} unchanged since last ingestion, skipping")
+            if progress_callback:
+                progress_callback(100, 100, "Unchanged, skipped")
+            return {
+                "document_id": doc_id,
+                "file": doc_name,
+                "skipped": True,
+                "chunks": len(manifest["chunk_ids"] or []),
+                "chunks_added": 0,
+                "chunks_removed": 0,
+                "entities_extracted": 0,
+                "relationships_extracted": 0,
+                "timestamp": datetime.utcnow().isoformat()
+            }
         
-        text = self._load_pdf(str(pdf_path))
-        logger.info(f"Extracted {len(text)} characters")
+        existing = set()
+        if not force:
+            if manifest is None:
+                # Resume: chunks written before an interrupted run are kept
+                existing = set(await asyncio.to_thread(
+                    self.vector_store.get_partial_chunk_ids, doc_id, ingest_config
+                ))
+                if existing:
+                    logger.info(f"Resuming {doc_name}: {len(existing)} chunks already written")
+            elif manifest["ingest_config"] == ingest_config:
+                existing = set(manifest["chunk_ids"] or [])
         
-        # Step 2: Chunk text
-        if progress_callback:
-            progress_callback(10, 100, "Chunking text...")
+        # Create document node (clearing the old hash until this run completes;
+        # ingest_config tells a resumed run which config wrote partial chunks)
+        await asyncio.to_thread(
+            self.vector_store.add_document,
+            doc_id=doc_id,
+            name=doc_name,
+            metadata={"path": str(pdf_path), "content_hash": None, "ingest_config": ingest_config}
+        )
         
-        chunks = self._chunk_text(text)
-        logger.info(f"Created {len(chunks)} chunks")
+        # Step 2: parse -> chunk -> embed -> write -> extract, overlapped
+        if progress_callback:
+            progress_callback(5, 100, f"Loading {doc_name}...")
         
-        # Step 3: Create document node
-        self.vector_store.add_document(
-            doc_id=doc_id,
-            name=pdf_path.name,
-            metadata={"path": str(pdf_path), "chunks": len(chunks)}
+        run = _DocumentIngestion(
+            self, doc_id, doc_name, existing,
+            extract_limit=batch_size if extract_entities else 0,
+            embedding_pool=embedding_pool,
+            progress_callback=progress_callback
         )
         
-        # Step 4: Process chunks
-        total_entities = 0
-        total_relationships = 0
+        stages = [
+            Stage("chunk", run.chunk, flush=run.flush_chunks),
+            Stage("embed", run.embed_pooled, batch_size=self.embed_window, threaded=False)
+            if embedding_pool is not None else
+            Stage("embed", run.embed, batch_size=self.embed_window),
+            Stage("write", run.write, flush=run.flush_writes, batch_size=self.chunk_write_batch_size),
+        ]
+        if extract_entities:
+            # The ONLY part that costs OpenRouter credits!
+            stages.append(Stage("extract", run.extract, flush=run.flush_extractions, threaded=False))
         
-        # Track how many chunks we've done entity extraction for
-        entity_extraction_count = 0
+        pages = self._iter_pdf_pages(str(pdf_path))
+        report = await IngestPipeline("parse", pages, stages, queue_size=self.ingest_queue_size).run()
+        logger.info(f"Pipeline for {doc_name}: {format_report(report)}")
+        if run.new_chunks > batch_size and extract_entities:
+            logger.info(f"Reached batch limit ({batch_size}), skipped entity extraction for remaining chunks")
         
-        for i, chunk_text in enumerate(chunks):
-            if progress_callback:
-                progress = 15 + int(75 * i / len(chunks))
-                progress_callback(progress, 100, f"Processing chunk {i+1}/{len(chunks)}...")
-            
-            chunk_id = f"{doc_id}_chunk_{i}"
-            
-            # Generate embedding (FREE - local)
-            embedding = self.embedder.embed_single(chunk_text)
-            
-            # Create chunk object
-            chunk = DocumentChunk(
-                id=chunk_id,
-                text=chunk_text,
-                document_id=doc_id,
-                document_name=pdf_path.name,
-                chunk_index=i,
-                embedding=embedding
-            )
-            
-            # Store chunk with embedding (FREE - local Neo4j)
-            self.vector_store.add_chunk(chunk)
-            
-            # Extract entities (if enabled AND within batch limit)
-            # This is the ONLY part that costs OpenRouter credits!
-            if extract_entities and entity_extraction_count < batch_size:
-                try:
-                    entities, relationships = await self.extractor.extract(chunk_text)
-                    entity_extraction_count += 1
-                    
-                    # Build entity map for relationship linking
-                    entity_map = {e.id: e.name for e in entities}
-                    
-                    # Store entities
-                    for entity in entities:
-                        entity.source_chunk_id = chunk_id
-                        self.vector_store.add_entity(entity, chunk_id)
-                        total_entities += 1
-                    
-                    # Store relationships
-                    for rel in relationships:
-                        self.vector_store.add_relationship(rel, entity_map)
-                        total_relationships += 1
-                    
-                    # Log batch progress
-                    if entity_extraction_count >= batch_size:
-                        logger.info(f"Reached batch limit ({batch_size}), skipping entity extraction for remaining chunks")
-                        
-                except Exception as e:
-                    logger.warning(f"Entity extraction failed for chunk {i}: {e}")
+        # Step 3: Drop chunks that are no longer in the document and
+        # re-number the unchanged ones, then record the manifest
+        removed = await asyncio.to_thread(self.vector_store.delete_stale_chunks, doc_id, run.chunk_ids)
+        if removed and self.ann_index is not None:
+            self.ann_index.remove(removed)
+        await asyncio.to_thread(self.vector_store.set_chunk_positions, run.kept)
+        await asyncio.to_thread(
+            self.vector_store.set_document_manifest, doc_id, content_hash, ingest_config, run.chunk_ids
+        )
+        
+        if self.ann_index is not None:
+            await asyncio.to_thread(self._persist_ann_index)
         
         if progress_callback:
             progress_callback(100, 100, "Complete!")
         
         stats = {
             "document_id": doc_id,
-            "file": pdf_path.name,
-            "chunks": len(chunks),
-            "entities_extracted": total_entities,
-            "relationships_extracted": total_relationships,
+            "file": doc_name,
+            "skipped": False,
+            "chunks": len(run.chunk_ids),
+            "chunks_added": run.new_chunks,
+            "chunks_removed": len(removed),
+            "entities_extracted": run.entities,
+            "relationships_extracted": run.relationships,
+            "pipeline": report,
             "timestamp": datetime.utcnow().isoformat()
         }
         
         logger.info(f"Ingestion complete: {stats}")
         return stats
     
+    def open_embedding_pool(self, processes: int = None) -> Optional["EmbeddingPool"]:
+        """
+        EmbeddingPool for multi-document ingestion, or None to embed in-process.
+        processes defaults to RAG_EMBED_PROCESSES; the caller closes the pool.
+        """
+        if processes is None:
+            processes = int(os.getenv("RAG_EMBED_PROCESSES", "0"))
+        if processes <= 1:
+            return None
+        if not self._initialized:
+            self.initialize()
+        return EmbeddingPool(self.embedder, processes=processes)
+    
     async def ingest_directory(
         self,
         directory: str,
         pattern: str = "*.pdf",
-        extract_entities: bool = True
+        extract_entities: bool = True,
+        processes: int = None,
+        force: bool = False
     ) -> List[Dict[str, Any]]:
-        """Ingest all PDFs in a directory"""
+        """
+        Ingest all PDFs in a directory.
+        
+        With processes > 1 (default RAG_EMBED_PROCESSES) embedding runs on a
+        process pool that loads the model once per worker and is shared by
+        every file in the directory. Files unchanged since their last
+        ingestion are skipped unless force is set.
+        """
         directory = Path(directory)
         pdf_files = list(directory.glob(pattern))
         
+        pool = self.open_embedding_pool(processes) if pdf_files else None
         results = []
-        for pdf_path in pdf_files:
-            try:
-                stats = await self.ingest_pdf(
-                    str(pdf_path),
-                    extract_entities=extract_entities
-                )
-                results.append(stats)
-            except Exception as e:
-                logger.error(f"Failed to ingest {pdf_path}: {e}")
-                results.append({"file": pdf_path.name, "error": str(e)})
+        try:
+            for pdf_path in pdf_files:
+                try:
+                    stats = await self.ingest_pdf(
+                        str(pdf_path),
+                        extract_entities=extract_entities,
+                        embedding_pool=pool,
+                        force=force
+                    )
+                    results.append(stats)
+                except Exception as e:
+                    logger.error(f"Failed to ingest {pdf_path}: {e}")
+                    results.append({"file": pdf_path.name, "error": str(e)})
+        finally:
+            if pool is not None:
+                await asyncio.to_thread(pool.close)
         
         return results
     
     # ==================== HYBRID RETRIEVAL ====================
     
+    def _query_vector(self, query_embedding: "np.ndarray") -> Optional["np.ndarray"]:
+        """Query in the index's space, or None while a PCA compressor is unfitted"""
+        if self.compressor is None:
+            return query_embedding
+        if not self.compressor.can_transform:
+            # Another process (the ingestion worker) may have fitted it since
+            self.compressor = VectorCompressor.load(
+                self.compression_path, self.compression, self.embedder.dimension
+            )
+            if not self.compressor.can_transform:
+                logger.warning("Vector compression not fitted yet (nothing ingested); skipping semantic search")
+                return None
+        return self.compressor.transform(query_embedding)
+    
+    @property
+    def _rescoring(self) -> bool:
+        return self.compressor is not None and self.compression.int8
+    
+    def _ann_ready(self) -> bool:
+        return self.ann_index is not None and len(self.ann_index) > 0
+    
+    @staticmethod
+    def _ann_results(hits: List[Tuple[str, float]], chunk_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        rows = {r["id"]: r for r in chunk_rows}
+        return [
+            {**rows[cid], "score": _index_score(score)}
+            for cid, score in hits if cid in rows
+        ]
+    
+    def _rescore(self, candidates: List[Dict[str, Any]], query_vector: "np.ndarray", top_k: int) -> List[Dict[str, Any]]:
+        """Re-rank over-fetched int8 candidates against their stored float vectors"""
+        if not self._rescoring:
+            return candidates
+        with_vectors = [c for c in candidates if c.get("embedding")]
+        if not with_vectors:
+            return candidates[:top_k]
+        
+        scores = np.asarray([c["embedding"] for c in with_vectors], dtype=np.float32) @ query_vector
+        for candidate, score in zip(with_vectors, scores):
+            candidate["score"] = _index_score(score)
+            del candidate["embedding"]
+        return sorted(with_vectors, key=lambda c: c["score"], reverse=True)[:top_k]
+    
+    def _semantic_search(self, query_embedding: "np.ndarray", top_k: int) -> List[Dict[str, Any]]:
+        """
+        Vector search over chunks. Served by the in-process ANN index when
+        enabled (only chunk text comes from Neo4j), otherwise by the Neo4j
+        vector index. With int8 index quantization, over-fetch candidates
+        and rescore them against the stored float vectors.
+        """
+        query_vector = self._query_vector(query_embedding)
+        if query_vector is None:
+            return []
+        
+        if self._ann_refresh_due():
+            self._refresh_ann_index()
+        if self._ann_ready():
+            hits = self.ann_index.search(query_vector, k=top_k)
+            return self._ann_results(hits, self.vector_store.get_chunks([cid for cid, _ in hits]))
+        
+        candidates = self.vector_store.vector_search(
+            query_vector,
+            limit=top_k * self.compression.rescore_factor if self._rescoring else top_k,
+            return_embeddings=self._rescoring
+        )
+        return self._rescore(candidates, query_vector, top_k)
+    
+    async def _semantic_search_async(self, query_embedding: "np.ndarray", top_k: int) -> List[Dict[str, Any]]:
+        """_semantic_search with Neo4j reads on the async store"""
+        query_vector = self._query_vector(query_embedding)
+        if query_vector is None:
+            return []
+        
+        if self._ann_refresh_due():
+            await asyncio.to_thread(self._refresh_ann_index)
+        if self._ann_ready():
+            hits = await asyncio.to_thread(self.ann_index.search, query_vector, top_k)
+            return self._ann_results(hits, await self.async_store.get_chunks([cid for cid, _ in hits]))
+        
+        candidates = await self.async_store.vector_search(
+            query_vector,
+            limit=top_k * self.compression.rescore_factor if self._rescoring else top_k,
+            return_embeddings=self._rescoring
+        )
+        return self._rescore(candidates, query_vector, top_k)
+    
     def retrieve(
         self,
         query: str,
@@ -835,13 +1999,63 @@ class AdvancedRAGService:
             self.initialize()
         
         # 1. Semantic search (vector similarity)
-        query_embedding = self.embedder.embed_single(query)
-        semantic_results = self.vector_store.vector_search(query_embedding, limit=top_k)
+        query_embedding = self.query_embeddings.get(query)
+        semantic_results = self._semantic_search(query_embedding, top_k)
         
         # 2. Keyword search (full-text)
         keyword_results = self.vector_store.keyword_search(search_text=query, limit=top_k)
         
-        # 3. Merge and deduplicate results
+        # 3. Entity search
+        entities = []
+        if include_entities:
+            entities = self.vector_store.entity_search(search_text=query, limit=10)
+        
+        # 4. Graph context (symptom -> disease paths)
+        disease_paths, red_flags = [], []
+        symptoms = self._extract_symptoms_from_query(query) if include_graph_context else []
+        if symptoms:
+            disease_paths = self.vector_store.get_symptom_disease_paths(symptoms)
+            red_flags = self.vector_store.get_red_flags(symptoms)
+        
+        return self._assemble_context(semantic_results, keyword_results, entities, disease_paths, red_flags, top_k)
+    
+    async def retrieve_async(
+        self,
+        query: str,
+        top_k: int = 5,
+        include_entities: bool = True,
+        include_graph_context: bool = True
+    ) -> RAGContext:
+        """
+        retrieve() for the event loop: the query embedding runs in a worker
+        thread and the Neo4j searches run concurrently on the async driver.
+        """
+        if not await self.initialize_async():
+            raise RuntimeError("Neo4j not reachable")
+        
+        query_embedding = await asyncio.to_thread(self.query_embeddings.get, query)
+        symptoms = self._extract_symptoms_from_query(query) if include_graph_context else []
+        
+        semantic_results, keyword_results, entities, disease_paths, red_flags = await asyncio.gather(
+            self._semantic_search_async(query_embedding, top_k),
+            self.async_store.keyword_search(search_text=query, limit=top_k),
+            self.async_store.entity_search(search_text=query, limit=10) if include_entities else _no_results(),
+            self.async_store.get_symptom_disease_paths(symptoms) if symptoms else _no_results(),
+            self.async_store.get_red_flags(symptoms) if symptoms else _no_results(),
+        )
+        
+        return self._assemble_context(semantic_results, keyword_results, entities, disease_paths, red_flags, top_k)
+    
+    def _assemble_context(
+        self,
+        semantic_results: List[Dict[str, Any]],
+        keyword_results: List[Dict[str, Any]],
+        entities: List[Dict[str, Any]],
+        disease_paths: List[Dict[str, Any]],
+        red_flags: List[Dict[str, Any]],
+        top_k: int
+    ) -> RAGContext:
+        """Merge and deduplicate search results into a RAGContext"""
         seen_ids = set()
         chunks = []
         
@@ -855,7 +2069,7 @@ class AdvancedRAGService:
                     document_id=result["doc_id"],
                     document_name="",
                     chunk_index=0,
-                    metadata={"score": result["score"], "method": "semantic"}
+                    metadata={"score": result["score"], "method": "semantic", **_page_metadata(result)}
                 ))
         
         for result in keyword_results:
@@ -867,37 +2081,18 @@ class AdvancedRAGService:
                     document_id=result["doc_id"],
                     document_name="",
                     chunk_index=0,
-                    metadata={"score": result["score"] * 0.8, "method": "keyword"}
+                    metadata={"score": result["score"] * 0.8, "method": "keyword", **_page_metadata(result)}
                 ))
         
-        # 4. Entity search
-        entities = []
-        if include_entities:
-            entity_results = self.vector_store.entity_search(search_text=query, limit=10)
-            entities = entity_results
-        
-        # 5. Graph context (symptom -> disease paths)
         graph_paths = []
-        relationships = []
-        
-        if include_graph_context:
-            # Extract potential symptoms from query
-            symptoms = self._extract_symptoms_from_query(query)
-            
-            if symptoms:
-                # Get disease paths
-                disease_paths = self.vector_store.get_symptom_disease_paths(symptoms)
-                for path in disease_paths:
-                    graph_paths.append(
-                        f"Symptoms {path['matching_symptoms']} may indicate {path['disease']}"
-                    )
-                
-                # Get red flags
-                red_flags = self.vector_store.get_red_flags(symptoms)
-                for rf in red_flags:
-                    graph_paths.append(
-                        f"⚠️ RED FLAG: {rf['red_flag']} - {rf.get('description', '')}"
-                    )
+        for path in disease_paths:
+            graph_paths.append(
+                f"Symptoms {path['matching_symptoms']} may indicate {path['disease']}"
+            )
+        for rf in red_flags:
+            graph_paths.append(
+                f"⚠️ RED FLAG: {rf['red_flag']} - {rf.get('description', '')}"
+            )
         
         # Calculate total relevance score
         total_score = sum(c.metadata.get("score", 0) for c in chunks)
@@ -905,7 +2100,7 @@ class AdvancedRAGService:
         return RAGContext(
             chunks=chunks[:top_k],
             entities=entities,
-            relationships=relationships,
+            relationships=[],
             graph_paths=graph_paths,
             total_score=total_score,
             retrieval_method="hybrid"
@@ -974,7 +2169,12 @@ class AdvancedRAGService:
         return {
             "status": "initialized",
             "embedding_model": self.embedder.model_name,
+            "embedding_backend": self.embedder.cache_key,
             "embedding_dimension": self.embedder.dimension,
+            "embedding_cache": self.embedder.cache.stats() if self.embedder.cache else None,
+            "query_embedding_cache": self.query_embeddings.stats(),
+            "ann_index": self.ann_index.stats() if self.ann_index is not None else None,
+            "neo4j_drivers": neo4j_drivers.stats(),
             "database_stats": db_stats
         }
 
@@ -0,0 +1,341 @@
+"""
+In-Process ANN Index for ClinixAI GraphRAG
+==========================================
+IVF (inverted file) index over unit-length chunk embeddings, used by
+AdvancedRAGService.retrieve() in place of Neo4j's vector index so a
+semantic search costs no Bolt round trip; only chunk text is fetched
+from Neo4j afterwards.
+
+- Spherical k-means centroids; a query scans the nprobe closest lists
+  with exact dot products (below nlist * min_list_size rows it is a
+  flat exact scan)
+- Vectors and list assignments live in float32/int32 files that are
+  memory-mapped on load, so start-up does not read the whole index
+- add() appends incrementally (re-added ids replace their old row);
+  remove() tombstones rows; rebuild() re-clusters from the live rows.
+  Per-list members are regrouped lazily, once before the next search
+
+Files under the index directory: meta.json plus, per generation,
+vectors.<gen>.f32, lists.<gen>.i32, centroids.<gen>.npy and ids.<gen>.json.
+build() writes a new generation next to the current one and save()
+switches to it by replacing meta.json, so a crash at any point leaves a
+complete index on disk.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _open_memmap(path: Path, dtype, rows: int, width: Optional[int] = None) -> np.memmap:
+    """Open (creating or growing) a row-major memmap with capacity for `rows` rows"""
+    itemsize = np.dtype(dtype).itemsize * (width or 1)
+    size = max(rows, 1) * itemsize
+    with open(path, "ab") as f:
+        if f.tell() < size:
+            f.truncate(size)
+    capacity = os.path.getsize(path) // itemsize
+    shape = (capacity, width) if width else (capacity,)
+    return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    """Identifies a version of a file replaced atomically (new inode each time)"""
+    stat = path.stat()
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """k unit-length centroids maximizing cosine similarity to their members"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            # Re-seed empty clusters from random points
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """Memory-mapped IVF-flat index keyed by chunk id"""
+
+    def __init__(self, path: str, dim: int, nprobe: int = 8, min_list_size: int = 64):
+        self.path = Path(path)
+        self.dim = dim
+        self.nprobe = nprobe
+        self.min_list_size = min_list_size
+
+        self._lock = threading.RLock()
+        self._rows = 0
+        self._ids: List[Optional[str]] = []
+        self._row_of: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._vectors: Optional[np.memmap] = None
+        self._lists: Optional[np.memmap] = None
+        self._members: Dict[int, np.ndarray] = {}
+        self._members_stale = False
+        self._generation = 0
+        self._meta_stamp: Optional[Tuple[int, int]] = None  # meta.json as of the last load/save
+        self._dirty = False
+        self._centroids_dirty = False
+
+    def _file(self, name: str, generation: Optional[int] = None) -> Path:
+        """Data file of a generation (0: the unversioned names of older indexes)"""
+        generation = self._generation if generation is None else generation
+        stem, ext = name.split(".")
+        return self.path / (f"{stem}.{generation}.{ext}" if generation else name)
+
+    # ==================== PERSISTENCE ====================
+
+    @classmethod
+    def load(cls, path: str, dim: int, **kwargs) -> "IVFIndex":
+        """Open an index directory, memory-mapping vectors (empty index if absent)"""
+        index = cls(path, dim, **kwargs)
+        meta_path = index.path / "meta.json"
+        if not meta_path.exists():
+            return index
+
+        index._meta_stamp = _stamp(meta_path)
+        meta = json.loads(meta_path.read_text())
+        if meta["dim"] != dim:
+            logger.warning(f"ANN index at {path} has dimension {meta['dim']}, expected {dim}; ignoring it")
+            return index
+
+        with index._lock:
+            index._generation = meta.get("generation", 0)
+            index._rows = meta["rows"]
+            index._ids = json.loads(index._file("ids.json").read_text())[:index._rows]
+            index._row_of = {cid: row for row, cid in enumerate(index._ids) if cid is not None}
+            centroids = index._file("centroids.npy")
+            if centroids.exists():
+                index._centroids = np.load(centroids, mmap_mode="r")
+            index._vectors = _open_memmap(index._file("vectors.f32"), np.float32, index._rows, dim)
+            index._lists = _open_memmap(index._file("lists.i32"), np.int32, index._rows)
+            index._members_stale = True
+        logger.info(f"Loaded ANN index {path}: {len(index)} vectors, {index.nlist} lists")
+        return index
+
+    def save(self):
+        """Flush vectors and write ids/meta (meta last, so a crash leaves the previous state)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._lists.flush()
+            if self._centroids_dirty and self._centroids is not None:
+                # Only after build(): loaded centroids are memory-mapped from this file
+                np.save(self._file("centroids.npy"), np.asarray(self._centroids))
+                self._centroids_dirty = False
+            self._write_json(self._file("ids.json"), self._ids[:self._rows])
+            self._write_json(self.path / "meta.json", {
+                "dim": self.dim,
+                "generation": self._generation,
+                "rows": self._rows,
+                "live": len(self._row_of),
+                "nlist": self.nlist,
+                "saved_at": time.time(),
+            })
+            self._meta_stamp = _stamp(self.path / "meta.json")
+            self._dirty = False
+            self._remove_generations(keep=self._generation)
+
+    def changed_on_disk(self) -> bool:
+        """True when another process saved the index since this one loaded or saved it"""
+        if self._dirty:
+            return False
+        try:
+            return _stamp(self.path / "meta.json") != self._meta_stamp
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _write_json(path: Path, payload):
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(payload))
+        os.replace(tmp, path)
+
+    def _remove_generations(self, keep: int):
+        """Delete data files of every generation but keep (processes mapping them keep their copy)"""
+        for name in ("vectors.f32", "lists.i32", "centroids.npy", "ids.json"):
+            stem, ext = name.split(".")
+            for path in [self.path / name, *self.path.glob(f"{stem}.*.{ext}")]:
+                if path != self._file(name, keep):
+                    path.unlink(missing_ok=True)
+
+    # ==================== BUILD / UPDATE ====================
+
+    @property
+    def nlist(self) -> int:
+        return 0 if self._centroids is None else len(self._centroids)
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _ensure_members(self):
+        """Regroup rows per list if add()/remove() changed them since the last search"""
+        if self._members_stale:
+            self._rebuild_members()
+            self._members_stale = False
+
+    def _rebuild_members(self):
+        """Row numbers per list, for live rows"""
+        self._members = {}
+        if self._rows == 0:
+            return
+        lists = np.asarray(self._lists[:self._rows])
+        live = np.fromiter((cid is not None for cid in self._ids), dtype=bool, count=self._rows)
+        rows = np.nonzero(live)[0]
+        order = np.argsort(lists[rows], kind="stable")
+        sorted_rows = rows[order]
+        boundaries = np.searchsorted(lists[sorted_rows], np.arange(max(self.nlist, 1) + 1))
+        for list_id in range(max(self.nlist, 1)):
+            members = sorted_rows[boundaries[list_id]:boundaries[list_id + 1]]
+            if len(members):
+                self._members[list_id] = members
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            return np.zeros(len(vectors), dtype=np.int32)
+        return np.argmax(vectors @ np.asarray(self._centroids).T, axis=1).astype(np.int32)
+
+    def build(self, ids: List[str], vectors: np.ndarray, nlist: Optional[int] = None):
+        """Replace the index contents and cluster them, as a new generation committed by save()"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._generation += 1
+            # Leftovers of a build that crashed before save()
+            for name in ("vectors.f32", "lists.i32", "centroids.npy", "ids.json"):
+                self._file(name).unlink(missing_ok=True)
+            self._rows = 0
+            self._ids = []
+            self._row_of = {}
+            self._vectors = None
+            self._lists = None
+
+            if nlist is None:
+                nlist = int(np.sqrt(len(vectors)))
+            nlist = min(nlist, len(vectors) // self.min_list_size)
+            self._centroids = spherical_kmeans(vectors, nlist) if nlist >= 2 else None
+            self._centroids_dirty = True
+            self._dirty = True
+            self.add(ids, vectors)
+        logger.info(f"Built ANN index {self.path}: {len(ids)} vectors, {self.nlist} lists")
+
+    def rebuild(self, nlist: Optional[int] = None):
+        """Re-cluster from the live rows (after many incremental updates)"""
+        with self._lock:
+            rows = sorted(self._row_of.values())
+            ids = [self._ids[r] for r in rows]
+            vectors = np.array(self._vectors[rows]) if rows else np.zeros((0, self.dim), np.float32)
+        self.build(ids, vectors, nlist)
+
+    def add(self, ids: List[str], vectors: np.ndarray):
+        """Append vectors; an id already present is replaced"""
+        if not ids:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"ANN index expects dimension {self.dim}, got {vectors.shape[1]}")
+
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            start, end = self._rows, self._rows + len(ids)
+            if self._vectors is None or end > len(self._vectors):
+                capacity = max(end, 2 * (len(self._vectors) if self._vectors is not None else 0), 1024)
+                if self._vectors is not None:
+                    self._vectors.flush()
+                    self._lists.flush()
+                self._vectors = _open_memmap(self._file("vectors.f32"), np.float32, capacity, self.dim)
+                self._lists = _open_memmap(self._file("lists.i32"), np.int32, capacity)
+
+            assignment = self._assign(vectors)
+            self._vectors[start:end] = vectors
+            self._lists[start:end] = assignment
+
+            for offset, chunk_id in enumerate(ids):
+                old = self._row_of.get(chunk_id)
+                if old is not None:
+                    self._ids[old] = None
+                self._ids.append(chunk_id)
+                self._row_of[chunk_id] = start + offset
+            self._rows = end
+            self._members_stale = True
+            self._dirty = True
+
+    def remove(self, ids: Iterable[str]):
+        """Tombstone rows for chunk ids"""
+        with self._lock:
+            removed = 0
+            for chunk_id in ids:
+                row = self._row_of.pop(chunk_id, None)
+                if row is not None:
+                    self._ids[row] = None
+                    removed += 1
+            if removed:
+                self._members_stale = True
+                self._dirty = True
+
+    def needs_rebuild(self) -> bool:
+        """
+        True when incremental updates have drifted from the built layout:
+        mostly tombstones, a flat index that is now large enough to cluster,
+        or a corpus that has outgrown nlist ~ sqrt(rows) by 2x.
+        """
+        live = len(self)
+        if self._rows > 2 * max(live, 1):
+            return True
+        if self.nlist == 0:
+            return live >= 4 * self.min_list_size
+        return live > 4 * self.nlist * self.nlist
+
+    # ==================== SEARCH ====================
+
+    def search(self, query: np.ndarray, k: int = 5, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Top-k (chunk id, cosine) for a unit-length query"""
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            if not self._row_of:
+                return []
+            self._ensure_members()
+            if self.nlist == 0:
+                candidates = np.concatenate(list(self._members.values()))
+            else:
+                nprobe = min(nprobe or self.nprobe, self.nlist)
+                closest = np.argsort(-(np.asarray(self._centroids) @ query))[:nprobe]
+                parts = [self._members[c] for c in closest if c in self._members]
+                if not parts:
+                    return []
+                candidates = np.concatenate(parts)
+
+            scores = self._vectors[candidates] @ query
+            top = min(k, len(candidates))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            return [(self._ids[candidates[i]], float(scores[i])) for i in best]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "vectors": len(self._row_of),
+                "rows": self._rows,
+                "nlist": self.nlist,
+                "nprobe": self.nprobe,
+                "bytes": self._rows * self.dim * 4,
+            }
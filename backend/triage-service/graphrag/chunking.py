@@ -0,0 +1,141 @@
+"""
+Page-Aware Text Chunking for ClinixAI GraphRAG
+==============================================
+Splits a stream of pages into overlapping chunks of about chunk_size
+characters, preferring to end a chunk at a sentence, paragraph, line or
+word boundary in its second half.
+
+- Pages are joined with a blank line, so chunks and their overlap run
+  across page boundaries; each chunk records the pages it spans
+- Chunks are yielded as soon as enough text has arrived; only the
+  unchunked tail of the stream is buffered
+- Every chunk advances by at least half its length, whatever
+  chunk_overlap is (an overlap of chunk_size or more would otherwise
+  never move forward), and the stream ends with the chunk that reaches
+  its end rather than a tail made only of overlap
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from .pdf_pages import PdfPage
+
+# Boundaries tried in order, searched in the second half of the chunk window
+SEPARATORS = (". ", "\n\n", "\n", " ")
+PAGE_SEPARATOR = "\n\n"
+
+
+@dataclass
+class TextChunk:
+    """One chunk and the pages it spans"""
+    text: str
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+
+class PageChunker:
+    """
+    Incremental chunker: feed() pages in order, then finish().
+
+    Usage:
+        chunker = PageChunker(500, 100)
+        for page in pages:
+            for chunk in chunker.feed(page):
+                ...
+        for chunk in chunker.finish():
+            ...
+    """
+
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 100):
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = max(0, chunk_overlap)
+
+        self._buffer = ""
+        self._start = 0  # next chunk start within _buffer
+        self._page_offsets: List[int] = []  # where each buffered page begins
+        self._page_numbers: List[int] = []
+
+    def feed(self, page: PdfPage) -> Iterator[TextChunk]:
+        """Append a page; yield every chunk that no longer depends on later text"""
+        if not page.text:
+            return
+        self._compact()
+        if self._buffer:
+            self._buffer += PAGE_SEPARATOR
+        self._page_offsets.append(len(self._buffer))
+        self._page_numbers.append(page.number)
+        self._buffer += page.text
+
+        # A chunk is final once text exists past its window
+        while len(self._buffer) - self._start > self.chunk_size:
+            chunk = self._next_chunk()
+            if chunk is not None:
+                yield chunk
+
+    def finish(self) -> Iterator[TextChunk]:
+        """Yield the remaining chunks at the end of the stream"""
+        while self._start < len(self._buffer):
+            end_of_stream = self._start + self.chunk_size >= len(self._buffer)
+            chunk = self._next_chunk()
+            if chunk is not None:
+                yield chunk
+            if end_of_stream:
+                break
+        self._buffer = ""
+        self._start = 0
+        self._page_offsets = []
+        self._page_numbers = []
+
+    def _next_chunk(self) -> Optional[TextChunk]:
+        text, start = self._buffer, self._start
+        end = start + self.chunk_size
+
+        # Try to end at a sentence boundary
+        if end < len(text):
+            for sep in SEPARATORS:
+                last_sep = text.rfind(sep, start + self.chunk_size // 2, end)
+                if last_sep > start:
+                    end = last_sep + len(sep)
+                    break
+        end = min(end, len(text))
+
+        length = end - start
+        self._start = start + max(length - self.chunk_overlap, length // 2, 1)
+
+        raw = text[start:end]
+        chunk = raw.strip()
+        if not chunk:
+            return None
+        first = start + (len(raw) - len(raw.lstrip()))
+        last = first + len(chunk) - 1
+        return TextChunk(chunk, self._page_at(first), self._page_at(last))
+
+    def _page_at(self, offset: int) -> Optional[int]:
+        i = bisect_right(self._page_offsets, offset) - 1
+        return self._page_numbers[i] if i >= 0 else None
+
+    def _compact(self):
+        """Drop text before the next chunk start (keeping the page it falls in)"""
+        if self._start == 0:
+            return
+        keep = max(bisect_right(self._page_offsets, self._start) - 1, 0)
+        self._page_offsets = [offset - self._start for offset in self._page_offsets[keep:]]
+        self._page_numbers = self._page_numbers[keep:]
+        self._buffer = self._buffer[self._start:]
+        self._start = 0
+
+
+def chunk_pages(pages: Iterable[PdfPage], chunk_size: int = 500, chunk_overlap: int = 100) -> Iterator[TextChunk]:
+    """Lazily chunk a page stream"""
+    chunker = PageChunker(chunk_size, chunk_overlap)
+    for page in pages:
+        yield from chunker.feed(page)
+    yield from chunker.finish()
+
+
+def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 100) -> List[str]:
+    """Chunk one string"""
+    return [chunk.text for chunk in chunk_pages([PdfPage(1, text)], chunk_size, chunk_overlap)]
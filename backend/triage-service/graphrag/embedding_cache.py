@@ -0,0 +1,366 @@
+"""
+Persistent Embedding Cache for ClinixAI GraphRAG
+================================================
+Content-addressed on-disk cache for EmbeddingService vectors.
+
+Layout (under cache_dir):
+- index.sqlite : (model, text sha256) -> slot, last_used
+- <model>.<dim>.f32 : float32 memmap, one row per slot
+
+Rows freed by eviction are reused. When the stored vectors exceed
+max_bytes the least recently used entries are evicted. Lookups are
+reported to metrics as the "embedding_disk" cache.
+
+Several processes (API workers, embedding pool workers) may share one
+cache_dir: every lookup and insert runs in a BEGIN IMMEDIATE transaction,
+so slot allocation, vector writes and reads of a slot never interleave
+with another process reusing it, and a memmap is re-opened when another
+process has grown the file.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from metrics import record_cache_lookup, set_cache_bytes
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = "embedding_disk"
+
+
+def text_key(text: str) -> str:
+    """Content hash used as the cache key for a text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _VectorStore:
+    """Growable float32 memmap of fixed-width rows for one model"""
+
+    def __init__(self, path: Path, dim: int, capacity: int):
+        self.path = path
+        self.dim = dim
+        self.capacity = 0
+        self._mmap: Optional[np.memmap] = None
+        if path.exists() and path.stat().st_size >= dim * 4:
+            self._map()
+        self.ensure_capacity(max(capacity, 1))
+
+    def _map(self):
+        """(Re-)map the whole file, which may have been grown by another process"""
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap = None
+        rows = self.path.stat().st_size // (self.dim * 4)
+        self._mmap = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+        self.capacity = rows
+
+    def ensure_capacity(self, rows: int):
+        """Grow the file to hold rows (call with the index write lock held)"""
+        if rows <= self.capacity:
+            return
+        if self.path.exists() and self.path.stat().st_size >= rows * self.dim * 4:
+            self._map()
+            return
+        size = max(rows, self.capacity * 2, 1024) * self.dim * 4
+        with open(self.path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._map()
+
+    def read(self, slots: List[int]) -> np.ndarray:
+        if max(slots) >= self.capacity:
+            self._map()
+        return np.array(self._mmap[slots], dtype=np.float32)
+
+    def write(self, slots: List[int], rows: np.ndarray):
+        self.ensure_capacity(max(slots) + 1)
+        self._mmap[slots] = rows
+
+    def flush(self):
+        if self._mmap is not None:
+            self._mmap.flush()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (model name, text hash).
+
+    Thread-safe; a single instance is shared by every EmbeddingService in
+    the process (see get_embedding_cache).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.cache_dir / "index.sqlite"), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS stores (
+                model TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                next_slot INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                slot INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, key)
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used);
+            CREATE TABLE IF NOT EXISTS free_slots (
+                model TEXT NOT NULL,
+                slot INTEGER NOT NULL,
+                PRIMARY KEY (model, slot)
+            );
+        """)
+        self._db.commit()
+
+        self._stores: Dict[str, _VectorStore] = {}
+        self._dims: Dict[str, int] = {
+            model: dim for model, dim in self._db.execute("SELECT model, dim FROM stores")
+        }
+        self.hits = 0
+        self.misses = 0
+        self._bytes = self._count_bytes()
+        set_cache_bytes(CACHE_NAME, self._bytes)
+
+    # ==================== STORAGE ====================
+
+    def _count_bytes(self) -> int:
+        total = 0
+        for count, dim in self._db.execute(
+            "SELECT COUNT(*), s.dim FROM entries e JOIN stores s ON s.model = e.model GROUP BY e.model"
+        ):
+            total += count * dim * 4
+        return total
+
+    def _begin(self):
+        """Take the cross-process write lock for a lookup or insert"""
+        if self._db.in_transaction:
+            self._db.commit()
+        self._db.execute("BEGIN IMMEDIATE")
+
+    def _store(self, model: str, dim: Optional[int] = None) -> Optional[_VectorStore]:
+        if model in self._stores:
+            return self._stores[model]
+
+        known = self._dims.get(model)
+        if known is None:
+            # Possibly created by another process since we started
+            row = self._db.execute("SELECT dim FROM stores WHERE model = ?", (model,)).fetchone()
+            if row is None:
+                if dim is None:
+                    return None
+                self._db.execute("INSERT INTO stores (model, dim) VALUES (?, ?)", (model, dim))
+                row = (dim,)
+            self._dims[model] = known = row[0]
+
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", model)
+        next_slot = self._db.execute("SELECT next_slot FROM stores WHERE model = ?", (model,)).fetchone()[0]
+        store = _VectorStore(self.cache_dir / f"{safe}.{known}.f32", known, next_slot)
+        self._stores[model] = store
+        return store
+
+    def _lookup(self, model: str, keys: List[str]) -> Dict[str, int]:
+        """Slots of the given keys that are present, chunked under SQLite's parameter limit"""
+        found: Dict[str, int] = {}
+        unique = list(set(keys))
+        for i in range(0, len(unique), 500):
+            part = unique[i:i + 500]
+            placeholders = ",".join("?" * len(part))
+            for key, slot in self._db.execute(
+                f"SELECT key, slot FROM entries WHERE model = ? AND key IN ({placeholders})",
+                [model, *part],
+            ):
+                found[key] = slot
+        return found
+
+    def _allocate(self, model: str, n: int) -> List[int]:
+        """Take n slots, reusing freed ones first (inside the _begin transaction)"""
+        rows = self._db.execute(
+            "SELECT slot FROM free_slots WHERE model = ? ORDER BY slot LIMIT ?", (model, n)
+        ).fetchall()
+        slots = [r[0] for r in rows]
+        if slots:
+            self._db.executemany(
+                "DELETE FROM free_slots WHERE model = ? AND slot = ?", [(model, s) for s in slots]
+            )
+
+        needed = n - len(slots)
+        if needed:
+            start = self._db.execute("SELECT next_slot FROM stores WHERE model = ?", (model,)).fetchone()[0]
+            slots.extend(range(start, start + needed))
+            self._db.execute("UPDATE stores SET next_slot = ? WHERE model = ?", (start + needed, model))
+        return slots
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes"""
+        while self._bytes > self.max_bytes:
+            victims = self._db.execute(
+                "SELECT e.model, e.key, e.slot, s.dim FROM entries e JOIN stores s ON s.model = e.model "
+                "ORDER BY e.last_used LIMIT 256"
+            ).fetchall()
+            if not victims:
+                break
+            freed = 0
+            for model, key, slot, dim in victims:
+                if self._bytes - freed <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE model = ? AND key = ?", (model, key))
+                self._db.execute("INSERT OR IGNORE INTO free_slots (model, slot) VALUES (?, ?)", (model, slot))
+                freed += dim * 4
+            self._bytes -= freed
+
+    # ==================== API ====================
+
+    def get_many(self, model: str, texts: List[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """
+        Look up texts for a model.
+
+        Returns ({index: vector} for hits, [indices of misses]).
+        """
+        if not texts:
+            return {}, []
+        keys = [text_key(t) for t in texts]
+
+        with self._lock:
+            # Read slots under the write lock: another process may evict and reuse them
+            self._begin()
+            try:
+                store = self._store(model)
+                found = self._lookup(model, keys) if store is not None else {}
+
+                hit_indices = [i for i, k in enumerate(keys) if k in found]
+                misses = [i for i, k in enumerate(keys) if k not in found]
+                hits: Dict[int, np.ndarray] = {}
+                if hit_indices:
+                    rows = store.read([found[keys[i]] for i in hit_indices])
+                    hits = {i: rows[j] for j, i in enumerate(hit_indices)}
+                    now = time.time()
+                    self._db.executemany(
+                        "UPDATE entries SET last_used = ? WHERE model = ? AND key = ?",
+                        [(now, model, k) for k in set(found)],
+                    )
+            finally:
+                self._db.commit()
+
+            self.hits += len(hit_indices)
+            self.misses += len(misses)
+
+        if hit_indices:
+            record_cache_lookup(CACHE_NAME, True, len(hit_indices))
+        if misses:
+            record_cache_lookup(CACHE_NAME, False, len(misses))
+        return hits, misses
+
+    def put_many(self, model: str, texts: List[str], vectors: np.ndarray):
+        """Store vectors (rows aligned with texts) for a model"""
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        # Collapse duplicate texts within the call
+        by_key: Dict[str, int] = {}
+        for i, text in enumerate(texts):
+            by_key.setdefault(text_key(text), i)
+
+        with self._lock:
+            # Allocation, vector writes and index rows commit as one unit
+            # across processes sharing cache_dir
+            self._begin()
+            try:
+                store = self._store(model, vectors.shape[1])
+                if store.dim != vectors.shape[1]:
+                    logger.warning(f"Embedding cache dimension mismatch for {model}: {store.dim} != {vectors.shape[1]}")
+                    self._db.rollback()
+                    return
+
+                existing = self._lookup(model, list(by_key))
+                new = [(k, i) for k, i in by_key.items() if k not in existing]
+                if not new:
+                    self._db.rollback()
+                    return
+
+                slots = self._allocate(model, len(new))
+                store.write(slots, vectors[[i for _, i in new]])
+                store.flush()
+
+                now = time.time()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries (model, key, slot, last_used) VALUES (?, ?, ?, ?)",
+                    [(model, k, slot, now) for (k, _), slot in zip(new, slots)],
+                )
+                # Other processes insert too: recount before evicting
+                self._bytes = self._count_bytes()
+                self._evict()
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                # The store row may have been rolled back with the rest
+                self._stores.pop(model, None)
+                self._dims.pop(model, None)
+                raise
+            nbytes = self._bytes
+
+        set_cache_bytes(CACHE_NAME, nbytes)
+
+    def stats(self) -> Dict[str, object]:
+        """Hit rate, entry count and bytes of stored vectors"""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.cache_dir),
+                "entries": entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def close(self):
+        with self._lock:
+            for store in self._stores.values():
+                store.flush()
+            self._db.close()
+
+
+# Singleton instance
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Get or create the process-wide embedding cache.
+    Returns None when disabled via EMBEDDING_CACHE_ENABLED=false or unusable.
+    """
+    global _embedding_cache
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            try:
+                _embedding_cache = EmbeddingCache(
+                    cache_dir=os.getenv("EMBEDDING_CACHE_DIR", "data/embedding_cache"),
+                    max_bytes=int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "512")) * 1024 * 1024),
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Embedding cache disabled: {e}")
+                return None
+        return _embedding_cache
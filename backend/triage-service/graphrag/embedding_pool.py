@@ -0,0 +1,122 @@
+"""
+Multi-Process Embedding Pool for ClinixAI GraphRAG
+==================================================
+Spreads CPU-bound embedding over worker processes for large ingestions
+(/rag/ingest-directory). Each worker loads the model once in its
+initializer; batches are submitted with a bounded window and results come
+back in submission order, so the Neo4j writer sees a stable stream.
+
+Workers do not touch the on-disk embedding cache: the parent already looks
+every text up once before dispatch, so a worker lookup would only repeat it.
+Workers return raw (unnormalized) vectors, which the parent stores in the
+cache in the same form EmbeddingService does and normalizes afterwards.
+"""
+
+import os
+import asyncio
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-process embedder, created by _init_worker
+_worker_embedder = None
+
+
+def _init_worker(model_name: str, backend: str, onnx_path: str, onnx_int8: bool, threads: int):
+    global _worker_embedder
+
+    # Must be set before torch/onnxruntime create their thread pools
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    os.environ["EMBEDDING_ONNX_THREADS"] = str(threads)
+
+    from graphrag.advanced_rag_service import EmbeddingService
+
+    _worker_embedder = EmbeddingService(
+        model_name=model_name,
+        cache=None,
+        backend=backend,
+        onnx_path=onnx_path,
+        onnx_int8=onnx_int8,
+    )
+    _worker_embedder.load()
+    if backend != "onnx":
+        import torch
+        torch.set_num_threads(threads)
+
+
+def _embed_in_worker(texts: List[str]):
+    return _worker_embedder.embed_matrix(texts, normalize=False, batch_size=len(texts))
+
+
+class EmbeddingPool:
+    """
+    Process pool of EmbeddingService workers matching a parent embedder's
+    model and backend.
+
+    Usage:
+        with EmbeddingPool(embedder, processes=4) as pool:
+            for matrix in pool.map_ordered(batches):
+                ...
+    """
+
+    def __init__(self, embedder, processes: Optional[int] = None, max_in_flight: Optional[int] = None):
+        cores = os.cpu_count() or 1
+        self.processes = max(1, processes or cores)
+        self.threads_per_worker = max(1, cores // self.processes)
+        self.max_in_flight = max_in_flight or self.processes * 2
+
+        # spawn: fork after torch has started threads can deadlock
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                embedder.model_name,
+                embedder.backend,
+                embedder.onnx_path,
+                embedder.onnx_int8,
+                self.threads_per_worker,
+            ),
+        )
+        logger.info(
+            f"Embedding pool: {self.processes} workers x {self.threads_per_worker} threads "
+            f"({embedder.model_name}, {embedder.backend})"
+        )
+
+    def map_ordered(self, batches: Iterable[List[str]]) -> Iterator["object"]:
+        """Embed batches across workers, yielding raw matrices in input order"""
+        pending: "deque[Future]" = deque()
+        for texts in batches:
+            pending.append(self._executor.submit(_embed_in_worker, texts))
+            if len(pending) >= self.max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    async def amap_ordered(self, batches: Iterable[List[str]]) -> AsyncIterator["object"]:
+        """Async variant of map_ordered for the ingest coroutine"""
+        pending: "deque[asyncio.Future]" = deque()
+        try:
+            for texts in batches:
+                pending.append(asyncio.wrap_future(self._executor.submit(_embed_in_worker, texts)))
+                if len(pending) >= self.max_in_flight:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "EmbeddingPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -12,12 +12,17 @@ This is the main interface for the GraphRAG pipeline.
 
 import os
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 
-from .neo4j_client import Neo4jClient, GraphDocument
+import asyncio
+
+from .neo4j_client import Neo4jClient, AsyncNeo4jClient, GraphDocument
 from .medical_schema import MedicalSchema, TRIAGE_SCHEMA
 from .graph_extractor import MedicalGraphExtractor, LangChainGraphExtractor
+from .pdf_pages import PDF_AVAILABLE, PdfPage, PdfPagePool, iter_pdf_pages, page_count
+from .chunking import chunk_pages, chunk_text
 
 logger = logging.getLogger(__name__)
 
@@ -52,14 +57,15 @@ class GraphRAGService:
         ollama_url: str = None,
         schema: MedicalSchema = None,
         chunk_size: int = 500,
-        chunk_overlap: int = 50
+        chunk_overlap: int = 50,
+        write_docs_per_batch: int = 50
     ):
-        # Neo4j connection
-        self.neo4j = Neo4jClient(
-            uri=neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687"),
-            user=neo4j_user or os.getenv("NEO4J_USER", "neo4j"),
-            password=neo4j_password or os.getenv("NEO4J_PASSWORD", "clinixai_neo4j_password")
-        )
+        # Neo4j connection (sync for ingestion, async for the *_async queries)
+        neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+        neo4j_user = neo4j_user or os.getenv("NEO4J_USER", "neo4j")
+        neo4j_password = neo4j_password or os.getenv("NEO4J_PASSWORD", "clinixai_neo4j_password")
+        self.neo4j = Neo4jClient(uri=neo4j_uri, user=neo4j_user, password=neo4j_password)
+        self.async_neo4j = AsyncNeo4jClient(uri=neo4j_uri, user=neo4j_user, password=neo4j_password)
         
         # Schema configuration
         self.schema = schema or TRIAGE_SCHEMA
@@ -68,6 +74,14 @@ class GraphRAGService:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         
+        # Extracted chunks accumulated per grouped Neo4j write
+        self.write_docs_per_batch = write_docs_per_batch
+        
+        # Page extraction processes (0/1 = in-process); the pool is created on first use
+        self.pdf_processes = int(os.getenv("RAG_PDF_PROCESSES", "0"))
+        self._pdf_pool: Optional[PdfPagePool] = None
+        self._pdf_pool_lock = threading.Lock()
+        
         # LLM extractor
         self.extractor = self._setup_extractor(
             llm_backend=llm_backend,
@@ -77,6 +91,7 @@ class GraphRAGService:
         
         # State
         self._initialized = False
+        self._async_initialized = False
     
     def _setup_extractor(
         self,
@@ -122,37 +137,57 @@ class GraphRAGService:
         self._initialized = True
         return True
     
+    async def initialize_async(self) -> bool:
+        """Connect the async driver (schema setup is left to initialize())"""
+        if self._async_initialized:
+            return True
+        
+        if not await self.async_neo4j.connect():
+            logger.error("Failed to connect to Neo4j (async)")
+            return False
+        
+        self._async_initialized = True
+        return True
+    
     def close(self):
         """Close connections"""
         self.neo4j.close()
+        if self._pdf_pool is not None:
+            self._pdf_pool.close()
+            self._pdf_pool = None
         self._initialized = False
     
+    async def close_async(self):
+        """Close the async driver"""
+        await self.async_neo4j.close()
+        self._async_initialized = False
+    
     # ==================== PDF INGESTION ====================
     
-    def _load_pdf(self, pdf_path: str) -> str:
-        """Load text content from PDF"""
+    def _iter_pdf_pages(self, pdf_path: str) -> Iterator[PdfPage]:
+        """Stream non-empty pages in order (on a process pool when RAG_PDF_PROCESSES > 1)"""
+        if PDF_AVAILABLE:
+            pool = None
+            if self.pdf_processes > 1:
+                with self._pdf_pool_lock:
+                    if self._pdf_pool is None:
+                        self._pdf_pool = PdfPagePool(self.pdf_processes)
+                    pool = self._pdf_pool
+            yield from iter_pdf_pages(pdf_path, pool)
+            return
+        
+        # Try langchain loader
         try:
-            from pypdf import PdfReader
-            
-            reader = PdfReader(pdf_path)
-            text_parts = []
-            
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-            
-            return "\n\n".join(text_parts)
-            
+            from langchain_community.document_loaders import PyPDFLoader
         except ImportError:
-            # Try langchain loader
-            try:
-                from langchain_community.document_loaders import PyPDFLoader
-                loader = PyPDFLoader(pdf_path)
-                documents = loader.load()
-                return "\n\n".join([doc.page_content for doc in documents])
-            except ImportError:
-                raise ImportError("Install pypdf or langchain: pip install pypdf langchain-community")
+            raise ImportError("Install pypdf or langchain: pip install pypdf langchain-community")
+        for i, doc in enumerate(PyPDFLoader(pdf_path).lazy_load()):
+            if doc.page_content:
+                yield PdfPage(doc.metadata.get("page", i) + 1, doc.page_content)
+    
+    def _load_pdf(self, pdf_path: str) -> str:
+        """Load text content from PDF"""
+        return "\n\n".join(page.text for page in self._iter_pdf_pages(pdf_path))
     
     def _chunk_text(
         self,
@@ -176,26 +211,8 @@ class GraphRAGService:
             return splitter.split_text(text)
             
         except ImportError:
-            # Simple fallback chunking
-            chunks = []
-            start = 0
-            
-            while start < len(text):
-                end = start + chunk_size
-                
-                # Try to end at a sentence boundary
-                if end < len(text):
-                    # Look for period or newline
-                    for sep in [". ", "\n\n", "\n", " "]:
-                        last_sep = text.rfind(sep, start, end)
-                        if last_sep > start:
-                            end = last_sep + len(sep)
-                            break
-                
-                chunks.append(text[start:end].strip())
-                start = end - chunk_overlap
-            
-            return [c for c in chunks if c]
+            # Fallback: the page-aware chunker on a single page
+            return chunk_text(text, chunk_size, chunk_overlap)
     
     def ingest_pdf(
         self,
@@ -223,55 +240,64 @@ class GraphRAGService:
         
         logger.info(f"Ingesting PDF: {pdf_path.name}")
         
-        # Step 1: Load PDF
+        # Step 1: Stream pages (only a window of pages is held at a time)
         if progress_callback:
             progress_callback(0, 100, f"Loading {pdf_path.name}...")
         
-        text = self._load_pdf(str(pdf_path))
-        logger.info(f"Loaded {len(text)} characters from PDF")
-        
-        # Step 2: Chunk text
-        if progress_callback:
-            progress_callback(10, 100, "Chunking text...")
+        total_pages = page_count(str(pdf_path)) if PDF_AVAILABLE else 0
         
-        chunks = self._chunk_text(text)
-        logger.info(f"Created {len(chunks)} chunks")
-        
-        # Step 3: Extract entities from each chunk
+        # Step 2: Chunk the page stream (chunks may span pages) and extract
+        # entities from each chunk
         total_nodes = 0
         total_relationships = 0
+        pending: List[GraphDocument] = []
         
-        for i, chunk in enumerate(chunks):
-            if progress_callback:
-                progress = 10 + int(80 * i / len(chunks))
-                progress_callback(progress, 100, f"Extracting chunk {i+1}/{len(chunks)}...")
-            
+        def pages() -> Iterator[PdfPage]:
+            for page in self._iter_pdf_pages(str(pdf_path)):
+                if progress_callback and total_pages:
+                    progress = 10 + int(80 * (page.number - 1) / total_pages)
+                    progress_callback(progress, 100, f"Extracting page {page.number}/{total_pages}...")
+                yield page
+        
+        i = 0
+        for i, chunk in enumerate(chunk_pages(pages(), self.chunk_size, self.chunk_overlap), 1):
             try:
                 graph_doc = self.extractor.extract(
-                    text=chunk,
+                    text=chunk.text,
                     source=pdf_path.name,
                     metadata={
-                        "chunk_id": f"{pdf_path.stem}_chunk_{i}",
-                        "chunk_index": i,
-                        "text": chunk[:500]  # Store first 500 chars
+                        "chunk_id": f"{pdf_path.stem}_chunk_{i - 1}",
+                        "chunk_index": i - 1,
+                        "page_start": chunk.page_start,
+                        "page_end": chunk.page_end,
+                        "text": chunk.text[:500]  # Store first 500 chars
                     }
                 )
                 
-                # Step 4: Write to Neo4j
                 if graph_doc.nodes or graph_doc.relationships:
-                    self.neo4j.add_graph_document(graph_doc, include_source=include_source)
+                    pending.append(graph_doc)
                     total_nodes += len(graph_doc.nodes)
                     total_relationships += len(graph_doc.relationships)
                     
             except Exception as e:
-                logger.warning(f"Failed to process chunk {i}: {e}")
+                logger.warning(f"Failed to process chunk {i - 1}: {e}")
+            
+            # Step 3: Write to Neo4j in grouped batches
+            if len(pending) >= self.write_docs_per_batch:
+                self.neo4j.add_graph_documents(pending, include_source=include_source)
+                pending = []
+        
+        if pending:
+            self.neo4j.add_graph_documents(pending, include_source=include_source)
+        
+        logger.info(f"Created {i} chunks from {pdf_path.name}")
         
         if progress_callback:
             progress_callback(100, 100, "Complete!")
         
         stats = {
             "file": pdf_path.name,
-            "chunks": len(chunks),
+            "chunks": i,
             "nodes_created": total_nodes,
             "relationships_created": total_relationships
         }
@@ -321,6 +347,7 @@ class GraphRAGService:
         chunks = self._chunk_text(text)
         total_nodes = 0
         total_relationships = 0
+        pending: List[GraphDocument] = []
         
         for i, chunk in enumerate(chunks):
             try:
@@ -335,13 +362,16 @@ class GraphRAGService:
                 )
                 
                 if graph_doc.nodes or graph_doc.relationships:
-                    self.neo4j.add_graph_document(graph_doc, include_source=include_source)
+                    pending.append(graph_doc)
                     total_nodes += len(graph_doc.nodes)
                     total_relationships += len(graph_doc.relationships)
                     
             except Exception as e:
                 logger.warning(f"Failed to process chunk {i}: {e}")
         
+        if pending:
+            self.neo4j.add_graph_documents(pending, include_source=include_source)
+        
         return {
             "source": source,
             "chunks": len(chunks),
@@ -386,20 +416,34 @@ class GraphRAGService:
         entities = self.neo4j.search_entities(query=query, limit=max_results)
         
         # Get relationships for found entities
+        expanded = self._entities_to_expand(entities)
+        related = [self.neo4j.get_related_entities(entity['name']) for entity in expanded]
+        
+        return self._build_rag_result(context_str, entities, expanded, related)
+    
+    @staticmethod
+    def _entities_to_expand(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Limit to first 5 for performance
+        return [entity for entity in entities[:5] if 'name' in entity]
+    
+    @staticmethod
+    def _build_rag_result(
+        context_str: str,
+        entities: List[Dict[str, Any]],
+        expanded: List[Dict[str, Any]],
+        related: List[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
         relationships = []
-        if entities:
-            for entity in entities[:5]:  # Limit to first 5 for performance
-                if 'name' in entity:
-                    rels = self.neo4j.get_related_entities(entity['name'])
-                    for rel in rels:
-                        relationships.append({
-                            'type': rel.get('relationship', 'RELATED_TO'),
-                            'source_id': entity.get('id', ''),
-                            'target_id': rel.get('id', ''),
-                            'source_name': entity.get('name', ''),
-                            'target_name': rel.get('name', ''),
-                            'properties': rel.get('properties', {})
-                        })
+        for entity, rels in zip(expanded, related):
+            for rel in rels:
+                relationships.append({
+                    'type': rel.get('relationship', 'RELATED_TO'),
+                    'source_id': entity.get('id', ''),
+                    'target_id': rel.get('id', ''),
+                    'source_name': entity.get('name', ''),
+                    'target_name': rel.get('name', ''),
+                    'properties': rel.get('properties', {})
+                })
         
         # Get source attributions
         sources = set()
@@ -421,11 +465,26 @@ class GraphRAGService:
     async def get_rag_context_async(
         self,
         query: str,
+        max_tokens: int = 2000,
+        include_graph: bool = True,
+        include_chunks: bool = True,
         max_results: int = 10
     ) -> Dict[str, Any]:
-        """Async wrapper for get_rag_context"""
-        # For now, call sync method (Neo4j driver is async-safe)
-        return self.get_rag_context(query=query, max_results=max_results)
+        """get_rag_context on the async driver; independent queries run concurrently"""
+        if not self._async_initialized:
+            await self.initialize_async()
+        
+        context_str, entities = await asyncio.gather(
+            self.async_neo4j.get_rag_context(query=query, max_hops=2, limit=max_results),
+            self.async_neo4j.search_entities(query=query, limit=max_results)
+        )
+        
+        expanded = self._entities_to_expand(entities)
+        related = await asyncio.gather(
+            *(self.async_neo4j.get_related_entities(entity['name']) for entity in expanded)
+        )
+        
+        return self._build_rag_result(context_str, entities, expanded, related)
     
     def search_entities(
         self,
@@ -450,8 +509,16 @@ class GraphRAGService:
         entity_type: str = None,
         limit: int = 20
     ) -> List[Dict[str, Any]]:
-        """Async wrapper for search_entities"""
-        return self.search_entities(query=query, entity_type=entity_type, limit=limit)
+        """search_entities on the async driver"""
+        if not self._async_initialized:
+            await self.initialize_async()
+        
+        labels = [entity_type] if entity_type else None
+        return await self.async_neo4j.search_entities(
+            query=query,
+            labels=labels,
+            limit=limit
+        )
     
     def search(
         self,
@@ -474,10 +541,11 @@ class GraphRAGService:
         if not self._initialized:
             self.initialize()
         
-        red_flags = []
-        for symptom in symptoms:
-            flags = self.neo4j.get_red_flags(symptom)
-            red_flags.extend(flags)
+        return self._unique_flags([self.neo4j.get_red_flags(symptom) for symptom in symptoms])
+    
+    @staticmethod
+    def _unique_flags(per_symptom: List[List[str]]) -> List[str]:
+        red_flags = [flag for flags in per_symptom for flag in flags]
         
         # Remove duplicates while preserving order
         seen = set()
@@ -490,17 +558,29 @@ class GraphRAGService:
         return unique_flags
     
     async def get_red_flags_for_symptoms_async(self, symptoms: List[str]) -> List[str]:
-        """Async wrapper for get_red_flags_for_symptoms"""
-        return self.get_red_flags_for_symptoms(symptoms)
+        """get_red_flags_for_symptoms on the async driver, one concurrent query per symptom"""
+        if not self._async_initialized:
+            await self.initialize_async()
+        
+        per_symptom = await asyncio.gather(*(self.async_neo4j.get_red_flags(symptom) for symptom in symptoms))
+        return self._unique_flags(per_symptom)
     
     def get_possible_conditions(self, symptoms: List[str]) -> List[Dict[str, Any]]:
         """Get possible conditions for given symptoms"""
         if not self._initialized:
             self.initialize()
         
+        return self._merge_conditions(
+            symptoms, [self.neo4j.get_symptom_diseases(symptom) for symptom in symptoms]
+        )
+    
+    @staticmethod
+    def _merge_conditions(
+        symptoms: List[str],
+        per_symptom: List[List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
         conditions = {}
-        for symptom in symptoms:
-            diseases = self.neo4j.get_symptom_diseases(symptom)
+        for symptom, diseases in zip(symptoms, per_symptom):
             for disease in diseases:
                 name = disease.get('name', '')
                 if name:
@@ -525,8 +605,14 @@ class GraphRAGService:
         return result
     
     async def get_possible_conditions_async(self, symptoms: List[str]) -> List[Dict[str, Any]]:
-        """Async wrapper for get_possible_conditions"""
-        return self.get_possible_conditions(symptoms)
+        """get_possible_conditions on the async driver, one concurrent query per symptom"""
+        if not self._async_initialized:
+            await self.initialize_async()
+        
+        per_symptom = await asyncio.gather(
+            *(self.async_neo4j.get_symptom_diseases(symptom) for symptom in symptoms)
+        )
+        return self._merge_conditions(symptoms, per_symptom)
     
     def get_drug_interactions(self, drugs: List[str]) -> List[Dict[str, Any]]:
         """Get drug interactions from the knowledge graph"""
@@ -534,18 +620,27 @@ class GraphRAGService:
             self.initialize()
         
         interactions = []
-        for i, drug1 in enumerate(drugs):
-            for drug2 in drugs[i+1:]:
-                # Query for interactions between drug pairs
-                interaction = self.neo4j.get_drug_interaction(drug1, drug2)
-                if interaction:
-                    interactions.append(interaction)
+        for drug1, drug2 in self._drug_pairs(drugs):
+            # Query for interactions between drug pairs
+            interaction = self.neo4j.get_drug_interaction(drug1, drug2)
+            if interaction:
+                interactions.append(interaction)
         
         return interactions
     
+    @staticmethod
+    def _drug_pairs(drugs: List[str]) -> List[tuple]:
+        return [(drug1, drug2) for i, drug1 in enumerate(drugs) for drug2 in drugs[i+1:]]
+    
     async def get_drug_interactions_async(self, drugs: List[str]) -> List[Dict[str, Any]]:
-        """Async wrapper for get_drug_interactions"""
-        return self.get_drug_interactions(drugs)
+        """get_drug_interactions on the async driver, drug pairs queried concurrently"""
+        if not self._async_initialized:
+            await self.initialize_async()
+        
+        results = await asyncio.gather(
+            *(self.async_neo4j.get_drug_interaction(drug1, drug2) for drug1, drug2 in self._drug_pairs(drugs))
+        )
+        return [interaction for interaction in results if interaction]
     
     def get_graph_stats(self) -> Dict[str, Any]:
         """Get knowledge graph statistics"""
@@ -555,8 +650,11 @@ class GraphRAGService:
         return self.neo4j.get_stats()
     
     async def get_graph_stats_async(self) -> Dict[str, Any]:
-        """Async wrapper for get_graph_stats"""
-        return self.get_graph_stats()
+        """get_graph_stats on the async driver"""
+        if not self._async_initialized:
+            await self.initialize_async()
+        
+        return await self.async_neo4j.get_stats()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get knowledge graph statistics"""
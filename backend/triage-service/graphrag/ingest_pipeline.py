@@ -0,0 +1,218 @@
+"""
+Staged Ingestion Pipeline for ClinixAI GraphRAG
+===============================================
+Runs document ingestion as a chain of stages connected by bounded queues:
+
+    parse -> chunk -> embed (batched) -> write (batched) -> extract
+
+Every stage is its own asyncio task. Blocking stages (PDF parsing,
+embedding, Neo4j writes) execute on a dedicated worker thread each, so
+CPU, network and database work overlap instead of running in turn.
+
+A full queue blocks its producer, so between two stages at most
+queue_size batches of the consuming stage are in flight; memory stays
+bounded however large the document is.
+
+Each stage reports items in/out, busy time, time starved for input and
+time blocked on a full output queue. The stage with the highest busy
+time (and whose neighbours show starved/blocked time) limits throughput.
+"""
+
+import time
+import asyncio
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from metrics import record_ingest_stage
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed down the queues
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step.
+
+    process(item) returns the outputs for one input (an iterable, possibly
+    empty); with batch_size > 0 it receives lists of up to batch_size items
+    instead. flush() returns outputs held back when the input ends. Either
+    may be a coroutine function; plain functions run on the stage's own
+    thread when threaded, otherwise on the event loop.
+    """
+    name: str
+    process: Callable[[Any], Optional[Iterable[Any]]]
+    flush: Optional[Callable[[], Optional[Iterable[Any]]]] = None
+    batch_size: int = 0
+    threaded: bool = True
+
+
+@dataclass
+class StageStats:
+    """Throughput counters for one stage"""
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0  # inside process/flush (or the source iterator)
+    starved_seconds: float = 0.0  # waiting for input
+    blocked_seconds: float = 0.0  # waiting for room downstream (back-pressure)
+
+    def as_dict(self) -> Dict[str, Any]:
+        rate_items = self.items_in or self.items_out
+        return {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "starved_seconds": round(self.starved_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_busy_sec": round(rate_items / self.busy_seconds, 1) if self.busy_seconds else None,
+        }
+
+
+class IngestPipeline:
+    """
+    Source iterator followed by stages, each stage's outputs feeding the next.
+
+    Usage:
+        pipeline = IngestPipeline("parse", pages(), [
+            Stage("embed", embed, batch_size=256),
+            Stage("write", write, batch_size=500),
+        ])
+        report = await pipeline.run()
+    """
+
+    def __init__(self, source_name: str, source: Iterable[Any], stages: List[Stage], queue_size: int = 4):
+        self.source_name = source_name
+        self.source = source
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.stats = [StageStats(source_name)] + [StageStats(stage.name) for stage in stages]
+
+    async def run(self) -> Dict[str, Any]:
+        """Run to completion; the first failing stage cancels the rest and re-raises"""
+        queues = [
+            asyncio.Queue(maxsize=self.queue_size * max(1, stage.batch_size))
+            for stage in self.stages
+        ]
+        executors = {
+            name: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ingest-{name}")
+            for name in [self.source_name] + [s.name for s in self.stages if s.threaded]
+        }
+
+        tasks = [asyncio.create_task(
+            self._run_source(queues[0] if queues else None, executors[self.source_name])
+        )]
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            tasks.append(asyncio.create_task(
+                self._run_stage(stage, self.stats[i + 1], queues[i], outbox, executors.get(stage.name))
+            ))
+
+        start = time.perf_counter()
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for executor in executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+        wall = time.perf_counter() - start
+
+        for stats in self.stats:
+            record_ingest_stage(stats.name, stats.items_in or stats.items_out, stats.busy_seconds, stats.blocked_seconds)
+        return {
+            "wall_seconds": round(wall, 3),
+            "stages": {stats.name: stats.as_dict() for stats in self.stats},
+        }
+
+    async def _emit(self, outputs: Iterable[Any], outbox: Optional[asyncio.Queue], stats: StageStats):
+        for item in outputs:
+            stats.items_out += 1
+            if outbox is None:
+                continue
+            start = time.perf_counter()
+            await outbox.put(item)
+            stats.blocked_seconds += time.perf_counter() - start
+
+    async def _run_source(self, outbox: Optional[asyncio.Queue], executor: ThreadPoolExecutor):
+        loop = asyncio.get_running_loop()
+        stats = self.stats[0]
+        iterator = iter(self.source)
+        while True:
+            start = time.perf_counter()
+            item = await loop.run_in_executor(executor, next, iterator, _DONE)
+            stats.busy_seconds += time.perf_counter() - start
+            if item is _DONE:
+                break
+            await self._emit([item], outbox, stats)
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+    async def _call(self, fn: Callable, stats: StageStats, executor, *args) -> List[Any]:
+        start = time.perf_counter()
+        if inspect.iscoroutinefunction(fn):
+            outputs = await fn(*args)
+        elif executor is not None:
+            # Materialize on the worker thread so generator stages run there too
+            outputs = await asyncio.get_running_loop().run_in_executor(
+                executor, lambda: list(fn(*args) or ())
+            )
+        else:
+            outputs = fn(*args)
+        stats.busy_seconds += time.perf_counter() - start
+        return list(outputs or ())
+
+    async def _run_stage(
+        self,
+        stage: Stage,
+        stats: StageStats,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        executor: Optional[ThreadPoolExecutor]
+    ):
+        pending: List[Any] = []
+        while True:
+            start = time.perf_counter()
+            item = await inbox.get()
+            stats.starved_seconds += time.perf_counter() - start
+            if item is _DONE:
+                break
+            stats.items_in += 1
+
+            if stage.batch_size <= 0:
+                await self._emit(await self._call(stage.process, stats, executor, item), outbox, stats)
+                continue
+            pending.append(item)
+            if len(pending) >= stage.batch_size:
+                batch, pending = pending, []
+                await self._emit(await self._call(stage.process, stats, executor, batch), outbox, stats)
+
+        if pending:
+            await self._emit(await self._call(stage.process, stats, executor, pending), outbox, stats)
+        if stage.flush is not None:
+            await self._emit(await self._call(stage.flush, stats, executor), outbox, stats)
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """One-line summary of a run() report for logs"""
+    parts = []
+    for name, stats in report["stages"].items():
+        rate = stats["items_per_busy_sec"]
+        parts.append(
+            f"{name} {stats['items_in'] or stats['items_out']} items "
+            f"busy {stats['busy_seconds']}s"
+            + (f" ({rate}/s)" if rate else "")
+            + (f" blocked {stats['blocked_seconds']}s" if stats["blocked_seconds"] >= 0.001 else "")
+        )
+    return f"{report['wall_seconds']}s wall: " + ", ".join(parts)
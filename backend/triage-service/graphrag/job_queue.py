@@ -0,0 +1,83 @@
+"""
+Redis Job Queue for ClinixAI GraphRAG Ingestion
+===============================================
+Hands ingestion job ids from the API process to `python -m graphrag.worker`
+so PDF parsing and embedding never run on the API event loop.
+
+Job state lives in the JobStore (see jobs.py); Redis only carries ids:
+
+- enqueue() pushes a job id onto the queue list
+- claim() atomically moves the next id onto the worker's own processing
+  list (BLMOVE), so a job is never handed to two workers
+- ack() removes it once the job has finished
+- recover() puts ids a crashed worker left on its processing list back on
+  the queue when that worker (same worker id) starts again
+"""
+
+import logging
+from typing import List, Optional
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class RedisJobQueue:
+    """
+    Reliable FIFO of job ids on Redis 6.2+.
+
+    Usage:
+        queue = RedisJobQueue("redis://localhost:6379")
+        await queue.enqueue(job.id)
+        job_id = await queue.claim("worker-1")
+        ...
+        await queue.ack("worker-1", job_id)
+    """
+
+    def __init__(self, url: str, name: str = "clinixai:ingest"):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis not installed. Run: pip install redis")
+        self.url = url
+        self.name = name
+        self._redis = aioredis.from_url(url, decode_responses=True)
+
+    @property
+    def pending_key(self) -> str:
+        return f"{self.name}:queue"
+
+    def processing_key(self, worker_id: str) -> str:
+        return f"{self.name}:processing:{worker_id}"
+
+    async def enqueue(self, job_id: str):
+        await self._redis.lpush(self.pending_key, job_id)
+
+    async def claim(self, worker_id: str, timeout: float = 5.0) -> Optional[str]:
+        """Next job id (oldest first), or None after timeout seconds"""
+        return await self._redis.blmove(
+            self.pending_key, self.processing_key(worker_id), timeout, "RIGHT", "LEFT"
+        )
+
+    async def ack(self, worker_id: str, job_id: str):
+        await self._redis.lrem(self.processing_key(worker_id), 1, job_id)
+
+    async def recover(self, worker_id: str) -> List[str]:
+        """Requeue ids this worker claimed before it stopped; returns them"""
+        recovered = []
+        while True:
+            job_id = await self._redis.lmove(
+                self.processing_key(worker_id), self.pending_key, "RIGHT", "RIGHT"
+            )
+            if job_id is None:
+                return recovered
+            recovered.append(job_id)
+
+    async def depth(self) -> int:
+        """Job ids waiting to be claimed"""
+        return await self._redis.llen(self.pending_key)
+
+    async def close(self):
+        await self._redis.aclose()
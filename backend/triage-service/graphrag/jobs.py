@@ -0,0 +1,491 @@
+"""
+Durable Ingestion Jobs for ClinixAI GraphRAG
+============================================
+Every ingestion request becomes a job with an id, persisted in SQLite
+(RAG_JOB_DB) together with one row per document, so status survives a
+restart and an interrupted job resumes where it stopped:
+
+- Per-document checkpoint: a document whose row is "completed" is not
+  ingested again when the job resumes
+- Per-chunk checkpoint: AdvancedRAGService writes content-addressed chunks
+  in batches and, when the document is re-run, reuses the chunks a
+  partial run already stored (see ingest_pdf) instead of re-embedding them
+
+The services' progress_callback feeds the document rows; job progress is
+the mean document progress. JobManager runs at most RAG_JOB_CONCURRENCY
+jobs at once so two large ingestions do not fight over CPU.
+
+With RAG_JOB_QUEUE=redis the API process only records and enqueues jobs;
+`python -m graphrag.worker` runs them (see job_queue.py, worker.py).
+
+Usage:
+    manager = get_job_manager()
+    manager.register(RAG_INGEST, handler)
+    await manager.resume()
+    job = await manager.submit(RAG_INGEST, params, documents)
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .job_queue import RedisJobQueue
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# A job or document in one of these states is not run again
+FINISHED = (COMPLETED, FAILED)
+
+# Job kinds
+RAG_INGEST = "rag.ingest_directory"
+GRAPH_INGEST = "graphrag.ingest_directory"
+
+
+@dataclass
+class JobDocument:
+    """Checkpoint of one document within a job"""
+    path: str
+    status: str = QUEUED
+    progress: float = 0.0  # 0-100
+    message: str = ""
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "file": Path(self.path).name,
+            "status": self.status,
+            "progress": round(self.progress, 1),
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+@dataclass
+class Job:
+    """One ingestion request and its documents"""
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str = QUEUED
+    message: str = ""
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    documents: List[JobDocument] = field(default_factory=list)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def progress(self) -> float:
+        if self.status == COMPLETED:
+            return 100.0
+        if not self.documents:
+            return 0.0
+        return sum(
+            100.0 if doc.status in FINISHED else doc.progress for doc in self.documents
+        ) / len(self.documents)
+
+    def pending_documents(self) -> List[JobDocument]:
+        return [doc for doc in self.documents if doc.status not in FINISHED]
+
+    def as_dict(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for doc in self.documents:
+            counts[doc.status] = counts.get(doc.status, 0) + 1
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": round(self.progress, 1),
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "documents_total": len(self.documents),
+            "documents_by_status": counts,
+            "documents": [doc.as_dict() for doc in self.documents],
+        }
+
+
+class JobStore:
+    """
+    SQLite-backed job and document checkpoints.
+
+    Thread-safe (progress callbacks arrive from pipeline worker threads),
+    and safe to share between processes using the same file (WAL mode).
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                message TEXT NOT NULL DEFAULT '',
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status);
+            CREATE TABLE IF NOT EXISTS job_documents (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT NOT NULL DEFAULT '',
+                result TEXT,
+                error TEXT,
+                PRIMARY KEY (job_id, path)
+            );
+        """)
+        self._db.commit()
+
+    def create(self, kind: str, params: Dict[str, Any], documents: List[str]) -> Job:
+        now = time.time()
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            params=params,
+            created_at=now,
+            updated_at=now,
+            documents=[JobDocument(path) for path in documents],
+        )
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job.id, kind, json.dumps(params), job.status, now, now),
+            )
+            self._db.executemany(
+                "INSERT INTO job_documents (job_id, position, path, status) VALUES (?, ?, ?, ?)",
+                [(job.id, i, doc.path, doc.status) for i, doc in enumerate(job.documents)],
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, kind, params, status, message, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            documents = self._db.execute(
+                "SELECT path, status, progress, message, result, error FROM job_documents "
+                "WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+        return Job(
+            id=row[0], kind=row[1], params=json.loads(row[2]), status=row[3],
+            message=row[4], error=row[5], created_at=row[6], updated_at=row[7],
+            documents=[
+                JobDocument(path, status, progress, message, json.loads(result) if result else None, error)
+                for path, status, progress, message, result, error in documents
+            ],
+        )
+
+    def list(self, limit: int = 50, statuses: Optional[List[str]] = None) -> List[Job]:
+        """Most recent jobs first"""
+        query = "SELECT id FROM jobs"
+        args: List[Any] = []
+        if statuses:
+            query += f" WHERE status IN ({','.join('?' * len(statuses))})"
+            args.extend(statuses)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            ids = [row[0] for row in self._db.execute(query, args)]
+        return [job for job in (self.get(job_id) for job_id in ids) if job is not None]
+
+    def unfinished(self) -> List[Job]:
+        """Queued or interrupted jobs, oldest first"""
+        return list(reversed(self.list(limit=-1, statuses=[QUEUED, RUNNING])))
+
+    def set_status(self, job_id: str, status: str, message: str = "", error: Optional[str] = None):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, message = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, message, error, time.time(), job_id),
+            )
+
+    def update_document(
+        self,
+        job_id: str,
+        path: str,
+        status: str,
+        progress: Optional[float] = None,
+        message: str = "",
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE job_documents SET status = ?, progress = COALESCE(?, progress), message = ?, "
+                "result = ?, error = ? WHERE job_id = ? AND path = ?",
+                (status, progress, message, json.dumps(result, default=str) if result else None,
+                 error, job_id, path),
+            )
+            self._db.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+
+    def document_progress(self, job_id: str, path: str) -> Callable[[float, float, str], None]:
+        """A service progress_callback(progress, total, message) recording into this document's row"""
+        def callback(progress: float, total: float, message: str):
+            self.update_document(job_id, path, RUNNING, 100.0 * progress / (total or 100), message)
+        return callback
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# Handler: runs a job's pending documents, recording checkpoints in the store
+JobHandler = Callable[[Job, JobStore], Awaitable[None]]
+
+
+class JobManager:
+    """
+    Runs persisted jobs on the event loop, at most `concurrency` at a time.
+
+    Jobs left queued or running by a previous process are picked up again
+    by resume(); documents already completed are skipped.
+    """
+
+    def __init__(self, store: JobStore, concurrency: int = 1, queue: Optional["RedisJobQueue"] = None):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.queue = queue  # when set, jobs are enqueued for graphrag.worker
+        self._handlers: Dict[str, JobHandler] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def handlers(self) -> Dict[str, JobHandler]:
+        return self._handlers
+
+    def register(self, kind: str, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    def create(self, kind: str, params: Dict[str, Any], documents: List[str]) -> Job:
+        """Persist a queued job without running it here (see graphrag.worker)"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        return self.store.create(kind, params, documents)
+
+    async def submit(self, kind: str, params: Dict[str, Any], documents: List[str]) -> Job:
+        """Persist a job and start it once a concurrency slot is free (or enqueue it)"""
+        job = await asyncio.to_thread(self.create, kind, params, documents)
+        if self.queue is not None:
+            try:
+                await self.queue.enqueue(job.id)
+            except Exception as e:
+                # No worker will ever see it, and resume() leaves queued jobs to the worker
+                await asyncio.to_thread(self.store.set_status, job.id, FAILED, "Could not enqueue", str(e))
+                raise
+        else:
+            self._start(job.id)
+        return job
+
+    async def resume(self) -> List[str]:
+        """Restart jobs a previous process left unfinished; returns their ids"""
+        if self.queue is not None:
+            return []  # the worker recovers its own jobs
+        jobs = await asyncio.to_thread(self.store.unfinished)
+        resumed = []
+        for job in jobs:
+            if job.kind not in self._handlers:
+                continue
+            logger.info(f"Resuming {job.kind} job {job.id} ({len(job.pending_documents())} documents left)")
+            await asyncio.to_thread(self.store.set_status, job.id, QUEUED, "Resuming after restart")
+            self._start(job.id)
+            resumed.append(job.id)
+        return resumed
+
+    def _start(self, job_id: str):
+        if job_id in self._tasks:
+            return
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run(self, job_id: str):
+        async with self._semaphore:
+            await run_job(self.store, self._handlers, job_id)
+
+    async def stream(self, job_id: str, interval: float = 1.0) -> AsyncIterator[Dict[str, Any]]:
+        """Job snapshots whenever the job changes, ending with its final state"""
+        last = None
+        while True:
+            job = await asyncio.to_thread(self.store.get, job_id)
+            if job is None:
+                return
+            snapshot = job.as_dict()
+            if snapshot != last:
+                last = snapshot
+                yield snapshot
+            if job.finished:
+                return
+            await asyncio.sleep(interval)
+
+    async def close(self):
+        """Stop running jobs; they stay queued/running in the store and resume on restart"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.queue is not None:
+            await self.queue.close()
+
+
+async def run_job(store: JobStore, handlers: Dict[str, JobHandler], job_id: str):
+    """Run one job to completion with the handler for its kind, recording the outcome"""
+    job = await asyncio.to_thread(store.get, job_id)
+    if job is None or job.finished:
+        return
+    handler = handlers.get(job.kind)
+    if handler is None:
+        await asyncio.to_thread(store.set_status, job_id, FAILED, error=f"Unknown job kind: {job.kind}")
+        return
+
+    await asyncio.to_thread(store.set_status, job_id, RUNNING, "Running")
+    try:
+        await handler(job, store)
+    except asyncio.CancelledError:
+        # Left RUNNING on purpose: resume() picks it up after a restart
+        raise
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        await asyncio.to_thread(store.set_status, job_id, FAILED, error=str(e))
+        return
+
+    job = await asyncio.to_thread(store.get, job_id)
+    failed = [doc for doc in job.documents if doc.status == FAILED]
+    message = f"{len(job.documents) - len(failed)}/{len(job.documents)} documents ingested"
+    await asyncio.to_thread(store.set_status, job_id, COMPLETED, message)
+    logger.info(f"Job {job_id} complete: {message}")
+
+
+# ==================== INGESTION HANDLERS ====================
+
+async def ingest_rag_documents(service, job: Job, store: JobStore):
+    """AdvancedRAGService ingestion of a job's pending documents (params as /rag/ingest-directory)"""
+    params = job.params
+    pool = await asyncio.to_thread(service.open_embedding_pool, params.get("processes"))
+    try:
+        for doc in job.pending_documents():
+            await asyncio.to_thread(store.update_document, job.id, doc.path, RUNNING, 0.0, "Starting")
+            try:
+                stats = await service.ingest_pdf(
+                    doc.path,
+                    extract_entities=params.get("extract_entities", True),
+                    progress_callback=store.document_progress(job.id, doc.path),
+                    embedding_pool=pool,
+                    force=params.get("force", False),
+                )
+            except Exception as e:
+                logger.error(f"Failed to ingest {doc.path}: {e}")
+                await asyncio.to_thread(store.update_document, job.id, doc.path, FAILED, error=str(e))
+                continue
+            stats.pop("pipeline", None)
+            await asyncio.to_thread(
+                store.update_document, job.id, doc.path, COMPLETED, 100.0, "Complete", stats
+            )
+    finally:
+        if pool is not None:
+            await asyncio.to_thread(pool.close)
+
+
+async def ingest_graph_documents(service, job: Job, store: JobStore):
+    """GraphRAGService (LLM graph extraction) ingestion of a job's pending documents"""
+    for doc in job.pending_documents():
+        await asyncio.to_thread(store.update_document, job.id, doc.path, RUNNING, 0.0, "Starting")
+        try:
+            stats = await asyncio.to_thread(
+                service.ingest_pdf, doc.path, progress_callback=store.document_progress(job.id, doc.path)
+            )
+        except Exception as e:
+            logger.error(f"Failed to ingest {doc.path}: {e}")
+            await asyncio.to_thread(store.update_document, job.id, doc.path, FAILED, error=str(e))
+            continue
+        await asyncio.to_thread(
+            store.update_document, job.id, doc.path, COMPLETED, 100.0, "Complete", stats
+        )
+
+
+def register_ingestion_handlers(
+    manager: JobManager,
+    get_rag_service: Callable[[], Any],
+    get_graph_service: Callable[[], Any],
+) -> JobManager:
+    """Register the ingestion job kinds; the service getters are blocking factories"""
+    async def rag_ingestion(job: Job, store: JobStore):
+        service = await asyncio.to_thread(get_rag_service)
+        await ingest_rag_documents(service, job, store)
+
+    async def graph_ingestion(job: Job, store: JobStore):
+        service = await asyncio.to_thread(get_graph_service)
+        await ingest_graph_documents(service, job, store)
+
+    manager.register(RAG_INGEST, rag_ingestion)
+    manager.register(GRAPH_INGEST, graph_ingestion)
+    return manager
+
+
+def list_documents(directory: str, pattern: str = "*.pdf") -> List[str]:
+    """Files a directory job will ingest, fixed when the job is created"""
+    path = Path(directory)
+    if not path.is_dir():
+        raise NotADirectoryError(f"Not a directory: {directory}")
+    return [str(p.resolve()) for p in sorted(path.glob(pattern))]
+
+
+# Singleton instance
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Get or create the process-wide job manager (RAG_JOB_DB, RAG_JOB_CONCURRENCY).
+    RAG_JOB_QUEUE=redis enqueues jobs on REDIS_URL instead of running them here.
+    """
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            queue = None
+            if os.getenv("RAG_JOB_QUEUE", "local").lower() == "redis":
+                queue = RedisJobQueue(os.getenv("REDIS_URL", "redis://localhost:6379"))
+            _job_manager = JobManager(
+                JobStore(os.getenv("RAG_JOB_DB", "data/jobs.sqlite")),
+                concurrency=int(os.getenv("RAG_JOB_CONCURRENCY", "1")),
+                queue=queue,
+            )
+        return _job_manager
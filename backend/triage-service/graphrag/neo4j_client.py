@@ -6,25 +6,40 @@ Provides:
 - Cypher query execution
 - Graph document ingestion
 - Medical entity search
+
+Neo4jClient uses the sync driver (ingestion, scripts); AsyncNeo4jClient has
+the same methods as coroutines on neo4j.AsyncGraphDatabase for use on the
+FastAPI event loop. Both share the Cypher below, take their drivers from
+the per-process registry in neo4j_drivers, run reads with execute_read
+(routed to readers on a cluster) and writes in managed transactions.
 """
 
 import os
+import re
+import time
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
 
 try:
-    from neo4j import GraphDatabase, Driver, Session
-    from neo4j.exceptions import ServiceUnavailable, AuthError
+    from neo4j import Driver, Session
+    from neo4j.exceptions import ServiceUnavailable, AuthError, SessionExpired, TransientError
     NEO4J_AVAILABLE = True
 except ImportError:
     NEO4J_AVAILABLE = False
     Driver = None
     Session = None
 
+from metrics import track_neo4j_query
+
+from . import neo4j_drivers
+
 logger = logging.getLogger(__name__)
 
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")  # use fullmatch
+
 
 @dataclass
 class GraphNode:
@@ -57,6 +72,275 @@ class GraphDocument:
     metadata: Optional[Dict[str, Any]] = None
 
 
+SCHEMA_STATEMENTS = [
+    # Unique constraints for main entities
+    "CREATE CONSTRAINT disease_name IF NOT EXISTS FOR (d:Disease) REQUIRE d.name IS UNIQUE",
+    "CREATE CONSTRAINT symptom_name IF NOT EXISTS FOR (s:Symptom) REQUIRE s.name IS UNIQUE",
+    "CREATE CONSTRAINT drug_name IF NOT EXISTS FOR (d:Drug) REQUIRE d.name IS UNIQUE",
+    "CREATE CONSTRAINT red_flag_name IF NOT EXISTS FOR (r:RedFlag) REQUIRE r.name IS UNIQUE",
+    
+    # Index for full-text search
+    "CREATE FULLTEXT INDEX entity_search IF NOT EXISTS FOR (n:Disease|Symptom|Drug|Sign|Condition) ON EACH [n.name, n.description]",
+    
+    # Index for document chunks
+    "CREATE INDEX chunk_doc_id IF NOT EXISTS FOR (c:Chunk) ON (c.document_id)",
+    "CREATE INDEX chunk_id IF NOT EXISTS FOR (c:Chunk) ON (c.id)",
+    
+    # Index for triage levels
+    "CREATE INDEX triage_level IF NOT EXISTS FOR (t:TriageLevel) ON (t.level)",
+]
+
+# Labels with a (label, name) constraint from SCHEMA_STATEMENTS
+CONSTRAINED_LABELS = {"Disease", "Symptom", "Drug", "RedFlag"}
+
+TRANSIENT_ERRORS = (TransientError, ServiceUnavailable, SessionExpired) if NEO4J_AVAILABLE else ()
+
+Statement = Tuple[str, List[Dict[str, Any]]]
+
+
+def plan_graph_writes(
+    graph_docs: List[GraphDocument],
+    include_source: bool,
+    batch_size: int
+) -> Tuple[List[str], List[List[Statement]], Dict[str, int]]:
+    """
+    Group GraphDocuments into UNWIND statements.
+    
+    Nodes are grouped by label and relationships by (source label, type,
+    target label) across all documents, so each group is one MERGE per
+    batch_size rows and every MATCH goes through a (label, name) index.
+    Statement slices are packed into transactions of about batch_size rows.
+    
+    Relationship endpoints are resolved within their document by node id
+    or name; relationships whose endpoints are not in the document are
+    skipped.
+    
+    Returns (node labels, transactions, stats).
+    """
+    nodes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    relationships: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    chunks: List[Dict[str, Any]] = []
+    mentions: Dict[str, List[Dict[str, Any]]] = {}
+    skipped = 0
+    
+    for graph_doc in graph_docs:
+        endpoints: Dict[str, Tuple[str, str]] = {}
+        for node in graph_doc.nodes:
+            label = node.label if _IDENTIFIER.fullmatch(node.label or "") else "Entity"
+            name = node.properties.get("name", node.id)
+            endpoints[node.id] = endpoints[name] = (label, name)
+            row = nodes.setdefault(label, {}).setdefault(name, {"name": name, "properties": {}})
+            row["properties"].update(node.properties)
+        
+        for rel in graph_doc.relationships:
+            source = endpoints.get(rel.source_id)
+            target = endpoints.get(rel.target_id)
+            if not source or not target or not _IDENTIFIER.fullmatch(rel.type or ""):
+                skipped += 1
+                continue
+            relationships.setdefault((source[0], rel.type, target[0]), []).append({
+                "source": source[1],
+                "target": target[1],
+                "properties": rel.properties or {},
+            })
+        
+        if include_source and graph_doc.source:
+            metadata = graph_doc.metadata or {}
+            chunk_id = metadata.get("chunk_id", graph_doc.source[:50])
+            chunks.append({
+                "id": chunk_id,
+                "text": metadata.get("text", ""),
+                "source": graph_doc.source,
+                "page_start": metadata.get("page_start"),
+                "page_end": metadata.get("page_end"),
+            })
+            for label, name in set(endpoints.values()):
+                mentions.setdefault(label, []).append({"name": name, "chunk_id": chunk_id})
+    
+    statements: List[Statement] = []
+    for label, rows in nodes.items():
+        statements.append((f"""
+            UNWIND $rows AS row
+            MERGE (n:{label} {{name: row.name}})
+            SET n += row.properties
+        """, list(rows.values())))
+    for (source_label, rel_type, target_label), rows in relationships.items():
+        statements.append((f"""
+            UNWIND $rows AS row
+            MATCH (source:{source_label} {{name: row.source}})
+            MATCH (target:{target_label} {{name: row.target}})
+            MERGE (source)-[r:{rel_type}]->(target)
+            SET r += row.properties
+        """, rows))
+    if chunks:
+        statements.append(("""
+            UNWIND $rows AS row
+            MERGE (c:Chunk {id: row.id})
+            SET c.text = row.text, c.source = row.source,
+                c.page_start = row.page_start, c.page_end = row.page_end
+        """, chunks))
+    for label, rows in mentions.items():
+        statements.append((f"""
+            UNWIND $rows AS row
+            MATCH (n:{label} {{name: row.name}})
+            MATCH (c:Chunk {{id: row.chunk_id}})
+            MERGE (n)-[:MENTIONED_IN]->(c)
+        """, rows))
+    
+    transactions: List[List[Statement]] = []
+    transaction: List[Statement] = []
+    pending = 0
+    for query, rows in statements:
+        for start in range(0, len(rows), batch_size):
+            part = rows[start:start + batch_size]
+            transaction.append((query, part))
+            pending += len(part)
+            if pending >= batch_size:
+                transactions.append(transaction)
+                transaction, pending = [], 0
+    if transaction:
+        transactions.append(transaction)
+    
+    stats = {
+        "nodes": sum(len(rows) for rows in nodes.values()),
+        "relationships": sum(len(rows) for rows in relationships.values()),
+        "skipped_relationships": skipped,
+        "transactions": len(transactions),
+    }
+    return list(nodes), transactions, stats
+
+
+def _name_index_statement(label: str) -> str:
+    return f"CREATE INDEX {label.lower()}_name IF NOT EXISTS FOR (n:{label}) ON (n.name)"
+
+
+def _fallback_search_query(labels: List[str] = None) -> str:
+    label_filter = ":Disease|Symptom|Drug|Sign|Condition"
+    if labels:
+        label_filter = ":" + "|".join(labels)
+    return f"""
+    MATCH (n{label_filter})
+    WHERE toLower(n.name) CONTAINS toLower($query)
+       OR toLower(n.description) CONTAINS toLower($query)
+    RETURN n.name AS name, labels(n) AS labels,
+           n.description AS description, 1.0 AS score
+    LIMIT $limit
+    """
+
+
+SEARCH_ENTITIES_QUERY = """
+CALL db.index.fulltext.queryNodes('entity_search', $query)
+YIELD node, score
+WHERE score > 0.5
+RETURN node.name AS name, labels(node) AS labels, 
+       node.description AS description, score
+ORDER BY score DESC
+LIMIT $limit
+"""
+
+SYMPTOM_DISEASES_QUERY = """
+MATCH (s:Symptom {name: $symptom})-[:INDICATES]->(d:Disease)
+RETURN d.name AS disease, d.description AS description,
+       d.severity AS severity
+LIMIT $limit
+"""
+
+DISEASE_DETAILS_QUERY = """
+MATCH (d:Disease {name: $disease})
+OPTIONAL MATCH (d)<-[:INDICATES]-(s:Symptom)
+OPTIONAL MATCH (d)<-[:TREATS]-(drug:Drug)
+OPTIONAL MATCH (d)-[:RED_FLAG_FOR]->(rf:RedFlag)
+OPTIONAL MATCH (d)-[:REQUIRES_URGENCY]->(t:TriageLevel)
+RETURN d.name AS disease,
+       d.description AS description,
+       d.severity AS severity,
+       collect(DISTINCT s.name) AS symptoms,
+       collect(DISTINCT drug.name) AS treatments,
+       collect(DISTINCT rf.name) AS red_flags,
+       t.level AS triage_level
+"""
+
+RED_FLAGS_QUERY = """
+MATCH (s:Symptom)-[:RED_FLAG_FOR]->(rf:RedFlag)
+WHERE toLower(s.name) CONTAINS toLower($symptom)
+RETURN rf.name AS red_flag
+UNION
+MATCH (s:Symptom)-[:INDICATES]->(d:Disease)-[:HAS_RED_FLAG]->(rf:RedFlag)
+WHERE toLower(s.name) CONTAINS toLower($symptom)
+RETURN rf.name AS red_flag
+"""
+
+RED_FLAGS_DETAILED_QUERY = """
+UNWIND $symptoms AS symptom_name
+MATCH (s:Symptom {name: symptom_name})-[:RED_FLAG_FOR]->(rf:RedFlag)
+RETURN rf.name AS red_flag, rf.severity AS severity,
+       rf.requires_immediate_action AS immediate,
+       collect(s.name) AS related_symptoms
+"""
+
+RELATED_ENTITIES_QUERY = """
+MATCH (n {name: $name})-[r]-(related)
+RETURN related.name AS name, 
+       labels(related) AS labels,
+       type(r) AS relationship,
+       related.description AS description,
+       properties(related) AS properties
+LIMIT $limit
+"""
+
+DRUG_INTERACTION_QUERY = """
+MATCH (d1:Drug)-[r:INTERACTS_WITH]-(d2:Drug)
+WHERE toLower(d1.name) CONTAINS toLower($drug1)
+  AND toLower(d2.name) CONTAINS toLower($drug2)
+RETURN d1.name AS drug1, d2.name AS drug2,
+       r.severity AS severity, r.description AS description,
+       r.contraindicated AS contraindicated
+LIMIT 1
+"""
+
+CONTEXT_CHUNKS_QUERY = """
+CALL db.index.fulltext.queryNodes('entity_search', $query)
+YIELD node
+MATCH (node)-[:MENTIONED_IN]->(c:Chunk)
+RETURN c.text AS text, c.source AS source
+LIMIT 5
+"""
+
+NODE_COUNTS_APOC_QUERY = """
+CALL db.labels() YIELD label
+CALL apoc.cypher.run('MATCH (n:`' + label + '`) RETURN count(n) as count', {})
+YIELD value
+RETURN label, value.count AS count
+"""
+
+NODE_COUNTS_QUERY = "MATCH (n) RETURN labels(n)[0] AS label, count(*) AS count"
+
+RELATIONSHIP_COUNTS_QUERY = """
+MATCH ()-[r]->()
+RETURN type(r) AS type, count(*) AS count
+"""
+
+
+def _symptom_context(entity_name: str, diseases: List[Dict[str, Any]], red_flags: List[str]) -> List[str]:
+    parts = []
+    if diseases:
+        disease_list = ", ".join([d["disease"] for d in diseases])
+        parts.append(f"Symptom '{entity_name}' may indicate: {disease_list}")
+    if red_flags:
+        parts.append(f"Red flags for '{entity_name}': {', '.join(red_flags)}")
+    return parts
+
+
+def _disease_context(entity_name: str, details: Dict[str, Any]) -> str:
+    return (
+        f"Disease: {entity_name}\n"
+        f"  Symptoms: {', '.join(details.get('symptoms', []))}\n"
+        f"  Treatments: {', '.join(details.get('treatments', []))}\n"
+        f"  Red flags: {', '.join(details.get('red_flags', []))}\n"
+        f"  Triage level: {details.get('triage_level', 'Unknown')}"
+    )
+
+
 class Neo4jClient:
     """
     Neo4j database client for GraphRAG operations.
@@ -80,7 +364,9 @@ class Neo4jClient:
         uri: str = None,
         user: str = None,
         password: str = None,
-        database: str = "neo4j"
+        database: str = "neo4j",
+        write_batch_size: int = None,
+        write_retries: int = None
     ):
         if not NEO4J_AVAILABLE:
             raise ImportError("neo4j package not installed. Run: pip install neo4j")
@@ -89,35 +375,35 @@ class Neo4jClient:
         self.user = user or os.getenv("NEO4J_USER", "neo4j")
         self.password = password or os.getenv("NEO4J_PASSWORD", "clinixai_neo4j_password")
         self.database = database
+        self.write_batch_size = write_batch_size or int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "1000"))
+        self.write_retries = write_retries if write_retries is not None else int(os.getenv("NEO4J_WRITE_RETRIES", "3"))
         
         self._driver: Optional[Driver] = None
+        self._indexed_labels = set(CONSTRAINED_LABELS)
         
     def connect(self) -> bool:
-        """Establish connection to Neo4j"""
+        """Establish connection to Neo4j (shared driver from neo4j_drivers)"""
         try:
-            self._driver = GraphDatabase.driver(
-                self.uri,
-                auth=(self.user, self.password)
-            )
+            if self._driver is None:
+                self._driver = neo4j_drivers.acquire(self.uri, self.user, self.password)
             # Verify connection
             self._driver.verify_connectivity()
             logger.info(f"Connected to Neo4j at {self.uri}")
             return True
         except ServiceUnavailable as e:
             logger.error(f"Neo4j service unavailable: {e}")
-            return False
         except AuthError as e:
             logger.error(f"Neo4j authentication failed: {e}")
-            return False
         except Exception as e:
             logger.error(f"Neo4j connection error: {e}")
-            return False
+        self.close()
+        return False
     
     def close(self):
-        """Close the database connection"""
+        """Release this client's reference to the shared driver"""
         if self._driver:
-            self._driver.close()
             self._driver = None
+            neo4j_drivers.release(self.uri, self.user)
             logger.info("Neo4j connection closed")
     
     @contextmanager
@@ -137,10 +423,9 @@ class Neo4jClient:
         query: str, 
         parameters: Dict[str, Any] = None
     ) -> List[Dict[str, Any]]:
-        """Execute a Cypher query and return results"""
+        """Execute a read-only Cypher query in a managed read transaction (use execute_write for writes)"""
         with self.session() as session:
-            result = session.run(query, parameters or {})
-            return [dict(record) for record in result]
+            return session.execute_read(neo4j_drivers.read_records, query, parameters or {})
     
     def execute_write(
         self,
@@ -156,26 +441,10 @@ class Neo4jClient:
     
     # ==================== SCHEMA SETUP ====================
     
+    @track_neo4j_query
     def setup_schema(self):
         """Create indexes and constraints for optimal performance"""
-        constraints = [
-            # Unique constraints for main entities
-            "CREATE CONSTRAINT disease_name IF NOT EXISTS FOR (d:Disease) REQUIRE d.name IS UNIQUE",
-            "CREATE CONSTRAINT symptom_name IF NOT EXISTS FOR (s:Symptom) REQUIRE s.name IS UNIQUE",
-            "CREATE CONSTRAINT drug_name IF NOT EXISTS FOR (d:Drug) REQUIRE d.name IS UNIQUE",
-            "CREATE CONSTRAINT red_flag_name IF NOT EXISTS FOR (r:RedFlag) REQUIRE r.name IS UNIQUE",
-            
-            # Index for full-text search
-            "CREATE FULLTEXT INDEX entity_search IF NOT EXISTS FOR (n:Disease|Symptom|Drug|Sign|Condition) ON EACH [n.name, n.description]",
-            
-            # Index for document chunks
-            "CREATE INDEX chunk_doc_id IF NOT EXISTS FOR (c:Chunk) ON (c.document_id)",
-            
-            # Index for triage levels
-            "CREATE INDEX triage_level IF NOT EXISTS FOR (t:TriageLevel) ON (t.level)",
-        ]
-        
-        for constraint in constraints:
+        for constraint in SCHEMA_STATEMENTS:
             try:
                 self.execute_write(constraint)
                 logger.info(f"Created: {constraint[:50]}...")
@@ -196,67 +465,56 @@ class Neo4jClient:
             graph_doc: The graph document containing nodes and relationships
             include_source: Whether to create source links to document chunks
         """
-        with self.session() as session:
-            # Create nodes
-            for node in graph_doc.nodes:
-                query = f"""
-                MERGE (n:{node.label} {{name: $name}})
-                SET n += $properties
-                RETURN n
-                """
-                params = {
-                    "name": node.properties.get("name", node.id),
-                    "properties": node.properties
-                }
-                session.run(query, params)
-            
-            # Create relationships
-            for rel in graph_doc.relationships:
-                # Find source and target nodes
-                query = f"""
-                MATCH (source {{name: $source_name}})
-                MATCH (target {{name: $target_name}})
-                MERGE (source)-[r:{rel.type}]->(target)
-                SET r += $properties
-                RETURN r
-                """
-                params = {
-                    "source_name": rel.source_id,
-                    "target_name": rel.target_id,
-                    "properties": rel.properties
-                }
-                session.run(query, params)
-            
-            # Create source chunk link if specified
-            if include_source and graph_doc.source:
-                chunk_query = """
-                MERGE (c:Chunk {id: $chunk_id})
-                SET c.text = $text, c.source = $source
-                WITH c
-                UNWIND $node_names AS node_name
-                MATCH (n {name: node_name})
-                MERGE (n)-[:MENTIONED_IN]->(c)
-                """
-                params = {
-                    "chunk_id": graph_doc.metadata.get("chunk_id", graph_doc.source[:50]),
-                    "text": graph_doc.metadata.get("text", ""),
-                    "source": graph_doc.source,
-                    "node_names": [n.properties.get("name", n.id) for n in graph_doc.nodes]
-                }
-                session.run(chunk_query, params)
+        return self.add_graph_documents([graph_doc], include_source)
     
+    @track_neo4j_query
     def add_graph_documents(
         self,
         graph_docs: List[GraphDocument],
-        include_source: bool = True
-    ):
-        """Add multiple graph documents"""
-        for doc in graph_docs:
-            self.add_graph_document(doc, include_source)
-        logger.info(f"Added {len(graph_docs)} graph documents to Neo4j")
+        include_source: bool = True,
+        batch_size: int = None
+    ) -> Dict[str, int]:
+        """
+        Add many GraphDocuments with grouped UNWIND writes (see
+        plan_graph_writes), one managed transaction per ~batch_size rows,
+        each retried on transient errors.
+        """
+        labels, transactions, stats = plan_graph_writes(
+            graph_docs, include_source, batch_size or self.write_batch_size
+        )
+        self._ensure_name_indexes(labels)
+        for statements in transactions:
+            self._write_with_retry(statements)
+        
+        logger.info(f"Added {len(graph_docs)} graph documents to Neo4j: {stats}")
+        return stats
+    
+    def _ensure_name_indexes(self, labels):
+        """Name index for labels first seen at write time (schema changes need their own transaction)"""
+        for label in set(labels) - self._indexed_labels:
+            self.execute_write(_name_index_statement(label))
+            self._indexed_labels.add(label)
+    
+    def _write_with_retry(self, statements: List[Statement]):
+        """Run statements in one managed write transaction, retrying transient failures"""
+        def work(tx):
+            for query, rows in statements:
+                tx.run(query, rows=rows).consume()
+        
+        for attempt in range(self.write_retries + 1):
+            try:
+                with self.session() as session:
+                    return session.execute_write(work)
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.write_retries:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                logger.warning(f"Transient Neo4j write error, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
     
     # ==================== RAG QUERIES ====================
     
+    @track_neo4j_query
     def search_entities(
         self,
         query: str,
@@ -274,19 +532,8 @@ class Neo4jClient:
         Returns:
             List of matching entities with scores
         """
-        # Use full-text index if available
-        cypher = """
-        CALL db.index.fulltext.queryNodes('entity_search', $query)
-        YIELD node, score
-        WHERE score > 0.5
-        RETURN node.name AS name, labels(node) AS labels, 
-               node.description AS description, score
-        ORDER BY score DESC
-        LIMIT $limit
-        """
-        
         try:
-            results = self.execute_query(cypher, {"query": query, "limit": limit})
+            results = self.execute_query(SEARCH_ENTITIES_QUERY, {"query": query, "limit": limit})
             
             # Filter by labels if specified
             if labels:
@@ -297,6 +544,7 @@ class Neo4jClient:
             logger.warning(f"Full-text search failed, using fallback: {e}")
             return self._fallback_search(query, labels, limit)
     
+    @track_neo4j_query
     def _fallback_search(
         self,
         query: str,
@@ -304,122 +552,63 @@ class Neo4jClient:
         limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Fallback search using CONTAINS"""
-        label_filter = ":Disease|Symptom|Drug|Sign|Condition"
-        if labels:
-            label_filter = ":" + "|".join(labels)
-        
-        cypher = f"""
-        MATCH (n{label_filter})
-        WHERE toLower(n.name) CONTAINS toLower($query)
-           OR toLower(n.description) CONTAINS toLower($query)
-        RETURN n.name AS name, labels(n) AS labels,
-               n.description AS description, 1.0 AS score
-        LIMIT $limit
-        """
-        return self.execute_query(cypher, {"query": query, "limit": limit})
+        return self.execute_query(_fallback_search_query(labels), {"query": query, "limit": limit})
     
+    @track_neo4j_query
     def get_symptom_diseases(
         self,
         symptom_name: str,
         limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Get diseases associated with a symptom"""
-        cypher = """
-        MATCH (s:Symptom {name: $symptom})-[:INDICATES]->(d:Disease)
-        RETURN d.name AS disease, d.description AS description,
-               d.severity AS severity
-        LIMIT $limit
-        """
-        return self.execute_query(cypher, {"symptom": symptom_name, "limit": limit})
+        return self.execute_query(SYMPTOM_DISEASES_QUERY, {"symptom": symptom_name, "limit": limit})
     
+    @track_neo4j_query
     def get_disease_details(
         self,
         disease_name: str
     ) -> Dict[str, Any]:
         """Get comprehensive information about a disease"""
-        cypher = """
-        MATCH (d:Disease {name: $disease})
-        OPTIONAL MATCH (d)<-[:INDICATES]-(s:Symptom)
-        OPTIONAL MATCH (d)<-[:TREATS]-(drug:Drug)
-        OPTIONAL MATCH (d)-[:RED_FLAG_FOR]->(rf:RedFlag)
-        OPTIONAL MATCH (d)-[:REQUIRES_URGENCY]->(t:TriageLevel)
-        RETURN d.name AS disease,
-               d.description AS description,
-               d.severity AS severity,
-               collect(DISTINCT s.name) AS symptoms,
-               collect(DISTINCT drug.name) AS treatments,
-               collect(DISTINCT rf.name) AS red_flags,
-               t.level AS triage_level
-        """
-        results = self.execute_query(cypher, {"disease": disease_name})
+        results = self.execute_query(DISEASE_DETAILS_QUERY, {"disease": disease_name})
         return results[0] if results else {}
     
+    @track_neo4j_query
     def get_red_flags(
         self,
         symptom: str
     ) -> List[str]:
         """Get red flags associated with a symptom (returns list of flag names)"""
-        cypher = """
-        MATCH (s:Symptom)-[:RED_FLAG_FOR]->(rf:RedFlag)
-        WHERE toLower(s.name) CONTAINS toLower($symptom)
-        RETURN rf.name AS red_flag
-        UNION
-        MATCH (s:Symptom)-[:INDICATES]->(d:Disease)-[:HAS_RED_FLAG]->(rf:RedFlag)
-        WHERE toLower(s.name) CONTAINS toLower($symptom)
-        RETURN rf.name AS red_flag
-        """
-        results = self.execute_query(cypher, {"symptom": symptom})
+        results = self.execute_query(RED_FLAGS_QUERY, {"symptom": symptom})
         return [r["red_flag"] for r in results if r.get("red_flag")]
     
+    @track_neo4j_query
     def get_red_flags_detailed(
         self,
         symptoms: List[str]
     ) -> List[Dict[str, Any]]:
         """Get red flags associated with given symptoms (detailed)"""
-        cypher = """
-        UNWIND $symptoms AS symptom_name
-        MATCH (s:Symptom {name: symptom_name})-[:RED_FLAG_FOR]->(rf:RedFlag)
-        RETURN rf.name AS red_flag, rf.severity AS severity,
-               rf.requires_immediate_action AS immediate,
-               collect(s.name) AS related_symptoms
-        """
-        return self.execute_query(cypher, {"symptoms": symptoms})
+        return self.execute_query(RED_FLAGS_DETAILED_QUERY, {"symptoms": symptoms})
     
+    @track_neo4j_query
     def get_related_entities(
         self,
         entity_name: str,
         limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Get entities related to the given entity"""
-        cypher = """
-        MATCH (n {name: $name})-[r]-(related)
-        RETURN related.name AS name, 
-               labels(related) AS labels,
-               type(r) AS relationship,
-               related.description AS description,
-               properties(related) AS properties
-        LIMIT $limit
-        """
-        return self.execute_query(cypher, {"name": entity_name, "limit": limit})
+        return self.execute_query(RELATED_ENTITIES_QUERY, {"name": entity_name, "limit": limit})
     
+    @track_neo4j_query
     def get_drug_interaction(
         self,
         drug1: str,
         drug2: str
     ) -> Optional[Dict[str, Any]]:
         """Get interaction between two drugs"""
-        cypher = """
-        MATCH (d1:Drug)-[r:INTERACTS_WITH]-(d2:Drug)
-        WHERE toLower(d1.name) CONTAINS toLower($drug1)
-          AND toLower(d2.name) CONTAINS toLower($drug2)
-        RETURN d1.name AS drug1, d2.name AS drug2,
-               r.severity AS severity, r.description AS description,
-               r.contraindicated AS contraindicated
-        LIMIT 1
-        """
-        results = self.execute_query(cypher, {"drug1": drug1, "drug2": drug2})
+        results = self.execute_query(DRUG_INTERACTION_QUERY, {"drug1": drug1, "drug2": drug2})
         return results[0] if results else None
     
+    @track_neo4j_query
     def get_rag_context(
         self,
         query: str,
@@ -455,44 +644,20 @@ class Neo4jClient:
             
             # Get connected information based on entity type
             if "Symptom" in labels:
-                # Get diseases this symptom indicates
-                diseases = self.get_symptom_diseases(entity_name, limit=5)
-                if diseases:
-                    disease_list = ", ".join([d["disease"] for d in diseases])
-                    context_parts.append(
-                        f"Symptom '{entity_name}' may indicate: {disease_list}"
-                    )
-                
-                # Get red flags
-                red_flags = self.get_red_flags([entity_name])
-                if red_flags:
-                    rf_list = ", ".join([r["red_flag"] for r in red_flags])
-                    context_parts.append(
-                        f"Red flags for '{entity_name}': {rf_list}"
-                    )
+                context_parts.extend(_symptom_context(
+                    entity_name,
+                    self.get_symptom_diseases(entity_name, limit=5),
+                    self.get_red_flags(entity_name)
+                ))
             
             elif "Disease" in labels:
                 details = self.get_disease_details(entity_name)
                 if details:
-                    context_parts.append(
-                        f"Disease: {entity_name}\n"
-                        f"  Symptoms: {', '.join(details.get('symptoms', []))}\n"
-                        f"  Treatments: {', '.join(details.get('treatments', []))}\n"
-                        f"  Red flags: {', '.join(details.get('red_flags', []))}\n"
-                        f"  Triage level: {details.get('triage_level', 'Unknown')}"
-                    )
+                    context_parts.append(_disease_context(entity_name, details))
         
         # Step 3: Get source chunks for additional context
-        chunk_cypher = """
-        CALL db.index.fulltext.queryNodes('entity_search', $query)
-        YIELD node
-        MATCH (node)-[:MENTIONED_IN]->(c:Chunk)
-        RETURN c.text AS text, c.source AS source
-        LIMIT 5
-        """
-        
         try:
-            chunks = self.execute_query(chunk_cypher, {"query": query})
+            chunks = self.execute_query(CONTEXT_CHUNKS_QUERY, {"query": query})
             for chunk in chunks:
                 if chunk.get("text"):
                     context_parts.append(f"From {chunk.get('source', 'knowledge base')}:\n{chunk['text']}")
@@ -503,33 +668,21 @@ class Neo4jClient:
     
     # ==================== STATISTICS ====================
     
+    @track_neo4j_query
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         stats = {}
         
         # Node counts by label
-        node_query = """
-        CALL db.labels() YIELD label
-        CALL apoc.cypher.run('MATCH (n:`' + label + '`) RETURN count(n) as count', {})
-        YIELD value
-        RETURN label, value.count AS count
-        """
-        
         try:
-            results = self.execute_query(node_query)
-            stats["nodes"] = {r["label"]: r["count"] for r in results}
+            results = self.execute_query(NODE_COUNTS_APOC_QUERY)
         except Exception:
             # APOC not available, use simple count
-            simple_query = "MATCH (n) RETURN labels(n)[0] AS label, count(*) AS count"
-            results = self.execute_query(simple_query)
-            stats["nodes"] = {r["label"]: r["count"] for r in results}
+            results = self.execute_query(NODE_COUNTS_QUERY)
+        stats["nodes"] = {r["label"]: r["count"] for r in results}
         
         # Relationship counts
-        rel_query = """
-        MATCH ()-[r]->()
-        RETURN type(r) AS type, count(*) AS count
-        """
-        results = self.execute_query(rel_query)
+        results = self.execute_query(RELATIONSHIP_COUNTS_QUERY)
         stats["relationships"] = {r["type"]: r["count"] for r in results}
         
         # Total counts
@@ -538,6 +691,7 @@ class Neo4jClient:
         
         return stats
     
+    @track_neo4j_query
     def clear_database(self, confirm: bool = False):
         """Clear all data from the database (use with caution!)"""
         if not confirm:
@@ -545,3 +699,312 @@ class Neo4jClient:
         
         self.execute_write("MATCH (n) DETACH DELETE n")
         logger.warning("Database cleared!")
+
+
+class AsyncNeo4jClient:
+    """
+    Neo4jClient on the async driver: the same methods as coroutines, with
+    sessions drawn from the AsyncGraphDatabase pool so callers on the event
+    loop never block on Bolt I/O.
+    
+    Usage:
+        client = AsyncNeo4jClient()
+        await client.connect()
+        context = await client.get_rag_context("chest pain")
+    """
+    
+    def __init__(
+        self,
+        uri: str = None,
+        user: str = None,
+        password: str = None,
+        database: str = "neo4j",
+        write_batch_size: int = None,
+        write_retries: int = None
+    ):
+        if not NEO4J_AVAILABLE:
+            raise ImportError("neo4j package not installed. Run: pip install neo4j")
+        
+        self.uri = uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+        self.user = user or os.getenv("NEO4J_USER", "neo4j")
+        self.password = password or os.getenv("NEO4J_PASSWORD", "clinixai_neo4j_password")
+        self.database = database
+        self.write_batch_size = write_batch_size or int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "1000"))
+        self.write_retries = write_retries if write_retries is not None else int(os.getenv("NEO4J_WRITE_RETRIES", "3"))
+        
+        self._driver = None
+        self._indexed_labels = set(CONSTRAINED_LABELS)
+    
+    async def connect(self) -> bool:
+        """Establish connection to Neo4j (shared driver from neo4j_drivers)"""
+        try:
+            if self._driver is None:
+                self._driver = await neo4j_drivers.acquire_async(self.uri, self.user, self.password)
+            await self._driver.verify_connectivity()
+            logger.info(f"Connected to Neo4j at {self.uri} (async)")
+            return True
+        except ServiceUnavailable as e:
+            logger.error(f"Neo4j service unavailable: {e}")
+        except AuthError as e:
+            logger.error(f"Neo4j authentication failed: {e}")
+        except Exception as e:
+            logger.error(f"Neo4j connection error: {e}")
+        await self.close()
+        return False
+    
+    async def close(self):
+        """Release this client's reference to the shared driver"""
+        if self._driver:
+            self._driver = None
+            await neo4j_drivers.release_async(self.uri, self.user)
+            logger.info("Neo4j async connection closed")
+    
+    @asynccontextmanager
+    async def session(self):
+        """Get an async database session"""
+        if not self._driver:
+            await self.connect()
+        
+        session = self._driver.session(database=self.database)
+        try:
+            yield session
+        finally:
+            await session.close()
+    
+    async def execute_query(
+        self,
+        query: str,
+        parameters: Dict[str, Any] = None
+    ) -> List[Dict[str, Any]]:
+        """Execute a read-only Cypher query in a managed read transaction (use execute_write for writes)"""
+        async with self.session() as session:
+            return await session.execute_read(neo4j_drivers.read_records_async, query, parameters or {})
+    
+    async def execute_write(
+        self,
+        query: str,
+        parameters: Dict[str, Any] = None
+    ) -> Any:
+        """Execute a write transaction"""
+        async def work(tx):
+            result = await tx.run(query, parameters or {})
+            return await result.consume()
+        
+        async with self.session() as session:
+            return await session.execute_write(work)
+    
+    # ==================== SCHEMA SETUP ====================
+    
+    @track_neo4j_query
+    async def setup_schema(self):
+        """Create indexes and constraints for optimal performance"""
+        for constraint in SCHEMA_STATEMENTS:
+            try:
+                await self.execute_write(constraint)
+            except Exception as e:
+                logger.debug(f"Schema element may already exist: {e}")
+    
+    # ==================== GRAPH INGESTION ====================
+    
+    async def add_graph_document(
+        self,
+        graph_doc: GraphDocument,
+        include_source: bool = True
+    ):
+        """Add a GraphDocument to Neo4j"""
+        return await self.add_graph_documents([graph_doc], include_source)
+    
+    @track_neo4j_query
+    async def add_graph_documents(
+        self,
+        graph_docs: List[GraphDocument],
+        include_source: bool = True,
+        batch_size: int = None
+    ) -> Dict[str, int]:
+        """Add many GraphDocuments with grouped UNWIND writes (see plan_graph_writes)"""
+        labels, transactions, stats = plan_graph_writes(
+            graph_docs, include_source, batch_size or self.write_batch_size
+        )
+        for label in set(labels) - self._indexed_labels:
+            await self.execute_write(_name_index_statement(label))
+            self._indexed_labels.add(label)
+        for statements in transactions:
+            await self._write_with_retry(statements)
+        
+        logger.info(f"Added {len(graph_docs)} graph documents to Neo4j: {stats}")
+        return stats
+    
+    async def _write_with_retry(self, statements: List[Statement]):
+        """Run statements in one managed write transaction, retrying transient failures"""
+        async def work(tx):
+            for query, rows in statements:
+                result = await tx.run(query, rows=rows)
+                await result.consume()
+        
+        for attempt in range(self.write_retries + 1):
+            try:
+                async with self.session() as session:
+                    return await session.execute_write(work)
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.write_retries:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                logger.warning(f"Transient Neo4j write error, retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+    
+    # ==================== RAG QUERIES ====================
+    
+    @track_neo4j_query
+    async def search_entities(
+        self,
+        query: str,
+        labels: List[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Full-text search for entities matching a query"""
+        try:
+            results = await self.execute_query(SEARCH_ENTITIES_QUERY, {"query": query, "limit": limit})
+            if labels:
+                results = [r for r in results if any(l in r["labels"] for l in labels)]
+            return results
+        except Exception as e:
+            logger.warning(f"Full-text search failed, using fallback: {e}")
+            return await self._fallback_search(query, labels, limit)
+    
+    @track_neo4j_query
+    async def _fallback_search(
+        self,
+        query: str,
+        labels: List[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Fallback search using CONTAINS"""
+        return await self.execute_query(_fallback_search_query(labels), {"query": query, "limit": limit})
+    
+    @track_neo4j_query
+    async def get_symptom_diseases(
+        self,
+        symptom_name: str,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Get diseases associated with a symptom"""
+        return await self.execute_query(SYMPTOM_DISEASES_QUERY, {"symptom": symptom_name, "limit": limit})
+    
+    @track_neo4j_query
+    async def get_disease_details(
+        self,
+        disease_name: str
+    ) -> Dict[str, Any]:
+        """Get comprehensive information about a disease"""
+        results = await self.execute_query(DISEASE_DETAILS_QUERY, {"disease": disease_name})
+        return results[0] if results else {}
+    
+    @track_neo4j_query
+    async def get_red_flags(
+        self,
+        symptom: str
+    ) -> List[str]:
+        """Get red flags associated with a symptom (returns list of flag names)"""
+        results = await self.execute_query(RED_FLAGS_QUERY, {"symptom": symptom})
+        return [r["red_flag"] for r in results if r.get("red_flag")]
+    
+    @track_neo4j_query
+    async def get_red_flags_detailed(
+        self,
+        symptoms: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Get red flags associated with given symptoms (detailed)"""
+        return await self.execute_query(RED_FLAGS_DETAILED_QUERY, {"symptoms": symptoms})
+    
+    @track_neo4j_query
+    async def get_related_entities(
+        self,
+        entity_name: str,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Get entities related to the given entity"""
+        return await self.execute_query(RELATED_ENTITIES_QUERY, {"name": entity_name, "limit": limit})
+    
+    @track_neo4j_query
+    async def get_drug_interaction(
+        self,
+        drug1: str,
+        drug2: str
+    ) -> Optional[Dict[str, Any]]:
+        """Get interaction between two drugs"""
+        results = await self.execute_query(DRUG_INTERACTION_QUERY, {"drug1": drug1, "drug2": drug2})
+        return results[0] if results else None
+    
+    @track_neo4j_query
+    async def get_rag_context(
+        self,
+        query: str,
+        max_hops: int = 2,
+        limit: int = 20
+    ) -> str:
+        """
+        Get RAG context from the knowledge graph for a query. The per-entity
+        expansions run concurrently on separate pooled sessions.
+        """
+        matches = await self.search_entities(query, limit=5)
+        
+        if not matches:
+            return ""
+        
+        async def expand(match: Dict[str, Any]) -> List[str]:
+            entity_name = match["name"]
+            if "Symptom" in match["labels"]:
+                diseases, red_flags = await asyncio.gather(
+                    self.get_symptom_diseases(entity_name, limit=5),
+                    self.get_red_flags(entity_name)
+                )
+                return _symptom_context(entity_name, diseases, red_flags)
+            if "Disease" in match["labels"]:
+                details = await self.get_disease_details(entity_name)
+                if details:
+                    return [_disease_context(entity_name, details)]
+            return []
+        
+        context_parts = []
+        for parts in await asyncio.gather(*(expand(match) for match in matches)):
+            context_parts.extend(parts)
+        
+        try:
+            chunks = await self.execute_query(CONTEXT_CHUNKS_QUERY, {"query": query})
+            for chunk in chunks:
+                if chunk.get("text"):
+                    context_parts.append(f"From {chunk.get('source', 'knowledge base')}:\n{chunk['text']}")
+        except Exception:
+            pass  # Full-text index may not exist
+        
+        return "\n\n".join(context_parts[:limit])
+    
+    # ==================== STATISTICS ====================
+    
+    @track_neo4j_query
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get database statistics"""
+        stats = {}
+        
+        try:
+            results = await self.execute_query(NODE_COUNTS_APOC_QUERY)
+        except Exception:
+            results = await self.execute_query(NODE_COUNTS_QUERY)
+        stats["nodes"] = {r["label"]: r["count"] for r in results}
+        
+        results = await self.execute_query(RELATIONSHIP_COUNTS_QUERY)
+        stats["relationships"] = {r["type"]: r["count"] for r in results}
+        
+        stats["total_nodes"] = sum(stats.get("nodes", {}).values())
+        stats["total_relationships"] = sum(stats.get("relationships", {}).values())
+        
+        return stats
+    
+    @track_neo4j_query
+    async def clear_database(self, confirm: bool = False):
+        """Clear all data from the database (use with caution!)"""
+        if not confirm:
+            raise ValueError("Must set confirm=True to clear database")
+        
+        await self.execute_write("MATCH (n) DETACH DELETE n")
+        logger.warning("Database cleared!")
@@ -0,0 +1,142 @@
+"""
+Shared Neo4j Drivers for ClinixAI GraphRAG
+==========================================
+One driver per (uri, user) per process, shared by Neo4jClient,
+Neo4jVectorStore and their async counterparts, so GraphRAGService and
+AdvancedRAGService draw from a single connection pool instead of one each.
+
+Clients acquire() a driver in connect() and release() it in close(); the
+driver is closed when its last client releases it. Async drivers are bound
+to the event loop they were created on, so they are registered per loop.
+
+Pool settings (env):
+- NEO4J_MAX_POOL_SIZE: connections per driver (default 50)
+- NEO4J_MAX_CONNECTION_LIFETIME: seconds before a pooled connection is
+  replaced (default 3600; keep below any load balancer idle timeout)
+- NEO4J_CONNECTION_ACQUISITION_TIMEOUT: seconds to wait for a free
+  connection before failing (default 60)
+- NEO4J_CONNECTION_TIMEOUT: seconds to establish a connection (default 30)
+
+Use a neo4j:// URI against a cluster so execute_read routes reads to
+followers/read replicas; bolt:// always talks to the one server.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Tuple
+
+try:
+    from neo4j import GraphDatabase, AsyncGraphDatabase
+    NEO4J_AVAILABLE = True
+except ImportError:
+    NEO4J_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_Key = Tuple[str, str]
+
+_lock = threading.Lock()
+_drivers: Dict[_Key, Any] = {}
+_refcounts: Dict[_Key, int] = {}
+_async_drivers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_Key, Any]]" = weakref.WeakKeyDictionary()
+_async_refcounts: Dict[Tuple[int, str, str], int] = {}
+
+
+def pool_config() -> Dict[str, Any]:
+    """Driver keyword arguments from the NEO4J_* pool settings"""
+    return {
+        "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+        "max_connection_lifetime": float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600")),
+        "connection_acquisition_timeout": float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60")),
+        "connection_timeout": float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "30")),
+    }
+
+
+def acquire(uri: str, user: str, password: str):
+    """Shared sync driver for (uri, user), created on first use"""
+    key = (uri, user)
+    with _lock:
+        driver = _drivers.get(key)
+        if driver is None:
+            driver = GraphDatabase.driver(uri, auth=(user, password), **pool_config())
+            _drivers[key] = driver
+            logger.info(f"Opened Neo4j driver for {uri} ({user})")
+        _refcounts[key] = _refcounts.get(key, 0) + 1
+        return driver
+
+
+def release(uri: str, user: str):
+    """Drop one reference; the last one closes the driver"""
+    key = (uri, user)
+    with _lock:
+        count = _refcounts.get(key, 0) - 1
+        if count > 0:
+            _refcounts[key] = count
+            return
+        _refcounts.pop(key, None)
+        driver = _drivers.pop(key, None)
+    if driver is not None:
+        driver.close()
+        logger.info(f"Closed Neo4j driver for {uri} ({user})")
+
+
+async def acquire_async(uri: str, user: str, password: str):
+    """Shared async driver for (uri, user) on the running event loop"""
+    loop = asyncio.get_running_loop()
+    key = (uri, user)
+    with _lock:
+        drivers = _async_drivers.setdefault(loop, {})
+        driver = drivers.get(key)
+        if driver is None:
+            driver = AsyncGraphDatabase.driver(uri, auth=(user, password), **pool_config())
+            drivers[key] = driver
+            logger.info(f"Opened async Neo4j driver for {uri} ({user})")
+        count_key = (id(loop), uri, user)
+        _async_refcounts[count_key] = _async_refcounts.get(count_key, 0) + 1
+        return driver
+
+
+async def release_async(uri: str, user: str):
+    """Drop one reference to this loop's async driver; the last one closes it"""
+    loop = asyncio.get_running_loop()
+    key = (uri, user)
+    count_key = (id(loop), uri, user)
+    with _lock:
+        count = _async_refcounts.get(count_key, 0) - 1
+        if count > 0:
+            _async_refcounts[count_key] = count
+            return
+        _async_refcounts.pop(count_key, None)
+        driver = _async_drivers.get(loop, {}).pop(key, None)
+    if driver is not None:
+        await driver.close()
+        logger.info(f"Closed async Neo4j driver for {uri} ({user})")
+
+
+def read_records(tx, query: str, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Transaction function for session.execute_read: all records as dicts"""
+    return [dict(record) for record in tx.run(query, parameters)]
+
+
+async def read_records_async(tx, query: str, parameters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Async counterpart of read_records"""
+    result = await tx.run(query, parameters)
+    return [dict(record) async for record in result]
+
+
+def run_write(tx, query: str, parameters: Dict[str, Any]):
+    """Transaction function for session.execute_write: one statement, consumed"""
+    return tx.run(query, parameters).consume()
+
+
+def stats() -> Dict[str, Any]:
+    """Open drivers and their client counts"""
+    with _lock:
+        return {
+            "pool": pool_config(),
+            "drivers": {f"{uri} ({user})": count for (uri, user), count in _refcounts.items()},
+            "async_drivers": sum(len(drivers) for drivers in _async_drivers.values()),
+        }
@@ -0,0 +1,226 @@
+"""
+ONNX Runtime Embedding Backend for ClinixAI GraphRAG
+====================================================
+Runs an exported sentence-transformers model through ONNX Runtime, fp32
+or int8 (dynamic quantization), without importing torch at serve time.
+Runtime dependencies: onnxruntime and tokenizers.
+
+Model directory layout (created by the export command below):
+- model.onnx            : fp32 graph (input_ids, attention_mask[, token_type_ids])
+- model_quantized.onnx  : int8 weights, optional
+- tokenizer.json        : fast tokenizer
+- pooling.json          : {"mode": "mean" | "cls", "max_seq_length": N}
+
+Export (needs torch + transformers once, e.g. in a build stage):
+    python -m graphrag.onnx_embedding \\
+        --model sentence-transformers/all-MiniLM-L6-v2 \\
+        --out models/onnx/all-MiniLM-L6-v2 --int8
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ONNX_ROOT = "models/onnx"
+
+
+def default_model_dir(model_name: str) -> str:
+    """models/onnx/<model basename>, overridable with EMBEDDING_ONNX_PATH"""
+    return os.getenv("EMBEDDING_ONNX_PATH") or str(Path(DEFAULT_ONNX_ROOT) / model_name.split("/")[-1])
+
+
+class _TokenizerAdapter:
+    """Minimal HF-tokenizer call interface used by EmbeddingService.token_lengths"""
+
+    def __init__(self, tokenizer: "Tokenizer"):
+        self._tokenizer = tokenizer
+
+    def __call__(self, texts: List[str], add_special_tokens: bool = True, truncation: bool = False) -> Dict[str, Any]:
+        encodings = self._tokenizer.encode_batch(texts, add_special_tokens=add_special_tokens)
+        return {"input_ids": [e.ids for e in encodings]}
+
+
+class OnnxEmbeddingModel:
+    """
+    Drop-in for the parts of SentenceTransformer that EmbeddingService uses:
+    encode(), tokenizer and max_seq_length.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        intra_op_threads: Optional[int] = None
+    ):
+        if not ONNX_AVAILABLE:
+            raise ImportError("onnxruntime/tokenizers not installed. Run: pip install onnxruntime tokenizers")
+
+        self.model_dir = Path(model_dir)
+        model_file = self.model_dir / ("model_quantized.onnx" if quantized else "model.onnx")
+        if not model_file.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found: {model_file}. Export it with: "
+                f"python -m graphrag.onnx_embedding --out {self.model_dir}{' --int8' if quantized else ''}"
+            )
+        self.quantized = quantized
+
+        pooling_path = self.model_dir / "pooling.json"
+        pooling = json.loads(pooling_path.read_text()) if pooling_path.exists() else {}
+        self.pooling_mode = pooling.get("mode", "mean")
+        self.max_seq_length = int(pooling.get("max_seq_length", 256))
+
+        self._tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        self._tokenizer.no_truncation()
+        self._tokenizer.no_padding()
+        self.tokenizer = _TokenizerAdapter(self._tokenizer)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self._session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self._session.get_inputs()}
+
+        logger.info(f"Loaded ONNX embedding model {model_file} (pooling={self.pooling_mode})")
+
+    def _tokenize(self, texts: List[str]) -> Dict[str, "np.ndarray"]:
+        encodings = self._tokenizer.encode_batch(texts)
+        lengths = [min(len(e.ids), self.max_seq_length) for e in encodings]
+        width = max(lengths)
+
+        input_ids = np.zeros((len(texts), width), dtype=np.int64)
+        attention_mask = np.zeros((len(texts), width), dtype=np.int64)
+        for row, (encoding, length) in enumerate(zip(encodings, lengths)):
+            ids = encoding.ids[:length]
+            if length < len(encoding.ids):
+                # Keep the trailing [SEP] when truncating
+                ids[-1] = encoding.ids[-1]
+            input_ids[row, :length] = ids
+            attention_mask[row, :length] = 1
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        return feeds
+
+    def _pool(self, hidden: "np.ndarray", mask: "np.ndarray") -> "np.ndarray":
+        if self.pooling_mode == "cls":
+            return hidden[:, 0]
+        weights = mask[..., None].astype(np.float32)
+        return (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False
+    ) -> "np.ndarray":
+        """Embed texts; mirrors SentenceTransformer.encode for the arguments we use"""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Length-sort so each ONNX call pads to a similar width
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out: Optional["np.ndarray"] = None
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            feeds = self._tokenize([texts[i] for i in indices])
+            hidden = self._session.run(None, feeds)[0]
+            pooled = self._pool(hidden, feeds["attention_mask"]).astype(np.float32)
+            if out is None:
+                out = np.empty((len(texts), pooled.shape[1]), dtype=np.float32)
+            out[indices] = pooled
+
+        if normalize_embeddings:
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out
+
+
+# ==================== EXPORT ====================
+
+def export_onnx(model_name: str, out_dir: str, int8: bool = False, opset: int = 17) -> Path:
+    """
+    Export a sentence-transformers model to ONNX (and optionally int8).
+    Build-time only: requires sentence-transformers/torch.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    hf_tokenizer = st_model.tokenizer
+    hf_tokenizer.save_pretrained(str(out))
+
+    pooling = "mean"
+    for module in st_model:
+        if type(module).__name__ == "Pooling" and getattr(module, "pooling_mode_cls_token", False):
+            pooling = "cls"
+    (out / "pooling.json").write_text(json.dumps({
+        "mode": pooling,
+        "max_seq_length": st_model.max_seq_length,
+        "source_model": model_name,
+    }, indent=2))
+
+    sample = hf_tokenizer(["ClinixAI export sample"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class _HiddenStates(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    model_path = out / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            _HiddenStates(transformer),
+            tuple(sample[n] for n in input_names),
+            str(model_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    logger.info(f"Exported {model_name} to {model_path}")
+
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(model_path), str(out / "model_quantized.onnx"), weight_type=QuantType.QInt8)
+        logger.info(f"Wrote int8 model to {out / 'model_quantized.onnx'}")
+
+    return out
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Export an embedding model to ONNX")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--out", default=None, help="Defaults to models/onnx/<model basename>")
+    parser.add_argument("--int8", action="store_true", help="Also write a dynamically quantized int8 model")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    export_onnx(args.model, args.out or default_model_dir(args.model), int8=args.int8, opset=args.opset)
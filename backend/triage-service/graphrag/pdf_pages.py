@@ -0,0 +1,130 @@
+"""
+Page-Streaming PDF Loader for ClinixAI GraphRAG
+===============================================
+Extracts PDF text page by page and yields PdfPage(number, text) in page
+order, so ingestion can chunk and embed the first pages while later ones
+are still being parsed.
+
+pypdf text extraction is CPU-bound Python, so PdfPagePool runs it on a
+process pool: each worker opens the file once and keeps its reader for
+the following pages. At most max_in_flight pages are outstanding, which
+bounds peak memory to a window of pages instead of the whole book.
+
+RAG_PDF_PROCESSES sets the pool size used by the RAG services
+(0 = extract in-process).
+"""
+
+import os
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+try:
+    from pypdf import PdfReader
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PdfPage:
+    """Extracted text of one page"""
+    number: int  # 1-based
+    text: str
+
+
+# Per-process reader for the file currently being extracted
+_worker_reader: Optional[Tuple[Tuple[str, float], "PdfReader"]] = None
+
+
+def _extract_page(path: str, index: int) -> str:
+    global _worker_reader
+
+    key = (path, os.path.getmtime(path))
+    if _worker_reader is None or _worker_reader[0] != key:
+        _worker_reader = (key, PdfReader(path))
+    return _worker_reader[1].pages[index].extract_text() or ""
+
+
+def _require_pypdf():
+    if not PDF_AVAILABLE:
+        raise ImportError("pypdf not installed. Run: pip install pypdf")
+
+
+def page_count(path: str) -> int:
+    """Number of pages (reads the page tree only, not page content)"""
+    _require_pypdf()
+    return len(PdfReader(path).pages)
+
+
+class PdfPagePool:
+    """
+    Process pool extracting PDF pages, yielded in page order.
+
+    Usage:
+        with PdfPagePool(processes=4) as pool:
+            for page in pool.iter_pages("handbook.pdf"):
+                ...
+    """
+
+    def __init__(self, processes: Optional[int] = None, max_in_flight: Optional[int] = None):
+        _require_pypdf()
+        self.processes = max(1, processes or os.cpu_count() or 1)
+        self.max_in_flight = max_in_flight or self.processes * 2
+
+        # spawn, like EmbeddingPool: forking a process with torch threads can deadlock
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"PDF page pool: {self.processes} workers")
+
+    def iter_pages(self, path: str) -> Iterator[PdfPage]:
+        """Non-empty pages of path in order, extracted across workers"""
+        path = os.path.abspath(path)
+        total = page_count(path)
+        pending: "deque[Tuple[int, Future]]" = deque()
+        try:
+            for index in range(total):
+                pending.append((index, self._executor.submit(_extract_page, path, index)))
+                if len(pending) >= self.max_in_flight:
+                    index, future = pending.popleft()
+                    text = future.result()
+                    if text:
+                        yield PdfPage(index + 1, text)
+            while pending:
+                index, future = pending.popleft()
+                text = future.result()
+                if text:
+                    yield PdfPage(index + 1, text)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "PdfPagePool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_pdf_pages(path: str, pool: Optional[PdfPagePool] = None) -> Iterator[PdfPage]:
+    """Non-empty pages of a PDF in order, on the pool when given"""
+    _require_pypdf()
+    if pool is not None:
+        yield from pool.iter_pages(path)
+        return
+
+    reader = PdfReader(path)
+    for index, page in enumerate(reader.pages):
+        text = page.extract_text()
+        if text:
+            yield PdfPage(index + 1, text)
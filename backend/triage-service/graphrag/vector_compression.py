@@ -0,0 +1,181 @@
+"""
+Embedding Compression for ClinixAI GraphRAG
+===========================================
+Optional per-index compression of chunk embeddings:
+
+- Dimension reduction: PCA fitted on the corpus, or Matryoshka truncation
+  (keep the leading dimensions; best with Matryoshka-trained models)
+- int8 scalar quantization: per-dimension symmetric scales fitted on the
+  corpus. For the Neo4j index this enables native vector quantization and
+  rescoring of an over-fetched candidate set with the float vectors.
+
+All outputs are unit length so cosine similarity stays a dot product.
+Fitted state is saved as .npz next to the other service data.
+
+Configure per index with RAG_VECTOR_<INDEX>_* variables, falling back to
+RAG_VECTOR_*; e.g. RAG_VECTOR_REDUCTION=pca, RAG_VECTOR_DIMS=128,
+RAG_VECTOR_INT8=true, RAG_VECTOR_RESCORE_FACTOR=4.
+"""
+
+import os
+import logging
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REDUCTIONS = ("none", "pca", "matryoshka")
+
+
+@dataclass
+class CompressionConfig:
+    """Compression settings for one vector index"""
+    reduction: str = "none"  # none, pca, matryoshka
+    dims: Optional[int] = None  # target dimension for pca/matryoshka
+    int8: bool = False  # scalar-quantize in the index, rescore with floats
+    rescore_factor: int = 4  # candidates fetched per result when int8
+
+    @property
+    def enabled(self) -> bool:
+        return self.reduction != "none" or self.int8
+
+    @classmethod
+    def from_env(cls, index_name: str = "chunk_embeddings") -> "CompressionConfig":
+        prefix = f"RAG_VECTOR_{index_name.upper()}_"
+
+        def env(name: str, default: str) -> str:
+            return os.getenv(prefix + name, os.getenv("RAG_VECTOR_" + name, default))
+
+        reduction = env("REDUCTION", "none").lower()
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown vector reduction '{reduction}', expected one of {REDUCTIONS}")
+        dims = env("DIMS", "")
+        return cls(
+            reduction=reduction,
+            dims=int(dims) if dims else None,
+            int8=env("INT8", "false").lower() == "true",
+            rescore_factor=int(env("RESCORE_FACTOR", "4")),
+        )
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class VectorCompressor:
+    """Fits and applies a CompressionConfig to unit-length float32 embeddings"""
+
+    def __init__(self, config: CompressionConfig, input_dim: int):
+        if config.reduction != "none" and not config.dims:
+            raise ValueError(f"{config.reduction} reduction needs a target dimension (RAG_VECTOR_DIMS)")
+        if config.dims and config.dims > input_dim:
+            raise ValueError(f"Target dimension {config.dims} exceeds embedding dimension {input_dim}")
+
+        self.config = config
+        self.input_dim = input_dim
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None  # (dims, input_dim)
+        self.scales: Optional[np.ndarray] = None  # per output dimension, for int8
+
+    @property
+    def output_dim(self) -> int:
+        return self.config.dims if self.config.reduction != "none" else self.input_dim
+
+    @property
+    def can_transform(self) -> bool:
+        """False for PCA until fitted (or loaded); int8 scales are not needed to transform"""
+        return self.config.reduction != "pca" or self.components is not None
+
+    @property
+    def needs_fit(self) -> bool:
+        """True while transform() cannot run; int8 scales only serve quantize()"""
+        return not self.can_transform
+
+    @property
+    def min_fit_samples(self) -> int:
+        return self.config.dims if self.config.reduction == "pca" else 1
+
+    def fit(self, matrix: np.ndarray) -> "VectorCompressor":
+        """Fit PCA components and/or int8 scales on a sample of corpus embeddings"""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if self.config.reduction == "pca":
+            if len(matrix) < self.min_fit_samples:
+                raise ValueError(
+                    f"PCA to {self.config.dims} dims needs at least {self.min_fit_samples} samples, got {len(matrix)}"
+                )
+            self.mean = matrix.mean(axis=0)
+            # Rows of vt are principal directions, strongest first
+            _, _, vt = np.linalg.svd(matrix - self.mean, full_matrices=False)
+            self.components = vt[:self.config.dims].astype(np.float32)
+
+        if self.config.int8:
+            reduced = self.transform(matrix)
+            self.scales = np.maximum(np.abs(reduced).max(axis=0), 1e-6).astype(np.float32) / 127.0
+        return self
+
+    def transform(self, matrix: np.ndarray) -> np.ndarray:
+        """Reduce and re-normalize; accepts a single vector or a matrix"""
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if self.config.reduction == "pca":
+            if self.components is None:
+                raise RuntimeError("PCA compressor used before fit()")
+            matrix = (matrix - self.mean) @ self.components.T
+        elif self.config.reduction == "matryoshka":
+            matrix = matrix[..., :self.config.dims]
+        else:
+            return matrix
+        return _normalize(matrix).astype(np.float32)
+
+    def quantize(self, reduced: np.ndarray) -> np.ndarray:
+        """
+        int8 codes for reduced vectors. The Neo4j index quantizes on its own;
+        this mirrors it for benchmarks/vector_compression.py.
+        """
+        return np.clip(np.rint(reduced / self.scales), -127, 127).astype(np.int8)
+
+    def bytes_per_vector(self) -> int:
+        return self.output_dim * (1 if self.config.int8 else 4)
+
+    # ==================== PERSISTENCE ====================
+
+    def save(self, path: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "input_dim": np.array(self.input_dim),
+            "reduction": np.array(self.config.reduction),
+            "dims": np.array(self.config.dims or 0),
+        }
+        for name in ("mean", "components", "scales"):
+            value = getattr(self, name)
+            if value is not None:
+                arrays[name] = value
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, config: CompressionConfig, input_dim: int) -> "VectorCompressor":
+        """
+        Load fitted state if it matches the config; otherwise return an
+        unfitted compressor (the index must then be rebuilt).
+        """
+        compressor = cls(config, input_dim)
+        if not Path(path).exists():
+            return compressor
+        data = np.load(path)
+        if (
+            int(data["input_dim"]) != input_dim
+            or str(data["reduction"]) != config.reduction
+            or int(data["dims"]) != (config.dims or 0)
+        ):
+            logger.warning(f"Ignoring {path}: fitted for a different compression config")
+            return compressor
+        for name in ("mean", "components", "scales"):
+            if name in data:
+                setattr(compressor, name, data[name])
+        return compressor
@@ -0,0 +1,163 @@
+"""
+Out-of-Process Ingestion Worker for ClinixAI GraphRAG
+=====================================================
+Runs the ingestion jobs the API enqueues when RAG_JOB_QUEUE=redis, so
+pypdf parsing, embedding and Neo4j writes happen in this process instead
+of on the API event loop and triage latency is unaffected by bulk
+ingestion.
+
+Jobs are claimed from the Redis queue (job_queue.py) and recorded in the
+shared JobStore (RAG_JOB_DB), which the API reads for GET /rag/jobs/{id}.
+Each worker runs at most RAG_JOB_CONCURRENCY jobs and only claims a job
+when it has a free slot, so several workers share the queue fairly.
+
+Usage (from backend/triage-service):
+    python -m graphrag.worker
+    python -m graphrag.worker --worker-id ingest-1 --concurrency 2
+"""
+
+import os
+import socket
+import signal
+import asyncio
+import logging
+import argparse
+import threading
+from typing import Optional
+
+from .jobs import JobManager, JobStore, register_ingestion_handlers, run_job
+from .job_queue import RedisJobQueue
+
+logger = logging.getLogger(__name__)
+
+
+# Services are created on first use, one per worker process
+_rag_service = None
+_graph_service = None
+_services_lock = threading.Lock()
+
+
+def _get_rag_service():
+    global _rag_service
+    with _services_lock:
+        if _rag_service is None:
+            from .advanced_rag_service import AdvancedRAGService
+            service = AdvancedRAGService()
+            service.initialize()
+            _rag_service = service
+        return _rag_service
+
+
+def _get_graph_service():
+    global _graph_service
+    with _services_lock:
+        if _graph_service is None:
+            from .graph_rag_service import GraphRAGService
+            _graph_service = GraphRAGService(
+                neo4j_uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
+                neo4j_user=os.getenv("NEO4J_USER", "neo4j"),
+                neo4j_password=os.getenv("NEO4J_PASSWORD", "clinixai_neo4j_password"),
+            )
+        return _graph_service
+
+
+class IngestionWorker:
+    """Claims job ids from the queue and runs them with the registered handlers"""
+
+    def __init__(self, manager: JobManager, queue: RedisJobQueue, worker_id: str, poll_seconds: float = 5.0):
+        self.manager = manager
+        self.queue = queue
+        self.worker_id = worker_id
+        self.poll_seconds = poll_seconds
+        self._tasks: set = set()
+        self._main: Optional[asyncio.Task] = None
+
+    def stop(self):
+        """Stop claiming jobs; running ones are cancelled and recovered on restart"""
+        if self._main is not None:
+            self._main.cancel()
+
+    async def run(self):
+        self._main = asyncio.current_task()
+        recovered = await self.queue.recover(self.worker_id)
+        if recovered:
+            logger.info(f"Requeued {len(recovered)} job(s) interrupted on {self.worker_id}")
+        logger.info(f"Ingestion worker {self.worker_id} consuming {self.queue.pending_key}")
+
+        slots = asyncio.Semaphore(self.manager.concurrency)
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    job_id = await self.queue.claim(self.worker_id, timeout=self.poll_seconds)
+                except Exception as e:
+                    slots.release()
+                    logger.warning(f"Job queue unavailable, retrying: {e}")
+                    await asyncio.sleep(self.poll_seconds)
+                    continue
+                if job_id is None:
+                    slots.release()
+                    continue
+                task = asyncio.create_task(self._run(job_id, slots))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, job_id: str, slots: asyncio.Semaphore):
+        try:
+            logger.info(f"Running job {job_id}")
+            await run_job(self.manager.store, self.manager.handlers, job_id)
+            # Only acknowledged when it ran to the end; a crash leaves it to recover()
+            await self.queue.ack(self.worker_id, job_id)
+        finally:
+            slots.release()
+
+
+async def serve(worker_id: str, concurrency: int, poll_seconds: float):
+    queue = RedisJobQueue(os.getenv("REDIS_URL", "redis://localhost:6379"))
+    manager = register_ingestion_handlers(
+        JobManager(JobStore(os.getenv("RAG_JOB_DB", "data/jobs.sqlite")), concurrency=concurrency),
+        _get_rag_service,
+        _get_graph_service,
+    )
+    worker = IngestionWorker(manager, queue, worker_id, poll_seconds)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    except asyncio.CancelledError:
+        logger.info(f"Ingestion worker {worker_id} stopped")
+    finally:
+        await queue.close()
+        manager.store.close()
+        if _rag_service is not None:
+            await _rag_service.close_async()
+        if _graph_service is not None:
+            await _graph_service.close_async()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--worker-id", default=os.getenv("RAG_WORKER_ID") or socket.gethostname(),
+        help="Stable id; a restarted worker requeues the jobs it had claimed"
+    )
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("RAG_JOB_CONCURRENCY", "1")))
+    parser.add_argument("--poll-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    asyncio.run(serve(args.worker_id, args.concurrency, args.poll_seconds))
+
+
+if __name__ == "__main__":
+    main()
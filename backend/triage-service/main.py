@@ -16,14 +16,18 @@ Neo4j GraphRAG for medical knowledge retrieval
 import os
 import json
 import re
+import time
+import asyncio
 import logging
+import threading
 from datetime import datetime
 from typing import Optional, List, Dict, Any, TypedDict, Annotated
 from contextlib import asynccontextmanager
 import operator
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, File, UploadFile
+from fastapi import FastAPI, HTTPException, BackgroundTasks, File, UploadFile, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 import httpx
 
@@ -32,10 +36,48 @@ from langgraph.graph import StateGraph, END
 
 # GraphRAG imports
 from graphrag import GraphRAGService, Neo4jClient, MedicalSchema
+from graphrag.jobs import (
+    FINISHED,
+    GRAPH_INGEST,
+    RAG_INGEST,
+    JobManager,
+    get_job_manager,
+    list_documents,
+    register_ingestion_handlers,
+)
+
+# Online model selection
+from ai.model_selector import (
+    ModelSelector,
+    BAND_CRITICAL,
+    BAND_STANDARD,
+    FEEDBACK_FAILURE,
+    FEEDBACK_SKIP,
+    FEEDBACK_UNAVAILABLE,
+    feedback_for_status,
+    get_model_selector,
+)
+
+# Prometheus metrics
+from metrics import (
+    HTTP_REQUEST_LATENCY,
+    instrument_node,
+    instrument_provider_call,
+    render_metrics,
+    set_provider_model,
+    set_provider_outcome,
+    track_in_flight,
+)
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Provider base URLs (point these at benchmarks.stub_server for offline load tests)
+OPENROUTER_API_BASE = os.getenv("OPENROUTER_API_BASE", "https://openrouter.ai/api/v1")
+HUGGINGFACE_INFERENCE_ENDPOINT = os.getenv("HUGGINGFACE_INFERENCE_ENDPOINT", "https://api-inference.huggingface.co/models")
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+ANTHROPIC_API_BASE = os.getenv("ANTHROPIC_API_BASE", "https://api.anthropic.com/v1")
+
 # ==================== LANGGRAPH STATE ====================
 
 class TriageState(TypedDict):
@@ -105,6 +147,11 @@ def symptom_analyzer_node(state: TriageState) -> TriageState:
         "messages": [f"[SymptomAnalyzer] Complexity: {complexity_score:.2f}, Critical: {detected_critical}"],
     }
 
+def _node_succeeded(state: TriageState) -> bool:
+    """Provider nodes report failure through the state's error field"""
+    return not state.get("error")
+
+@instrument_provider_call("openrouter", succeeded=_node_succeeded)
 async def openrouter_node(state: TriageState) -> TriageState:
     """
     Process with OpenRouter API - Primary inference provider.
@@ -114,13 +161,14 @@ async def openrouter_node(state: TriageState) -> TriageState:
     - Llama 3.1 70B/8B (Meta)
     - Mistral Large, Mixtral (Mistral AI)
     
-    Model selection based on case complexity:
-    - Critical cases: claude-3.5-sonnet or gpt-4o
-    - Standard cases: gpt-4o-mini or llama-3.1-70b
-    - Simple cases: llama-3.1-8b (free tier)
+    Model selection is learned per complexity band (see ai.model_selector):
+    - Critical cases: claude-3.5-sonnet or gpt-4o only (safety floor)
+    - Standard cases: gpt-4o-mini, claude-3.5-sonnet or llama-3.1-70b
+    - Simple cases: llama-3.1-70b, gpt-4o-mini or llama-3.1-8b (free tier)
     """
     api_key = os.getenv("OPENROUTER_API_KEY", "")
     if not api_key or api_key == "your-openrouter-key":
+        set_provider_outcome("not_configured")
         return {
             **state,
             "error": "OpenRouter API key not configured",
@@ -130,16 +178,21 @@ async def openrouter_node(state: TriageState) -> TriageState:
     features = state.get("symptom_features", {})
     complexity = state.get("complexity_score", 0.5)
     
-    # Dynamic model selection based on complexity and criticality
-    if features.get("critical_keywords") or complexity >= 0.9:
-        # Critical cases - use most capable model
-        model = os.getenv("OPENROUTER_CRITICAL_MODEL", "anthropic/claude-3.5-sonnet")
-    elif complexity >= 0.7:
-        # Standard complex cases
-        model = os.getenv("OPENROUTER_DEFAULT_MODEL", "openai/gpt-4o-mini")
+    # Dynamic model selection: band from complexity and criticality, model
+    # from learned latency / parse-success / cost within the band
+    band = ModelSelector.band_for(
+        complexity_score=complexity,
+        critical=bool(features.get("critical_keywords")),
+    )
+    if band == BAND_CRITICAL:
+        default_model = os.getenv("OPENROUTER_CRITICAL_MODEL", "anthropic/claude-3.5-sonnet")
+    elif band == BAND_STANDARD:
+        default_model = os.getenv("OPENROUTER_DEFAULT_MODEL", "openai/gpt-4o-mini")
     else:
-        # Simple cases - use cost-effective model
-        model = os.getenv("OPENROUTER_SIMPLE_MODEL", "meta-llama/llama-3.1-8b-instruct:free")
+        default_model = os.getenv("OPENROUTER_SIMPLE_MODEL", "meta-llama/llama-3.1-8b-instruct:free")
+    selector = get_model_selector()
+    model = selector.select(band, default=default_model)
+    set_provider_model(model)
     
     prompt = f"""You are ClinixAI, a medical triage assistant. Analyze these symptoms and provide a structured assessment.
 
@@ -153,11 +206,15 @@ URGENT INDICATORS: {features.get('urgent_keywords', [])}
 Respond ONLY with valid JSON in this exact format:
 {{"urgency": "critical|urgent|standard|non-urgent", "confidence": 0.0-1.0, "assessment": "Brief clinical assessment", "action": "Recommended action", "conditions": [{{"name": "Possible condition", "probability": 0.0-1.0}}], "red_flags": ["Warning signs if any"]}}"""
 
+    succeeded = False
+    feedback = FEEDBACK_FAILURE
+    response = None
+    usage = None
+    start = datetime.utcnow()
     try:
-        start = datetime.utcnow()
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
+                f"{OPENROUTER_API_BASE}/chat/completions",
                 headers={
                     "Authorization": f"Bearer {api_key}",
                     "Content-Type": "application/json",
@@ -172,6 +229,7 @@ Respond ONLY with valid JSON in this exact format:
                     ],
                     "temperature": 0.3,
                     "max_tokens": 500,
+                    "usage": {"include": True},
                 },
                 timeout=45.0,
             )
@@ -191,6 +249,8 @@ Respond ONLY with valid JSON in this exact format:
                         content = json_match.group()
                 
                 result = json.loads(content)
+                succeeded = True
+                usage = data.get("usage")
                 inference_time = int((datetime.utcnow() - start).total_seconds() * 1000)
                 
                 return {
@@ -207,6 +267,8 @@ Respond ONLY with valid JSON in this exact format:
                     "messages": [f"[OpenRouter] Success with {model} in {inference_time}ms"],
                 }
             else:
+                set_provider_outcome("http_error")
+                feedback = feedback_for_status(response.status_code)
                 error_msg = f"OpenRouter API error: {response.status_code}"
                 return {
                     **state,
@@ -214,22 +276,49 @@ Respond ONLY with valid JSON in this exact format:
                     "messages": [f"[OpenRouter] {error_msg}"],
                 }
     except json.JSONDecodeError as e:
+        set_provider_outcome("parse_error")
         return {
             **state,
             "error": f"Failed to parse OpenRouter response: {str(e)}",
             "messages": ["[OpenRouter] JSON parse error, trying fallback"],
         }
     except Exception as e:
+        # Timeouts and malformed responses are the model's failures; an
+        # unreachable host is not, and errors before any request were ours
+        if isinstance(e, httpx.TransportError) and not isinstance(e, httpx.TimeoutException):
+            feedback = FEEDBACK_UNAVAILABLE
+        elif response is None and not isinstance(e, httpx.TimeoutException):
+            feedback = FEEDBACK_SKIP
         return {
             **state,
             "error": f"OpenRouter inference failed: {str(e)}",
             "messages": [f"[OpenRouter] Error: {str(e)}"],
         }
+    finally:
+        # Feed latency, parse success and cost back into model selection;
+        # rate limits and unreachable models are not quality outcomes, and
+        # rejected requests (bad key, bad request) say nothing about the model
+        if succeeded or feedback == FEEDBACK_FAILURE:
+            await selector.arecord(
+                band,
+                model,
+                success=succeeded,
+                latency_ms=(datetime.utcnow() - start).total_seconds() * 1000,
+                cost_usd=selector.estimate_cost(model, usage),
+            )
+        elif feedback == FEEDBACK_UNAVAILABLE:
+            await selector.arecord_unavailable(band, model)
 
+@instrument_provider_call(
+    "huggingface",
+    model=lambda state: os.getenv("HUGGINGFACE_MODEL", "mistralai/Mistral-7B-Instruct-v0.2"),
+    succeeded=_node_succeeded,
+)
 async def huggingface_node(state: TriageState) -> TriageState:
     """Process with HuggingFace Inference API (fallback after OpenRouter)"""
     api_key = os.getenv("HUGGINGFACE_API_KEY", "")
     if not api_key:
+        set_provider_outcome("not_configured")
         return {
             **state,
             "error": "HuggingFace API key not configured",
@@ -252,7 +341,7 @@ Respond in JSON format:
         start = datetime.utcnow()
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                f"https://api-inference.huggingface.co/models/{model}",
+                f"{HUGGINGFACE_INFERENCE_ENDPOINT}/{model}",
                 headers={"Authorization": f"Bearer {api_key}"},
                 json={"inputs": prompt, "parameters": {"max_new_tokens": 500, "temperature": 0.3}},
                 timeout=60.0,
@@ -281,7 +370,12 @@ Respond in JSON format:
                         "error": None,
                         "messages": [f"[HuggingFace] Success in {inference_time}ms"],
                     }
-    except Exception as e:
+                set_provider_outcome("parse_error")
+            else:
+                set_provider_outcome("http_error")
+    except json.JSONDecodeError:
+        set_provider_outcome("parse_error")
+    except Exception:
         pass
     
     return {
@@ -290,10 +384,12 @@ Respond in JSON format:
         "messages": ["[HuggingFace] Failed, will try OpenAI"],
     }
 
+@instrument_provider_call("openai", model=lambda state: "gpt-4o", succeeded=_node_succeeded)
 async def openai_node(state: TriageState) -> TriageState:
     """Process with OpenAI GPT-4 (fallback after HuggingFace)"""
     api_key = os.getenv("OPENAI_API_KEY", "")
     if not api_key or api_key == "your-openai-key":
+        set_provider_outcome("not_configured")
         return {
             **state,
             "error": "OpenAI API key not configured",
@@ -311,7 +407,7 @@ Respond ONLY in JSON: {{"urgency": "critical|urgent|standard|non-urgent", "confi
         start = datetime.utcnow()
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
+                f"{OPENAI_API_BASE}/chat/completions",
                 headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
                 json={
                     "model": "gpt-4o",
@@ -344,7 +440,11 @@ Respond ONLY in JSON: {{"urgency": "critical|urgent|standard|non-urgent", "confi
                     "error": None,
                     "messages": [f"[OpenAI] Success in {inference_time}ms"],
                 }
-    except Exception as e:
+            else:
+                set_provider_outcome("http_error")
+    except json.JSONDecodeError:
+        set_provider_outcome("parse_error")
+    except Exception:
         pass
     
     return {
@@ -353,10 +453,12 @@ Respond ONLY in JSON: {{"urgency": "critical|urgent|standard|non-urgent", "confi
         "messages": ["[OpenAI] Failed, will try fallback"],
     }
 
+@instrument_provider_call("anthropic", model=lambda state: "claude-3-sonnet-20240229", succeeded=_node_succeeded)
 async def anthropic_node(state: TriageState) -> TriageState:
     """Process with Anthropic Claude"""
     api_key = os.getenv("ANTHROPIC_API_KEY", "")
     if not api_key or api_key == "your-anthropic-key":
+        set_provider_outcome("not_configured")
         return {
             **state,
             "error": "Anthropic API key not configured", 
@@ -374,7 +476,7 @@ Respond ONLY in JSON: {{"urgency": "critical|urgent|standard|non-urgent", "confi
         start = datetime.utcnow()
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                "https://api.anthropic.com/v1/messages",
+                f"{ANTHROPIC_API_BASE}/messages",
                 headers={
                     "x-api-key": api_key,
                     "Content-Type": "application/json",
@@ -408,7 +510,11 @@ Respond ONLY in JSON: {{"urgency": "critical|urgent|standard|non-urgent", "confi
                     "error": None,
                     "messages": [f"[Anthropic] Success in {inference_time}ms"],
                 }
-    except Exception as e:
+            else:
+                set_provider_outcome("http_error")
+    except json.JSONDecodeError:
+        set_provider_outcome("parse_error")
+    except Exception:
         pass
     
     return {
@@ -505,12 +611,12 @@ def build_triage_graph() -> StateGraph:
     workflow = StateGraph(TriageState)
     
     # Add nodes - OpenRouter is PRIMARY
-    workflow.add_node("symptom_analyzer", symptom_analyzer_node)
-    workflow.add_node("openrouter", openrouter_node)  # PRIMARY
-    workflow.add_node("huggingface", huggingface_node)
-    workflow.add_node("openai", openai_node)
-    workflow.add_node("anthropic", anthropic_node)
-    workflow.add_node("fallback", fallback_node)
+    workflow.add_node("symptom_analyzer", instrument_node("symptom_analyzer", symptom_analyzer_node))
+    workflow.add_node("openrouter", instrument_node("openrouter", openrouter_node))  # PRIMARY
+    workflow.add_node("huggingface", instrument_node("huggingface", huggingface_node))
+    workflow.add_node("openai", instrument_node("openai", openai_node))
+    workflow.add_node("anthropic", instrument_node("anthropic", anthropic_node))
+    workflow.add_node("fallback", instrument_node("fallback", fallback_node))
     
     # Set entry point
     workflow.set_entry_point("symptom_analyzer")
@@ -607,9 +713,21 @@ async def lifespan(app: FastAPI):
     print("🚀 ClinixAI Triage Service Starting (LangGraph-powered)...")
     print(f"📊 Complexity threshold: {os.getenv('COMPLEXITY_THRESHOLD', '0.7')}")
     print(f"🤖 HuggingFace model: {os.getenv('HUGGINGFACE_MODEL', 'mistralai/Mistral-7B-Instruct-v0.2')}")
+    if os.getenv("RAG_WARMUP", "true").lower() == "true":
+        # Load the embedding model and RAG service off the event loop; /ready flips when done
+        threading.Thread(target=warm_up_rag, name="rag-warmup", daemon=True).start()
+    resumed = await get_ingestion_jobs().resume()
+    if resumed:
+        print(f"📥 Resumed {len(resumed)} interrupted ingestion job(s)")
     yield
     # Shutdown
     print("👋 ClinixAI Triage Service Shutting Down...")
+    # Running jobs stay persisted and resume on the next start
+    await get_ingestion_jobs().close()
+    if graph_rag_service is not None:
+        await graph_rag_service.close_async()
+    if _advanced_rag_service is not None:
+        await _advanced_rag_service.close_async()
 
 app = FastAPI(
     title="ClinixAI Triage Service",
@@ -627,6 +745,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def prometheus_middleware(request: Request, call_next):
+    """Record per-route latency and in-flight HTTP requests"""
+    start = time.perf_counter()
+    status = "500"
+    with track_in_flight("http"):
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            # Use the route template so path params don't explode cardinality
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_LATENCY.labels(request.method, route_path, status).observe(
+                time.perf_counter() - start
+            )
+
 # ==================== ROUTES ====================
 
 @app.get("/health")
@@ -639,6 +775,24 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat(),
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Ready once the embedding model is loaded (RAG/Neo4j status is reported too)"""
+    body = {
+        "ready": _readiness["embedding_model"],
+        **_readiness,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    if not _readiness["embedding_model"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
 @app.post("/analyze", response_model=TriageResponse)
 async def analyze_triage(request: TriageRequest):
     """Perform LangGraph-powered AI triage analysis"""
@@ -756,6 +910,7 @@ async def get_available_models():
             },
         },
         "complexity_threshold": float(os.getenv("COMPLEXITY_THRESHOLD", "0.7")),
+        "model_selector": get_model_selector().snapshot(),
     }
 
 # ==================== GRAPHRAG ENDPOINTS ====================
@@ -815,7 +970,7 @@ async def graphrag_query(request: GraphRAGQueryRequest):
         service = get_graph_rag_service()
         
         # Get RAG context from Neo4j
-        result = await service.get_rag_context(
+        result = await service.get_rag_context_async(
             query=request.query,
             max_results=request.max_results,
         )
@@ -844,7 +999,7 @@ async def search_entities(request: EntitySearchRequest):
     """Search for medical entities in the knowledge graph"""
     try:
         service = get_graph_rag_service()
-        entities = await service.search_entities(
+        entities = await service.search_entities_async(
             query=request.query,
             entity_type=request.entity_type,
             limit=request.limit,
@@ -858,7 +1013,7 @@ async def get_red_flags(request: RedFlagsRequest):
     """Get red flags for given symptoms from the knowledge graph"""
     try:
         service = get_graph_rag_service()
-        red_flags = await service.get_red_flags_for_symptoms(request.symptoms)
+        red_flags = await service.get_red_flags_for_symptoms_async(request.symptoms)
         return {"red_flags": red_flags, "success": True}
     except Exception as e:
         return {"red_flags": [], "success": False, "error": str(e)}
@@ -868,7 +1023,7 @@ async def get_possible_conditions(request: ConditionsRequest):
     """Get possible conditions for given symptoms"""
     try:
         service = get_graph_rag_service()
-        conditions = await service.get_possible_conditions(request.symptoms)
+        conditions = await service.get_possible_conditions_async(request.symptoms)
         return {"conditions": conditions, "success": True}
     except Exception as e:
         return {"conditions": [], "success": False, "error": str(e)}
@@ -878,7 +1033,7 @@ async def get_drug_interactions(request: DrugInteractionsRequest):
     """Get drug interactions from the knowledge graph"""
     try:
         service = get_graph_rag_service()
-        interactions = await service.get_drug_interactions(request.drugs)
+        interactions = await service.get_drug_interactions_async(request.drugs)
         return {"interactions": interactions, "success": True}
     except Exception as e:
         return {"interactions": [], "success": False, "error": str(e)}
@@ -888,26 +1043,23 @@ async def get_graphrag_stats():
     """Get statistics about the medical knowledge graph"""
     try:
         service = get_graph_rag_service()
-        stats = await service.get_graph_stats()
+        stats = await service.get_graph_stats_async()
         return {"stats": stats, "success": True}
     except Exception as e:
         return {"stats": {}, "success": False, "error": str(e)}
 
 @app.post("/graphrag/ingest")
-async def ingest_documents(
-    directory: str = None,
-    background_tasks: BackgroundTasks = None
-):
-    """Ingest documents into the knowledge graph (background task)"""
+async def ingest_documents(directory: str = None):
+    """Ingest documents into the knowledge graph (as a job, see GET /rag/jobs/{id})"""
     try:
-        service = get_graph_rag_service()
-        
         if directory:
-            # Run ingestion in background
-            background_tasks.add_task(service.ingest_directory, directory)
+            documents = await asyncio.to_thread(list_documents, directory)
+            job = await get_ingestion_jobs().submit(GRAPH_INGEST, {"directory": directory}, documents)
             return {
-                "message": f"Started ingesting documents from {directory}",
+                "message": f"Queued {len(documents)} documents from {directory}",
                 "success": True,
+                "job_id": job.id,
+                "status": job.status,
             }
         else:
             return {
@@ -922,20 +1074,56 @@ async def ingest_documents(
 
 # Global advanced RAG service instance
 _advanced_rag_service = None
+_advanced_rag_lock = threading.Lock()
+
+# Warm-up state reported by /ready
+_readiness: Dict[str, Any] = {
+    "embedding_model": False,
+    "rag_service": False,
+    "error": None,
+}
 
 def get_advanced_rag_service():
-    """Get or create the advanced RAG service"""
+    """
+    Get or create the advanced RAG service. Blocking and single-flight:
+    concurrent first callers wait for one initialization. Call from async
+    routes via asyncio.to_thread.
+    """
     global _advanced_rag_service
     if _advanced_rag_service is None:
-        try:
-            from graphrag.advanced_rag_service import AdvancedRAGService
-            _advanced_rag_service = AdvancedRAGService()
-            _advanced_rag_service.initialize()
-        except Exception as e:
-            logger.error(f"Failed to initialize AdvancedRAGService: {e}")
-            raise HTTPException(status_code=500, detail=f"RAG service unavailable: {e}")
+        with _advanced_rag_lock:
+            if _advanced_rag_service is None:
+                try:
+                    from graphrag.advanced_rag_service import AdvancedRAGService
+                    service = AdvancedRAGService()
+                    _readiness["rag_service"] = service.initialize()
+                    _readiness["embedding_model"] = True
+                    _advanced_rag_service = service
+                except Exception as e:
+                    logger.error(f"Failed to initialize AdvancedRAGService: {e}")
+                    raise HTTPException(status_code=500, detail=f"RAG service unavailable: {e}")
     return _advanced_rag_service
 
+def warm_up_rag():
+    """Background warm-up: shared embedding model first, then the RAG service"""
+    try:
+        from graphrag.advanced_rag_service import get_embedding_service
+        start = time.perf_counter()
+        embedder = get_embedding_service()
+        embedder.load()
+        embedder.embed_single("warm up")
+        _readiness["embedding_model"] = True
+        print(f"🔥 Embedding model {embedder.model_name} ready in {time.perf_counter() - start:.1f}s")
+        
+        service = get_advanced_rag_service()
+        if not _readiness["rag_service"]:
+            # Neo4j was down; retrieve_async() retries initialize() on demand
+            _readiness["rag_service"] = service.initialize()
+    except Exception as e:
+        detail = getattr(e, "detail", str(e))
+        _readiness["error"] = detail
+        print(f"RAG warm-up failed: {detail}")
+
 
 class PDFUploadResponse(BaseModel):
     success: bool
@@ -944,6 +1132,9 @@ class PDFUploadResponse(BaseModel):
     chunks: int = 0
     entities_extracted: int = 0
     relationships_extracted: int = 0
+    skipped: bool = False
+    chunks_added: int = 0
+    chunks_removed: int = 0
     message: str = ""
 
 
@@ -969,6 +1160,7 @@ async def upload_pdf_for_rag(
     file: UploadFile = File(...),
     extract_entities: bool = False,  # DEFAULT OFF to save OpenRouter credits
     batch_size: int = 10,  # Process N chunks at a time for entity extraction
+    force: bool = False,  # Re-embed even if this file was ingested unchanged
     background_tasks: BackgroundTasks = None
 ):
     """
@@ -983,6 +1175,9 @@ async def upload_pdf_for_rag(
     Set extract_entities=true to enable AI entity extraction (uses OpenRouter credits).
     Set batch_size to control how many chunks are processed (lower = less cost).
     
+    Re-uploading a file with the same name is incremental: an identical file is
+    skipped, and a changed one only embeds new chunks and removes deleted ones.
+    
     This enables semantic search and knowledge graph queries.
     """
     import aiofiles
@@ -1001,23 +1196,28 @@ async def upload_pdf_for_rag(
             tmp_path = tmp.name
         
         # Get RAG service
-        rag_service = get_advanced_rag_service()
+        rag_service = await asyncio.to_thread(get_advanced_rag_service)
         
         # Ingest PDF (extract_entities=False by default to save credits)
         stats = await rag_service.ingest_pdf(
             pdf_path=tmp_path,
             extract_entities=extract_entities,
-            batch_size=batch_size  # Limit entity extraction to N chunks max
+            batch_size=batch_size,  # Limit entity extraction to N chunks max
+            document_name=file.filename,
+            force=force
         )
         
         # Clean up temp file
         _os.unlink(tmp_path)
         
         # Build helpful message
-        if extract_entities:
-            cost_msg = f" (entity extraction on {min(batch_size, stats.get('chunks', 0))} chunks used OpenRouter credits)"
+        if stats.get("skipped"):
+            message = f"{file.filename} is unchanged since it was last ingested, skipped"
+        elif extract_entities:
+            extracted = min(batch_size, stats.get('chunks_added', 0))
+            message = f"Successfully ingested {file.filename} (entity extraction on {extracted} chunks used OpenRouter credits)"
         else:
-            cost_msg = " (FREE - no OpenRouter credits used)"
+            message = f"Successfully ingested {file.filename} (FREE - no OpenRouter credits used)"
         
         return PDFUploadResponse(
             success=True,
@@ -1026,7 +1226,10 @@ async def upload_pdf_for_rag(
             chunks=stats.get("chunks", 0),
             entities_extracted=stats.get("entities_extracted", 0),
             relationships_extracted=stats.get("relationships_extracted", 0),
-            message=f"Successfully ingested {file.filename}{cost_msg}"
+            skipped=stats.get("skipped", False),
+            chunks_added=stats.get("chunks_added", 0),
+            chunks_removed=stats.get("chunks_removed", 0),
+            message=message
         )
         
     except Exception as e:
@@ -1051,10 +1254,10 @@ async def query_rag(request: RAGQueryRequest):
     Returns relevant chunks and entities for AI context.
     """
     try:
-        rag_service = get_advanced_rag_service()
+        rag_service = await asyncio.to_thread(get_advanced_rag_service)
         
         # Perform hybrid retrieval
-        context = rag_service.retrieve(
+        context = await rag_service.retrieve_async(
             query=request.query,
             top_k=request.top_k,
             include_entities=request.include_entities,
@@ -1099,7 +1302,7 @@ async def query_rag(request: RAGQueryRequest):
 async def get_rag_stats():
     """Get advanced RAG service statistics"""
     try:
-        rag_service = get_advanced_rag_service()
+        rag_service = await asyncio.to_thread(get_advanced_rag_service)
         return {
             "success": True,
             **rag_service.get_stats()
@@ -1115,30 +1318,75 @@ async def get_rag_stats():
 async def ingest_directory(
     directory: str,
     extract_entities: bool = True,
-    background_tasks: BackgroundTasks = None
+    processes: Optional[int] = None,
+    force: bool = False
 ):
-    """Ingest all PDFs in a directory (runs in background)"""
+    """
+    Ingest all PDFs in a directory as a durable job.
+    processes > 1 embeds on that many worker processes (default RAG_EMBED_PROCESSES).
+    Files unchanged since their last ingestion are skipped unless force=true.
+    Follow progress with GET /rag/jobs/{job_id} or GET /rag/jobs/{job_id}/events.
+    """
     try:
-        rag_service = get_advanced_rag_service()
-        
-        # Run in background
-        async def _ingest():
-            return await rag_service.ingest_directory(
-                directory=directory,
-                extract_entities=extract_entities
-            )
-        
-        background_tasks.add_task(_ingest)
+        documents = await asyncio.to_thread(list_documents, directory)
+        job = await get_ingestion_jobs().submit(RAG_INGEST, {
+            "directory": directory,
+            "extract_entities": extract_entities,
+            "processes": processes,
+            "force": force,
+        }, documents)
         
         return {
             "success": True,
-            "message": f"Started ingesting PDFs from {directory}",
-            "status": "processing"
+            "message": f"Queued {len(documents)} PDFs from {directory}",
+            "job_id": job.id,
+            "status": job.status
         }
     except Exception as e:
         return {"success": False, "error": str(e)}
 
 
+# ==================== INGESTION JOBS ====================
+
+def get_ingestion_jobs() -> JobManager:
+    """
+    Process-wide job manager with the ingestion handlers registered. With
+    RAG_JOB_QUEUE=redis jobs are only enqueued here and run by graphrag.worker.
+    """
+    return register_ingestion_handlers(get_job_manager(), get_advanced_rag_service, get_graph_rag_service)
+
+
+@app.get("/rag/jobs")
+async def list_ingestion_jobs(limit: int = 20):
+    """Most recent ingestion jobs"""
+    jobs = await asyncio.to_thread(get_ingestion_jobs().store.list, limit)
+    return {"success": True, "jobs": [job.as_dict() for job in jobs]}
+
+
+@app.get("/rag/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """Status, progress and per-document checkpoints of an ingestion job"""
+    job = await asyncio.to_thread(get_ingestion_jobs().store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job.as_dict()
+
+
+@app.get("/rag/jobs/{job_id}/events")
+async def stream_ingestion_job(job_id: str, interval: float = 1.0):
+    """Server-sent events: a "progress" event per job change, then "done" """
+    manager = get_ingestion_jobs()
+    if await asyncio.to_thread(manager.store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    
+    async def events():
+        async for snapshot in manager.stream(job_id, interval=max(interval, 0.2)):
+            event = "done" if snapshot["status"] in FINISHED else "progress"
+            yield f"event: {event}\ndata: {json.dumps(snapshot)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
 # ==================== RAG-ENHANCED TRIAGE ====================
 
 @app.post("/analyze-with-rag")
@@ -1160,13 +1408,13 @@ async def analyze_with_rag(request: TriageRequest):
         rag_paths = []
         
         try:
-            rag_service = get_advanced_rag_service()
+            rag_service = await asyncio.to_thread(get_advanced_rag_service)
             
             # Build query from symptoms
             symptom_text = " ".join([s.description for s in request.symptoms])
             
             # Retrieve relevant context
-            context = rag_service.retrieve(
+            context = await rag_service.retrieve_async(
                 query=symptom_text,
                 top_k=3,
                 include_entities=True,
@@ -1268,6 +1516,8 @@ async def root():
         "status": "running",
         "endpoints": {
             "health": "GET /health",
+            "ready": "GET /ready",
+            "metrics": "GET /metrics",
             "analyze": "POST /analyze",
             "analyze_with_rag": "POST /analyze-with-rag",
             "graph": "GET /graph",
@@ -1286,6 +1536,9 @@ async def root():
                 "query": "POST /rag/query",
                 "stats": "GET /rag/stats",
                 "ingest_directory": "POST /rag/ingest-directory",
+                "jobs": "GET /rag/jobs",
+                "job": "GET /rag/jobs/{job_id}",
+                "job_events": "GET /rag/jobs/{job_id}/events",
             },
         },
     }
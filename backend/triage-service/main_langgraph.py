@@ -16,12 +16,13 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 # Import LangGraph orchestrator
 from ai.langgraph_orchestrator import TriageGraph, get_triage_graph
+from metrics import render_metrics
 
 # ==================== MODELS ====================
 
@@ -194,6 +195,15 @@ async def health_check():
     )
 
 
+@app.get("/metrics", tags=["System"], include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
 @app.get("/", tags=["System"])
 async def root():
     """
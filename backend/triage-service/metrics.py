@@ -0,0 +1,434 @@
+"""
+Prometheus Metrics for ClinixAI Triage Service
+==============================================
+Central registry of latency histograms, counters and in-flight gauges for:
+- LangGraph nodes (main.py workflow and ai.langgraph_orchestrator)
+- Inference provider/model calls, including HTTP and parse failures
+- Neo4j queries in Neo4jClient and Neo4jVectorStore
+- EmbeddingService encodes
+- Ingestion pipeline stages (items, busy and back-pressure time)
+- In-process and on-disk caches (hit/miss counters, hit ratio, bytes)
+
+Exposed by the FastAPI app at GET /metrics. When prometheus-client is not
+installed every helper degrades to a no-op so the pipeline keeps working.
+"""
+
+import time
+import asyncio
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from prometheus_client import (
+        Counter,
+        Gauge,
+        Histogram,
+        CONTENT_TYPE_LATEST,
+        generate_latest,
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _NoopMetric:
+    """Stand-in for prometheus metrics when prometheus-client is missing"""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def observe(self, *args, **kwargs):
+        pass
+
+    def inc(self, *args, **kwargs):
+        pass
+
+    def dec(self, *args, **kwargs):
+        pass
+
+    def set(self, *args, **kwargs):
+        pass
+
+
+def _histogram(name: str, doc: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Histogram(name, doc, labels, buckets=buckets)
+
+
+def _counter(name: str, doc: str, labels: Tuple[str, ...]):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Counter(name, doc, labels)
+
+
+def _gauge(name: str, doc: str, labels: Tuple[str, ...]):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Gauge(name, doc, labels)
+
+
+# Buckets: fast local work (ms) through slow cloud LLM calls (tens of seconds)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 45.0, 60.0, 90.0)
+
+
+# ==================== METRICS ====================
+
+HTTP_REQUEST_LATENCY = _histogram(
+    "clinixai_http_request_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+    SLOW_BUCKETS,
+)
+
+GRAPH_NODE_LATENCY = _histogram(
+    "clinixai_graph_node_seconds",
+    "LangGraph node execution latency",
+    ("node", "status"),
+    SLOW_BUCKETS,
+)
+
+PROVIDER_CALL_LATENCY = _histogram(
+    "clinixai_provider_call_seconds",
+    "Inference provider call latency by model and outcome",
+    ("provider", "model", "outcome"),
+    SLOW_BUCKETS,
+)
+
+PROVIDER_CALLS = _counter(
+    "clinixai_provider_calls_total",
+    "Inference provider calls by model and outcome (success, http_error, parse_error, error, not_configured)",
+    ("provider", "model", "outcome"),
+)
+
+NEO4J_QUERY_LATENCY = _histogram(
+    "clinixai_neo4j_query_seconds",
+    "Neo4j query latency by component and operation",
+    ("component", "operation", "status"),
+    FAST_BUCKETS,
+)
+
+EMBEDDING_LATENCY = _histogram(
+    "clinixai_embedding_encode_seconds",
+    "EmbeddingService encode latency",
+    ("model",),
+    FAST_BUCKETS,
+)
+
+EMBEDDING_TEXTS = _counter(
+    "clinixai_embedding_texts_total",
+    "Texts encoded by EmbeddingService",
+    ("model",),
+)
+
+IN_FLIGHT = _gauge(
+    "clinixai_in_flight",
+    "Operations currently in flight (http, graph_node, provider, neo4j, embedding)",
+    ("kind",),
+)
+
+CACHE_LOOKUPS = _counter(
+    "clinixai_cache_lookups_total",
+    "Cache lookups by cache name and result (hit or miss)",
+    ("cache", "result"),
+)
+
+CACHE_HIT_RATIO = _gauge(
+    "clinixai_cache_hit_ratio",
+    "Cache hit ratio since process start",
+    ("cache",),
+)
+
+CACHE_BYTES = _gauge(
+    "clinixai_cache_bytes",
+    "Bytes held by a cache",
+    ("cache",),
+)
+
+INGEST_STAGE_ITEMS = _counter(
+    "clinixai_ingest_stage_items_total",
+    "Items processed by each ingestion pipeline stage",
+    ("stage",),
+)
+
+INGEST_STAGE_BUSY = _counter(
+    "clinixai_ingest_stage_busy_seconds_total",
+    "Time ingestion pipeline stages spent working",
+    ("stage",),
+)
+
+INGEST_STAGE_BLOCKED = _counter(
+    "clinixai_ingest_stage_blocked_seconds_total",
+    "Time ingestion pipeline stages waited on a full downstream queue",
+    ("stage",),
+)
+
+# Local tallies backing CACHE_HIT_RATIO (prometheus counters are write-only)
+_cache_tallies: Dict[str, Dict[str, int]] = {}
+_cache_lock = threading.Lock()
+
+
+# ==================== HELPERS ====================
+
+@contextmanager
+def track_in_flight(kind: str):
+    """Increment the in-flight gauge for the duration of the block"""
+    IN_FLIGHT.labels(kind).inc()
+    try:
+        yield
+    finally:
+        IN_FLIGHT.labels(kind).dec()
+
+
+def instrument_node(name: str, fn: Callable) -> Callable:
+    """
+    Wrap a LangGraph node (function or callable instance) with latency and
+    in-flight tracking. Async nodes stay async so LangGraph awaits them.
+    """
+    is_async = asyncio.iscoroutinefunction(fn) or asyncio.iscoroutinefunction(
+        getattr(fn, "__call__", None)
+    )
+
+    if is_async:
+        @functools.wraps(fn)
+        async def async_wrapper(state, *args, **kwargs):
+            status = "error"
+            start = time.perf_counter()
+            with track_in_flight("graph_node"):
+                try:
+                    result = await fn(state, *args, **kwargs)
+                    status = "ok"
+                    return result
+                finally:
+                    GRAPH_NODE_LATENCY.labels(name, status).observe(time.perf_counter() - start)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def sync_wrapper(state, *args, **kwargs):
+        status = "error"
+        start = time.perf_counter()
+        with track_in_flight("graph_node"):
+            try:
+                result = fn(state, *args, **kwargs)
+                status = "ok"
+                return result
+            finally:
+                GRAPH_NODE_LATENCY.labels(name, status).observe(time.perf_counter() - start)
+    return sync_wrapper
+
+
+class ProviderCall:
+    """Outcome holder for track_provider_call; callers set .outcome"""
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self.outcome = "error"
+
+
+@contextmanager
+def track_provider_call(provider: str, model: str):
+    """
+    Time one provider/model call.
+
+    Usage:
+        with track_provider_call("openrouter", model) as call:
+            response = await client.post(...)
+            if response.status_code != 200:
+                call.outcome = "http_error"
+            ...
+            call.outcome = "success"
+
+    Exceptions are recorded as "parse_error" for JSON/value errors and
+    "error" otherwise, then re-raised.
+    """
+    call = ProviderCall(provider, model)
+    start = time.perf_counter()
+    IN_FLIGHT.labels("provider").inc()
+    try:
+        yield call
+    except ValueError:
+        # json.JSONDecodeError is a ValueError
+        call.outcome = "parse_error"
+        raise
+    except Exception:
+        call.outcome = "error"
+        raise
+    finally:
+        IN_FLIGHT.labels("provider").dec()
+        PROVIDER_CALL_LATENCY.labels(provider, model, call.outcome).observe(time.perf_counter() - start)
+        PROVIDER_CALLS.labels(provider, model, call.outcome).inc()
+
+
+_current_provider_call: ContextVar[Optional[ProviderCall]] = ContextVar(
+    "clinixai_provider_call", default=None
+)
+
+
+def set_provider_outcome(outcome: str):
+    """
+    Mark the outcome of the provider call currently wrapped by
+    instrument_provider_call (e.g. "http_error", "parse_error").
+    """
+    call = _current_provider_call.get()
+    if call is not None:
+        call.outcome = outcome
+
+
+def set_provider_model(model: str):
+    """Label the current instrument_provider_call with a model chosen inside the call"""
+    call = _current_provider_call.get()
+    if call is not None:
+        call.model = model
+
+
+def instrument_provider_call(
+    provider: str,
+    model: Optional[Callable] = None,
+    succeeded: Optional[Callable] = None
+) -> Callable:
+    """
+    Decorator for async node methods that make one provider/model call and
+    return a parsed result dict or None, and for main.py graph nodes that
+    return the updated state (with succeeded=...).
+
+    The model label comes from the method's ``model``/``model_name`` argument,
+    from ``model(*args, **kwargs)`` when given (``self`` first for methods), or
+    from set_provider_model() inside the call. A result passing ``succeeded``
+    (default: not None) counts as "success"; otherwise the outcome set via
+    set_provider_outcome is used, defaulting to "error" (exceptions swallowed
+    inside the method).
+    """
+    ok = succeeded or (lambda result: result is not None)
+
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        def resolve_model(args, kwargs) -> str:
+            if model is not None:
+                return model(*args, **kwargs)
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            return str(bound.get("model") or bound.get("model_name") or "unknown")
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            call = ProviderCall(provider, resolve_model(args, kwargs))
+            call.outcome = ""
+            token = _current_provider_call.set(call)
+            start = time.perf_counter()
+            IN_FLIGHT.labels("provider").inc()
+            try:
+                result = await fn(*args, **kwargs)
+                if ok(result):
+                    call.outcome = "success"
+                return result
+            finally:
+                _current_provider_call.reset(token)
+                IN_FLIGHT.labels("provider").dec()
+                outcome = call.outcome or "error"
+                PROVIDER_CALL_LATENCY.labels(provider, call.model, outcome).observe(
+                    time.perf_counter() - start
+                )
+                PROVIDER_CALLS.labels(provider, call.model, outcome).inc()
+        return wrapper
+    return decorator
+
+
+def track_neo4j_query(fn: Callable) -> Callable:
+    """
+    Decorator for Neo4jClient / Neo4jVectorStore query methods (and their
+    async counterparts). Labels by owning class name and method name.
+    """
+    operation = fn.__name__
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(self, *args, **kwargs):
+            component = type(self).__name__
+            status = "error"
+            start = time.perf_counter()
+            with track_in_flight("neo4j"):
+                try:
+                    result = await fn(self, *args, **kwargs)
+                    status = "ok"
+                    return result
+                finally:
+                    NEO4J_QUERY_LATENCY.labels(component, operation, status).observe(
+                        time.perf_counter() - start
+                    )
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        component = type(self).__name__
+        status = "error"
+        start = time.perf_counter()
+        with track_in_flight("neo4j"):
+            try:
+                result = fn(self, *args, **kwargs)
+                status = "ok"
+                return result
+            finally:
+                NEO4J_QUERY_LATENCY.labels(component, operation, status).observe(
+                    time.perf_counter() - start
+                )
+    return wrapper
+
+
+@contextmanager
+def track_embedding(model: str, num_texts: int):
+    """Time one EmbeddingService encode call"""
+    start = time.perf_counter()
+    with track_in_flight("embedding"):
+        try:
+            yield
+        finally:
+            EMBEDDING_LATENCY.labels(model).observe(time.perf_counter() - start)
+            EMBEDDING_TEXTS.labels(model).inc(num_texts)
+
+
+def record_ingest_stage(stage: str, items: int, busy_seconds: float, blocked_seconds: float):
+    """Add one pipeline run's counters for a stage"""
+    INGEST_STAGE_ITEMS.labels(stage).inc(items)
+    INGEST_STAGE_BUSY.labels(stage).inc(busy_seconds)
+    INGEST_STAGE_BLOCKED.labels(stage).inc(blocked_seconds)
+
+
+def record_cache_lookup(cache: str, hit: bool, count: int = 1):
+    """Record cache hits/misses and refresh the hit-ratio gauge"""
+    result = "hit" if hit else "miss"
+    CACHE_LOOKUPS.labels(cache, result).inc(count)
+
+    with _cache_lock:
+        tally = _cache_tallies.setdefault(cache, {"hit": 0, "miss": 0})
+        tally[result] += count
+        total = tally["hit"] + tally["miss"]
+        ratio = tally["hit"] / total if total else 0.0
+    CACHE_HIT_RATIO.labels(cache).set(ratio)
+
+
+def set_cache_bytes(cache: str, nbytes: int):
+    """Report the current size of a cache"""
+    CACHE_BYTES.labels(cache).set(nbytes)
+
+
+def get_cache_hit_ratio(cache: str) -> Optional[float]:
+    """Current hit ratio for a cache, or None if never used"""
+    tally = _cache_tallies.get(cache)
+    if not tally:
+        return None
+    total = tally["hit"] + tally["miss"]
+    return tally["hit"] / total if total else None
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Render the default registry in Prometheus text format"""
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus-client not installed\n", CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,8 @@
+"""Make the service modules (graphrag, metrics, ai) importable from tests"""
+
+import sys
+from pathlib import Path
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+if str(SERVICE_ROOT) not in sys.path:
+    sys.path.insert(0, str(SERVICE_ROOT))
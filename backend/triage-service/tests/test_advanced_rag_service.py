@@ -0,0 +1,191 @@
+"""Tests for the deterministic helpers and batched writes of graphrag.advanced_rag_service"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from graphrag.advanced_rag_service import (
+    NEO4J_AVAILABLE,
+    DocumentChunk,
+    Neo4jVectorStore,
+    QueryEmbeddingCache,
+    _DocumentIngestion,
+    _chunk_id,
+    _safe_identifier,
+)
+from graphrag.pdf_pages import PdfPage
+from graphrag.vector_compression import CompressionConfig, VectorCompressor
+
+PARAGRAPHS = [
+    "Chest pain radiating to the left arm needs an ECG within ten minutes.",
+    "Sudden severe headache with neck stiffness suggests subarachnoid bleeding.",
+    "Fever with a non-blanching rash in a child is treated as meningococcal sepsis.",
+    "Unilateral leg swelling and calf tenderness raise suspicion of a DVT.",
+]
+
+
+def ingest(pages, existing=(), compressor=None):
+    """Run the chunk stage; returns (the run, chunks passed on for embedding)"""
+    service = SimpleNamespace(chunk_size=90, chunk_overlap=0, compressor=compressor)
+    run = _DocumentIngestion(service, "doc", "doc.pdf", set(existing))
+    passed = []
+    for number, text in enumerate(pages, 1):
+        passed.extend(run.chunk(PdfPage(number, text)))
+    passed.extend(run.flush_chunks())
+    return run, passed
+
+
+def test_chunk_ids_are_content_addressed():
+    seen = {}
+    first = _chunk_id("doc", "same text", seen)
+    assert _chunk_id("doc", "same text", seen) == f"{first}_1"
+    assert _chunk_id("doc", "same text", {}) == first
+    assert _chunk_id("other", "same text", {}) != first
+
+
+def test_first_ingestion_embeds_every_chunk():
+    run, passed = ingest(PARAGRAPHS)
+    assert [entry.id for entry in passed] == run.chunk_ids
+    assert [entry.position for entry in passed] == list(range(len(run.chunk_ids)))
+    assert run.kept == [] and run.new_chunks == len(run.chunk_ids)
+
+
+def test_unchanged_document_embeds_nothing():
+    first, _ = ingest(PARAGRAPHS)
+    again, passed = ingest(PARAGRAPHS, existing=first.chunk_ids)
+    assert passed == []
+    assert again.chunk_ids == first.chunk_ids
+    assert [row["id"] for row in again.kept] == first.chunk_ids
+
+
+def test_changed_document_diff():
+    first, _ = ingest(PARAGRAPHS)
+    edited = [PARAGRAPHS[0], "Shortness of breath at rest needs pulse oximetry.", PARAGRAPHS[2], PARAGRAPHS[3]]
+    second, passed = ingest(edited, existing=first.chunk_ids)
+
+    unchanged = [cid for cid in second.chunk_ids if cid in set(first.chunk_ids)]
+    changed = [cid for cid in second.chunk_ids if cid not in set(first.chunk_ids)]
+    removed = set(first.chunk_ids) - set(second.chunk_ids)
+    assert unchanged and changed and removed
+
+    # Only new chunks are embedded; unchanged ones are re-numbered in place
+    assert [entry.id for entry in passed] == changed
+    assert second.new_chunks == len(changed)
+    assert [row["id"] for row in second.kept] == unchanged
+    for row in second.kept:
+        assert second.chunk_ids[row["chunk_index"]] == row["id"]
+        assert row["page_start"] is not None
+
+
+def test_small_first_document_fails_before_embedding_when_pca_is_unfitted():
+    compressor = VectorCompressor(CompressionConfig("pca", dims=8), 32)
+    service = SimpleNamespace(chunk_size=90, chunk_overlap=0, compressor=compressor)
+    run = _DocumentIngestion(service, "doc", "doc.pdf", set())
+    passed = []
+    with pytest.raises(ValueError, match="needs 8"):
+        for number, text in enumerate(PARAGRAPHS, 1):
+            passed.extend(run.chunk(PdfPage(number, text)))
+        passed.extend(run.flush_chunks())
+    assert passed == []
+
+
+def test_chunks_flow_once_the_pca_fit_has_enough_samples():
+    compressor = VectorCompressor(CompressionConfig("pca", dims=2), 32)
+    run, passed = ingest(PARAGRAPHS, compressor=compressor)
+    assert [entry.id for entry in passed] == run.chunk_ids
+
+
+def test_int8_only_compression_does_not_hold_chunks_back():
+    compressor = VectorCompressor(CompressionConfig(int8=True), 32)
+    run, passed = ingest(PARAGRAPHS[:1], compressor=compressor)
+    assert [entry.id for entry in passed] == run.chunk_ids
+
+
+@pytest.mark.parametrize("label", ["Disease", "RedFlag", "HAS_SYMPTOM", "_private", "Drug2"])
+def test_safe_identifier_keeps_plain_labels(label):
+    assert _safe_identifier(label, "Entity") == label
+
+
+@pytest.mark.parametrize("label", [
+    None,
+    "",
+    "2Drug",
+    "Disease`) DETACH DELETE n //",
+    "Disease:Admin",
+    "Disease {name: 'x'}",
+    "Disease\n",
+    "Dis ease",
+    "Maladie-é",
+])
+def test_safe_identifier_rejects_injected_labels(label):
+    assert _safe_identifier(label, "Entity") == "Entity"
+
+
+class RecordingSession:
+    """Stands in for a neo4j session; records the rows of each write transaction"""
+
+    def __init__(self):
+        self.transactions = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work, *args):
+        statements = []
+        tx = SimpleNamespace(run=lambda query, **params: (
+            statements.append((query, params)) or SimpleNamespace(consume=lambda: None)
+        ))
+        work(tx, *args)
+        self.transactions.append(statements)
+
+
+@pytest.mark.skipif(not NEO4J_AVAILABLE, reason="neo4j not installed")
+def test_add_chunks_writes_one_unwind_per_batch():
+    session = RecordingSession()
+    store = Neo4jVectorStore()
+    store._driver = SimpleNamespace(session=lambda **kwargs: session)
+    chunks = [
+        DocumentChunk(f"c{i}", f"text {i}", "doc", "doc.pdf", i, np.ones(4, dtype=np.float32), {"page_start": 1})
+        for i in range(5)
+    ]
+    store.add_chunks(chunks, batch_size=2)
+
+    assert [len(statements) for statements in session.transactions] == [1, 1, 1]
+    batches = [statements[0][1]["rows"] for statements in session.transactions]
+    assert [[row["id"] for row in rows] for rows in batches] == [["c0", "c1"], ["c2", "c3"], ["c4"]]
+    assert all("UNWIND $rows" in statements[0][0] for statements in session.transactions)
+    assert batches[0][0]["page_start"] == 1 and batches[0][0]["embedding"] == [1.0] * 4
+
+
+class CountingEmbedder:
+    def __init__(self, uncased: bool):
+        self.uncased = uncased
+        self.embedded = []
+
+    def embed_matrix(self, texts, cached=True):
+        self.embedded.extend(texts)
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+def test_query_cache_keeps_case_for_cased_models():
+    embedder = CountingEmbedder(uncased=False)
+    cache = QueryEmbeddingCache(embedder)
+    cache.get("  MS   relapse ")
+    cache.get("MS relapse")
+    cache.get("ms relapse")
+    assert embedder.embedded == ["MS relapse", "ms relapse"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_query_cache_casefolds_keys_for_uncased_models():
+    embedder = CountingEmbedder(uncased=True)
+    cache = QueryEmbeddingCache(embedder)
+    cache.get("Chest  Pain")
+    cache.get("chest pain")
+    # The model sees the query as typed; only the key is casefolded
+    assert embedder.embedded == ["Chest Pain"]
+    assert cache.stats()["hits"] == 1
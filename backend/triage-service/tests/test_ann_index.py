@@ -0,0 +1,162 @@
+"""Tests for graphrag.ann_index"""
+
+import numpy as np
+
+from graphrag.ann_index import IVFIndex
+
+DIM = 16
+
+
+def unit_vectors(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # Clustered data, like real embeddings
+    centers = rng.standard_normal((20, DIM))
+    vectors = centers[rng.integers(0, 20, n)] + 0.3 * rng.standard_normal((n, DIM))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def brute_force(ids, vectors, query, k):
+    scores = vectors @ query
+    return [ids[i] for i in np.argsort(-scores)[:k]]
+
+
+def recall(index, ids, vectors, queries, k=10):
+    found = 0
+    for query in queries:
+        expected = set(brute_force(ids, vectors, query, k))
+        found += len(expected & {cid for cid, _ in index.search(query, k)})
+    return found / (k * len(queries))
+
+
+def test_search_recall_against_brute_force(tmp_path):
+    vectors = unit_vectors(4000)
+    ids = [f"c{i}" for i in range(len(vectors))]
+    index = IVFIndex(str(tmp_path), DIM, nprobe=8, min_list_size=32)
+    index.build(ids, vectors)
+    assert index.nlist >= 2
+
+    queries = unit_vectors(50, seed=1)
+    assert recall(index, ids, vectors, queries) >= 0.9
+
+    # Exact with every list probed
+    query = queries[0]
+    exact = [cid for cid, _ in index.search(query, 10, nprobe=index.nlist)]
+    assert exact == brute_force(ids, vectors, query, 10)
+
+
+def test_flat_index_is_exact_and_handles_add_remove(tmp_path):
+    vectors = unit_vectors(200)
+    ids = [f"c{i}" for i in range(200)]
+    index = IVFIndex(str(tmp_path), DIM)
+    index.add(ids[:100], vectors[:100])
+    index.add(ids[100:], vectors[100:])
+    assert index.nlist == 0
+    assert len(index) == 200
+
+    query = vectors[150]
+    assert index.search(query, 1)[0][0] == "c150"
+
+    index.remove(["c150", "missing"])
+    assert len(index) == 199
+    assert "c150" not in {cid for cid, _ in index.search(query, 10)}
+
+    # Re-adding an id replaces its row
+    index.add(["c10"], vectors[150:151])
+    assert len(index) == 199
+    assert index.search(query, 1)[0][0] == "c10"
+
+
+def test_members_are_regrouped_lazily(tmp_path):
+    vectors = unit_vectors(100)
+    index = IVFIndex(str(tmp_path), DIM)
+    calls = 0
+    rebuild = index._rebuild_members
+
+    def counting():
+        nonlocal calls
+        calls += 1
+        rebuild()
+
+    index._rebuild_members = counting
+    for i in range(0, 100, 10):
+        index.add([f"c{j}" for j in range(i, i + 10)], vectors[i:i + 10])
+    assert calls == 0
+    index.search(vectors[0], 3)
+    index.search(vectors[1], 3)
+    assert calls == 1
+
+
+def test_save_load_and_atomic_rebuild(tmp_path):
+    vectors = unit_vectors(1000)
+    ids = [f"c{i}" for i in range(1000)]
+    index = IVFIndex(str(tmp_path), DIM, min_list_size=32)
+    index.build(ids, vectors)
+    index.save()
+
+    loaded = IVFIndex.load(str(tmp_path), DIM, min_list_size=32)
+    assert len(loaded) == 1000
+    assert loaded.search(vectors[7], 1)[0][0] == "c7"
+
+    # A rebuild that is never saved (crash) leaves the saved index intact
+    loaded.remove(ids[:500])
+    loaded.rebuild()
+    again = IVFIndex.load(str(tmp_path), DIM, min_list_size=32)
+    assert len(again) == 1000
+    assert again.search(vectors[7], 1)[0][0] == "c7"
+
+    # Once saved, the new generation replaces the old files
+    loaded.save()
+    final = IVFIndex.load(str(tmp_path), DIM, min_list_size=32)
+    assert len(final) == 500
+    assert final.search(vectors[700], 1)[0][0] == "c700"
+    assert sorted(p.name for p in tmp_path.glob("vectors*")) == [f"vectors.{final._generation}.f32"]
+
+
+def test_dimension_mismatch_is_ignored_on_load(tmp_path):
+    index = IVFIndex(str(tmp_path), DIM)
+    index.add(["a"], unit_vectors(1))
+    index.save()
+    assert len(IVFIndex.load(str(tmp_path), DIM * 2)) == 0
+
+
+def test_changed_on_disk_sees_saves_from_another_instance(tmp_path):
+    vectors = unit_vectors(10)
+    writer = IVFIndex(str(tmp_path), DIM)
+    writer.add(["a"], vectors[:1])
+    writer.save()
+
+    reader = IVFIndex.load(str(tmp_path), DIM)
+    assert not reader.changed_on_disk() and not writer.changed_on_disk()
+
+    writer.add(["b"], vectors[1:2])
+    writer.save()
+    assert reader.changed_on_disk()
+    assert not writer.changed_on_disk()
+    assert len(IVFIndex.load(str(tmp_path), DIM)) == 2
+
+
+def test_service_keeps_its_index_when_a_reload_races_a_save(tmp_path):
+    from types import SimpleNamespace
+
+    from graphrag.advanced_rag_service import AdvancedRAGService
+
+    vectors = unit_vectors(10)
+    writer = IVFIndex(str(tmp_path), DIM)
+    writer.build(["a"], vectors[:1])
+    writer.save()
+    loaded = IVFIndex.load(str(tmp_path), DIM)
+    service = SimpleNamespace(ann_path=str(tmp_path), ann_nprobe=4, ann_index=loaded, _ann_checked_at=0.0)
+
+    writer.build(["a", "b"], vectors[:2])
+    writer.save()
+    assert loaded.changed_on_disk()
+    # The next save removes this generation after the reader saw its meta.json
+    writer._file("ids.json").unlink()
+
+    AdvancedRAGService._refresh_ann_index(service)
+    assert service.ann_index is loaded and len(service.ann_index) == 1
+
+    writer.build(["a", "b"], vectors[:2])
+    writer.save()
+    AdvancedRAGService._refresh_ann_index(service)
+    assert service.ann_index is not loaded and len(service.ann_index) == 2
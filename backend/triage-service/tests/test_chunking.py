@@ -0,0 +1,100 @@
+"""Tests for graphrag.chunking"""
+
+import pytest
+
+from graphrag.chunking import PageChunker, chunk_pages, chunk_text
+from graphrag.pdf_pages import PdfPage
+
+
+def legacy_chunk_text(text, chunk_size, chunk_overlap):
+    """The previous in-service fallback chunker (loops forever when overlap >= step)"""
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        if end < len(text):
+            for sep in [". ", "\n\n", "\n", " "]:
+                last_sep = text.rfind(sep, start + chunk_size // 2, end)
+                if last_sep > start:
+                    end = last_sep + len(sep)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end - chunk_overlap
+        if start >= len(text) - chunk_overlap:
+            break
+    return chunks
+
+
+SAMPLE = " ".join(
+    f"Sentence {i} describes symptom number {i}." + ("\n\n" if i % 7 == 0 else "")
+    for i in range(300)
+)
+
+
+@pytest.mark.parametrize("size,overlap", [(500, 100), (200, 50), (1000, 200), (120, 0)])
+def test_matches_legacy_chunker_for_regular_overlap(size, overlap):
+    assert chunk_text(SAMPLE, size, overlap) == legacy_chunk_text(SAMPLE, size, overlap)
+
+
+@pytest.mark.parametrize("size,overlap", [(100, 100), (100, 150), (50, 49), (1, 5)])
+def test_overlap_at_or_above_step_terminates_and_covers_text(size, overlap):
+    chunks = chunk_text(SAMPLE, size, overlap)
+    assert chunks
+    assert all(len(chunk) <= size for chunk in chunks)
+    assert SAMPLE.rstrip().endswith(chunks[-1])
+
+    # Every chunk starts strictly after the previous one
+    position = -1
+    for chunk in chunks:
+        found = SAMPLE.find(chunk, position + 1)
+        assert found > position
+        position = found
+
+
+def test_empty_input_and_empty_pages():
+    assert chunk_text("", 100, 10) == []
+    assert chunk_text("   \n\n  ", 100, 10) == []
+    assert list(chunk_pages([PdfPage(1, ""), PdfPage(2, "")], 100, 10)) == []
+
+    pages = [PdfPage(1, "alpha beta"), PdfPage(2, ""), PdfPage(3, "gamma delta")]
+    chunks = list(chunk_pages(pages, 100, 10))
+    assert [c.text for c in chunks] == ["alpha beta\n\ngamma delta"]
+    assert (chunks[0].page_start, chunks[0].page_end) == (1, 3)
+
+
+def test_chunks_cross_page_boundaries_with_page_span():
+    pages = [PdfPage(n, f"Page {n} text. " * 20) for n in range(1, 6)]
+    chunks = list(chunk_pages(pages, 200, 40))
+
+    assert any(c.page_start != c.page_end for c in chunks)
+    for chunk in chunks:
+        assert chunk.page_start <= chunk.page_end
+        assert f"Page {chunk.page_start} " in chunk.text
+        assert f"Page {chunk.page_end} " in chunk.text
+    assert chunks[0].page_start == 1
+    assert chunks[-1].page_end == 5
+
+
+def test_streaming_matches_single_string():
+    texts = [SAMPLE[i:i + 700] for i in range(0, len(SAMPLE), 700)]
+    pages = [PdfPage(n, text) for n, text in enumerate(texts, 1)]
+    joined = "\n\n".join(texts)
+
+    streamed = [c.text for c in chunk_pages(pages, 300, 60)]
+    assert streamed == chunk_text(joined, 300, 60)
+
+
+def test_feed_yields_before_finish():
+    chunker = PageChunker(100, 20)
+    early = list(chunker.feed(PdfPage(1, "word " * 100)))
+    assert early
+    rest = list(chunker.finish())
+    assert rest
+    assert list(chunker.finish()) == []
+
+
+def test_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        PageChunker(0, 0)
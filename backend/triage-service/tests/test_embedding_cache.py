@@ -0,0 +1,105 @@
+"""Tests for graphrag.embedding_cache"""
+
+import multiprocessing
+
+import numpy as np
+
+from graphrag.embedding_cache import EmbeddingCache, text_key
+
+DIM = 8
+MODEL = "test-model"
+
+
+def vector_for(text: str) -> np.ndarray:
+    seed = sum(text.encode()) * 31 + len(text)
+    return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+def put(cache: EmbeddingCache, texts):
+    cache.put_many(MODEL, texts, np.stack([vector_for(t) for t in texts]))
+
+
+def slots(cache: EmbeddingCache):
+    return dict(cache._db.execute("SELECT key, slot FROM entries WHERE model = ?", (MODEL,)).fetchall())
+
+
+def test_round_trip_and_duplicates(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    put(cache, ["a", "b", "a"])
+
+    hits, misses = cache.get_many(MODEL, ["a", "c", "b"])
+    assert misses == [1]
+    np.testing.assert_array_equal(hits[0], vector_for("a"))
+    np.testing.assert_array_equal(hits[2], vector_for("b"))
+    assert cache.stats()["entries"] == 2
+    assert cache.get_many("other-model", ["a"]) == ({}, [0])
+
+
+def test_lru_eviction_and_slot_reuse(tmp_path):
+    row = DIM * 4
+    cache = EmbeddingCache(str(tmp_path), max_bytes=3 * row)
+    put(cache, ["a"])
+    put(cache, ["b"])
+    put(cache, ["c"])
+    cache.get_many(MODEL, ["a"])  # a is now more recent than b
+    before = slots(cache)
+
+    put(cache, ["d"])
+    hits, misses = cache.get_many(MODEL, ["a", "b", "c", "d"])
+    assert misses == [1]  # b was least recently used
+    assert cache.stats()["bytes"] == 3 * row
+
+    np.testing.assert_array_equal(hits[3], vector_for("d"))
+
+    # b's row was freed and is the next one handed out
+    put(cache, ["e"])
+    after = slots(cache)
+    assert after[text_key("e")] == before[text_key("b")]
+    assert max(after.values()) == len(before)  # no row beyond the one d added
+    hits, _ = cache.get_many(MODEL, ["e"])
+    np.testing.assert_array_equal(hits[0], vector_for("e"))
+
+
+def test_reopen_reads_persisted_vectors(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    put(cache, [f"text {i}" for i in range(2000)])
+    cache.close()
+
+    reopened = EmbeddingCache(str(tmp_path))
+    hits, misses = reopened.get_many(MODEL, ["text 0", "text 1999"])
+    assert misses == []
+    np.testing.assert_array_equal(hits[1], vector_for("text 1999"))
+
+
+def _writer(cache_dir: str, prefix: str, batches: int, barrier):
+    cache = EmbeddingCache(cache_dir)
+    barrier.wait()
+    for b in range(batches):
+        put(cache, [f"{prefix} {b} {i}" for i in range(64)])
+        # Read back the other process's rows as they appear
+        cache.get_many(MODEL, [f"other {b} {i}" for i in range(64)])
+    cache.close()
+
+
+def test_two_processes_share_a_cache_dir(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(2)
+    batches = 40  # 2560 rows each: both grow the file past its initial 1024 rows
+    workers = [
+        context.Process(target=_writer, args=(str(tmp_path), prefix, batches, barrier))
+        for prefix in ("first", "second")
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=120)
+        assert worker.exitcode == 0
+
+    cache = EmbeddingCache(str(tmp_path))
+    texts = [f"{prefix} {b} {i}" for prefix in ("first", "second") for b in range(batches) for i in range(64)]
+    assert len(set(slots(cache).values())) == len(texts)
+
+    hits, misses = cache.get_many(MODEL, texts)
+    assert misses == []
+    for i, text in enumerate(texts):
+        np.testing.assert_array_equal(hits[i], vector_for(text))
@@ -0,0 +1,104 @@
+"""Tests for the ordering and in-flight window of graphrag.embedding_pool"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from graphrag import embedding_pool
+from graphrag.embedding_pool import EmbeddingPool
+
+
+class SlowEmbedder:
+    """Later batches finish first, so ordering comes from the pool"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def embed_matrix(self, texts, normalize=True, batch_size=32, cached=True):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.02 / (1 + int(texts[0])))
+        with self.lock:
+            self.running -= 1
+        return [f"vec-{text}" for text in texts]
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # Threads instead of spawned processes: the workers' model loading is not under test
+    embedder = SlowEmbedder()
+    monkeypatch.setattr(embedding_pool, "_worker_embedder", embedder)
+    pool = EmbeddingPool.__new__(EmbeddingPool)
+    pool.processes = 4
+    pool.max_in_flight = 3
+    pool._executor = ThreadPoolExecutor(max_workers=4)
+    yield pool, embedder
+    pool.close()
+
+
+def batches(n):
+    return ([str(i), str(i)] for i in range(n))
+
+
+def test_map_ordered_keeps_submission_order(pool):
+    pool, embedder = pool
+    results = list(pool.map_ordered(batches(8)))
+    assert results == [[f"vec-{i}", f"vec-{i}"] for i in range(8)]
+    assert embedder.peak <= pool.max_in_flight
+
+
+def test_amap_ordered_keeps_submission_order(pool):
+    pool, embedder = pool
+
+    async def collect():
+        return [matrix async for matrix in pool.amap_ordered(batches(8))]
+
+    assert asyncio.run(collect()) == [[f"vec-{i}", f"vec-{i}"] for i in range(8)]
+    assert embedder.peak <= pool.max_in_flight
+
+
+def test_pooled_embeddings_are_cached_raw_like_the_in_process_path(tmp_path):
+    import numpy as np
+    from types import SimpleNamespace
+
+    from graphrag.advanced_rag_service import AdvancedRAGService, EmbeddingService
+    from graphrag.embedding_cache import EmbeddingCache
+
+    raw = {"a": np.array([3.0, 4.0], dtype=np.float32), "b": np.array([0.0, 2.0], dtype=np.float32)}
+
+    class FakePool:
+        async def amap_ordered(self, batches):
+            for texts in batches:
+                yield np.stack([raw[text] for text in texts])
+
+    cache = EmbeddingCache(str(tmp_path))
+    embedder = SimpleNamespace(
+        cache=cache,
+        cache_key="model",
+        normalize=EmbeddingService.normalize,
+        plan_batches=lambda texts, *args: [[i] for i in range(len(texts))],
+    )
+    service = SimpleNamespace(embedder=embedder, embed_batch_size=8, embed_max_batch_tokens=None)
+
+    async def collect():
+        out = {}
+        async for indices, matrix in AdvancedRAGService._embed_chunks_pooled(service, ["a", "b"], FakePool()):
+            out.update(zip(indices, matrix))
+        return out
+
+    first = asyncio.run(collect())
+    hits, misses = cache.get_many("model", ["a", "b"])
+    assert misses == []
+    np.testing.assert_allclose(hits[0], raw["a"])
+    np.testing.assert_allclose(first[0], [0.6, 0.8], rtol=1e-6)
+
+    # Served from the cache the second time, normalized the same way
+    again = asyncio.run(collect())
+    np.testing.assert_allclose(again[0], first[0], rtol=1e-6)
+    np.testing.assert_allclose(again[1], [0.0, 1.0])
@@ -0,0 +1,97 @@
+"""Tests for the local NER and similarity nodes of ai.nodes.huggingface_node"""
+
+import importlib.util
+
+import numpy as np
+
+from conftest import SERVICE_ROOT
+
+# Loaded by path: importing the ai package pulls in the LangGraph orchestrator
+_spec = importlib.util.spec_from_file_location("huggingface_node", SERVICE_ROOT / "ai" / "nodes" / "huggingface_node.py")
+huggingface_node = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(huggingface_node)
+
+MedicalNERNode = huggingface_node.MedicalNERNode
+SymptomSimilarityNode = huggingface_node.SymptomSimilarityNode
+
+
+def words(text: str):
+    return [(e["word"], e["entity_group"]) for e in MedicalNERNode(backend="gazetteer").extract_entities_sync(text)]
+
+
+def test_longest_term_wins_over_overlapping_ones():
+    assert words("High fever and vomiting blood since Lassa fever contact") == [
+        ("High fever", "Sign_symptom"),
+        ("vomiting blood", "Sign_symptom"),
+        ("Lassa fever", "Disease_disorder"),
+    ]
+    assert words("severe bleeding, then loss of consciousness") == [
+        ("severe bleeding", "Sign_symptom"),
+        ("loss of consciousness", "Sign_symptom"),
+    ]
+
+
+def test_matching_ignores_case_but_keeps_the_text_and_offsets():
+    text = "CHEST PAIN after Paracetamol"
+    entities = MedicalNERNode(backend="gazetteer").extract_entities_sync(text)
+    assert [(e["word"], e["entity_group"]) for e in entities] == [
+        ("CHEST PAIN", "Sign_symptom"),
+        ("Paracetamol", "Medication"),
+    ]
+    assert all(text[e["start"]:e["end"]] == e["word"] for e in entities)
+
+
+def test_terms_only_match_whole_words():
+    assert words("feverish and coughing, anaemic") == []
+    assert words("an x-ray and a malaria test") == [
+        ("x-ray", "Diagnostic_procedure"),
+        ("malaria test", "Diagnostic_procedure"),
+    ]
+
+
+def test_everyday_phrases_are_not_body_parts():
+    assert words("The fever came back ahead of the headache, head to the clinic") == [
+        ("fever", "Sign_symptom"),
+        ("headache", "Sign_symptom"),
+    ]
+    assert words("lower back pain") == [("back pain", "Sign_symptom")]
+
+
+class BagOfWordsEmbedder:
+    """Counts words over a fixed vocabulary; records how often it is called"""
+
+    VOCAB = ["fever", "chills", "cough", "breath", "rash", "itching", "pain", "chest"]
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_matrix(self, texts, normalize=True):
+        self.calls.append(list(texts))
+        matrix = np.array(
+            [[text.lower().count(word) for word in self.VOCAB] for text in texts], dtype=np.float32
+        ) + 1e-3
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_similarity_ranks_the_closest_condition_first():
+    embedder = BagOfWordsEmbedder()
+    conditions = ["malaria: fever and chills", "pneumonia: cough and short breath", "eczema: rash and itching"]
+    node = SymptomSimilarityNode(embedder=embedder, conditions=conditions)
+
+    scores = node.find_similar_conditions_sync("fever with chills at night")
+    assert [s["condition"] for s in scores] == conditions
+    assert max(scores, key=lambda s: s["similarity"])["condition"] == conditions[0]
+
+    scores = node.find_similar_conditions_sync("itching rash")
+    assert max(scores, key=lambda s: s["similarity"])["condition"] == conditions[2]
+
+    # Condition embeddings are computed once; each query embeds only itself
+    assert embedder.calls[0] == conditions
+    assert embedder.calls[1:] == [["fever with chills at night"], ["itching rash"]]
+
+
+def test_similarity_with_an_explicit_condition_list():
+    node = SymptomSimilarityNode(embedder=BagOfWordsEmbedder())
+    assert node.find_similar_conditions_sync("cough") == []
+    scores = node.find_similar_conditions_sync("chest pain", ["angina: chest pain", "flu: fever"])
+    assert scores[0]["similarity"] > scores[1]["similarity"]
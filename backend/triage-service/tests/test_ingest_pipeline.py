@@ -0,0 +1,72 @@
+"""Tests for graphrag.ingest_pipeline"""
+
+import asyncio
+import itertools
+
+import pytest
+
+from graphrag.ingest_pipeline import IngestPipeline, Stage, format_report
+
+
+def test_stages_batches_and_flush_in_order():
+    received = []
+    held = []
+
+    def batch_sum(batch):
+        held.append(len(batch))
+        return [sum(batch)]
+
+    async def collect(item):
+        received.append(item)
+        return [item]
+
+    pipeline = IngestPipeline("source", range(10), [
+        Stage("double", lambda x: [2 * x]),
+        Stage("sum", batch_sum, flush=lambda: ["end"], batch_size=4),
+        Stage("collect", collect, threaded=False),
+    ])
+    report = asyncio.run(pipeline.run())
+
+    # 0..9 doubled, summed in batches of 4, 4 and the 2 left at end of input
+    assert received == [12, 44, 34, "end"]
+    assert held == [4, 4, 2]
+    stages = report["stages"]
+    assert stages["source"]["items_out"] == 10
+    assert stages["double"]["items_in"] == 10 and stages["double"]["items_out"] == 10
+    assert stages["sum"]["items_in"] == 10 and stages["sum"]["items_out"] == 4
+    assert "wall" in format_report(report)
+
+
+def test_failing_stage_cancels_the_rest():
+    pulled = []
+
+    def source():
+        for i in itertools.count():
+            pulled.append(i)
+            yield i
+
+    def explode(item):
+        if item == 3:
+            raise ValueError("bad page")
+        return [item]
+
+    async def slow_sink(item):
+        await asyncio.sleep(0.01)
+        return []
+
+    pipeline = IngestPipeline("source", source(), [
+        Stage("check", explode),
+        Stage("sink", slow_sink, threaded=False),
+    ], queue_size=2)
+
+    async def run():
+        with pytest.raises(ValueError, match="bad page"):
+            await asyncio.wait_for(pipeline.run(), timeout=5)
+        count = len(pulled)
+        await asyncio.sleep(0.05)
+        return count
+
+    count = asyncio.run(run())
+    # The endless source stopped: bounded queues held it back, then it was cancelled
+    assert count < 50
+    assert len(pulled) <= count + 1
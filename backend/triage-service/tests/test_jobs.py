@@ -0,0 +1,120 @@
+"""Tests for graphrag.jobs"""
+
+import asyncio
+
+from graphrag.jobs import COMPLETED, FAILED, QUEUED, RUNNING, JobManager, JobStore, run_job
+
+
+def make_store(tmp_path) -> JobStore:
+    return JobStore(str(tmp_path / "jobs.sqlite"))
+
+
+async def ingest_all(job, store):
+    for doc in job.pending_documents():
+        store.document_progress(job.id, doc.path)(50, 100, "halfway")
+        if doc.path.endswith("bad.pdf"):
+            store.update_document(job.id, doc.path, FAILED, error="unreadable")
+        else:
+            store.update_document(job.id, doc.path, COMPLETED, 100.0, "Complete", {"chunks": 3})
+
+
+def test_store_round_trip_and_progress(tmp_path):
+    store = make_store(tmp_path)
+    job = store.create("kind", {"force": True}, ["a.pdf", "b.pdf"])
+
+    loaded = store.get(job.id)
+    assert loaded.status == QUEUED
+    assert loaded.params == {"force": True}
+    assert [doc.path for doc in loaded.documents] == ["a.pdf", "b.pdf"]
+
+    store.document_progress(job.id, "a.pdf")(50, 100, "Embedding")
+    store.update_document(job.id, "b.pdf", COMPLETED, 100.0, "Complete", {"chunks": 2})
+    loaded = store.get(job.id)
+    assert loaded.documents[0].status == RUNNING
+    assert loaded.progress == 75.0
+    assert loaded.documents[1].result == {"chunks": 2}
+    assert store.get("missing") is None
+
+
+def test_run_job_records_completion_and_document_failures(tmp_path):
+    store = make_store(tmp_path)
+    job = store.create("kind", {}, ["good.pdf", "bad.pdf"])
+    asyncio.run(run_job(store, {"kind": ingest_all}, job.id))
+
+    done = store.get(job.id)
+    assert done.status == COMPLETED
+    assert done.message == "1/2 documents ingested"
+    assert [doc.status for doc in done.documents] == [COMPLETED, FAILED]
+
+
+def test_handler_error_fails_job(tmp_path):
+    async def broken(job, store):
+        raise RuntimeError("neo4j down")
+
+    store = make_store(tmp_path)
+    job = store.create("kind", {}, ["a.pdf"])
+    asyncio.run(run_job(store, {"kind": broken}, job.id))
+    assert store.get(job.id).status == FAILED
+    assert store.get(job.id).error == "neo4j down"
+
+
+def test_resume_skips_completed_documents(tmp_path):
+    store = make_store(tmp_path)
+    job = store.create("kind", {}, ["a.pdf", "b.pdf", "c.pdf"])
+    # A previous process finished a.pdf and died during b.pdf
+    store.set_status(job.id, RUNNING)
+    store.update_document(job.id, "a.pdf", COMPLETED, 100.0)
+    store.update_document(job.id, "b.pdf", RUNNING, 40.0)
+
+    seen = []
+
+    async def record(job, store):
+        seen.extend(doc.path for doc in job.pending_documents())
+        await ingest_all(job, store)
+
+    async def main():
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite")))
+        manager.register("kind", record)
+        resumed = await manager.resume()
+        await asyncio.gather(*manager._tasks.values())
+        return resumed
+
+    assert asyncio.run(main()) == [job.id]
+    assert seen == ["b.pdf", "c.pdf"]
+    assert store.get(job.id).status == COMPLETED
+
+
+def test_concurrency_limit(tmp_path):
+    running = 0
+    peak = 0
+
+    async def slow(job, store):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+
+    async def main():
+        manager = JobManager(make_store(tmp_path), concurrency=2)
+        manager.register("kind", slow)
+        jobs = [await manager.submit("kind", {}, []) for _ in range(5)]
+        await asyncio.gather(*manager._tasks.values())
+        return jobs
+
+    jobs = asyncio.run(main())
+    assert peak == 2
+    store = make_store(tmp_path)
+    assert all(store.get(job.id).status == COMPLETED for job in jobs)
+
+
+def test_stream_ends_with_final_state(tmp_path):
+    async def main():
+        manager = JobManager(make_store(tmp_path))
+        manager.register("kind", ingest_all)
+        job = await manager.submit("kind", {}, ["a.pdf"])
+        return [snapshot async for snapshot in manager.stream(job.id, interval=0.01)]
+
+    snapshots = asyncio.run(main())
+    assert snapshots[-1]["status"] == COMPLETED
+    assert snapshots[-1]["progress"] == 100.0
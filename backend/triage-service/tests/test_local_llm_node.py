@@ -0,0 +1,31 @@
+"""Tests for the speculative decoding setup of ai.nodes.local_llm_node"""
+
+import importlib.util
+
+from conftest import SERVICE_ROOT
+
+# Loaded by path: importing the ai package pulls in the LangGraph orchestrator
+_spec = importlib.util.spec_from_file_location("local_llm_node", SERVICE_ROOT / "ai" / "nodes" / "local_llm_node.py")
+local_llm_node = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(local_llm_node)
+
+LocalLLMConfig = local_llm_node.LocalLLMConfig
+LocalLLMNode = local_llm_node.LocalLLMNode
+SpeculativeMode = local_llm_node.SpeculativeMode
+
+
+def test_missing_draft_model_disables_only_speculation(tmp_path):
+    node = LocalLLMNode(LocalLLMConfig(
+        speculative_mode=SpeculativeMode.DRAFT_MODEL,
+        draft_model_path=str(tmp_path / "missing.gguf"),
+    ))
+    assert node._init_draft_model() is None
+
+
+def test_draft_mode_without_a_path_disables_only_speculation():
+    node = LocalLLMNode(LocalLLMConfig(speculative_mode=SpeculativeMode.DRAFT_MODEL))
+    assert node._init_draft_model() is None
+
+
+def test_speculation_off_builds_no_draft_model():
+    assert LocalLLMNode(LocalLLMConfig())._init_draft_model() is None
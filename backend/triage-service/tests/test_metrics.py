@@ -0,0 +1,60 @@
+"""Tests for metrics.instrument_provider_call"""
+
+import asyncio
+
+import pytest
+
+import metrics
+from metrics import instrument_provider_call, set_provider_model, set_provider_outcome
+
+pytestmark = pytest.mark.skipif(not metrics.PROMETHEUS_AVAILABLE, reason="prometheus-client not installed")
+
+
+def calls(provider: str, model: str, outcome: str) -> float:
+    from prometheus_client import REGISTRY
+    labels = {"provider": provider, "model": model, "outcome": outcome}
+    return REGISTRY.get_sample_value("clinixai_provider_calls_total", labels) or 0.0
+
+
+def test_method_outcomes_and_model_argument():
+    class Node:
+        @instrument_provider_call("test-method")
+        async def call(self, prompt: str, model: str):
+            if prompt == "bad":
+                set_provider_outcome("parse_error")
+                return None
+            return {"ok": True}
+
+    node = Node()
+    asyncio.run(node.call("good", "m1"))
+    asyncio.run(node.call("bad", model="m1"))
+    assert calls("test-method", "m1", "success") == 1
+    assert calls("test-method", "m1", "parse_error") == 1
+
+
+def test_graph_node_function_with_succeeded_and_inner_model():
+    @instrument_provider_call("test-node", succeeded=lambda state: not state.get("error"))
+    async def node(state):
+        if not state.get("key"):
+            set_provider_outcome("not_configured")
+            return {**state, "error": "no key"}
+        set_provider_model(state["model"])
+        if state.get("fail"):
+            return {**state, "error": "http"}
+        return {**state, "error": None}
+
+    asyncio.run(node({}))
+    asyncio.run(node({"key": 1, "model": "chosen"}))
+    asyncio.run(node({"key": 1, "model": "chosen", "fail": True}))
+    assert calls("test-node", "unknown", "not_configured") == 1
+    assert calls("test-node", "chosen", "success") == 1
+    assert calls("test-node", "chosen", "error") == 1
+
+
+def test_model_callable_gets_the_call_arguments():
+    @instrument_provider_call("test-callable", model=lambda state: state["model"])
+    async def node(state):
+        return state
+
+    asyncio.run(node({"model": "from-state"}))
+    assert calls("test-callable", "from-state", "success") == 1
@@ -0,0 +1,146 @@
+"""Tests for ai.model_selector"""
+
+import asyncio
+import importlib.util
+import json
+import random
+
+from conftest import SERVICE_ROOT
+
+# Loaded by path: importing the ai package pulls in the LangGraph orchestrator
+_spec = importlib.util.spec_from_file_location("model_selector", SERVICE_ROOT / "ai" / "model_selector.py")
+model_selector = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(model_selector)
+
+BandPolicy = model_selector.BandPolicy
+ModelSelector = model_selector.ModelSelector
+ModelSelectorConfig = model_selector.ModelSelectorConfig
+BAND_CRITICAL = model_selector.BAND_CRITICAL
+BAND_STANDARD = model_selector.BAND_STANDARD
+BAND_SIMPLE = model_selector.BAND_SIMPLE
+
+
+def make_selector(tmp_path, **kwargs) -> ModelSelector:
+    config = ModelSelectorConfig(
+        state_path=str(tmp_path / "state.json"),
+        policies={
+            BAND_CRITICAL: BandPolicy(candidates=["big-a", "big-b"], cost_weight=0.0, min_success_rate=0.9),
+            BAND_STANDARD: BandPolicy(candidates=["mid-a", "mid-b"]),
+            BAND_SIMPLE: BandPolicy(candidates=["small-a", "small-b"]),
+        },
+        **kwargs,
+    )
+    selector = ModelSelector(config)
+    selector._rng = random.Random(0)
+    return selector
+
+
+def test_band_for():
+    assert ModelSelector.band_for(0.95) == BAND_CRITICAL
+    assert ModelSelector.band_for(0.2, critical=True) == BAND_CRITICAL
+    assert ModelSelector.band_for(0.5, risk_score=0.85) == BAND_CRITICAL
+    assert ModelSelector.band_for(0.2, risk_score=0.2) == BAND_SIMPLE
+    assert ModelSelector.band_for(0.5, risk_score=0.5) == BAND_STANDARD
+    assert ModelSelector.band_for(0.75) == BAND_STANDARD
+    assert ModelSelector.band_for(0.3) == BAND_SIMPLE
+
+
+def test_thompson_sampling_prefers_the_better_model(tmp_path):
+    selector = make_selector(tmp_path)
+    for _ in range(30):
+        selector.record(BAND_STANDARD, "mid-a", success=True, latency_ms=1000)
+        selector.record(BAND_STANDARD, "mid-b", success=False, latency_ms=1000)
+
+    picks = [selector.select(BAND_STANDARD) for _ in range(200)]
+    assert picks.count("mid-a") > 190
+    assert selector.rank(BAND_STANDARD) == ["mid-a", "mid-b"]
+
+
+def test_unobserved_models_are_explored(tmp_path):
+    selector = make_selector(tmp_path)
+    picks = {selector.select(BAND_SIMPLE) for _ in range(50)}
+    assert picks == {"small-a", "small-b"}
+
+
+def test_critical_never_widens_past_its_allowlist(tmp_path):
+    selector = make_selector(tmp_path)
+    assert selector.candidates(BAND_CRITICAL, extra=["cheap"]) == ["big-a", "big-b"]
+    assert "cheap" in selector.candidates(BAND_STANDARD, extra=["cheap"])
+    assert selector.select(BAND_CRITICAL, default="big-c") in {"big-a", "big-b", "big-c"}
+
+
+def test_success_rate_floor(tmp_path):
+    selector = make_selector(tmp_path, min_samples=10)
+    for i in range(20):
+        selector.record(BAND_CRITICAL, "big-a", success=i % 2 == 0, latency_ms=100)
+        selector.record(BAND_CRITICAL, "big-b", success=True, latency_ms=9000)
+
+    # big-a is faster but below the 0.9 floor
+    assert {selector.select(BAND_CRITICAL) for _ in range(20)} == {"big-b"}
+    assert selector.rank(BAND_CRITICAL) == ["big-b", "big-a"]
+
+
+def test_unavailable_models_cool_down_without_quality_penalty(tmp_path):
+    selector = make_selector(tmp_path)
+    selector.record(BAND_STANDARD, "mid-a", success=True, latency_ms=500)
+    before = dict(selector._arm(BAND_STANDARD, "mid-a"))
+
+    selector.record_unavailable(BAND_STANDARD, "mid-a")
+    arm = selector._arm(BAND_STANDARD, "mid-a")
+    for key in ("successes", "failures", "calls", "latency_ms", "cost_usd"):
+        assert arm[key] == before[key]
+    assert arm["unavailable"] == 1.0
+
+    assert {selector.select(BAND_STANDARD) for _ in range(20)} == {"mid-b"}
+    assert selector.rank(BAND_STANDARD)[-1] == "mid-a"
+
+    # Every candidate cooling down still leaves the band with a model
+    selector.record_unavailable(BAND_STANDARD, "mid-b")
+    assert selector.select(BAND_STANDARD) in {"mid-a", "mid-b"}
+
+    arm["unavailable_at"] -= selector.config.unavailable_cooldown_s + 1
+    assert "mid-a" in {selector.select(BAND_STANDARD) for _ in range(50)}
+
+
+def test_feedback_for_status():
+    feedback = model_selector.feedback_for_status
+    assert {feedback(code) for code in (402, 429)} == {model_selector.FEEDBACK_UNAVAILABLE}
+    assert {feedback(code) for code in (408, 500, 502, 503)} == {model_selector.FEEDBACK_FAILURE}
+    # A bad key or a bad request is not the model's fault
+    assert {feedback(code) for code in (400, 401, 403, 404, 422)} == {model_selector.FEEDBACK_SKIP}
+
+
+def test_async_records_save_off_the_event_loop(tmp_path):
+    selector = make_selector(tmp_path, save_every=5)
+
+    async def burst():
+        await asyncio.gather(*(
+            selector.arecord(BAND_SIMPLE, "small-a", success=True, latency_ms=100) for _ in range(23)
+        ))
+        await selector.arecord_unavailable(BAND_SIMPLE, "small-b")
+
+    asyncio.run(burst())
+    # Saves ran on worker threads after later updates landed, one writer at a time
+    saved = json.loads((tmp_path / "state.json").read_text())
+    assert 20 <= saved["arms"][BAND_SIMPLE]["small-a"]["calls"] <= 23
+    assert not (tmp_path / "state.json.tmp").exists()
+
+
+def test_state_survives_restart(tmp_path):
+    selector = make_selector(tmp_path)
+    for _ in range(5):
+        selector.record(BAND_SIMPLE, "small-b", success=True, latency_ms=200, cost_usd=0.001)
+    selector.record_unavailable(BAND_SIMPLE, "small-a")
+    selector.save()
+
+    restored = make_selector(tmp_path)
+    assert restored.snapshot()[BAND_SIMPLE] == selector.snapshot()[BAND_SIMPLE]
+    assert restored._arm(BAND_SIMPLE, "small-b")["calls"] == 5
+    assert restored.rank(BAND_SIMPLE)[0] == "small-b"
+
+
+def test_estimate_cost_prefers_reported_cost(tmp_path):
+    selector = make_selector(tmp_path, prices_per_mtok={"mid-a": [1.0, 2.0]})
+    assert selector.estimate_cost("mid-a", {"cost": 0.5}) == 0.5
+    assert selector.estimate_cost("mid-a", {"prompt_tokens": 1_000_000, "completion_tokens": 500_000}) == 2.0
+    assert selector.estimate_cost("unknown", {"prompt_tokens": 10}) == 0.0
@@ -0,0 +1,71 @@
+"""Tests for graphrag.neo4j_client.plan_graph_writes"""
+
+from graphrag.neo4j_client import GraphDocument, GraphNode, GraphRelationship, plan_graph_writes
+
+
+def node(node_id: str, label: str) -> GraphNode:
+    return GraphNode(id=node_id, label=label, properties={"name": node_id})
+
+
+def document(chunk_id: str) -> GraphDocument:
+    return GraphDocument(
+        nodes=[
+            node("Fever", "Symptom"),
+            node("Sepsis", "Disease"),
+            node("Rash", "Symptom"),
+            node("Injected", "Disease`) DETACH DELETE n //"),
+        ],
+        relationships=[
+            GraphRelationship("Sepsis", "Fever", "HAS_SYMPTOM", {}),
+            GraphRelationship("Sepsis", "Rash", "HAS_SYMPTOM", {}),
+            GraphRelationship("Sepsis", "Fever", "CAUSES\n", {}),
+            GraphRelationship("Sepsis", "Elsewhere", "HAS_SYMPTOM", {}),
+        ],
+        source=f"text of {chunk_id}",
+        metadata={"chunk_id": chunk_id, "text": "...", "page_start": 1, "page_end": 1},
+    )
+
+
+def statements(transactions):
+    return [statement for transaction in transactions for statement in transaction]
+
+
+def test_groups_by_label_and_relationship_type():
+    labels, transactions, stats = plan_graph_writes([document("c1"), document("c2")], True, batch_size=100)
+
+    assert sorted(labels) == ["Disease", "Entity", "Symptom"]
+    # Nodes merge across documents; relationships do not (one row per document)
+    assert stats["nodes"] == 4
+    assert stats["relationships"] == 4
+    # Invalid type and missing endpoint, per document
+    assert stats["skipped_relationships"] == 4
+    assert stats["transactions"] == 1
+
+    queries = [query for query, _ in statements(transactions)]
+    assert not any("DETACH" in query or "CAUSES" in query for query in queries)
+    relationship_rows = [rows for query, rows in statements(transactions) if "HAS_SYMPTOM" in query]
+    assert relationship_rows == [[
+        {"source": "Sepsis", "target": "Fever", "properties": {}},
+        {"source": "Sepsis", "target": "Rash", "properties": {}},
+    ] * 2]
+    chunk_rows = [rows for query, rows in statements(transactions) if "MERGE (c:Chunk" in query]
+    assert [row["id"] for row in chunk_rows[0]] == ["c1", "c2"]
+
+
+def test_transactions_hold_about_batch_size_rows():
+    docs = [document(f"c{i}") for i in range(10)]
+    _, transactions, _ = plan_graph_writes(docs, True, batch_size=5)
+
+    for transaction in transactions:
+        assert all(len(rows) <= 5 for _, rows in transaction)
+    # Slices are packed until a transaction reaches batch_size rows
+    for transaction in transactions[:-1]:
+        assert 5 <= sum(len(rows) for _, rows in transaction) < 10
+    total = sum(len(rows) for _, rows in statements(transactions))
+    _, single, _ = plan_graph_writes(docs, True, batch_size=1000)
+    assert total == sum(len(rows) for _, rows in statements(single))
+
+
+def test_without_source_writes_no_chunks():
+    _, transactions, _ = plan_graph_writes([document("c1")], False, batch_size=100)
+    assert not any("Chunk" in query for query, _ in statements(transactions))
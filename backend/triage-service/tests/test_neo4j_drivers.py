@@ -0,0 +1,57 @@
+"""Tests for graphrag.neo4j_drivers (drivers are created but never connect)"""
+
+import asyncio
+
+import pytest
+
+from graphrag import neo4j_drivers
+
+pytestmark = pytest.mark.skipif(not neo4j_drivers.NEO4J_AVAILABLE, reason="neo4j not installed")
+
+URI = "bolt://localhost:1"
+
+
+def test_sync_driver_is_shared_until_the_last_release():
+    first = neo4j_drivers.acquire(URI, "shared", "pw")
+    second = neo4j_drivers.acquire(URI, "shared", "pw")
+    other_user = neo4j_drivers.acquire(URI, "other", "pw")
+    try:
+        assert first is second
+        assert other_user is not first
+        assert neo4j_drivers.stats()["drivers"][f"{URI} (shared)"] == 2
+
+        neo4j_drivers.release(URI, "shared")
+        assert neo4j_drivers.stats()["drivers"][f"{URI} (shared)"] == 1
+        assert neo4j_drivers.acquire(URI, "shared", "pw") is first
+        neo4j_drivers.release(URI, "shared")
+    finally:
+        neo4j_drivers.release(URI, "shared")
+        neo4j_drivers.release(URI, "other")
+
+    assert f"{URI} (shared)" not in neo4j_drivers.stats()["drivers"]
+    # A new acquire after the last release opens a new driver
+    fresh = neo4j_drivers.acquire(URI, "shared", "pw")
+    assert fresh is not first
+    neo4j_drivers.release(URI, "shared")
+
+
+def test_async_drivers_are_per_event_loop():
+    async def acquire_pair():
+        a = await neo4j_drivers.acquire_async(URI, "async", "pw")
+        b = await neo4j_drivers.acquire_async(URI, "async", "pw")
+        await neo4j_drivers.release_async(URI, "async")
+        await neo4j_drivers.release_async(URI, "async")
+        return a, b
+
+    a1, b1 = asyncio.run(acquire_pair())
+    a2, _ = asyncio.run(acquire_pair())
+    assert a1 is b1
+    assert a2 is not a1
+
+
+def test_pool_config_from_env(monkeypatch):
+    monkeypatch.setenv("NEO4J_MAX_POOL_SIZE", "7")
+    monkeypatch.setenv("NEO4J_CONNECTION_TIMEOUT", "2.5")
+    config = neo4j_drivers.pool_config()
+    assert config["max_connection_pool_size"] == 7
+    assert config["connection_timeout"] == 2.5
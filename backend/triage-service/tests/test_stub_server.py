@@ -0,0 +1,140 @@
+"""Tests for benchmarks.stub_server record and replay modes"""
+
+import asyncio
+import json
+import random
+import statistics
+
+import httpx
+
+from benchmarks.stub_server import API_OPENAI, API_OPENROUTER, FaultProfile, StubConfig, create_app
+
+CHAT = {"model": "m", "messages": [{"role": "user", "content": "fever"}]}
+AUTH = {"Authorization": "Bearer secret", "x-api-key": "secret"}
+
+
+def record(tmp_path, upstreams, path):
+    seen = []
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"choices": [], "host": request.url.host})
+
+    cassette = tmp_path / "cassette.jsonl"
+    app = create_app(StubConfig(mode="record", cassette_path=str(cassette), upstreams=upstreams))
+    app.state.stub._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://stub") as client:
+            return await client.post(path, json=CHAT, headers=AUTH)
+
+    response = asyncio.run(main())
+    entries = [json.loads(line) for line in cassette.read_text().splitlines()]
+    return response, seen, entries
+
+
+def test_each_provider_records_from_its_own_upstream(tmp_path):
+    _, seen, entries = record(tmp_path, {API_OPENAI: "https://openai.test/v1"}, "/openai/v1/chat/completions")
+    assert str(seen[0].url) == "https://openai.test/v1/chat/completions"
+    assert [entry["api"] for entry in entries] == [API_OPENAI]
+
+
+def test_credentials_forwarded_only_to_configured_upstream(tmp_path):
+    _, seen, _ = record(tmp_path, {API_OPENAI: "https://openai.test/v1"}, "/openai/v1/chat/completions")
+    assert seen[0].headers["authorization"] == "Bearer secret"
+
+    _, seen, entries = record(tmp_path, {API_OPENAI: "https://openai.test/v1"}, "/openrouter/v1/chat/completions")
+    assert seen[0].url.host == "openrouter.ai"
+    assert "authorization" not in seen[0].headers
+    assert "x-api-key" not in seen[0].headers
+    assert entries[-1]["api"] == API_OPENROUTER
+
+
+def replay(config, requests):
+    """POST each (path, payload) to a replay-mode app; returns (responses, stats)"""
+    app = create_app(config)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://stub") as client:
+            responses = [await client.post(path, json=payload) for path, payload in requests]
+            stats = (await client.get("/_stub/stats")).json()
+            return responses, stats
+
+    return asyncio.run(main())
+
+
+def no_latency(**rates) -> FaultProfile:
+    return FaultProfile(latency_mode="none", **rates)
+
+
+def test_replay_cycles_recordings_and_synthesizes_on_a_miss(tmp_path):
+    cassette = tmp_path / "cassette.jsonl"
+    entries = [
+        {"api": API_OPENAI, "model": "m", "status": 200, "body": {"n": 1}, "latency_ms": 5},
+        {"api": API_OPENAI, "model": "m", "status": 200, "body": {"n": 2}, "latency_ms": 5},
+        {"api": API_OPENAI, "model": "m", "status": 500, "body": {"n": 3}, "latency_ms": 5},
+    ]
+    cassette.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+    config = StubConfig(cassette_path=str(cassette), default_profile=no_latency())
+
+    chat = "/openai/v1/chat/completions"
+    other_model = {**CHAT, "model": "other"}
+    responses, stats = replay(config, [
+        (chat, CHAT), (chat, CHAT), (chat, CHAT), (chat, other_model),
+        ("/openrouter/v1/chat/completions", CHAT),
+    ])
+
+    # Only successful recordings replay, round-robin; other models of the api share them
+    assert [r.json() for r in responses[:4]] == [{"n": 1}, {"n": 2}, {"n": 1}, {"n": 1}]
+    # Nothing recorded for openrouter: synthetic triage JSON
+    content = json.loads(responses[4].json()["choices"][0]["message"]["content"])
+    assert content["urgency"] == "standard"
+    assert stats["requests"][API_OPENAI]["replayed"] == 4
+    assert stats["requests"][API_OPENROUTER]["synthetic"] == 1
+
+
+def test_fault_injection_shapes():
+    chat = "/openai/v1/chat/completions"
+    responses, _ = replay(
+        StubConfig(profiles={API_OPENAI: no_latency(rate_limit_rate=1.0, retry_after_s=7)}),
+        [(chat, CHAT)],
+    )
+    assert responses[0].status_code == 429
+    assert responses[0].headers["retry-after"] == "7"
+
+    responses, _ = replay(StubConfig(default_profile=no_latency(malformed_rate=1.0)), [(chat, CHAT)])
+    assert responses[0].status_code == 200
+    content = responses[0].json()["choices"][0]["message"]["content"]
+    assert not content.startswith("{")
+
+    responses, _ = replay(StubConfig(default_profile=no_latency(unavailable_rate=1.0)), [("/models/ner", {"inputs": "x"})])
+    assert responses[0].status_code == 503 and "estimated_time" in responses[0].json()
+
+
+def test_fixed_seed_fault_profile_is_reproducible():
+    profile = no_latency(error_rate=0.2, rate_limit_rate=0.2, unavailable_rate=0.1)
+    requests = [("/openai/v1/chat/completions", CHAT)] * 200
+
+    first, stats = replay(StubConfig(seed=7, default_profile=profile), requests)
+    second, _ = replay(StubConfig(seed=7, default_profile=profile), requests)
+    statuses = [r.status_code for r in first]
+    assert statuses == [r.status_code for r in second]
+
+    counts = stats["requests"][API_OPENAI]
+    assert counts["total"] == 200
+    assert counts["error"] == statuses.count(500) and 20 <= counts["error"] <= 60
+    assert counts["rate_limited"] == statuses.count(429) and 20 <= counts["rate_limited"] <= 60
+    assert counts["unavailable"] == statuses.count(503) and 5 <= counts["unavailable"] <= 40
+
+
+def test_lognormal_latency_matches_p50_and_p99():
+    profile = FaultProfile(p50_ms=400, p99_ms=2000)
+    rng = random.Random(0)
+    samples = sorted(profile.sample_latency_s(rng) * 1000 for _ in range(20000))
+    assert abs(statistics.median(samples) - 400) < 20
+    assert abs(samples[int(0.99 * len(samples))] - 2000) < 200
+
+    assert FaultProfile(latency_mode="recorded").sample_latency_s(rng, recorded_ms=250) == 0.25
+    assert FaultProfile(latency_mode="none").sample_latency_s(rng) == 0.0
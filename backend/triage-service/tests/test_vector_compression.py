@@ -0,0 +1,82 @@
+"""Tests for graphrag.vector_compression"""
+
+import numpy as np
+import pytest
+
+from graphrag.vector_compression import CompressionConfig, VectorCompressor
+
+DIM = 32
+
+
+def unit_vectors(n: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((n, DIM))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_pca_fit_transform_shapes():
+    compressor = VectorCompressor(CompressionConfig("pca", dims=8), DIM)
+    assert compressor.needs_fit and not compressor.can_transform
+
+    compressor.fit(unit_vectors(100))
+    assert not compressor.needs_fit and compressor.can_transform
+    assert compressor.components.shape == (8, DIM)
+
+    matrix = compressor.transform(unit_vectors(10, seed=1))
+    assert matrix.shape == (10, 8) and matrix.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-5)
+    assert compressor.transform(unit_vectors(1, seed=2)[0]).shape == (8,)
+
+
+def test_pca_needs_enough_samples():
+    with pytest.raises(ValueError):
+        VectorCompressor(CompressionConfig("pca", dims=8), DIM).fit(unit_vectors(4))
+
+
+def test_unfitted_pca_transform_raises():
+    with pytest.raises(RuntimeError):
+        VectorCompressor(CompressionConfig("pca", dims=8), DIM).transform(unit_vectors(1))
+
+
+def test_matryoshka_keeps_leading_dimensions():
+    compressor = VectorCompressor(CompressionConfig("matryoshka", dims=8), DIM)
+    assert compressor.can_transform and not compressor.needs_fit
+
+    vectors = unit_vectors(5)
+    reduced = compressor.transform(vectors)
+    expected = vectors[:, :8] / np.linalg.norm(vectors[:, :8], axis=1, keepdims=True)
+    np.testing.assert_allclose(reduced, expected, rtol=1e-5)
+
+
+def test_int8_scales_cover_the_corpus():
+    compressor = VectorCompressor(CompressionConfig(int8=True), DIM)
+    # int8 alone does not change the vectors; scales only serve quantize()
+    assert compressor.can_transform and not compressor.needs_fit
+
+    corpus = unit_vectors(200)
+    compressor.fit(corpus)
+    codes = compressor.quantize(compressor.transform(corpus))
+    assert codes.dtype == np.int8 and codes.shape == corpus.shape
+    assert np.abs(codes).max() == 127
+    assert compressor.bytes_per_vector() == DIM
+
+
+def test_save_load_round_trip(tmp_path):
+    path = tmp_path / "chunk_embeddings.npz"
+    config = CompressionConfig("pca", dims=8, int8=True)
+    fitted = VectorCompressor(config, DIM).fit(unit_vectors(100))
+    fitted.save(str(path))
+
+    loaded = VectorCompressor.load(str(path), config, DIM)
+    assert not loaded.needs_fit
+    queries = unit_vectors(3, seed=1)
+    np.testing.assert_allclose(loaded.transform(queries), fitted.transform(queries), rtol=1e-5)
+
+    # A different target dimension ignores the saved state
+    assert VectorCompressor.load(str(path), CompressionConfig("pca", dims=4), DIM).needs_fit
+
+
+def test_invalid_configs():
+    with pytest.raises(ValueError):
+        VectorCompressor(CompressionConfig("pca"), DIM)
+    with pytest.raises(ValueError):
+        VectorCompressor(CompressionConfig("matryoshka", dims=DIM + 1), DIM)
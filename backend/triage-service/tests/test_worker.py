@@ -0,0 +1,108 @@
+"""Tests for graphrag.worker and the enqueue path of graphrag.jobs"""
+
+import asyncio
+from collections import deque
+
+import pytest
+
+from graphrag.jobs import COMPLETED, FAILED, QUEUED, JobManager, JobStore
+from graphrag.worker import IngestionWorker
+
+
+class MemoryJobQueue:
+    """In-process stand-in with RedisJobQueue's interface"""
+
+    def __init__(self):
+        self.pending = deque()
+        self.processing = {}
+        self.pending_key = "memory:queue"
+
+    async def enqueue(self, job_id):
+        self.pending.appendleft(job_id)
+
+    async def claim(self, worker_id, timeout=5.0):
+        if not self.pending:
+            await asyncio.sleep(min(timeout, 0.01))
+            return None
+        job_id = self.pending.pop()
+        self.processing.setdefault(worker_id, []).append(job_id)
+        return job_id
+
+    async def ack(self, worker_id, job_id):
+        self.processing[worker_id].remove(job_id)
+
+    async def recover(self, worker_id):
+        recovered = self.processing.pop(worker_id, [])
+        self.pending.extend(recovered)
+        return recovered
+
+    async def close(self):
+        pass
+
+
+async def complete_all(job, store):
+    for doc in job.pending_documents():
+        store.update_document(job.id, doc.path, COMPLETED, 100.0)
+
+
+def test_api_manager_only_enqueues(tmp_path):
+    queue = MemoryJobQueue()
+
+    async def main():
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite")), queue=queue)
+        manager.register("kind", complete_all)
+        job = await manager.submit("kind", {}, ["a.pdf"])
+        assert await manager.resume() == []
+        return manager, job
+
+    manager, job = asyncio.run(main())
+    assert list(queue.pending) == [job.id]
+    assert manager.store.get(job.id).status == QUEUED
+
+
+def test_enqueue_failure_fails_the_job(tmp_path):
+    class DownQueue(MemoryJobQueue):
+        async def enqueue(self, job_id):
+            raise ConnectionError("redis is down")
+
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+
+    async def main():
+        manager = JobManager(store, queue=DownQueue())
+        manager.register("kind", complete_all)
+        with pytest.raises(ConnectionError):
+            await manager.submit("kind", {}, ["a.pdf"])
+
+    asyncio.run(main())
+    (job,) = store.list()
+    assert job.status == FAILED
+    assert job.error == "redis is down"
+    assert store.unfinished() == []
+
+
+def test_worker_runs_queued_and_recovered_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    queue = MemoryJobQueue()
+    interrupted = store.create("kind", {}, ["a.pdf"])
+    fresh = store.create("kind", {}, ["b.pdf", "c.pdf"])
+    # A previous run of this worker claimed a job and died
+    queue.processing["w1"] = [interrupted.id]
+    queue.pending.appendleft(fresh.id)
+
+    async def main():
+        manager = JobManager(store, concurrency=2)
+        manager.register("kind", complete_all)
+        worker = IngestionWorker(manager, queue, "w1", poll_seconds=0.01)
+        task = asyncio.create_task(worker.run())
+        for _ in range(200):
+            await asyncio.sleep(0.01)
+            if all(store.get(j.id).status == COMPLETED for j in (interrupted, fresh)):
+                break
+        worker.stop()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert store.get(interrupted.id).status == COMPLETED
+    assert store.get(fresh.id).status == COMPLETED
+    assert queue.processing["w1"] == []
+    assert not queue.pending